@@ -0,0 +1,126 @@
+# 영상별 아티팩트 manifest (manifests/{video_id}/artifacts.json)
+# - 추출 단계가 샘플 프레임마다 ms → {t, frame_id, frame/face/pose: {key, size}}를 기록하고 단계 끝에 1회 저장
+#   (packed 형식이면 key는 범위 참조, pack/offset 포함 — artifact_pack.py)
+# - 시선/감정/자세 단계는 저장소를 LIST하지 않고 manifest에서 입력 키와 frame_id를 얻음
+#   (list_objects_v2 1,000키 절단/LIST 지연 없음, Frame.image_url 매칭 쿼리 없음)
+# - manifest가 없는 과거 영상은 prefix LIST(페이지 처리) + URL 매칭으로 대체
+# - 같은 프로세스에서 방금 저장한 manifest는 메모리에서 바로 반환 (저장소 GET 없음)
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app import storage
+from app.log import get_logger
+
+logger = get_logger("manifest")
+
+MANIFEST_VERSION = 1
+KINDS = ("frame", "face", "pose")
+KIND_PREFIX = {"frame": "frames/{video_id}/", "face": "faces/{video_id}/", "pose": "poses/{video_id}/"}
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".webp")
+
+_RECENT_MAX = 16
+_recent: "OrderedDict[int, ArtifactManifest]" = OrderedDict()
+_recent_lock = threading.Lock()
+
+
+def manifest_key(video_id: int) -> str:
+    return f"manifests/{video_id}/artifacts.json"
+
+
+class ArtifactManifest:
+    """ms → {"t", "frame_id", "frame"/"face"/"pose": {"key", "size"}} (스레드 안전)"""
+
+    def __init__(self, video_id: int, entries: Optional[Dict[int, Dict[str, Any]]] = None):
+        self.video_id = video_id
+        self.entries: Dict[int, Dict[str, Any]] = entries or {}
+        self._lock = threading.Lock()
+
+    def add(self, t: float, kind: str, key: str, size: int, frame_id: Optional[int] = None, **extra) -> None:
+        ms = int(t * 1000)
+        with self._lock:
+            entry = self.entries.setdefault(ms, {"t": t})
+            entry[kind] = {"key": key, "size": int(size), **extra}
+            if frame_id is not None:
+                entry["frame_id"] = frame_id
+
+    def link_frame(self, t: float, frame_id: int) -> None:
+        with self._lock:
+            self.entries.setdefault(int(t * 1000), {"t": t})["frame_id"] = frame_id
+
+    def ref(self, ms: int, kind: str) -> Optional[str]:
+        """ms 시각 kind 아티팩트의 키(또는 범위 참조), 없으면 None (항목 ms는 절사, 렌더링 URL ms는 반올림 → ±1ms 허용)"""
+        with self._lock:
+            for candidate in (ms, ms - 1, ms + 1):
+                item = self.entries.get(candidate, {}).get(kind)
+                if item:
+                    return item["key"]
+        return None
+
+    def items(self, kind: str) -> List[Tuple[str, Optional[int]]]:
+        """kind 아티팩트 (key, frame_id) 목록, 시간순"""
+        with self._lock:
+            return [(e[kind]["key"], e.get("frame_id")) for _, e in sorted(self.entries.items()) if kind in e]
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = [{"ms": ms, **e} for ms, e in sorted(self.entries.items())]
+        totals = {k: sum(e[k]["size"] for e in entries if k in e) for k in KINDS}
+        return {"version": MANIFEST_VERSION, "video_id": self.video_id, "bytes": totals, "entries": entries}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ArtifactManifest":
+        entries = {}
+        for e in data.get("entries", []):
+            e = dict(e)
+            entries[int(e.pop("ms"))] = e
+        return cls(int(data["video_id"]), entries)
+
+    def save(self) -> str:
+        """저장소에 기록 + 프로세스 캐시 → URL"""
+        body = json.dumps(self.to_dict(), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        url = storage.get_storage().put_bytes(manifest_key(self.video_id), body, "application/json")
+        _remember(self)
+        logger.info("Artifact manifest saved: video_id=%s, %d entries, %d bytes",
+                    self.video_id, len(self.entries), len(body))
+        return url
+
+
+def _remember(manifest: ArtifactManifest) -> None:
+    with _recent_lock:
+        _recent[manifest.video_id] = manifest
+        _recent.move_to_end(manifest.video_id)
+        while len(_recent) > _RECENT_MAX:
+            _recent.popitem(last=False)
+
+
+def load(video_id: int) -> Optional[ArtifactManifest]:
+    """video_id의 manifest (없거나 읽기 실패 시 None)"""
+    with _recent_lock:
+        cached = _recent.get(video_id)
+    if cached is not None:
+        return cached
+    try:
+        data = json.loads(storage.get_storage().get_bytes(manifest_key(video_id)))
+    except Exception as e:
+        logger.info("No artifact manifest for video_id=%s (%s), falling back to listing", video_id, type(e).__name__)
+        return None
+    if data.get("version") != MANIFEST_VERSION:
+        logger.warning("Unsupported manifest version %s for video_id=%s", data.get("version"), video_id)
+        return None
+    manifest = ArtifactManifest.from_dict(data)
+    _remember(manifest)
+    return manifest
+
+
+def artifact_keys(video_id: int, kind: str) -> List[Tuple[str, Optional[int]]]:
+    """
+    분석 입력 (key, frame_id) 목록.
+    manifest가 있으면 그대로, 없으면 prefix LIST 결과 (frame_id=None → 호출부에서 URL 매칭)
+    """
+    manifest = load(video_id)
+    if manifest is not None:
+        return manifest.items(kind)
+    prefix = KIND_PREFIX[kind].format(video_id=video_id)
+    return [(k, None) for k in storage.get_storage().list(prefix) if k.lower().endswith(IMAGE_EXTS)]
@@ -0,0 +1,89 @@
+# 추출 아티팩트(frames/faces/poses) 저장기
+# - 기본(ARTIFACT_PACKED=0): 이미지 1장 = 객체 1개 ({kind}s/{video_id}/{kind}_{ms}.jpg), 기존 방식
+# - packed(ARTIFACT_PACKED=1): 종류별로 작업 디렉터리의 spool 파일에 이어 붙이고 단계 끝에
+#   packs/{video_id}/{kind}s.pack 1개씩 업로드 (20분 영상 기준 PUT ~3,600회 → 3회)
+#   · 개별 이미지는 범위 참조 "{key}#bytes={start}-{end}" (storage.read_ref, Range GET 1회)
+#   · Frame.image_url = 렌더링 URL(/videos/{video_id}/frames/{ms}) — 브라우저는 URL의 #fragment를 보내지 않으므로
+#     pack URL을 그대로 쓰면 pack 전체를 받게 됨. 엔드포인트가 manifest의 범위 참조로 Range GET (frame_render.py)
+#   · 인덱스(ms → offset/size)는 manifest
+# - 어느 형식이든 manifest에 {key(또는 범위 참조), size, frame_id}를 기록 → 분석 단계는 형식을 몰라도 됨
+import os
+import threading
+from typing import BinaryIO, Dict, Optional
+
+from app import artifact_manifest, frame_render, image_codec, storage
+from app.config import ARTIFACT_PACKED
+from app.log import get_logger
+
+logger = get_logger("artifact_pack")
+
+
+def pack_key(video_id: int, kind: str) -> str:
+    return f"packs/{video_id}/{kind}s.pack"
+
+
+class ArtifactWriter:
+    """영상 1개의 frames/faces/poses 저장 + manifest 기록 (스레드 안전)"""
+
+    def __init__(self, video_id: int, work_dir: str, s3_utils, packed: bool = ARTIFACT_PACKED):
+        self.video_id = video_id
+        self.work_dir = work_dir
+        self.s3_utils = s3_utils
+        self.packed = packed
+        self.manifest = artifact_manifest.ArtifactManifest(video_id)
+        self._spools: Dict[str, BinaryIO] = {}
+        self._offsets: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _spool_path(self, kind: str) -> str:
+        return os.path.join(self.work_dir, f"{kind}s.pack")
+
+    def _append(self, kind: str, data: bytes) -> int:
+        with self._lock:
+            f = self._spools.get(kind)
+            if f is None:
+                os.makedirs(self.work_dir, exist_ok=True)
+                f = self._spools[kind] = open(self._spool_path(kind), "wb")
+                self._offsets[kind] = 0
+            offset = self._offsets[kind]
+            f.write(data)
+            self._offsets[kind] = offset + len(data)
+        return offset
+
+    def put(self, t: float, kind: str, data: bytes, frame_id: Optional[int] = None) -> str:
+        """이미지 1장 저장 → Frame.image_url로 쓸 URL"""
+        ms = int(t * 1000)
+        if self.packed:
+            offset = self._append(kind, data)
+            key = pack_key(self.video_id, kind)
+            ref = storage.range_ref(key, offset, len(data))
+            self.manifest.add(t, kind, ref, len(data), frame_id=frame_id, pack=key, offset=offset)
+            if kind == "frame":
+                return frame_render.render_url(self.video_id, t)
+            return storage.get_storage().url(key) + ref[len(key):]
+        key = f"{kind}s/{self.video_id}/{kind}_{ms}{image_codec.EXT}"
+        url = self.s3_utils.upload_bytes_to_s3(data, key, image_codec.CONTENT_TYPE)
+        self.manifest.add(t, kind, key, len(data), frame_id=frame_id)
+        return url
+
+    def link_frame(self, t: float, frame_id: int) -> None:
+        """Frame 행 생성 후 manifest 항목에 frame_id 연결"""
+        self.manifest.link_frame(t, frame_id)
+
+    def close(self) -> None:
+        """pack 업로드(packed) + manifest 저장"""
+        with self._lock:
+            spools, self._spools = self._spools, {}
+        for kind, f in spools.items():
+            f.close()
+            path = self._spool_path(kind)
+            try:
+                self.s3_utils.upload_file_to_s3(path, pack_key(self.video_id, kind))
+                logger.info("Artifact pack uploaded: video_id=%s, %s (%d bytes)",
+                            self.video_id, kind, os.path.getsize(path))
+            finally:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+        self.manifest.save()
@@ -0,0 +1,145 @@
+# 공용 오디오 버퍼
+# - 영상에서 오디오를 한 번만 디코딩: ffmpeg → 16kHz mono float32 raw 파일(out_dir/audio_16k.f32)
+# - 분석기(STT/피치/발음)와 워커 프로세스는 같은 파일을 memmap으로 열어 공유 (재디코딩/복사 없음)
+# - WAV 파일은 필요할 때만(AUDIO_UPLOAD_WAV) 버퍼에서 만들어 업로드하는 선택적 아티팩트
+# - decode_audio_stream: 도착 중인 바이트(이어받기 업로드)를 ffmpeg stdin으로 흘려 업로드와 동시에 디코딩
+import os
+import re
+import shutil
+import subprocess
+import wave
+from typing import Iterable, Optional, Tuple, Union
+
+import numpy as np
+
+from app import metrics
+
+SAMPLE_RATE = 16000  # Whisper 입력 규격 = 파이프라인 표준 샘플레이트
+BUFFER_NAME = "audio_16k.f32"  # 작업 디렉터리 안 버퍼 파일명 (이미 있으면 재디코딩하지 않음)
+_DTYPE = np.float32
+
+
+def _ffmpeg_exe() -> str:
+    path = shutil.which("ffmpeg")
+    if path:
+        return path
+    try:
+        from imageio_ffmpeg import get_ffmpeg_exe  # moviepy 의존성으로 설치됨
+        return get_ffmpeg_exe()
+    except Exception:
+        return "ffmpeg"
+
+
+class AudioBuffer:
+    """16kHz mono float32 raw 파일 핸들 (프로세스 간 전달 시 경로만 pickle)"""
+
+    def __init__(self, path: str, sample_rate: int = SAMPLE_RATE):
+        self.path = path
+        self.sample_rate = sample_rate
+
+    @property
+    def n_samples(self) -> int:
+        return os.path.getsize(self.path) // np.dtype(_DTYPE).itemsize
+
+    @property
+    def duration(self) -> float:
+        return self.n_samples / self.sample_rate
+
+    def array(self, start_sec: float = 0.0, end_sec: Optional[float] = None) -> np.ndarray:
+        """[start_sec, end_sec) 구간 memmap (copy-on-write: 쓰기 가능하지만 파일은 불변)"""
+        n = self.n_samples
+        if n == 0:
+            return np.zeros(0, dtype=_DTYPE)
+        mm = np.memmap(self.path, dtype=_DTYPE, mode="c", shape=(n,))
+        s = max(0, int(start_sec * self.sample_rate))
+        e = n if end_sec is None else min(n, int(end_sec * self.sample_rate))
+        return mm[s:e]
+
+    def __repr__(self) -> str:
+        return f"AudioBuffer({self.path!r}, sr={self.sample_rate})"
+
+
+def decode_audio(src_path: str, out_path: str, sample_rate: int = SAMPLE_RATE) -> AudioBuffer:
+    """영상/오디오 파일 → 16kHz mono float32 raw 파일 (ffmpeg 1회 디코딩)"""
+    cmd = [
+        _ffmpeg_exe(), "-nostdin", "-y", "-v", "error", "-i", src_path,
+        "-vn", "-ac", "1", "-ar", str(sample_rate), "-f", "f32le", out_path,
+    ]
+    with metrics.span("decode.audio"):
+        proc = subprocess.run(cmd, capture_output=True)
+    if proc.returncode != 0 or not os.path.exists(out_path) or os.path.getsize(out_path) == 0:
+        err = proc.stderr.decode(errors="ignore").strip()[-300:]
+        raise RuntimeError(f"No audio track found in the video. {err}".strip())
+    return AudioBuffer(out_path, sample_rate)
+
+
+def decode_audio_stream(chunks: Iterable[bytes], out_path: str, sample_rate: int = SAMPLE_RATE) -> AudioBuffer:
+    """바이트 스트림 → 16kHz mono float32 raw 파일 (앞부분에 메타데이터가 있는 컨테이너만 가능: faststart mp4, webm 등)"""
+    tmp = f"{out_path}.tmp"
+    cmd = [
+        _ffmpeg_exe(), "-y", "-v", "error", "-i", "pipe:0",
+        "-vn", "-ac", "1", "-ar", str(sample_rate), "-f", "f32le", tmp,
+    ]
+    with metrics.span("decode.audio_stream"):
+        proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            for chunk in chunks:
+                proc.stdin.write(chunk)
+        except BrokenPipeError:  # ffmpeg가 먼저 종료 (지원하지 않는 입력)
+            pass
+        finally:
+            try:
+                proc.stdin.close()
+            except BrokenPipeError:
+                pass
+            returncode = proc.wait()
+    if returncode != 0 or not os.path.exists(tmp) or os.path.getsize(tmp) == 0:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise RuntimeError(f"Streaming audio decode failed (ffmpeg exit {returncode})")
+    os.replace(tmp, out_path)
+    return AudioBuffer(out_path, sample_rate)
+
+
+_DURATION_RE = re.compile(r"Duration:\s*(\d+):(\d+):(\d+(?:\.\d+)?)")
+
+
+def probe_duration(src_path: str) -> Optional[float]:
+    """컨테이너 헤더의 길이(초) (헤더를 못 읽으면 None) — 앞부분만 받은 파일에도 사용"""
+    proc = subprocess.run([_ffmpeg_exe(), "-nostdin", "-hide_banner", "-i", src_path], capture_output=True)
+    m = _DURATION_RE.search(proc.stderr.decode(errors="ignore"))
+    if not m:
+        return None
+    h, mi, sec = m.groups()
+    return int(h) * 3600 + int(mi) * 60 + float(sec)
+
+
+def load_audio(path: str, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """파일 → 16kHz mono float32 배열 (버퍼 파일 없이 메모리로)"""
+    cmd = [
+        _ffmpeg_exe(), "-nostdin", "-threads", "0", "-i", path,
+        "-f", "f32le", "-ac", "1", "-ar", str(sample_rate), "-",
+    ]
+    out = subprocess.run(cmd, capture_output=True, check=True).stdout
+    return np.frombuffer(out, dtype=_DTYPE).copy()
+
+
+def write_wav(buf: AudioBuffer, wav_path: str, block_sec: float = 30.0) -> str:
+    """버퍼 → 16bit PCM WAV (블록 단위로 변환해 메모리 사용 제한)"""
+    samples = buf.array()
+    block = int(block_sec * buf.sample_rate)
+    with wave.open(wav_path, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(buf.sample_rate)
+        for i in range(0, len(samples), block):
+            chunk = np.clip(samples[i:i + block], -1.0, 1.0)
+            wf.writeframes((chunk * 32767.0).astype("<i2").tobytes())
+    return wav_path
+
+
+def as_samples(audio: Union[AudioBuffer, str]) -> Tuple[np.ndarray, int]:
+    """AudioBuffer 또는 파일 경로 → (16kHz mono float32 배열, sr)"""
+    if isinstance(audio, AudioBuffer):
+        return audio.array(), audio.sample_rate
+    return load_audio(audio), SAMPLE_RATE
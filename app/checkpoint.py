@@ -0,0 +1,141 @@
+# 분석 단계별 체크포인트 (재시도/대본 교체 시 첫 미완료 단계부터 재개)
+# - 단계 순서(STAGES)는 파이프라인 실행 순서. 각 단계가 성공하면 출력 + 완료 표시를 저장소에 기록
+#   checkpoints/{video_id}/{stage}.json : 단계 출력 (시선/감정/속도·전사/자세 결과 등, 다음 단계 입력)
+#   checkpoints/{video_id}/state.json   : 완료 표시 {stage: {version, completed_at}}
+#   checkpoints/{video_id}/script.txt   : 대본 (재시도 시 입력)
+# - 표(DB 행)와 아티팩트(frames/faces/poses, manifest, Pitch 행의 f0 구간값)는 기존대로 저장 → 체크포인트는 그 위의 완료 표시
+# - STAGE_VERSIONS: 단계 로직/모델이 바뀌면 올림 → 이전 버전 완료 표시는 무효 (그 단계부터 다시 실행)
+# - 재개 지점 = 순서상 첫 미완료 단계. 그 뒤 단계의 완료 표시는 시작 시 지움 (앞 단계 재실행 결과와 섞이지 않도록)
+# - 단계 실행 전 해당 단계의 이전 DB 행을 지움 (crud.clear_stage_results, 중복 저장 방지)
+# - 샤딩 경로는 frames~pitch를 한 번에 처리 → 반환 후 성공한 단계만 완료 처리 (실패 샤드가 있으면 없음)
+#   프레임 이후 단계에서 멈췄으면 재시도는 일반 경로로 남은 단계만 실행
+import json
+import time
+from typing import Any, Dict, Optional
+
+from app import storage
+from app.config import CHECKPOINT_ENABLED
+from app.log import get_logger
+
+logger = get_logger("checkpoint")
+
+STAGES = ("frames", "gaze", "emotion", "speed", "posture", "pitch", "pronunciation", "scores", "feedback")
+STAGE_VERSIONS: Dict[str, int] = {stage: 1 for stage in STAGES}
+SHARDED_STAGES = ("frames", "gaze", "emotion", "speed", "posture", "pitch")
+SCRIPT_STAGES = ("pronunciation", "scores", "feedback")  # 대본이 바뀌면 다시 실행할 단계
+
+
+def _key(video_id: int, name: str) -> str:
+    return f"checkpoints/{video_id}/{name}"
+
+
+def _read_json(key: str) -> Optional[Any]:
+    try:
+        return json.loads(storage.get_storage().get_bytes(key, cached=False))
+    except Exception:
+        return None
+
+
+def _write_json(key: str, value: Any) -> None:
+    storage.get_storage().put_bytes(key, json.dumps(value, ensure_ascii=False).encode("utf-8"), "application/json")
+
+
+def _load_state(video_id: int) -> Dict[str, Dict[str, Any]]:
+    state = _read_json(_key(video_id, "state.json")) or {}
+    return {
+        stage: mark for stage, mark in state.items()
+        if stage in STAGE_VERSIONS and mark.get("version") == STAGE_VERSIONS[stage]
+    }
+
+
+def invalidate(video_id: int, stages) -> None:
+    """지정 단계(와 그 뒤 단계)의 완료 표시 삭제 — 예: 대본 교체 → SCRIPT_STAGES"""
+    if not CHECKPOINT_ENABLED:
+        return
+    first = min(STAGES.index(s) for s in stages)
+    state = _load_state(video_id)
+    _write_json(_key(video_id, "state.json"), {s: m for s, m in state.items() if STAGES.index(s) < first})
+
+
+def store_script(video_id: int, data: bytes) -> None:
+    storage.get_storage().put_bytes(_key(video_id, "script.txt"), data, "text/plain")
+
+
+def save_script(video_id: int, script_path: str) -> None:
+    """작업 시작 시 대본 보관 (실패해도 분석은 계속)"""
+    if not CHECKPOINT_ENABLED:
+        return
+    try:
+        with open(script_path, "rb") as f:
+            store_script(video_id, f.read())
+    except Exception as e:
+        logger.warning("Script checkpoint save failed for video_id %s: %s", video_id, e)
+
+
+def load_script(video_id: int, path: str) -> Optional[str]:
+    """저장된 대본 → path (없으면 None)"""
+    try:
+        data = storage.get_storage().get_bytes(_key(video_id, "script.txt"), cached=False)
+    except Exception:
+        return None
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+
+class Plan:
+    """작업 1회의 재개 계획 — done(stage)이면 건너뛰고 output(stage)로 결과 복원"""
+
+    def __init__(self, video_id: int, state: Dict[str, Dict[str, Any]]):
+        self.video_id = video_id
+        self._outputs: Dict[str, Any] = {}
+        resume = next((s for s in STAGES if s not in state), None)
+        self.resume_from = resume
+        self._done = {s: state[s] for s in STAGES[:STAGES.index(resume)]} if resume else dict(state)
+        for stage in self._done:
+            self._outputs[stage] = _read_json(_key(video_id, f"{stage}.json"))
+        if CHECKPOINT_ENABLED and len(self._done) != len(state):
+            _write_json(_key(video_id, "state.json"), self._done)  # 재개 지점 뒤의 오래된 완료 표시 제거
+        if self._done:
+            logger.info("Resuming video_id %s from stage %s (%d stages checkpointed)",
+                        video_id, resume or "-", len(self._done))
+
+    def done(self, stage: str) -> bool:
+        return stage in self._done
+
+    def output(self, stage: str, default: Any = None) -> Any:
+        value = self._outputs.get(stage)
+        return default if value is None else value
+
+    def complete(self, stage: str, output: Any = None) -> None:
+        """
+        단계 성공 → 출력 + 완료 표시 저장 (저장 실패는 분석을 멈추지 않음, 재시도 시 다시 실행).
+        저장된 state.json을 다시 읽어 이 단계만 추가 — 작업 이후 늦게 끝나는 단계(비동기 피드백)가
+        그 사이 invalidate(대본 교체)로 지워진 다른 단계 표시를 되살리지 않도록
+        """
+        self._outputs[stage] = output
+        mark = {"version": STAGE_VERSIONS[stage], "completed_at": time.time()}
+        self._done[stage] = mark
+        if not CHECKPOINT_ENABLED:
+            return
+        try:
+            _write_json(_key(self.video_id, f"{stage}.json"), output)
+            state = _load_state(self.video_id)
+            state[stage] = mark
+            _write_json(_key(self.video_id, "state.json"), state)
+        except Exception as e:
+            logger.warning("Checkpoint save failed for video_id %s, stage %s: %s", self.video_id, stage, e)
+
+    def needs_audio(self) -> bool:
+        """남은 단계에 오디오 버퍼가 필요한지 (속도/피치, 전사가 없는 발음)"""
+        if not self.done("speed") or not self.done("pitch"):
+            return True
+        return not self.done("pronunciation") and not self.output("speed", {}).get("transcript")
+
+    def needs_source(self) -> bool:
+        """남은 단계에 원본 영상이 필요한지 (프레임 추출 또는 오디오 디코딩)"""
+        return not self.done("frames") or self.needs_audio()
+
+
+def plan(video_id: int) -> Plan:
+    return Plan(video_id, _load_state(video_id) if CHECKPOINT_ENABLED else {})
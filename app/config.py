@@ -8,4 +8,107 @@ AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
 AWS_BUCKET_NAME = os.getenv("AWS_BUCKET_NAME")
 AWS_REGION = os.getenv("AWS_REGION")
 DB_URL = os.getenv("DB_URL")
-JWT_SECRET = os.getenv("JWT_SECRET")
\ No newline at end of file
+JWT_SECRET = os.getenv("JWT_SECRET")
+
+# 긴 영상 시간 샤딩 (video_sharding.py)
+SHARD_MIN_DURATION_SEC = float(os.getenv("SHARD_MIN_DURATION_SEC", "1800"))  # 이 길이 이상이면 샤딩
+SHARD_TARGET_SEC = float(os.getenv("SHARD_TARGET_SEC", "60"))  # 샤드 1개 목표 길이(초)
+SHARD_WORKERS = int(os.getenv("SHARD_WORKERS", "0"))  # 0이면 os.cpu_count() (메모리 예산이 없으면 가용 물리 메모리로 제한)
+SHARD_FRAME_MAX_SIDE = int(os.getenv("SHARD_FRAME_MAX_SIDE", "1280"))  # 샤드 공유 메모리 프레임의 긴 변 상한(px, 0이면 원본 해상도)
+
+# 모델 레지스트리 메모리 예산(MB, 0이면 무제한) — 초과 시 LRU 해제 (model_registry.py)
+MODEL_MEMORY_BUDGET_MB = float(os.getenv("MODEL_MEMORY_BUDGET_MB", "0"))
+
+# 기동/워밍업 (warmup.py)
+DB_CREATE_ALL = os.getenv("DB_CREATE_ALL", "1") == "1"  # 기동 시 Base.metadata.create_all + 누락 컬럼 추가(db_migrate.py) 실행 여부
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "0") == "1"  # 기동 후 백그라운드 모델 워밍업
+WARMUP_MODELS = os.getenv("WARMUP_MODELS", "")  # 콤마 구분, 비우면 전체 (예: "stt,mp_pose")
+
+# STT 백엔드 (stt_backend.py): whisper(openai-whisper, 기본) | faster-whisper(CTranslate2 CPU 양자화)
+STT_BACKEND = os.getenv("STT_BACKEND", "whisper")
+STT_MODEL_SIZE = os.getenv("STT_MODEL_SIZE", "base")
+STT_COMPUTE_TYPE = os.getenv("STT_COMPUTE_TYPE", "int8")  # faster-whisper 전용
+STT_CPU_THREADS = int(os.getenv("STT_CPU_THREADS", "0"))  # faster-whisper 전용, 0이면 자동
+
+# 긴 오디오 병렬 청크 전사 (stt_chunked.py)
+STT_CHUNK_MIN_DURATION_SEC = float(os.getenv("STT_CHUNK_MIN_DURATION_SEC", "600"))  # 0이면 비활성
+STT_CHUNK_SEC = float(os.getenv("STT_CHUNK_SEC", "120"))  # 청크 목표 길이(무음 경계로 조정)
+STT_CHUNK_WORKERS = int(os.getenv("STT_CHUNK_WORKERS", "0"))  # 0이면 os.cpu_count()
+
+# 공용 오디오 버퍼 (audio_buffer.py): WAV 아티팩트 S3 업로드 여부 (0이면 업로드 생략)
+AUDIO_UPLOAD_WAV = os.getenv("AUDIO_UPLOAD_WAV", "1") == "1"
+
+# 음성 구간 검출 (vad.py): STT/피치를 발화 구간에만 실행, WPM은 발화 시간 기준
+VAD_ENABLED = os.getenv("VAD_ENABLED", "1") == "1"
+VAD_DB_BELOW_PEAK = float(os.getenv("VAD_DB_BELOW_PEAK", "35"))  # 상위 5% 에너지 대비 이만큼 낮으면 무음
+VAD_MIN_SILENCE_SEC = float(os.getenv("VAD_MIN_SILENCE_SEC", "0.5"))  # 이 길이 이상 무음만 제거
+VAD_PAD_SEC = float(os.getenv("VAD_PAD_SEC", "0.2"))  # 발화 구간 앞뒤 여유
+
+# 비동기 스트리밍 피드백 (feedback_service.py)
+FEEDBACK_ASYNC = os.getenv("FEEDBACK_ASYNC", "1") == "1"  # 0이면 분석 작업 안에서 동기 호출(기존 방식)
+FEEDBACK_CONCURRENCY = int(os.getenv("FEEDBACK_CONCURRENCY", "4"))  # 동시 LLM 호출 수 상한
+FEEDBACK_TIMEOUT_SEC = float(os.getenv("FEEDBACK_TIMEOUT_SEC", "90"))  # 시도 1회 타임아웃
+FEEDBACK_MAX_RETRIES = int(os.getenv("FEEDBACK_MAX_RETRIES", "2"))
+FEEDBACK_RETRY_BACKOFF_SEC = float(os.getenv("FEEDBACK_RETRY_BACKOFF_SEC", "2"))  # 지수 백오프 시작값
+FEEDBACK_MODE = os.getenv("FEEDBACK_MODE", "llm")  # llm | rules (규칙 기반만 사용, LLM 호출 없음)
+FEEDBACK_RULES_FALLBACK = os.getenv("FEEDBACK_RULES_FALLBACK", "1") == "1"  # LLM 실패 시 규칙 기반 피드백 저장
+FEEDBACK_STREAM_TIMEOUT_SEC = float(os.getenv("FEEDBACK_STREAM_TIMEOUT_SEC", "3600"))  # SSE 구독 최대 대기 시간 (넘으면 error로 종료)
+
+# 메트릭/트레이싱 (metrics.py, GET /metrics)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+METRICS_TRACE_MAX_SPANS = int(os.getenv("METRICS_TRACE_MAX_SPANS", "300"))  # 작업 trace에 개별 보관할 span 수 (초과분은 요약만, TEXT 컬럼 크기 고려)
+
+# 로깅 (log.py)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")  # DEBUG면 프레임 단위 상세 로그 포함
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")  # json | text
+LOG_RATE_LIMIT_SEC = float(os.getenv("LOG_RATE_LIMIT_SEC", "5"))  # 프레임 단위 반복 이벤트는 키별로 이 간격에 1건
+LOG_ASYNC = os.getenv("LOG_ASYNC", "1") == "1"  # 1이면 별도 스레드에서 stdout 기록
+
+# 작업별 프로파일링 (profiling.py)
+PROFILE_SAMPLE_INTERVAL_SEC = float(os.getenv("PROFILE_SAMPLE_INTERVAL_SEC", "0.01"))  # sample 모드 스택 수집 간격
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")  # /admin/* 요청 헤더 X-Admin-Token (비우면 관리자 엔드포인트 비활성)
+
+# 메모리 계측/예산 (memory.py)
+MEMORY_BUDGET_MB = float(os.getenv("MEMORY_BUDGET_MB", "0"))  # 작업 중 프로세스 RSS 상한, 초과 예상 단계는 청크/스트리밍 변형 (0이면 비활성)
+MEMORY_SAMPLE_INTERVAL_SEC = float(os.getenv("MEMORY_SAMPLE_INTERVAL_SEC", "0.2"))  # 단계별 최대 RSS 샘플 간격
+MEMORY_TRACEMALLOC = os.getenv("MEMORY_TRACEMALLOC", "0") == "1"  # 1이면 Python 힙 최대치도 기록 (분석 속도 저하)
+MEMORY_SHARD_WORKER_MB = float(os.getenv("MEMORY_SHARD_WORKER_MB", "2500"))  # 샤드 워커 1개 상주 예상치(TF/mediapipe/DeepFace/Whisper)
+MEMORY_STT_WORKER_MB = float(os.getenv("MEMORY_STT_WORKER_MB", "1000"))  # 청크 전사 워커 1개 상주 예상치
+
+# 아티팩트 저장소 (storage.py)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "s3")  # s3 | minio (S3 호환, STORAGE_ENDPOINT_URL 필요) | local
+STORAGE_ENDPOINT_URL = os.getenv("STORAGE_ENDPOINT_URL", "")  # MinIO 등 S3 호환 엔드포인트 (예: http://minio:9000)
+STORAGE_LOCAL_DIR = os.getenv("STORAGE_LOCAL_DIR", "storage")  # local 백엔드 루트 디렉터리
+STORAGE_PUBLIC_URL = os.getenv("STORAGE_PUBLIC_URL", "")  # DB에 저장할 URL 접두어 (비우면 백엔드 기본 URL)
+STORAGE_CACHE_DIR = os.getenv("STORAGE_CACHE_DIR", "/tmp/storage_cache")  # 읽기 캐시 디렉터리 (프로세스별 하위 폴더)
+STORAGE_CACHE_MB = float(os.getenv("STORAGE_CACHE_MB", "0"))  # 읽기 캐시 크기 상한 (0이면 비활성)
+
+# 아티팩트 이미지 인코딩 / 저장 형식 / 작업 디렉터리 (image_codec.py, artifact_pack.py)
+ARTIFACT_IMAGE_CODEC = os.getenv("ARTIFACT_IMAGE_CODEC", "jpeg")  # jpeg | webp (frames/faces/poses 공통)
+ARTIFACT_FRAME_QUALITY = int(os.getenv("ARTIFACT_FRAME_QUALITY", "75"))  # 원본 프레임 품질 (기존 PIL 기본값)
+ARTIFACT_CROP_QUALITY = int(os.getenv("ARTIFACT_CROP_QUALITY", "95"))  # 얼굴/포즈 크롭 품질
+ARTIFACT_PACKED = os.getenv("ARTIFACT_PACKED", "0") == "1"  # 1이면 frames/faces/poses를 영상별 pack 파일 1개씩으로 저장 (Range 읽기)
+JOB_WORK_DIR = os.getenv("JOB_WORK_DIR", "temp")  # 작업별 임시 디렉터리 루트 (오디오 버퍼 등), 예: /dev/shm/sesac (tmpfs)
+
+# 프레임 이미지 요청 시 렌더링 (frame_render.py, GET /videos/{video_id}/frames/{ms})
+FRAME_RENDER_LAZY = os.getenv("FRAME_RENDER_LAZY", "0") == "1"  # 1이면 추출 시 원본 프레임 인코딩/업로드 생략, Frame.image_url은 렌더링 URL
+FRAME_RENDER_BASE_URL = os.getenv("FRAME_RENDER_BASE_URL", "")  # 렌더링 URL 접두어 (API 외부 주소, 비우면 상대 경로)
+FRAME_RENDER_MAX_WIDTH = int(os.getenv("FRAME_RENDER_MAX_WIDTH", "1920"))  # 요청 가능한 최대 가로 크기
+FRAME_RENDER_CACHE_DIR = os.getenv("FRAME_RENDER_CACHE_DIR", "/tmp/frame_render_cache")  # 렌더링 결과 캐시
+FRAME_RENDER_CACHE_MB = float(os.getenv("FRAME_RENDER_CACHE_MB", "256"))  # 렌더링 결과 캐시 크기 상한
+FRAME_RENDER_SOURCE_DIR = os.getenv("FRAME_RENDER_SOURCE_DIR", "/tmp/frame_render_sources")  # 원본 영상 로컬 사본
+FRAME_RENDER_MAX_SOURCES = int(os.getenv("FRAME_RENDER_MAX_SOURCES", "4"))  # 로컬에 유지할 원본 영상 수 (LRU)
+
+# 저장소 직접 업로드 (direct_upload.py, POST /videos/uploads)
+UPLOAD_URL_EXPIRES_SEC = int(os.getenv("UPLOAD_URL_EXPIRES_SEC", "3600"))  # presigned URL 유효 시간
+UPLOAD_MULTIPART_MIN_MB = float(os.getenv("UPLOAD_MULTIPART_MIN_MB", "100"))  # 이 크기 이상이면 multipart (part별 URL)
+UPLOAD_PART_MB = float(os.getenv("UPLOAD_PART_MB", "64"))  # multipart part 크기 (S3 최소 5MB, 최대 10,000 part)
+UPLOAD_MAX_MB = float(os.getenv("UPLOAD_MAX_MB", "20480"))  # 업로드 허용 최대 크기
+
+# 이어받기 분할 업로드 (resumable_upload.py, /videos/resumable)
+RESUMABLE_UPLOAD_DIR = os.getenv("RESUMABLE_UPLOAD_DIR", "temp/resumable")  # 업로드 중 파일/상태 저장 위치 (API 노드 로컬)
+RESUMABLE_EARLY_START_MB = float(os.getenv("RESUMABLE_EARLY_START_MB", "8"))  # 앞부분이 이만큼 도착하면 길이 측정/오디오 디코딩 시작 (0이면 완료 후)
+RESUMABLE_UPLOAD_TTL_HOURS = float(os.getenv("RESUMABLE_UPLOAD_TTL_HOURS", "24"))  # 이 시간 동안 진행 없는 미완료 업로드 정리
+
+# 단계별 체크포인트 / 재시도 (checkpoint.py, POST /videos/{video_id}/retry)
+CHECKPOINT_ENABLED = os.getenv("CHECKPOINT_ENABLED", "1") == "1"  # 0이면 단계 결과를 저장하지 않음 (재시도는 처음부터)
@@ -18,6 +18,12 @@ def create_video(db, user_id, title, video_totaltime, video_url):
     db.refresh(db_video)
     return db_video
 
+def update_video_totaltime(db: Session, video_id: int, video_totaltime: float):
+    video = db.query(Video).filter(Video.id == video_id).one_or_none()
+    if video:
+        video.video_totaltime = video_totaltime
+        db.commit()
+
 def update_video_audio_url(db: Session, video_id: int, video_url: str):
     video = db.query(Video).filter(Video.id == video_id).one_or_none()
     if video:
@@ -28,6 +34,8 @@ def create_frame(db: Session, video_id: int, frame_timestamp: float, image_url:
     db_frame = Frame(video_id=video_id, frame_timestamp=frame_timestamp, image_url=image_url)
     db.add(db_frame)
     db.commit()
+    db.refresh(db_frame)
+    return db_frame
 
 def create_gaze_record(db: Session, frame_id: int, direction: str):
     gaze_record = Gaze(frame_id=frame_id, direction=direction)
@@ -152,3 +160,23 @@ def create_feedback_record(db: Session, video_id: int, short_feedback: str, deta
     db.refresh(fb)
 
     return fb
+
+# 단계 재실행 전 이전 결과 삭제 (checkpoint 재개 시 중복 행 방지)
+def clear_stage_results(db: Session, video_id: int, stage: str) -> None:
+    frame_ids = db.query(Frame.id).filter(Frame.video_id == video_id)
+    audio_ids = db.query(Audio.id).filter(Audio.video_id == video_id)
+    by_frame = {"gaze": [Gaze], "emotion": [Emotion], "posture": [Pose]}
+    by_audio = {"speed": [Speed], "pitch": [Pitch]}
+    if stage == "frames":  # 프레임/오디오를 다시 만들면 그 아래 결과도 모두 다시 계산
+        by_frame["frames"] = [Gaze, Emotion, Pose]
+        by_audio["frames"] = [Speed, Pitch, Pronunciation]
+    for model in by_frame.get(stage, []):
+        db.query(model).filter(model.frame_id.in_(frame_ids)).delete(synchronize_session=False)
+    for model in by_audio.get(stage, []):
+        db.query(model).filter(model.audio_id.in_(audio_ids)).delete(synchronize_session=False)
+    if stage == "frames":
+        db.query(Frame).filter(Frame.video_id == video_id).delete(synchronize_session=False)
+        db.query(Audio).filter(Audio.video_id == video_id).delete(synchronize_session=False)
+    if stage == "feedback":
+        db.query(Feedback).filter(Feedback.video_id == video_id).delete(synchronize_session=False)
+    db.commit()
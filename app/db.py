@@ -1,9 +1,24 @@
 # db 연결, 세션 생성, 기본 선언 등 확인
-from sqlalchemy import create_engine
+import time
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
 import os
+from app import metrics
 from app.config import DB_URL
 
 engine = create_engine(DB_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
+
+
+# DB flush 소요 시간 → metrics span "db.flush" (작업 trace 포함)
+@event.listens_for(SessionLocal, "before_flush")
+def _flush_started(session, flush_context, instances):
+    session.info["_flush_t0"] = time.perf_counter()
+
+
+@event.listens_for(SessionLocal, "after_flush_postexec")
+def _flush_finished(session, flush_context):
+    t0 = session.info.pop("_flush_t0", None)
+    if t0 is not None:
+        metrics.record_span("db.flush", time.perf_counter() - t0)
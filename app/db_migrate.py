@@ -0,0 +1,37 @@
+# 기동 시 스키마 보정 (별도 마이그레이션 도구 없이 create_all 뒤에 실행, 여러 번 실행해도 안전)
+# - create_all은 없는 테이블만 만들고 기존 테이블의 새 컬럼은 추가하지 않음
+#   → 모델에는 있고 DB에는 없는 컬럼을 ALTER TABLE ... ADD COLUMN 으로 추가
+#   (예: job_status.trace / profile_url / failed_shards — 테이블이 먼저 만들어진 배포)
+# - NULL 허용 컬럼만 자동 추가. NOT NULL 컬럼은 기존 행 값이 필요하므로 경고만 남기고 수동 처리
+from typing import List
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from app.log import get_logger
+
+logger = get_logger("db_migrate")
+
+
+def add_missing_columns(engine: Engine, metadata) -> List[str]:
+    """모델에 있고 DB 테이블에 없는 NULL 허용 컬럼 추가 → 추가한 "table.column" 목록"""
+    insp = inspect(engine)
+    existing_tables = set(insp.get_table_names())
+    added: List[str] = []
+    with engine.begin() as conn:
+        for table in metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing = {c["name"] for c in insp.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                if not column.nullable:
+                    logger.warning("Column %s.%s is missing and NOT NULL; add it manually", table.name, column.name)
+                    continue
+                col_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type} NULL"))
+                added.append(f"{table.name}.{column.name}")
+    if added:
+        logger.info("Schema columns added: %s", ", ".join(added))
+    return added
@@ -0,0 +1,150 @@
+# 저장소 직접 업로드 (presigned PUT / multipart) — API 노드는 영상 바이트를 받지 않음
+# 1) POST /videos/uploads: 세션 생성 → 영상/대본 키 + presigned PUT URL
+#    영상이 UPLOAD_MULTIPART_MIN_MB 이상이면 multipart 업로드를 열고 part별 presigned URL (part 크기 UPLOAD_PART_MB)
+# 2) 클라이언트가 저장소로 직접 PUT (multipart는 part별 응답 ETag 보관)
+# 3) POST /videos/uploads/{upload_id}/complete: multipart 완료 → 객체 존재 확인 → Video 등록 + 분석 작업 등록
+#    (분석 작업이 저장소에서 원본을 내려받아 기존 파이프라인 실행)
+# - 세션 상태는 저장소 uploads/{upload_id}/session.json (API 노드 여러 대에서도 동작, complete 재호출은 같은 video_id 반환)
+# - S3/MinIO 백엔드만 지원 (local 백엔드는 presigned URL이 없으므로 NotImplementedError → 501)
+import os
+import json
+import math
+import time
+import uuid
+import mimetypes
+from typing import Any, Dict, List, Optional, Tuple
+
+from app import storage
+from app.config import UPLOAD_URL_EXPIRES_SEC, UPLOAD_MULTIPART_MIN_MB, UPLOAD_PART_MB, UPLOAD_MAX_MB
+from app.log import get_logger
+
+logger = get_logger("direct_upload")
+
+_MB = 1024 * 1024
+MIN_PART_BYTES = 5 * _MB   # S3 multipart 최소 part 크기 (마지막 part 제외)
+MAX_PARTS = 10000
+
+
+class UploadNotFound(Exception):
+    pass
+
+
+def _session_key(upload_id: str) -> str:
+    return f"uploads/{upload_id}/session.json"
+
+
+def _safe_name(filename: str, default: str) -> str:
+    name = os.path.basename((filename or "").replace("\\", "/")).strip()
+    return name or default
+
+
+def _save(session: Dict[str, Any]) -> None:
+    body = json.dumps(session, ensure_ascii=False).encode("utf-8")
+    storage.get_storage().put_bytes(_session_key(session["upload_id"]), body, "application/json")
+
+
+def load_session(upload_id: str) -> Dict[str, Any]:
+    try:
+        return json.loads(storage.get_storage().get_bytes(_session_key(upload_id), cached=False))
+    except Exception as e:
+        raise UploadNotFound(upload_id) from e
+
+
+def _part_size(size: int) -> int:
+    part = max(MIN_PART_BYTES, int(UPLOAD_PART_MB * _MB))
+    if math.ceil(size / part) > MAX_PARTS:
+        part = math.ceil(size / MAX_PARTS)
+    return part
+
+
+def create_session(title: str, filename: str, script_filename: str, size: int,
+                   content_type: Optional[str] = None, profile: Optional[str] = None) -> Dict[str, Any]:
+    """업로드 세션 생성 → 클라이언트용 응답 (upload_id, video/script URL)"""
+    if size <= 0:
+        raise ValueError("size must be positive")
+    if size > UPLOAD_MAX_MB * _MB:
+        raise ValueError(f"file too large (max {UPLOAD_MAX_MB:.0f}MB)")
+
+    store = storage.get_storage()
+    upload_id = uuid.uuid4().hex
+    filename = _safe_name(filename, "video.mp4")
+    video_key = f"videos/{upload_id}/{filename}"
+    script_key = f"scripts/{upload_id}/{_safe_name(script_filename, 'script.txt')}"
+    content_type = content_type or mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+    video: Dict[str, Any] = {"key": video_key, "content_type": content_type}
+    multipart_id = None
+    if size >= UPLOAD_MULTIPART_MIN_MB * _MB:
+        part = _part_size(size)
+        multipart_id = store.create_multipart(video_key, content_type)
+        video["part_size"] = part
+        video["parts"] = [
+            {"part_number": n, "url": store.presign_part(video_key, multipart_id, n, UPLOAD_URL_EXPIRES_SEC)}
+            for n in range(1, math.ceil(size / part) + 1)
+        ]
+    else:
+        video["url"] = store.presign_put(video_key, UPLOAD_URL_EXPIRES_SEC, content_type)
+    script = {"key": script_key, "url": store.presign_put(script_key, UPLOAD_URL_EXPIRES_SEC, "text/plain")}
+
+    _save({
+        "upload_id": upload_id,
+        "title": title,
+        "profile": profile,
+        "size": size,
+        "video_key": video_key,
+        "script_key": script_key,
+        "multipart_id": multipart_id,
+        "created_at": time.time(),
+        "video_id": None,
+    })
+    logger.info("Direct upload session created: %s (%.1fMB, %s)", upload_id, size / _MB,
+                f"{len(video['parts'])} parts" if multipart_id else "single PUT")
+    return {"upload_id": upload_id, "expires_in": UPLOAD_URL_EXPIRES_SEC, "video": video, "script": script}
+
+
+def complete_session(upload_id: str, parts: List[Tuple[int, str]]) -> Dict[str, Any]:
+    """multipart 완료 + 업로드 객체 확인 → 세션 (이미 등록된 세션이면 그대로 반환)"""
+    session = load_session(upload_id)
+    if session.get("video_id"):
+        return session
+
+    store = storage.get_storage()
+    if session.get("multipart_id"):
+        if not parts:
+            raise ValueError("parts (part_number, etag) are required for multipart uploads")
+        store.complete_multipart(session["video_key"], session["multipart_id"], parts)
+        session["multipart_id"] = None
+        _save(session)
+
+    video_size = store.size(session["video_key"])
+    if video_size is None:
+        raise ValueError("video has not been uploaded")
+    if store.size(session["script_key"]) is None:
+        raise ValueError("script has not been uploaded")
+    session["size"] = video_size
+    return session
+
+
+def mark_registered(session: Dict[str, Any], video_id: int) -> None:
+    session["video_id"] = video_id
+    _save(session)
+
+
+def abort_session(upload_id: str) -> None:
+    session = load_session(upload_id)
+    if session.get("multipart_id"):
+        try:
+            storage.get_storage().abort_multipart(session["video_key"], session["multipart_id"])
+        except Exception as e:
+            logger.warning("Multipart abort failed (%s): %s", upload_id, e)
+
+
+def fetch_sources(session: Dict[str, Any], work_dir: str) -> Tuple[str, str]:
+    """분석 작업용 로컬 사본 (video_path, script_path)"""
+    os.makedirs(work_dir, exist_ok=True)
+    store = storage.get_storage()
+    video_path = os.path.join(work_dir, f"{session['upload_id']}_{os.path.basename(session['video_key'])}")
+    script_path = os.path.join(work_dir, f"{session['upload_id']}_{os.path.basename(session['script_key'])}")
+    store.download(session["video_key"], video_path)
+    store.download(session["script_key"], script_path)
+    return video_path, script_path
@@ -1,153 +1,133 @@
 import os
 import re
-import boto3
-import cv2
+import logging
 import numpy as np
 from sqlalchemy.orm import Session
-from app import crud
+from app import artifact_manifest, crud, metrics, storage
 from app.models import Frame
-from app.config import AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, AWS_REGION
 from deepface import DeepFace
+from app.model_registry import registry
+from app.log import get_logger, throttled
+
+logger = get_logger("emotion")
 
 from sqlalchemy import func
 from app.models import Emotion, Frame
 
 
 # ----------------emotion 분석 부분 ---------------------------
-def read_image_from_s3(bucket: str, key: str):
-    s3_client = boto3.client(
-        's3',
-        aws_access_key_id=AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-        region_name=AWS_REGION
-    )
-    try:
-        res = s3_client.get_object(Bucket=bucket, Key=key)
-        img_data = res['Body'].read()
-        img_array = np.frombuffer(img_data, np.uint8)
-        img = cv2.imdecode(img_array, cv2.IMREAD_COLOR)
-        if img is None:
-            print(f"[ERROR] Failed to decode image: {key}")
-            return None
-        return img
-    except Exception as e:
-        print(f"[ERROR] Error reading image from S3: {e}")
-        return None
-
-def _faces_key_to_frame_url(bucket: str, region: str, img_key: str, video_id: int) -> str | None:
+def _faces_key_to_frame_url(img_key: str, video_id: int) -> str | None:
     """
     faces/{video_id}/face_XXXX.jpg  → frames/{video_id}/frame_XXXX.jpg 로 매핑된 URL 반환
     매칭 실패 시 None
     """
     base = os.path.basename(img_key)  #face_3000.jpg
-    m = re.search(r"(?:face|frames)_(\d+)\.(?:jpg|png)$", base, re.IGNORECASE)
+    m = re.search(r"(?:face|frames)_(\d+)\.(?:jpg|png|webp)$", base, re.IGNORECASE)
     if not m:
         return None
     ms = m.group(1)  # '3000'
     mapped_key = f"frames/{video_id}/frame_{ms}.jpg"
-    return f"https://{bucket}.s3.{region}.amazonaws.com/{mapped_key}"
+    return storage.get_storage().url(mapped_key)
+
+EMOTION_KEYS = ["angry", "fear", "surprise", "happy", "sad", "neutral"]
 
-def analyze_emotion_and_save_to_db(bucket: str, prefix: str, db: Session, region: str, video_id: int):
+
+def analyze_face_emotion(face_bgr: np.ndarray) -> dict:
+    """얼굴 crop(BGR) → DeepFace 감정 점수 {angry, fear, surprise, happy, sad, neutral}"""
+    registry.get("deepface_emotion")  # 로드/LRU 갱신 (DeepFace 내부 캐시와 같은 모델)
+    with metrics.span("detect.emotion"):
+        analysis = DeepFace.analyze(img_path=face_bgr, actions=['emotion'], enforce_detection=False)
+    emotion_scores = analysis[0]['emotion']
+    return {k: float(emotion_scores.get(k, 0.0)) for k in EMOTION_KEYS}
+
+
+def analyze_emotion_and_save_to_db(video_id: int, db: Session):
     """
-    S3 얼굴 crop → DeepFace 감정분석 → Emotion 테이블 저장
-    정밀 매칭: faces 키에서 ms 추출 → frames/{video_id}/frame_{ms}.jpg URL로 정확히 매칭
+    저장소 얼굴 crop(faces/{video_id}/, manifest 기준) → DeepFace 감정분석 → Emotion 테이블 저장
+    Frame 매칭: manifest의 frame_id, manifest가 없으면 faces 키에서 ms 추출 → frames/{video_id}/frame_{ms}.jpg URL로 정확히 매칭
     """
-    print(f"[INFO] Starting DeepFace emotion analysis for bucket: {bucket}, prefix: {prefix}")
-    s3_client = boto3.client(
-        's3',
-        aws_access_key_id=AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-        region_name=AWS_REGION
-    )
-
+    logger.info("Starting DeepFace emotion analysis for video_id: %s", video_id)
     try:
-        result = s3_client.list_objects_v2(Bucket=bucket, Prefix=prefix)
+        image_keys = artifact_manifest.artifact_keys(video_id, "face")
     except Exception as e:
-        print(f"[ERROR] Error listing S3 objects: {e}")
+        logger.error("Error listing storage objects: %s", e)
         return {}
 
-    if 'Contents' not in result:
-        print("[WARNING] No images found in S3 for emotion analysis")
+    if not image_keys:
+        logger.warning("No images found in storage for emotion analysis")
         return {}
+    logger.info("Found %d images for DeepFace emotion analysis", len(image_keys))
 
-    image_keys = sorted(
-        [obj['Key'] for obj in result['Contents'] if obj['Key'].lower().endswith(('.jpg', '.png'))]
-    )
-    print(f"[INFO] Found {len(image_keys)} images for DeepFace emotion analysis")
-
-    for img_key in image_keys:
-        print(f"[DEBUG] ========== Processing image: {img_key} ==========")
+    for img_key, frame_id in image_keys:
         try:
-            # 1) S3에서 얼굴 crop 읽기
-            frame_img = read_image_from_s3(bucket, img_key)
+            # 1) 저장소에서 얼굴 crop 읽기
+            frame_img = storage.read_image(img_key)
             if frame_img is None:
-                print(f"[WARNING] Failed to read image: {img_key}")
+                throttled(logger, logging.WARNING, "read", "Failed to read image: %s", img_key)
                 continue
 
             # 2) DeepFace 감정 분석
-            analysis = DeepFace.analyze(img_path=frame_img, actions=['emotion'], enforce_detection=False)
-            emotion_scores = analysis[0]['emotion']
-
-            # 3) 원본 프레임 URL로 정확 매핑
-            frame_url = _faces_key_to_frame_url(bucket, region, img_key, video_id)
-            if not frame_url:
-                print(f"[WARNING] Unable to parse ms from key: {img_key}")
-                continue
-
-            # 4) Frame 정확 조회 (URL 일치)
-            frame = db.query(Frame).filter(Frame.image_url == frame_url).first()
-            if not frame:
-                print(f"[WARNING] No matching frame found for: {frame_url}")
-                continue
+            emotion_scores = analyze_face_emotion(frame_img)
+
+            if frame_id is None:
+                # 3) 원본 프레임 URL로 정확 매핑 (manifest 없는 과거 영상)
+                frame_url = _faces_key_to_frame_url(img_key, video_id)
+                if not frame_url:
+                    throttled(logger, logging.WARNING, "parse_ms", "Unable to parse ms from key: %s", img_key)
+                    continue
+
+                # 4) Frame 정확 조회 (URL 일치)
+                frame = db.query(Frame).filter(Frame.image_url == frame_url).first()
+                if not frame:
+                    throttled(logger, logging.WARNING, "frame_missing", "No matching frame found for: %s", frame_url)
+                    continue
+                frame_id = frame.id
 
             # 5) Emotion 저장
             crud.create_emotion(
                 db=db,
-                frame_id=frame.id,
-                angry=float(emotion_scores.get("angry", 0.0)),
-                fear=float(emotion_scores.get("fear", 0.0)),
-                surprise=float(emotion_scores.get("surprise", 0.0)),
-                happy=float(emotion_scores.get("happy", 0.0)),
-                sad=float(emotion_scores.get("sad", 0.0)),
-                neutral=float(emotion_scores.get("neutral", 0.0)),
+                frame_id=frame_id,
+                **emotion_scores,
             )
-            print(f"[INFO] Emotion saved for frame_id: {frame.id}")
+            logger.debug("Emotion saved for frame_id: %s (%s)", frame_id, img_key)
 
         except Exception as e:
-            print(f"[ERROR] Failed to process image {img_key}: {e}")
-            import traceback; traceback.print_exc()
+            throttled(logger, logging.ERROR, "process", "Failed to process image %s: %s", img_key, e, exc_info=True)
             continue
 
-    print(f"[INFO] DeepFace emotion analysis & DB save completed.")
+    logger.info("DeepFace emotion analysis & DB save completed.")
 
 
 # ----------------emotion 평가 부분 ------------------------
-def get_emotion_ratios_corrected(db: Session, video_id: int):
-    rows = db.query(Emotion).join(Frame, Emotion.frame_id == Frame.id)\
-               .filter(Frame.video_id == video_id).all()
+NEGATIVE_EMOTIONS = ("sad", "fear", "angry")
+
 
+def corrected_dominant(r) -> str:
+    """
+    감정 점수 행(angry/fear/surprise/happy/sad/neutral 속성) → 보정된 dominant.
+    부정 감정이 최대여도 neutral > 20 또는 happy > 25면 neutral로 보정
+    """
+    dominant = max(
+        [("angry", r.angry), ("fear", r.fear), ("surprise", r.surprise),
+         ("happy", r.happy), ("sad", r.sad), ("neutral", r.neutral)],
+        key=lambda x: x[1]
+    )[0]
+    if dominant in NEGATIVE_EMOTIONS and (r.neutral > 20 or r.happy > 25):
+        return "neutral"
+    return dominant
+
+
+def corrected_ratios(rows) -> dict:
+    """보정 dominant 기준 neutral/happy 비율 (행이 없으면 0)"""
     total_count = len(rows)
     if total_count == 0:
         return {"neutral": 0.0, "happy": 0.0}
 
     neutral_count = 0
     happy_count = 0
-
     for r in rows:
-        # dominant 결정
-        dominant = max(
-            [("angry", r.angry), ("fear", r.fear), ("surprise", r.surprise),
-             ("happy", r.happy), ("sad", r.sad), ("neutral", r.neutral)],
-            key=lambda x: x[1]
-        )[0]
-
-        # 보정 적용
-        if dominant in ["sad", "fear", "angry"]:
-            if r.neutral > 20 or r.happy > 25:
-                dominant = "neutral (corrected)"
-
-        # 카운트
-        if dominant.startswith("neutral"):
+        dominant = corrected_dominant(r)
+        if dominant == "neutral":
             neutral_count += 1
         elif dominant == "happy":
             happy_count += 1
@@ -157,6 +137,12 @@ def get_emotion_ratios_corrected(db: Session, video_id: int):
         "happy": happy_count / total_count
     }
 
+
+def get_emotion_ratios_corrected(db: Session, video_id: int):
+    rows = db.query(Emotion).join(Frame, Emotion.frame_id == Frame.id)\
+               .filter(Frame.video_id == video_id).all()
+    return corrected_ratios(rows)
+
 def calculate_l1_score(ref_neutral, ref_happy, user_neutral, user_happy):
     neutral_gap = abs(user_neutral - ref_neutral)
     happy_gap = abs(user_happy - ref_happy)
@@ -180,31 +166,7 @@ def evaluate_presentation_emotion_corrected(db: Session, video_id: int):
             "score": 0.0
         }
 
-    neutral_count = 0
-    happy_count = 0
-
-    for r in rows:
-        # dominant 계산
-        dominant = max(
-            [("angry", r.angry), ("fear", r.fear), ("surprise", r.surprise),
-             ("happy", r.happy), ("sad", r.sad), ("neutral", r.neutral)],
-            key=lambda x: x[1]
-        )[0]
-
-        # 보정 로직
-        if dominant in ["sad", "fear", "angry"]:
-            if r.neutral > 20 or r.happy > 25:
-                dominant = "neutral"
-
-        if dominant == "neutral":
-            neutral_count += 1
-        elif dominant == "happy":
-            happy_count += 1
-
-    user_ratios = {
-        "neutral": neutral_count / total_count,
-        "happy": happy_count / total_count
-    }
+    user_ratios = corrected_ratios(rows)
     
     #아나운서 표준값 ->"/content/drive/MyDrive/faceproject/output/emotion_results_v5.csv" 저장된 내용을 기반으로 도출
     ref_neutral, ref_happy = 0.6902, 0.2102
@@ -232,26 +194,12 @@ def get_all_emotion_averages_corrected(db: Session, video_id: int):
 
     total_count = len(rows)
     if total_count == 0:
-        return {col: 0.0 for col in ["angry", "fear", "surprise", "happy", "sad", "neutral"]}
-
-    # 감정 카운트 초기화
-    emotion_counts = {col: 0 for col in ["angry", "fear", "surprise", "happy", "sad", "neutral"]}
+        return {col: 0.0 for col in EMOTION_KEYS}
 
+    # 보정 dominant 기준 감정 카운트
+    emotion_counts = {col: 0 for col in EMOTION_KEYS}
     for r in rows:
-        # dominant 결정
-        dominant = max(
-            [("angry", r.angry), ("fear", r.fear), ("surprise", r.surprise),
-             ("happy", r.happy), ("sad", r.sad), ("neutral", r.neutral)],
-            key=lambda x: x[1]
-        )[0]
-
-        # 보정 로직 적용
-        if dominant in ["sad", "fear", "angry"]:
-            if r.neutral > 20 or r.happy > 25:
-                dominant = "neutral"
-
-        # 카운트 증가
-        emotion_counts[dominant] += 1
+        emotion_counts[corrected_dominant(r)] += 1
 
     # 비율로 변환
     return {k: count / total_count for k, count in emotion_counts.items()}
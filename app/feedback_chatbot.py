@@ -1,31 +1,56 @@
 import os
-import openai
+import re
 import json
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from dotenv import load_dotenv
 
-# env에서 OpenAI API 키 로드함.
+from app import metrics
+from app.config import FEEDBACK_MODE, FEEDBACK_RULES_FALLBACK
+from app.feedback_digest import build_feedback_digest
+from app.feedback_rules import render_feedback
+from app.log import get_logger
+
+logger = get_logger("feedback")
+
+# env에서 OpenAI API 키 로드함. (키 검증/openai import는 실제 호출 시점에)
 load_dotenv()
-openai.api_key = os.getenv("OPENAI_API_KEY")
-if not openai.api_key:
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+# 로컬 chat API stand-in(tools/fake_chat_api.py) 등 호환 엔드포인트 사용 시 (예: http://localhost:8001/v1)
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "")
+
+
+def _api_key() -> str:
+    if OPENAI_API_KEY:
+        return OPENAI_API_KEY
+    if OPENAI_BASE_URL:
+        return "local"  # stand-in은 키를 검사하지 않음
     raise ValueError("OPENAI_API_KEY가 설정되지 않았습니다.")
 
+
+def _get_openai():
+    import openai
+    openai.api_key = _api_key()
+    if OPENAI_BASE_URL:
+        openai.base_url = OPENAI_BASE_URL
+    return openai
+
 class PresentationFeedbackBot:
     def __init__(self, model: str = "gpt-4.1"):
         self.model = model
 
     def build_prompt(self, analysis: Dict[str, Any]) -> str:
-        analysis_str = json.dumps(analysis, ensure_ascii=False)
+        analysis_str = json.dumps(analysis, ensure_ascii=False, separators=(",", ":"))
         return (
             "## 역할\n"
             "- 당신은 한국어로 피드백하는 **숙련된 발표 코치이며 누구나 인정하는 발표의 전문가**입니다. 사용자는 응답하지 않습니다.\n\n"
 
-            "## 입력(분석 결과)\n"
+            "## 입력(분석 결과 요약)\n"
             f"{analysis_str}\n\n"
 
-            
-        "## 입력(분석 결과)\n"
-        f"{analysis_str}\n\n"
+        "## 입력 형식\n"
+        "- `*_ranges` 항목은 `시작~끝초` 형식의 시간 구간 목록(길이순 상위 구간만 포함).\n"
+        "- `gaze.off_center_ranges`: 시선이 중앙(center)을 벗어난 구간과 방향, `gaze.distribution_pct`: 방향별 비율(%).\n"
+        "- `voice.speed.too_fast_ranges` / `too_slow_ranges`: 목표 범위보다 빠르거나 느린 구간과 구간 평균 wpm.\n\n"
 
         "## 지표 의미(반드시 반영)\n"
         "- **pitch_score**: 말의 **높낮이(억양) 다양성** 점수 (0~100)\n"
@@ -41,7 +66,7 @@ class PresentationFeedbackBot:
         "  - '일치율'은 `voice.pronunciation.matching_rate`를 사용하고 **백분율(%)**로 표기.\n"
         "  - 두 값을 섞거나 혼용 금지. 예: `발음 점수 76.5점, 일치율 90.8%`.\n"
         "- **속도:** `voice.speed.overall_wpm`을 실제 수치로 표기하고, 목표 범위는 `voice.speed.wpm_range`를 그대로 인용.\n"
-        "- **구간 코칭:** `voice.speed.speed_rows`의 `stn_start~stn_end`(초)를 그대로 사용.\n"
+        "- **구간 코칭:** `voice.speed.too_fast_ranges`, `voice.speed.too_slow_ranges`, `gaze.off_center_ranges`의 구간(초)을 그대로 사용.\n"
         "- **시선/자세:** 존재하면 `gaze.gaze_score`, `posture.pose_score`를 그대로 사용.\n"
         "- **수치 포맷:** 소수 한 자리까지 반올림(예: 76.5, 90.8%). **'약 ~점/약 ~%' 같은 표현 금지.**\n"
         "- 입력에 없는 수치 **추정/창작 금지**. 없으면 '데이터 없음'이라고만 밝힘.\n\n"
@@ -104,71 +129,96 @@ class PresentationFeedbackBot:
         "수치는 반드시 입력에서만 가져와 한 자리 소수로 표기.\n"
     )
 
-    def get_feedback(self, analysis: Dict[str, Any]) -> Dict[str, str]:
-        prompt = self.build_prompt(analysis)
-        response = openai.chat.completions.create(
+    def build_messages(self, analysis: Dict[str, Any]) -> List[Dict[str, str]]:
+        return [
+            {"role": "system", "content": "당신은 경험 많은 발표 코치입니다. 사용자는 응답할 수 없습니다."},
+            {"role": "user",   "content": self.build_prompt(analysis)}
+        ]
+
+    def completion_kwargs(self, analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """chat.completions.create 인자 (동기/비동기 스트리밍 공용)"""
+        return dict(
             model=self.model,
-            messages=[
-                {"role": "system", "content": "당신은 경험 많은 발표 코치입니다. 사용자는 응답할 수 없습니다."},
-                {"role": "user",   "content": prompt}
-            ],
+            messages=self.build_messages(analysis),
             # 길이를 충분히 보장
             max_completion_tokens=2000,
             # temperature=1  # gpt-4.1은 기본 1. 생략 권장
             response_format={"type": "json_object"},  # ✅ JSON 모드: 항상 유효한 JSON만 반환
         )
-        content = response.choices[0].message.content.strip()
 
-        # 안전 파싱 + 키 정규화
+    def get_feedback(self, analysis: Dict[str, Any]) -> Dict[str, str]:
+        kwargs = self.completion_kwargs(analysis)
+        with metrics.span("llm.completion"):
+            response = _get_openai().chat.completions.create(**kwargs)
+        return parse_feedback_content(response.choices[0].message.content)
+
+
+def parse_feedback_content(content: str) -> Dict[str, str]:
+    """모델 출력(JSON 문자열) → {"short_feedback", "detailed_feedback"} (안전 파싱 + 키 정규화)"""
+    content = (content or "").strip()
+    try:
+        data = json.loads(content)
+    except Exception:
+        # 원인 분석을 위해 앞부분 로그
+        logger.debug("raw model output (head): %s", content[:600])
+        # 중괄호 부분만 추출 재시도
+        m = re.search(r"\{.*\}", content, re.DOTALL)
+        if not m:
+            return {
+                "short_feedback": "피드백 생성에 실패했습니다.",
+                "detailed_feedback": "상세 피드백 생성 중 오류가 발생했습니다."
+            }
         try:
-            data = json.loads(content)
+            data = json.loads(m.group(0))
         except Exception:
-            # 원인 분석을 위해 앞부분 로그
-            print("[DEBUG] raw model output (head):", content[:600])
-            # 중괄호 부분만 추출 재시도
-            import re
-            m = re.search(r"\{.*\}", content, re.DOTALL)
-            if not m:
-                return {
-                    "short_feedback": "피드백 생성에 실패했습니다.",
-                    "detailed_feedback": "상세 피드백 생성 중 오류가 발생했습니다."
-                }
-            try:
-                data = json.loads(m.group(0))
-            except Exception:
-                return {
-                    "short_feedback": "피드백 생성에 실패했습니다.",
-                    "detailed_feedback": "상세 피드백 생성 중 오류가 발생했습니다."
-                }
-
-        short = (
-            data.get("short_feedback")
-            or data.get("summary")
-            or ""
-        )
-        detail = (
-            data.get("detail_feedback")
-            or data.get("detailed_feedback")
-            or data.get("details")
-            or ""
-        )
-
-        if not short or not detail:
-            print("[DEBUG] keys from model:", list(data.keys()))
             return {
-                "short_feedback": short or "피드백 생성에 실패했습니다.",
-                "detailed_feedback": detail or "상세 피드백 생성 중 오류가 발생했습니다."
+                "short_feedback": "피드백 생성에 실패했습니다.",
+                "detailed_feedback": "상세 피드백 생성 중 오류가 발생했습니다."
             }
 
+    short = (
+        data.get("short_feedback")
+        or data.get("summary")
+        or ""
+    )
+    detail = (
+        data.get("detail_feedback")
+        or data.get("detailed_feedback")
+        or data.get("details")
+        or ""
+    )
+
+    if not short or not detail:
+        logger.warning("Missing feedback fields, keys from model: %s", list(data.keys()))
         return {
-            "short_feedback": short,
-            "detailed_feedback": detail
+            "short_feedback": short or "피드백 생성에 실패했습니다.",
+            "detailed_feedback": detail or "상세 피드백 생성 중 오류가 발생했습니다."
         }
 
+    return {
+        "short_feedback": short,
+        "detailed_feedback": detail
+    }
+
 # video_processing 흐름 내 피드백 호출 예시
-def process_and_feedback(analysis_results: Dict[str, Any]) -> Dict[str, Any]:
-    bot = PresentationFeedbackBot()
-    fb = bot.get_feedback(analysis_results)
+def process_and_feedback(analysis_results: Dict[str, Any],
+                         frame_times: Optional[Dict[Any, float]] = None) -> Dict[str, Any]:
+    """
+    results 전체 대신 고정 크기 요약(build_feedback_digest)으로 프롬프트 구성.
+    FEEDBACK_MODE=rules면 규칙 기반 렌더러만 사용, LLM 실패 시 규칙 기반으로 대체(FEEDBACK_RULES_FALLBACK).
+    frame_times: {frame_id: frame_timestamp} (시선 구간을 실제 초 단위로 표기)
+    """
+    digest = build_feedback_digest(analysis_results, frame_times)
+    if FEEDBACK_MODE == "rules":
+        return render_feedback(digest)
+
+    try:
+        fb = PresentationFeedbackBot().get_feedback(digest)
+    except Exception as e:
+        if not FEEDBACK_RULES_FALLBACK:
+            raise
+        logger.warning("LLM feedback failed, using rule-based feedback: %s", e)
+        return render_feedback(digest)
     return {
         "short_feedback": fb.get("short_feedback", "피드백 생성에 실패했습니다."),
         "detailed_feedback": fb.get("detailed_feedback", "상세 피드백 생성 중 오류가 발생했습니다.")
@@ -0,0 +1,243 @@
+# 피드백 LLM 입력용 분석 요약(digest)
+# - results 전체(프레임별 시선 맵, speed_rows 전부)를 그대로 보내지 않고 고정 크기 통계 + 시간 구간(RLE)으로 압축
+# - 구간 목록은 길이순 상위 DIGEST_MAX_RANGES개만 남겨 영상 길이와 무관하게 프롬프트 크기 상한 유지
+from typing import Any, Dict, List, Optional, Tuple
+
+GAZE_STEP_SEC = 1.0        # 프레임 샘플 간격 (extract_frames_and_audio와 동일)
+GAZE_MIN_RANGE_SEC = 2.0   # 이보다 짧은 시선 이탈은 노이즈로 간주
+SPEED_MERGE_GAP_SEC = 2.0  # 같은 속도 상태의 세그먼트 사이 간격이 이 이하면 한 구간으로 병합
+DIGEST_MAX_RANGES = 8      # 항목별 최대 구간 수
+
+
+def _r1(v) -> Optional[float]:
+    try:
+        return None if v is None else round(float(v), 1)
+    except (TypeError, ValueError):
+        return None
+
+
+def _fmt_range(start: float, end: float) -> str:
+    return f"{start:.0f}~{end:.0f}초"
+
+
+def run_length_ranges(points: List[Tuple[float, str]], step: float = GAZE_STEP_SEC
+                      ) -> List[Tuple[float, float, str]]:
+    """
+    (시각, 라벨) 시계열(시간순) → 같은 라벨이 연속된 구간 [(start, end, label), ...].
+    샘플 간격이 step의 1.5배를 넘으면 다른 구간으로 끊음. end는 마지막 샘플 + step.
+    """
+    ranges: List[Tuple[float, float, str]] = []
+    for t, label in points:
+        if ranges:
+            s, e, prev = ranges[-1]
+            if label == prev and t - (e - step) <= step * 1.5:
+                ranges[-1] = (s, t + step, prev)
+                continue
+        ranges.append((t, t + step, label))
+    return ranges
+
+
+def _top_ranges(ranges: List[Tuple[float, float, Any]], limit: int = DIGEST_MAX_RANGES
+                ) -> List[Tuple[float, float, Any]]:
+    """길이순 상위 limit개 → 시간순 정렬"""
+    longest = sorted(ranges, key=lambda r: r[1] - r[0], reverse=True)[:limit]
+    return sorted(longest, key=lambda r: r[0])
+
+
+# -----------------------------
+# 항목별 요약
+# -----------------------------
+def digest_gaze(gaze: Dict[Any, Any], frame_times: Optional[Dict[Any, float]] = None) -> Dict[str, Any]:
+    """
+    {frame_id: direction, "gaze_score": float} → 점수/방향 분포/시선 이탈 구간.
+    frame_times({frame_id: frame_timestamp})가 없으면 frame_id 순서 × 1초로 시각 추정.
+    """
+    gaze = gaze or {}
+    points = [(k, v) for k, v in gaze.items() if k != "gaze_score" and isinstance(v, str)]
+    if frame_times:
+        timed = [(float(frame_times[k]), v) for k, v in points if k in frame_times]
+    else:
+        timed = [(i * GAZE_STEP_SEC, v) for i, (_, v) in enumerate(sorted(points, key=lambda p: p[0]))]
+    timed.sort(key=lambda p: p[0])
+
+    total = len(timed)
+    dist: Dict[str, int] = {}
+    for _, d in timed:
+        dist[d] = dist.get(d, 0) + 1
+
+    off = [
+        r for r in run_length_ranges(timed)
+        if r[2] != "center" and r[1] - r[0] >= GAZE_MIN_RANGE_SEC
+    ]
+    return {
+        "gaze_score": _r1(gaze.get("gaze_score")),
+        "frames": total,
+        "distribution_pct": {d: _r1(c * 100.0 / total) for d, c in sorted(dist.items())} if total else {},
+        "off_center_sec": _r1(sum(r[1] - r[0] for r in off)),
+        "off_center_ranges": [f"{_fmt_range(s, e)} {d}" for s, e, d in _top_ranges(off)],
+    }
+
+
+def _speed_state(row: Dict[str, Any], wpm_min: float, wpm_max: float) -> Optional[str]:
+    wpm = float(row.get("wpm", 0.0))
+    if wpm > wpm_max:
+        return "too_fast"
+    if wpm < wpm_min:
+        return "too_slow"
+    return None
+
+
+def digest_speed(speed: Dict[str, Any]) -> Dict[str, Any]:
+    """speed 블록 → 점수/전체 WPM + 빠름/느림 구간(인접 세그먼트 병합, 구간 평균 WPM)"""
+    speed = speed or {}
+    wpm_range = speed.get("wpm_range") or (100.0, 150.0)
+    wpm_min, wpm_max = float(wpm_range[0]), float(wpm_range[1])
+    rows = sorted(speed.get("speed_rows") or [], key=lambda r: float(r.get("stn_start", 0.0)))
+
+    # [start, end, state, words, duration]
+    merged: List[List[Any]] = []
+    for row in rows:
+        state = _speed_state(row, wpm_min, wpm_max)
+        if state is None:
+            continue
+        s, e = float(row.get("stn_start", 0.0)), float(row.get("stn_end", 0.0))
+        words, dur = float(row.get("num_words", 0)), float(row.get("duration", e - s))
+        if merged and merged[-1][2] == state and s - merged[-1][1] <= SPEED_MERGE_GAP_SEC:
+            merged[-1][1] = max(merged[-1][1], e)
+            merged[-1][3] += words
+            merged[-1][4] += dur
+        else:
+            merged.append([s, e, state, words, dur])
+
+    out = {
+        "final_score": _r1(speed.get("final_score")),
+        "knn_score": _r1(speed.get("knn_score")),
+        "overall_wpm": _r1(speed.get("overall_wpm")),
+        "wpm_range": [_r1(wpm_min), _r1(wpm_max)],
+        "bad_ratio": round(float(speed.get("bad_ratio") or 0.0), 3),
+        "counts": speed.get("counts"),
+    }
+    for state in ("too_fast", "too_slow"):
+        ranges = [(m[0], m[1], m[3] / m[4] * 60.0 if m[4] > 0 else 0.0) for m in merged if m[2] == state]
+        out[f"{state}_ranges"] = [f"{_fmt_range(s, e)} ({wpm:.1f} wpm)" for s, e, wpm in _top_ranges(ranges)]
+    return out
+
+
+def _round_dict(d: Optional[Dict[str, Any]], ndigits: int = 1) -> Optional[Dict[str, Any]]:
+    if not isinstance(d, dict):
+        return d
+    return {
+        k: (round(float(v), ndigits) if isinstance(v, (int, float)) and not isinstance(v, bool) else v)
+        for k, v in d.items()
+    }
+
+
+def build_feedback_digest(results: Dict[str, Any], frame_times: Optional[Dict[Any, float]] = None
+                          ) -> Dict[str, Any]:
+    """
+    analyze_presentation_video + main에서 병합된 results → LLM 프롬프트용 고정 크기 요약.
+    키 구조(gaze/emotion/posture/voice.*)는 기존 프롬프트 규칙이 참조하는 이름을 유지.
+    """
+    results = results or {}
+    emotion = results.get("emotion") or {}
+    voice = results.get("voice") or {}
+    posture = results.get("posture") or {}
+
+    digest: Dict[str, Any] = {
+        "gaze": digest_gaze(results.get("gaze") or {}, frame_times),
+        "emotion": {
+            "score": _r1(emotion.get("score")),
+            # 감정 비율은 0~1 값이라 소수 4자리 유지 (프롬프트에서 %로 변환)
+            "avg": _round_dict(emotion.get("avg"), 4),
+            "ref": _round_dict(emotion.get("ref"), 4),
+            "all_avg": _round_dict(emotion.get("all_avg"), 4),
+        },
+        "posture": {
+            k: posture.get(k) for k in ("pose_score", "good", "bad", "total") if k in posture
+        },
+        "voice": {
+            "speed": digest_speed(voice.get("speed") or {}),
+            "pronunciation": _round_dict(voice.get("pronunciation")),
+            "pitch": _round_dict(voice.get("pitch")),
+        },
+    }
+    return digest
+
+
+def load_results_from_db(db, video_id: int) -> Tuple[Dict[str, Any], Dict[Any, float]]:
+    """
+    저장된 테이블(Score/Gaze/Emotion/Pose/Speed/Pitch/Pronunciation)로 results 형태 재구성 (재처리용).
+    반환: (results, frame_times)
+    """
+    from app.emotion_analysis import get_all_emotion_averages_corrected
+    from app.models import Audio, Frame, Gaze, Pitch, Pose, Pronunciation, Score, Speed
+    from app.speed_analysis import WPM_GOOD_MIN, WPM_GOOD_MAX
+
+    score = db.query(Score).filter(Score.video_id == video_id).first()
+    frame_times = dict(db.query(Frame.id, Frame.frame_timestamp).filter(Frame.video_id == video_id).all())
+
+    gaze: Dict[Any, Any] = dict(
+        db.query(Gaze.frame_id, Gaze.direction)
+          .join(Frame, Gaze.frame_id == Frame.id)
+          .filter(Frame.video_id == video_id)
+          .all()
+    )
+    gaze["gaze_score"] = getattr(score, "gaze_score", None)
+
+    pose_types = [
+        t for (t,) in db.query(Pose.image_type)
+                        .join(Frame, Pose.frame_id == Frame.id)
+                        .filter(Frame.video_id == video_id)
+                        .all()
+    ]
+    good = sum(1 for t in pose_types if t == "GOOD")
+
+    speed_rows: List[Dict[str, Any]] = []
+    pron = pitch = None
+    audio = db.query(Audio).filter(Audio.video_id == video_id).first()
+    if audio:
+        speed_rows = [
+            {"stn_start": r.stn_start, "stn_end": r.stn_end, "num_words": r.num_words,
+             "duration": r.duration, "wpm": r.wpm, "wpm_band": r.wpm_band}
+            for r in db.query(Speed).filter(Speed.audio_id == audio.id).order_by(Speed.stn_start).all()
+        ]
+        pron = db.query(Pronunciation).filter(Pronunciation.audio_id == audio.id).first()
+        pitch = db.query(Pitch).filter(Pitch.audio_id == audio.id).first()
+
+    # overall_wpm은 저장되지 않으므로 구간 합으로 근사
+    total_words = sum(r["num_words"] or 0 for r in speed_rows)
+    total_dur = sum(r["duration"] or 0.0 for r in speed_rows)
+    bad = sum(1 for r in speed_rows if r["wpm_band"] == "bad")
+
+    results = {
+        "gaze": gaze,
+        "emotion": {
+            "score": getattr(score, "emotion_score", None),
+            "all_avg": get_all_emotion_averages_corrected(db, video_id),
+        },
+        "posture": {
+            "pose_score": getattr(score, "pose_score", None),
+            "good": good,
+            "bad": len(pose_types) - good,
+            "total": len(pose_types),
+        },
+        "voice": {
+            "speed": {
+                "speed_rows": speed_rows,
+                "overall_wpm": (total_words / total_dur * 60.0) if total_dur > 0 else None,
+                "final_score": getattr(score, "speed_score", None),
+                "bad_ratio": (bad / len(speed_rows)) if speed_rows else 0.0,
+                "wpm_range": (WPM_GOOD_MIN, WPM_GOOD_MAX),
+                "counts": {"good": len(speed_rows) - bad, "bad": bad, "total": len(speed_rows)},
+            },
+            "pronunciation": {
+                "matching_rate": getattr(pron, "matching_rate", None),
+                "score": getattr(score, "pronunciation_score", None),
+            },
+            "pitch": {
+                "hz_std": getattr(pitch, "hz_std", None),
+                "score": getattr(pitch, "pitch_score", None),
+            },
+        },
+    }
+    return results, frame_times
@@ -0,0 +1,227 @@
+# 규칙 기반 피드백 렌더러 (LLM 없이 수 ms)
+# - PresentationFeedbackBot.build_prompt의 조건부 규칙(감정 기준값, pitch/speed < 60, pose ≥ 85,
+#   발음 점수 × 일치율 매트릭스)과 출력 템플릿을 요약(digest)에 그대로 적용
+# - 용도: 스트리밍 전 즉시 초안(draft), LLM 지연/장애 시 대체 피드백, 재처리용 일괄 생성
+from typing import Any, Dict, List, Optional
+
+from app.log import get_logger
+
+logger = get_logger("feedback_rules")
+
+# build_prompt와 동일한 기준값/임계값
+REF_NEUTRAL = 0.6902
+REF_HAPPY = 0.2102
+PITCH_LOW = 60.0
+SPEED_LOW = 60.0
+POSE_GOOD = 85.0
+GAZE_GOOD = 85.0           # 시선 점수 칭찬 기준 (pose_score와 같은 척도)
+PRON_GOOD = 85.0
+MATCHING_HIGH = 80.0       # 일치율(%) '높음' 기준 (프롬프트에는 수치가 없어 별도 지정)
+SHORT_MAX_CHARS = 180      # Feedback.short_feedback 컬럼(200자) 이내
+
+
+def _num(v) -> Optional[float]:
+    try:
+        return None if v is None else float(v)
+    except (TypeError, ValueError):
+        return None
+
+
+def _f1(v: float) -> str:
+    return f"{v:.1f}"
+
+
+def _ranges_text(ranges: List[str], limit: int = 3) -> str:
+    return ", ".join(ranges[:limit])
+
+
+# -----------------------------
+# 카테고리별 규칙
+# -----------------------------
+def _emotion_lines(emotion: Dict[str, Any]) -> List[str]:
+    avg = emotion.get("all_avg") or {}
+    neutral, happy = _num(avg.get("neutral")), _num(avg.get("happy"))
+    if neutral is None or happy is None:
+        return ["- **[표정]** 전체: 표정 데이터 없음. 핵심 문장 시작 전에 **미소 예열**을 습관으로 만들어 보자."]
+
+    sad, angry = _num(avg.get("sad")) or 0.0, _num(avg.get("angry")) or 0.0
+    lines = [
+        f"- **[표정]** 전체: 표정 분포: 중립 {_f1(neutral * 100)}%, 행복 {_f1(happy * 100)}% "
+        f"(기준: 중립 {_f1(REF_NEUTRAL * 100)}%, 행복 {_f1(REF_HAPPY * 100)}%)"
+    ]
+    diagnosed = False
+    if neutral >= REF_NEUTRAL + 0.15 or happy <= REF_HAPPY - 0.10:
+        diagnosed = True
+        lines.append("- **[표정]** 전체: 표정 다양성이 부족해 밋밋해 보여. "
+                     "국면 전환마다 **미소/끄덕임/눈썹 리드** 중 2개를 넣고, 핵심 문장 시작 1초 전에 **미소 예열**을 해 보자.")
+    if happy >= REF_HAPPY + 0.15 and neutral <= REF_NEUTRAL - 0.10:
+        diagnosed = True
+        lines.append("- **[표정]** 전체: 밝은 표정이 과한 편이야. "
+                     "**강조 구간만** 밝게, 정보 구간은 **중립 표정**을 유지하고 웃음은 **2초 이내**로 줄이자.")
+    if sad + angry >= 0.20 or (neutral >= 0.85 and happy <= 0.05):
+        diagnosed = True
+        lines.append("- **[표정]** 전체: 표정이 다소 무겁게 보여. "
+                     "문장 첫 단어에서 **입꼬리 상승 5%**, 마무리 문장에 **미소 스냅**을 넣어 보자.")
+    if not diagnosed:
+        lines.append("- **[표정]** 전체: 기준과 비슷한 균형 잡힌 표정이야. 지금처럼 강조 구간에서만 표정 레벨을 한 단계 올려 보자.")
+    return lines
+
+
+def _gaze_lines(gaze: Dict[str, Any]) -> List[str]:
+    score = _num(gaze.get("gaze_score"))
+    dist = gaze.get("distribution_pct") or {}
+    ranges = gaze.get("off_center_ranges") or []
+    lines: List[str] = []
+
+    unknown = _num(dist.get("unknown")) or 0.0
+    if unknown >= 50.0:
+        lines.append(f"- **[시선]** 전체: 눈이 인식되지 않은 비율이 {_f1(unknown)}%야. "
+                     "**눈이 잘 보이도록 촬영 구도와 조명**을 고치고, **깜빡임 횟수를 줄이는 루틴**(문장 끝에서만 깜빡이기)을 연습하자.")
+    if score is None:
+        lines.append("- **[시선]** 전체: 시선 데이터 없음.")
+        return lines
+
+    if ranges:
+        lines.append(f"- **[시선]** {_ranges_text(ranges)}: 시선이 중앙을 벗어났어 (시선 점수 {_f1(score)}). "
+                     "해당 구간에서는 **카메라 렌즈를 3초 이상 고정**하고, 자료를 볼 때는 **한 문장 단위로만** 시선을 옮기자.")
+    elif score >= GAZE_GOOD:
+        lines.append(f"- **[시선]** 전체: 카메라를 안정적으로 응시하고 있어 (시선 점수 {_f1(score)}). 지금처럼 유지하자.")
+    else:
+        lines.append(f"- **[시선]** 전체: 시선 점수 {_f1(score)}. **카메라 렌즈를 청중의 눈**이라고 생각하고 문장마다 한 번씩 돌아오자.")
+    return lines
+
+
+def _posture_lines(posture: Dict[str, Any]) -> List[str]:
+    score = _num(posture.get("pose_score"))
+    if score is None:
+        return ["- **[자세]** 전체: 자세 데이터 없음."]
+    if score >= POSE_GOOD:
+        return [f"- **[자세]** 전체: 안정적인 자세가 돋보여 (자세 점수 {_f1(score)}). 어깨 높이와 정면 각도를 지금처럼 유지하자."]
+    return [f"- **[자세]** 전체: 자세 점수 {_f1(score)}. **허리를 세우고 어깨를 수평**으로, "
+            "**양발을 어깨너비**로 두고 시선을 정면에 고정하자."]
+
+
+def _pronunciation_lines(pron: Dict[str, Any]) -> List[str]:
+    score, rate = _num(pron.get("score")), _num(pron.get("matching_rate"))
+    if score is None:
+        return ["- **[발음]** 전체: 발음 데이터 없음."]
+    obs = f"발음 점수 {_f1(score)}" + (f", 일치율 {_f1(rate)}%" if rate is not None else "")
+    if score >= PRON_GOOD:
+        return [f"- **[발음]** 전체: 발음이 명확해 ({obs}). 지금의 또박또박한 전달을 유지하자."]
+    if rate is not None and rate >= MATCHING_HIGH:
+        return [f"- **[발음]** 전체: 일치율은 높지만 발음 정확도가 아쉬워 ({obs}). "
+                "**비슷하게 들리지만 뜻이 다른 단어**를 짝지어 소리 내어 구분하는 연습을 하자."]
+    return [f"- **[발음]** 전체: 발음의 명확성과 정확성 모두 개선이 필요해 ({obs}). "
+            "**또박또박 발음**, **받침(자음 끝) 처리**, **모음 길이 조절**을 하루 10분씩 연습하자."]
+
+
+def _speed_lines(speed: Dict[str, Any]) -> List[str]:
+    score = _num(speed.get("final_score"))
+    if score is None:
+        score = _num(speed.get("knn_score"))
+    wpm = _num(speed.get("overall_wpm"))
+    wpm_range = speed.get("wpm_range") or [100.0, 150.0]
+    target = f"목표 {_f1(float(wpm_range[0]))}~{_f1(float(wpm_range[1]))}"
+    if wpm is None:
+        return ["- **[속도]** 전체: 속도 데이터 없음."]
+
+    lines: List[str] = []
+    fast, slow = speed.get("too_fast_ranges") or [], speed.get("too_slow_ranges") or []
+    if score is not None and score < SPEED_LOW:
+        lines.append(f"- **[속도]** 전체: 속도 점수가 낮아 ({_f1(score)}, {_f1(wpm)} wpm / {target}). "
+                     "**3-3-3 호흡**(3초 말하고 3초 쉬고 3단어 강조)과 **쉼표·마침표에서 멈춤**을 연습하자.")
+    else:
+        lines.append(f"- **[속도]** 전체: 안정적인 속도야 ({_f1(wpm)} wpm / {target}).")
+    if fast:
+        lines.append(f"- **[속도]** {_ranges_text(fast)}: 목표보다 빨라. 문장마다 **쉼표에서 0.5초 멈춤**을 넣자.")
+    if slow:
+        lines.append(f"- **[속도]** {_ranges_text(slow)}: 목표보다 느려. **문장 말미 템포를 올리고** 불필요한 간투사를 줄이자.")
+    return lines
+
+
+def _pitch_lines(pitch: Dict[str, Any]) -> List[str]:
+    score = _num(pitch.get("score"))
+    if score is None:
+        return ["- **[피치]** 전체: 억양 데이터 없음."]
+    if score < PITCH_LOW:
+        return [f"- **[피치]** 전체: 억양이 단조로워 (피치 점수 {_f1(score)}). **국어책처럼 단조롭게 읽지 말기** — "
+                "**키워드에 억양 강조**, **상승→하강 패턴**, **문장 끝 톤 다운**을 넣어 보자."]
+    return [f"- **[피치]** 전체: 억양 변화가 자연스러워 (피치 점수 {_f1(score)}). 핵심 문장에서 **1–3–1 강세**로 한 번 더 살려 보자."]
+
+
+def _short_feedback(digest: Dict[str, Any]) -> str:
+    """점수가 가장 높은 항목 1개 칭찬 + 가장 낮은 항목 2개 개선 (한 줄)"""
+    voice = digest.get("voice") or {}
+    speed = voice.get("speed") or {}
+    scores = {
+        "시선": _num((digest.get("gaze") or {}).get("gaze_score")),
+        "자세": _num((digest.get("posture") or {}).get("pose_score")),
+        "표정": _num((digest.get("emotion") or {}).get("score")),
+        "발음": _num((voice.get("pronunciation") or {}).get("score")),
+        "억양": _num((voice.get("pitch") or {}).get("score")),
+        "속도": _num(speed.get("final_score")) if speed.get("final_score") is not None else _num(speed.get("knn_score")),
+    }
+    ranked = sorted(((k, v) for k, v in scores.items() if v is not None), key=lambda kv: kv[1], reverse=True)
+    if not ranked:
+        return "분석 데이터가 부족해 요약 피드백을 만들 수 없어."
+    best = ranked[0]
+    worst = [k for k, v in ranked[::-1][:2] if k != best[0]]
+    text = f"**{best[0]}**({_f1(best[1])}점)이 가장 좋아."
+    if worst:
+        text += f" {', '.join(f'**{k}**' for k in worst)}을 중심으로 다듬으면 발표가 훨씬 좋아질 거야."
+    return text[:SHORT_MAX_CHARS]
+
+
+# -----------------------------
+# 엔트리
+# -----------------------------
+def render_feedback(digest: Dict[str, Any]) -> Dict[str, str]:
+    """요약(digest) → {"short_feedback", "detailed_feedback"} (LLM 응답과 같은 키)"""
+    voice = digest.get("voice") or {}
+    lines: List[str] = []
+    lines += _gaze_lines(digest.get("gaze") or {})
+    lines += _posture_lines(digest.get("posture") or {})
+    lines += _emotion_lines(digest.get("emotion") or {})
+    lines += _pronunciation_lines(voice.get("pronunciation") or {})
+    lines += _speed_lines(voice.get("speed") or {})
+    lines += _pitch_lines(voice.get("pitch") or {})
+    return {
+        "short_feedback": _short_feedback(digest),
+        "detailed_feedback": "\n".join(lines),
+    }
+
+
+def regenerate_feedback(video_ids: List[int]) -> Dict[int, Optional[int]]:
+    """저장된 분석 결과로 규칙 기반 피드백을 일괄 생성/저장 (재처리용). {video_id: feedback_id}"""
+    from app import crud
+    from app.db import SessionLocal
+    from app.feedback_digest import build_feedback_digest, load_results_from_db
+
+    saved: Dict[int, Optional[int]] = {}
+    db = SessionLocal()
+    try:
+        for vid in video_ids:
+            try:
+                results, frame_times = load_results_from_db(db, vid)
+                fb = render_feedback(build_feedback_digest(results, frame_times))
+                rec = crud.create_feedback_record(
+                    db=db,
+                    video_id=vid,
+                    short_feedback=fb["short_feedback"],
+                    detail_feedback=fb["detailed_feedback"],
+                )
+                saved[vid] = rec.id
+            except Exception as e:
+                db.rollback()
+                logger.warning("Rule feedback failed for video_id %s: %s", vid, e)
+                saved[vid] = None
+    finally:
+        db.close()
+    return saved
+
+
+if __name__ == "__main__":
+    # 예: python -m app.feedback_rules 12 13 14
+    import sys
+    ids = [int(x) for x in sys.argv[1:]]
+    print(regenerate_feedback(ids))
@@ -0,0 +1,313 @@
+# 비동기 스트리밍 피드백 생성 (분석 작업과 분리된 단계)
+# - 분석 백그라운드 작업은 요약(digest)만 submit하고 바로 종료 → 점수는 Score에 이미 반영되어 즉시 조회 가능
+# - 서버 이벤트 루프에서 동시 호출 수 제한(FEEDBACK_CONCURRENCY), 시도별 타임아웃, 지수 백오프 재시도
+# - 저장에 성공하면 작업의 체크포인트(plan)에 feedback 단계 완료 표시 (재시도 시 다시 생성하지 않음)
+# - LLM 토큰은 영상별 채널로 브로드캐스트 → SSE(/videos/{video_id}/feedback/stream) 구독자에게 전달
+#   동기 경로(FEEDBACK_ASYNC=0, rules)는 complete()/fail()로 채널 종료. 채널은 프로세스 메모리이므로
+#   구독 중에는 HEARTBEAT_SEC마다 DB(저장된 Feedback, 실패한 작업)도 확인하고 FEEDBACK_STREAM_TIMEOUT_SEC 뒤에는 error로 종료
+# - OPENAI_BASE_URL로 로컬 chat API stand-in(tools/fake_chat_api.py)에 붙여 테스트 가능
+import json
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from app.config import (
+    FEEDBACK_CONCURRENCY,
+    FEEDBACK_TIMEOUT_SEC,
+    FEEDBACK_MAX_RETRIES,
+    FEEDBACK_RETRY_BACKOFF_SEC,
+    FEEDBACK_RULES_FALLBACK,
+    FEEDBACK_STREAM_TIMEOUT_SEC,
+)
+from app import checkpoint, metrics
+from app.feedback_rules import render_feedback
+from app.log import get_logger
+
+logger = get_logger("feedback_service")
+
+CHANNEL_TTL_SEC = 120.0     # 완료 후 늦게 붙은 구독자에게 결과를 재생해 줄 보관 시간
+HEARTBEAT_SEC = 15.0        # SSE keep-alive 주기
+TERMINAL_EVENTS = ("done", "error")
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_sem: Optional[asyncio.Semaphore] = None
+_client = None
+_channels: Dict[int, "FeedbackChannel"] = {}
+
+
+class FeedbackChannel:
+    """영상 1개의 피드백 이벤트 스트림 (이벤트 루프 스레드에서만 접근)"""
+
+    def __init__(self):
+        self.status = "pending"  # pending | queued | running | done | error
+        self.events: List[Tuple[str, Any]] = []
+        self.subscribers: Set[asyncio.Queue] = set()
+
+    def publish(self, event: str, data: Any) -> None:
+        if event == "reset":
+            # 재시도: 지금까지의 토큰은 버림 (새 구독자에게 재생하지 않음)
+            self.events = [e for e in self.events if e[0] != "token"]
+        self.events.append((event, data))
+        for q in self.subscribers:
+            q.put_nowait((event, data))
+
+    def subscribe(self) -> asyncio.Queue:
+        q: asyncio.Queue = asyncio.Queue()
+        for ev in self.events:
+            q.put_nowait(ev)
+        self.subscribers.add(q)
+        return q
+
+    @property
+    def finished(self) -> bool:
+        return self.status in TERMINAL_EVENTS
+
+
+def _queue_depth():
+    counts = {"queued": 0, "running": 0}
+    for ch in list(_channels.values()):
+        if ch.status in counts:
+            counts[ch.status] += 1
+    return [({"status": k}, v) for k, v in counts.items()]
+
+
+metrics.gauge("feedback_queue", "Feedback generations waiting for a slot (queued) or streaming (running)",
+              _queue_depth)
+
+
+def _get_channel(video_id: int) -> FeedbackChannel:
+    ch = _channels.get(video_id)
+    if ch is None:
+        ch = _channels[video_id] = FeedbackChannel()
+    return ch
+
+
+def _finish(video_id: int, ch: FeedbackChannel, event: str, data: Any) -> None:
+    ch.status = event
+    ch.publish(event, data)
+
+    def _drop():
+        if _channels.get(video_id) is ch:
+            del _channels[video_id]
+    asyncio.get_running_loop().call_later(CHANNEL_TTL_SEC, _drop)
+
+
+# -----------------------------
+# 수명주기 / 외부(스레드) 진입점
+# -----------------------------
+def start() -> None:
+    """서버 기동 시 이벤트 루프 안에서 호출 (startup 훅)"""
+    global _loop, _sem
+    _loop = asyncio.get_running_loop()
+    _sem = asyncio.Semaphore(max(1, FEEDBACK_CONCURRENCY))
+
+
+def submit(video_id: int, digest: Dict[str, Any], plan: Optional[checkpoint.Plan] = None) -> bool:
+    """
+    백그라운드(스레드)에서 피드백 생성 예약. 서비스가 시작되지 않았으면 False (호출 측 동기 경로 사용)
+    plan: 저장 성공 시 feedback 단계를 완료 처리할 작업 체크포인트
+    """
+    if _loop is None or _loop.is_closed():
+        return False
+    asyncio.run_coroutine_threadsafe(_run(video_id, digest, plan), _loop)
+    return True
+
+
+def complete(video_id: int, fb: Dict[str, Any]) -> None:
+    """동기 경로에서 피드백을 저장한 뒤 대기 중인 구독자에게 done 전달 (스레드 안전)"""
+    if _loop is None or _loop.is_closed():
+        return
+
+    def _complete():
+        ch = _get_channel(video_id)
+        if not ch.finished:
+            _finish(video_id, ch, "done", fb)
+    _loop.call_soon_threadsafe(_complete)
+
+
+def fail(video_id: int, message: str) -> None:
+    """분석 자체가 실패한 경우 대기 중인 구독자에게 오류 전달 (스레드 안전)"""
+    if _loop is None or _loop.is_closed():
+        return
+
+    def _fail():
+        ch = _get_channel(video_id)
+        if not ch.finished:
+            _finish(video_id, ch, "error", {"message": message})
+    _loop.call_soon_threadsafe(_fail)
+
+
+def status(video_id: int) -> Optional[str]:
+    ch = _channels.get(video_id)
+    return ch.status if ch else None
+
+
+# -----------------------------
+# LLM 호출
+# -----------------------------
+def _get_async_client():
+    global _client
+    if _client is None:
+        from openai import AsyncOpenAI
+        from app.feedback_chatbot import OPENAI_BASE_URL, _api_key
+        # 재시도/타임아웃은 이 모듈에서 관리 (SDK 자체 재시도 비활성)
+        _client = AsyncOpenAI(
+            api_key=_api_key(),
+            base_url=OPENAI_BASE_URL or None,
+            max_retries=0,
+            timeout=FEEDBACK_TIMEOUT_SEC,
+        )
+    return _client
+
+
+async def _stream_completion(kwargs: Dict[str, Any], ch: FeedbackChannel) -> str:
+    stream = await _get_async_client().chat.completions.create(**kwargs, stream=True)
+    parts: List[str] = []
+    async for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            parts.append(delta)
+            ch.publish("token", delta)
+    return "".join(parts)
+
+
+def _save_feedback(video_id: int, fb: Dict[str, str], plan: Optional[checkpoint.Plan] = None) -> int:
+    from app import crud
+    from app.db import SessionLocal
+    db = SessionLocal()
+    try:
+        saved = crud.create_feedback_record(
+            db=db,
+            video_id=video_id,
+            short_feedback=fb.get("short_feedback", "") or "",
+            detail_feedback=fb.get("detailed_feedback", "") or "",
+        )
+    finally:
+        db.close()
+    if plan is not None:
+        plan.complete("feedback", {})
+    return saved.id
+
+
+async def _run(video_id: int, digest: Dict[str, Any], plan: Optional[checkpoint.Plan] = None) -> None:
+    from app.feedback_chatbot import PresentationFeedbackBot, parse_feedback_content
+
+    ch = _get_channel(video_id)
+    ch.status = "queued"
+    # 규칙 기반 초안을 즉시 전달 (LLM 토큰이 오기 전 첫 응답)
+    draft = render_feedback(digest)
+    ch.publish("draft", draft)
+    kwargs = PresentationFeedbackBot().completion_kwargs(digest)
+
+    async with _sem:
+        ch.status = "running"
+        content = None
+        last_error: Optional[Exception] = None
+        for attempt in range(FEEDBACK_MAX_RETRIES + 1):
+            try:
+                with metrics.span("llm.completion", video_id=video_id, attempt=attempt + 1):
+                    content = await asyncio.wait_for(_stream_completion(kwargs, ch), FEEDBACK_TIMEOUT_SEC)
+                break
+            except Exception as e:
+                last_error = e
+                logger.warning("Feedback attempt %d failed for video_id %s: %s: %s",
+                               attempt + 1, video_id, type(e).__name__, e, extra={"video_id": video_id})
+                if attempt < FEEDBACK_MAX_RETRIES:
+                    ch.publish("reset", {"attempt": attempt + 2})
+                    await asyncio.sleep(FEEDBACK_RETRY_BACKOFF_SEC * (2 ** attempt))
+
+    if content is None:
+        logger.error("Failed to generate chatbot feedback for video_id %s: %s", video_id, last_error,
+                     extra={"video_id": video_id})
+        if not FEEDBACK_RULES_FALLBACK:
+            _finish(video_id, ch, "error", {"message": str(last_error)})
+            return
+        # LLM 장애/지연: 규칙 기반 피드백을 최종본으로 저장
+        fb = {**draft, "source": "rules"}
+    else:
+        fb = {**parse_feedback_content(content), "source": "llm"}
+
+    try:
+        fb_id = await asyncio.get_running_loop().run_in_executor(None, _save_feedback, video_id, fb, plan)
+        logger.info("Feedback saved! ID=%s (source=%s)", fb_id, fb["source"], extra={"video_id": video_id})
+    except Exception as e:
+        # 저장 실패: done을 보내면 구독자는 완료로 알지만 Feedback 행이 없음 → error로 종료
+        logger.error("Failed to save feedback for video_id %s: %s", video_id, e, extra={"video_id": video_id})
+        _finish(video_id, ch, "error", {"message": "feedback save failed"})
+        return
+    _finish(video_id, ch, "done", fb)
+
+
+# -----------------------------
+# SSE
+# -----------------------------
+def _sse(event: str, data: Any) -> str:
+    payload = data if isinstance(data, str) else json.dumps(data, ensure_ascii=False)
+    lines = "".join(f"data: {line}\n" for line in payload.split("\n"))
+    return f"event: {event}\n{lines}\n"
+
+
+def _load_saved_feedback(video_id: int) -> Optional[Tuple[str, Any]]:
+    """DB 기준 종료 이벤트: 저장된 피드백 → ("done", fb), 실패한 분석 작업 → ("error", ...), 아니면 None"""
+    from app.db import SessionLocal
+    from app.models import Feedback, JobStatus
+    db = SessionLocal()
+    try:
+        fb = (
+            db.query(Feedback)
+              .filter(Feedback.video_id == video_id)
+              .order_by(Feedback.created_at.desc())
+              .first()
+        )
+        if fb:
+            return "done", {"short_feedback": fb.short_feedback or "", "detailed_feedback": fb.detail_feedback or ""}
+        job = db.query(JobStatus.status).filter(JobStatus.video_id == video_id).first()
+        if job is not None and job[0] == "failed":
+            return "error", {"message": "analysis failed"}
+        return None
+    finally:
+        db.close()
+
+
+async def sse_events(video_id: int) -> AsyncIterator[str]:
+    """
+    SSE 이벤트: draft(규칙 기반 즉시 피드백) / token(모델 출력 조각) / reset(재시도, 누적 토큰 폐기) /
+    done(최종 피드백 JSON, source=llm|rules) / error.
+    이미 저장된 피드백이 있고 진행 중인 생성이 없으면 done 1건으로 종료.
+    대기 중에는 HEARTBEAT_SEC마다 DB를 확인 (다른 워커 프로세스가 생성/저장한 경우), FEEDBACK_STREAM_TIMEOUT_SEC 뒤 error.
+    """
+    loop = asyncio.get_running_loop()
+    if video_id not in _channels:
+        saved = await loop.run_in_executor(None, _load_saved_feedback, video_id)
+        if saved is not None:
+            yield _sse(*saved)
+            return
+
+    ch = _get_channel(video_id)
+    q = ch.subscribe()
+    deadline = loop.time() + FEEDBACK_STREAM_TIMEOUT_SEC
+    try:
+        yield _sse("status", {"status": ch.status})
+        while True:
+            try:
+                event, data = await asyncio.wait_for(q.get(), HEARTBEAT_SEC)
+            except asyncio.TimeoutError:
+                if ch.status == "pending":  # 이 프로세스에서 생성 중이 아니면 DB 확인 (다른 워커/동기 경로)
+                    saved = await loop.run_in_executor(None, _load_saved_feedback, video_id)
+                    if saved is not None:
+                        yield _sse(*saved)
+                        return
+                if loop.time() >= deadline:
+                    yield _sse("error", {"message": "feedback stream timed out"})
+                    return
+                yield ": keep-alive\n\n"
+                continue
+            yield _sse(event, data)
+            if event in TERMINAL_EVENTS:
+                return
+    finally:
+        ch.subscribers.discard(q)
+        # 생성이 예약되지 않은 채 구독만 했던 채널은 정리
+        if ch.status == "pending" and not ch.subscribers and _channels.get(video_id) is ch:
+            del _channels[video_id]
@@ -0,0 +1,169 @@
+# 프레임 이미지 요청 시 렌더링 (GET /videos/{video_id}/frames/{ms}?w=)
+# - 저장소의 원본 영상(Video.video_url)을 로컬에 내려받아(최근 FRAME_RENDER_MAX_SOURCES개 유지) 해당 시각 프레임을 디코딩
+#   (OpenCV 탐색: 가장 가까운 이전 키프레임부터 목표 시각까지 디코딩)
+# - 요청 가로 크기로 축소(비율 유지) → image_codec으로 인코딩 → 디스크 LRU 캐시 (video_id, ms, width)
+# - 추출 단계에서 저장한 프레임이 manifest에 있으면(packed 범위 참조 등) 그 이미지를 Range GET으로 읽어 사용 (원본 디코딩 없음)
+# - FRAME_RENDER_LAZY=1이면 추출 단계는 원본 프레임을 업로드하지 않고 Frame.image_url = render_url(...)
+#   (프론트가 실제로 보는 썸네일만 렌더링 비용 발생)
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from app import artifact_manifest, image_codec, metrics, storage
+from app.config import (
+    ARTIFACT_FRAME_QUALITY,
+    FRAME_RENDER_BASE_URL,
+    FRAME_RENDER_MAX_WIDTH,
+    FRAME_RENDER_CACHE_DIR,
+    FRAME_RENDER_CACHE_MB,
+    FRAME_RENDER_SOURCE_DIR,
+    FRAME_RENDER_MAX_SOURCES,
+)
+from app.log import get_logger
+
+logger = get_logger("frame_render")
+
+_MB = 1024 * 1024
+MIN_WIDTH = 16
+
+RENDERS = metrics.counter("frame_render_total", "Frame render requests, by result (hit|stored|rendered)")
+
+_cache: Optional[storage.DiskLRUCache] = None
+_cache_lock = threading.Lock()
+_sources: "OrderedDict[int, str]" = OrderedDict()  # video_id → 로컬 경로 (LRU 순)
+_sources_lock = threading.Lock()
+_download_locks: Dict[int, threading.Lock] = {}
+
+
+class SourceNotFound(Exception):
+    """원본 영상을 저장소에서 찾을 수 없음"""
+
+
+def render_url(video_id: int, t: float) -> str:
+    """Frame.image_url로 저장할 렌더링 URL"""
+    return f"{FRAME_RENDER_BASE_URL.rstrip('/')}/videos/{video_id}/frames/{int(round(t * 1000))}"
+
+
+def _get_cache() -> Optional[storage.DiskLRUCache]:
+    global _cache
+    if FRAME_RENDER_CACHE_MB <= 0:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = storage.DiskLRUCache(FRAME_RENDER_CACHE_DIR, int(FRAME_RENDER_CACHE_MB * _MB))
+    return _cache
+
+
+def _source_path(video_id: int, video_url: str) -> str:
+    """원본 영상 로컬 사본 경로 (없으면 저장소에서 1회 다운로드)"""
+    with _sources_lock:
+        path = _sources.get(video_id)
+        if path and os.path.exists(path):
+            _sources.move_to_end(video_id)
+            return path
+        lock = _download_locks.setdefault(video_id, threading.Lock())
+
+    with lock:  # 같은 영상 동시 요청은 다운로드 1회
+        with _sources_lock:
+            path = _sources.get(video_id)
+        if path and os.path.exists(path):
+            return path
+
+        key = storage.get_storage().key_from_url(video_url or "")
+        if not key:
+            raise SourceNotFound(f"video {video_id} has no stored source ({video_url})")
+        os.makedirs(FRAME_RENDER_SOURCE_DIR, exist_ok=True)
+        path = os.path.join(FRAME_RENDER_SOURCE_DIR, f"{video_id}{os.path.splitext(key)[1]}")
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            storage.get_storage().download(key, tmp)
+        except Exception as e:
+            raise SourceNotFound(f"video {video_id} source download failed: {e}") from e
+        os.replace(tmp, path)
+        logger.info("Render source cached: video_id=%s (%.1fMB)", video_id, os.path.getsize(path) / _MB)
+
+    evicted = []
+    with _sources_lock:
+        _sources[video_id] = path
+        _sources.move_to_end(video_id)
+        while len(_sources) > max(1, FRAME_RENDER_MAX_SOURCES):
+            old_id, old_path = _sources.popitem(last=False)
+            _download_locks.pop(old_id, None)
+            evicted.append(old_path)
+    for old in evicted:
+        try:
+            os.remove(old)
+        except OSError:
+            pass
+    return path
+
+
+def _decode(path: str, t: float, width: int):
+    """path의 t초 프레임 → 가로 width(원본 이하)로 축소한 RGB 배열"""
+    import cv2
+
+    cap = cv2.VideoCapture(path)
+    try:
+        with metrics.span("decode.frame"):
+            cap.set(cv2.CAP_PROP_POS_MSEC, max(0.0, t) * 1000.0)
+            ok, bgr = cap.read()
+            if not ok:  # 영상 길이 밖
+                raise ValueError(f"no frame at t={t:.3f}s")
+    finally:
+        cap.release()
+    h, w = bgr.shape[:2]
+    if width < w:
+        bgr = cv2.resize(bgr, (width, max(1, round(h * width / w))), interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+
+
+def _stored_frame(video_id: int, ms: int) -> Optional[bytes]:
+    """추출 단계에서 저장한 ms 시각 프레임 (manifest의 키/범위 참조), 없으면 None"""
+    manifest = artifact_manifest.load(video_id)
+    ref = manifest.ref(ms, "frame") if manifest is not None else None
+    if ref is None:
+        return None
+    try:
+        return storage.read_ref(ref)
+    except Exception as e:
+        logger.warning("Stored frame read failed (%s): %s", ref, e)
+        return None
+
+
+def _resize_encoded(data: bytes, width: int) -> bytes:
+    """인코딩된 프레임 → 가로 width로 축소 후 재인코딩 (이미 width 이하면 그대로)"""
+    import cv2
+    import numpy as np
+
+    bgr = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+    if bgr is None or bgr.shape[1] <= width:
+        return data
+    h, w = bgr.shape[:2]
+    bgr = cv2.resize(bgr, (width, max(1, round(h * width / w))), interpolation=cv2.INTER_AREA)
+    return image_codec.encode_rgb(cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB), ARTIFACT_FRAME_QUALITY)
+
+
+def render(video_id: int, video_url: str, ms: int, width: Optional[int] = None) -> Tuple[bytes, str]:
+    """(video_id, ms, width) 프레임 이미지 → (bytes, Content-Type)"""
+    width = max(MIN_WIDTH, min(int(width or FRAME_RENDER_MAX_WIDTH), FRAME_RENDER_MAX_WIDTH))
+    cache_key = f"{video_id}/{ms}/{width}{image_codec.EXT}"
+    cache = _get_cache()
+    if cache is not None:
+        data = cache.get(cache_key)
+        if data is not None:
+            RENDERS.inc(result="hit")
+            return data, image_codec.CONTENT_TYPE
+
+    with metrics.span("frame.render", video_id=video_id):
+        stored = _stored_frame(video_id, ms)
+        if stored is not None:
+            data = _resize_encoded(stored, width)
+        else:
+            rgb = _decode(_source_path(video_id, video_url), ms / 1000.0, width)
+            data = image_codec.encode_rgb(rgb, ARTIFACT_FRAME_QUALITY)
+    RENDERS.inc(result="stored" if stored is not None else "rendered")
+    if cache is not None:
+        cache.put(cache_key, data)
+    return data, image_codec.CONTENT_TYPE
@@ -1,22 +1,14 @@
-import boto3
+import logging
+
 import cv2
 import numpy as np
-import mediapipe as mp
 from sqlalchemy.orm import Session
-from app import crud
+from app import artifact_manifest, crud, metrics, storage
 from app.models import Frame
-from app.config import AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, AWS_REGION
-
+from app.model_registry import registry
+from app.log import get_logger, throttled
 
-# MediaPipe Face Mesh 초기화
-mp_face_mesh = mp.solutions.face_mesh
-_FACE_MESH = mp_face_mesh.FaceMesh(
-    static_image_mode=True,
-    max_num_faces=1,
-    refine_landmarks=True,
-    min_detection_confidence=0.3,
-    min_tracking_confidence=0.3
-)
+logger = get_logger("gaze")
 
 
 # 더 관대한 임계값 설정
@@ -43,23 +35,6 @@ LEFT_EYE_LANDMARKS = [33, 159, 158, 133, 153, 145]
 RIGHT_EYE_LANDMARKS = [362, 380, 374, 263, 386, 385]
 
 
-def read_image_from_s3(bucket: str, key: str):
-    """S3에서 이미지를 읽고 OpenCV 이미지로 반환"""
-    s3 = boto3.client(
-        's3',
-        aws_access_key_id=AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-        region_name=AWS_REGION
-    )
-    try:
-        res = s3.get_object(Bucket=bucket, Key=key)
-        arr = np.frombuffer(res['Body'].read(), np.uint8)
-        return cv2.imdecode(arr, cv2.IMREAD_COLOR)
-    except Exception as e:
-        print(f"[ERROR] 읽기 실패: {e}")
-        return None
-
-
 def calculate_eye_aspect_ratio(eye_points):
     """눈 깜빡임 검출을 위한 EAR 계산"""
     try:
@@ -83,10 +58,11 @@ def is_eye_closed(eye_points, threshold=0.05): # 방금 여기 수정
 
 def detect_gaze_direction_with_mediapipe(image: np.ndarray) -> str:
     rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-    results = _FACE_MESH.process(rgb)
+    with metrics.span("detect.face_mesh"), registry.lease("mp_face_mesh") as face_mesh:
+        results = face_mesh.process(rgb)
    
     if not results.multi_face_landmarks:
-        print("[DEBUG] No face detected")
+        logger.debug("No face detected")
         return "center"
 
     lm = results.multi_face_landmarks[0].landmark
@@ -100,9 +76,8 @@ def detect_gaze_direction_with_mediapipe(image: np.ndarray) -> str:
         left_closed = is_eye_closed(left_eye_points)
         right_closed = is_eye_closed(right_eye_points)
 
-        print(f"[DEBUG] Left eye closed: {left_closed}, Right eye closed: {right_closed}")
         if left_closed or right_closed:
-            print("[DEBUG] Eye blink detected -> down")
+            logger.debug("Eye blink detected (left=%s, right=%s) -> down", left_closed, right_closed)
             return "down"
 
         # 홍채와 눈 윤곽 landmark
@@ -139,104 +114,100 @@ def detect_gaze_direction_with_mediapipe(image: np.ndarray) -> str:
         right_v_ratio = (right_iris[1] - right_upper[1]) / right_eye_height if right_eye_height > 0 else 0.5
         vert_ratio = np.median([left_v_ratio, right_v_ratio])
 
-        print(f"[DEBUG] left_ratio: {left_ratio:.3f}, right_ratio: {right_ratio:.3f}, horiz_ratio: {horiz_ratio:.3f}")
-        print(f"[DEBUG] left_v_ratio: {left_v_ratio:.3f}, right_v_ratio: {right_v_ratio:.3f}, vert_ratio: {vert_ratio:.3f}")
-
         # 시선 방향 결정
         if vert_ratio > VERT_DOWN_THRESH:
-            print("[DEBUG] Looking down")
-            return "down"
+            direction = "down"
         elif horiz_ratio < HORIZ_LEFT_THRESH:
-            print("[DEBUG] Looking left")
-            return "left"
+            direction = "left"
         elif horiz_ratio > HORIZ_RIGHT_THRESH:
-            print("[DEBUG] Looking right")  
-            return "right"
+            direction = "right"
         else:
-            print("[DEBUG] Looking center")
-            return "center"
+            direction = "center"
+
+        logger.debug(
+            "Looking %s (horiz=%.3f [l=%.3f r=%.3f], vert=%.3f [l=%.3f r=%.3f])",
+            direction, horiz_ratio, left_ratio, right_ratio, vert_ratio, left_v_ratio, right_v_ratio,
+        )
+        return direction
 
     except Exception as e:
-        print(f"[DEBUG] 계산 오류: {e}")
+        throttled(logger, logging.DEBUG, "calc_error", "계산 오류: %s", e)
         return "center"
 
 
-def analyze_and_save_gaze(bucket: str, prefix: str, db: Session, region: str):
+def compute_gaze_score(gaze_results: dict) -> float:
+    """{frame_id: direction} → center 비율(%)"""
+    stats = {}
+    for d in gaze_results.values():
+        stats[d] = stats.get(d, 0) + 1
+   
+    total = sum(stats.values())
+    center_ct = stats.get("center", 0)
+    gaze_score = (center_ct / total) * 100 if total > 0 else 0
+    logger.info("Gaze score (center 비율 %%): %.2f, 방향별 분포: %s", gaze_score, stats)
+    return gaze_score
+
+
+def save_gaze_score(db: Session, video_id, gaze_results: dict) -> float:
+    """gaze_score 계산 후 Score 테이블에 저장 (실패해도 점수는 반환)"""
+    gaze_score = compute_gaze_score(gaze_results)
+
+    # DB에 gaze_score 저장
+    try:
+        crud.upsert_score(db, int(video_id), gaze_score=gaze_score)
+        logger.info("gaze_score 저장 완료: video_id=%s, score=%.2f", video_id, gaze_score)
+    except Exception as e:
+        logger.warning("gaze_score 저장 실패: %s", e)
+    return gaze_score
+
+
+def analyze_and_save_gaze(video_id: int, db: Session):
     """
-    눈동자 기반 gaze 분석 수행 후
+    frames/{video_id}/ 이미지(manifest 기준)에 눈동자 기반 gaze 분석 수행 후
     - frame별 gaze 테이블에 저장
     - gaze_results 딕셔너리 반환
     - gaze_score를 Score 테이블에 저장
     """
-    print(f"[INFO] Gaze 분석 시작: bucket={bucket}, prefix={prefix}")
-    s3 = boto3.client(
-        's3',
-        aws_access_key_id=AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-        region_name=AWS_REGION
-    )
-    resp = s3.list_objects_v2(Bucket=bucket, Prefix=prefix)
-    if 'Contents' not in resp:
-        print("[WARN] 분석할 이미지 없음")
+    logger.info("Gaze 분석 시작: video_id=%s", video_id)
+    store = storage.get_storage()
+    image_keys = artifact_manifest.artifact_keys(video_id, "frame")
+    if not image_keys:
+        logger.warning("분석할 이미지 없음")
         return {}
-
-
-    image_keys = sorted(
-        obj['Key'] for obj in resp['Contents']
-        if obj['Key'].lower().endswith(('.jpg', '.png'))
-    )
-    print(f"[INFO] 총 {len(image_keys)}개 이미지 처리 예정")
+    logger.info("총 %d개 이미지 처리 예정", len(image_keys))
 
 
     gaze_results = {}
     processed_count = 0
    
-    for idx, key in enumerate(image_keys):
-        print(f"[DEBUG] 처리 중 ({idx+1}/{len(image_keys)}): {key}")
-       
-        img = read_image_from_s3(bucket, key)
+    for idx, (key, frame_id) in enumerate(image_keys):
+        img = storage.read_image(key)
         if img is None:
             continue
 
 
         direction = detect_gaze_direction_with_mediapipe(img)
-        print(f"[DEBUG] 감지된 방향: {direction}")
-       
-        image_url = f"https://{bucket}.s3.{region}.amazonaws.com/{key}"
-        frame = db.query(Frame).filter(Frame.image_url == image_url).first()
-        if not frame:
-            print(f"[WARN] 프레임을 찾을 수 없음: {image_url}")
-            continue
-
+        logger.debug("처리 중 (%d/%d): %s → %s", idx + 1, len(image_keys), key, direction)
 
-        crud.create_gaze_record(db, frame.id, direction)
-        gaze_results[frame.id] = direction
-        processed_count += 1
+        if frame_id is None:  # manifest 없는 과거 영상: URL로 매칭
+            image_url = store.url(key)
+            frame = db.query(Frame).filter(Frame.image_url == image_url).first()
+            if not frame:
+                throttled(logger, logging.WARNING, "frame_missing", "프레임을 찾을 수 없음: %s", image_url)
+                continue
+            frame_id = frame.id
 
 
-    print(f"[INFO] 처리 완료: {processed_count}개 프레임")
+        crud.create_gaze_record(db, frame_id, direction)
+        gaze_results[frame_id] = direction
+        processed_count += 1
 
 
-    # gaze_score 계산
-    stats = {}
-    for d in gaze_results.values():
-        stats[d] = stats.get(d, 0) + 1
-   
-    print(f"[INFO] 방향별 분포: {stats}")
-   
-    total = sum(stats.values())
-    center_ct = stats.get("center", 0)
-    gaze_score = (center_ct / total) * 100 if total > 0 else 0
-    print(f"[INFO] Gaze score (center 비율 %): {gaze_score:.2f}")
+    logger.info("처리 완료: %d개 프레임", processed_count)
 
 
-    # DB에 gaze_score 저장
-    try:
-        video_id = int(prefix.split("/")[1])
-        crud.upsert_score(db, video_id, gaze_score=gaze_score)
-        print(f"[INFO] gaze_score 저장 완료: video_id={video_id}, score={gaze_score:.2f}")
-    except Exception as e:
-        print(f"[WARN] gaze_score 저장 실패: {e}")
+    # gaze_score 계산 + DB 저장
+    gaze_score = save_gaze_score(db, video_id, gaze_results)
 
 
     gaze_results["gaze_score"] = gaze_score
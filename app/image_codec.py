@@ -0,0 +1,37 @@
+# 아티팩트 이미지 메모리 인코딩 (frames/faces/poses)
+# - RGB 배열 → cv2.imencode → bytes → 저장소 put_bytes (임시 파일 쓰기/업로드/삭제 없음)
+# - 인코더를 OpenCV 하나로 통일 (기존: 프레임/포즈는 PIL, 얼굴은 cv2로 각각 파일 저장)
+# - ARTIFACT_IMAGE_CODEC(jpeg|webp), 품질은 ARTIFACT_FRAME_QUALITY(원본 프레임) / ARTIFACT_CROP_QUALITY(크롭)
+import cv2
+import numpy as np
+
+from app import metrics
+from app.config import ARTIFACT_IMAGE_CODEC, ARTIFACT_FRAME_QUALITY, ARTIFACT_CROP_QUALITY
+
+_CODECS = {
+    # 이름: (확장자, Content-Type, 품질 플래그)
+    "jpeg": (".jpg", "image/jpeg", cv2.IMWRITE_JPEG_QUALITY),
+    "webp": (".webp", "image/webp", cv2.IMWRITE_WEBP_QUALITY),
+}
+if ARTIFACT_IMAGE_CODEC not in _CODECS:
+    raise ValueError(f"Unknown ARTIFACT_IMAGE_CODEC: {ARTIFACT_IMAGE_CODEC} (available: {', '.join(_CODECS)})")
+
+EXT, CONTENT_TYPE, _QUALITY_FLAG = _CODECS[ARTIFACT_IMAGE_CODEC]
+
+
+def encode_rgb(rgb: np.ndarray, quality: int) -> bytes:
+    """RGB uint8 배열 → 인코딩된 이미지 바이트"""
+    with metrics.span("encode.image"):
+        bgr = cv2.cvtColor(np.ascontiguousarray(rgb), cv2.COLOR_RGB2BGR)
+        ok, buf = cv2.imencode(EXT, bgr, [_QUALITY_FLAG, int(quality)])
+    if not ok:
+        raise ValueError(f"Image encoding failed ({ARTIFACT_IMAGE_CODEC}, shape={rgb.shape})")
+    return buf.tobytes()
+
+
+def encode_frame(rgb: np.ndarray) -> bytes:
+    return encode_rgb(rgb, ARTIFACT_FRAME_QUALITY)
+
+
+def encode_crop(rgb: np.ndarray) -> bytes:
+    return encode_rgb(rgb, ARTIFACT_CROP_QUALITY)
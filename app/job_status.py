@@ -0,0 +1,328 @@
+# 분석 작업 상태/진행률 (GET /videos/{video_id}/status)
+# - 프로세스 메모리에 진행 상황을 유지하고, JobStatus 테이블에는 단계 전환 시 + 프레임 진행은 FLUSH_INTERVAL_SEC마다 저장
+# - 조회는 메모리 우선(같은 프로세스), 없으면 JobStatus 1행만 읽음 → 폴링 비용 최소화
+# - 단계별 메모리(시작/끝/최대 RSS, 선택적으로 tracemalloc 최대치)를 stages 항목과 작업 trace(notes.memory)에 기록
+# - ETA: 현재 단계 잔여(프레임 단계는 최근 처리 속도) + 남은 단계 예상치(영상 길이 × 단계별 초/영상초, 완료 작업으로 갱신)
+import json
+import math
+import time
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app import memory, metrics
+from app.db import SessionLocal
+from app.models import JobStatus
+from app.log import get_logger
+
+logger = get_logger("job_status")
+
+FRAME_INTERVAL_SEC = 1.0   # extract_frames_and_audio 샘플 간격
+FLUSH_INTERVAL_SEC = 2.0   # 프레임 진행률 DB 저장 최소 간격
+RATE_EMA_ALPHA = 0.3       # 처리 속도/단계 소요 추정의 지수 이동 평균 가중치
+
+# 파이프라인 단계 순서 (ETA 계산용)
+STAGES = ("frames", "audio", "gaze", "emotion", "speed", "posture", "pronunciation", "pitch", "scores", "feedback")
+
+# 단계별 초기 추정치: 영상 1초당 처리 초 (완료된 작업으로 갱신)
+_stage_rate: Dict[str, float] = {
+    "frames": 1.0,
+    "audio": 0.02,
+    "gaze": 0.3,
+    "emotion": 0.4,
+    "speed": 0.3,
+    "posture": 0.2,
+    "pronunciation": 0.3,
+    "pitch": 0.2,
+    "scores": 0.0,
+    "feedback": 0.05,
+}
+
+_jobs: Dict[int, "_Job"] = {}
+_lock = threading.Lock()
+
+
+class _Job:
+    def __init__(self, video_id: int, duration: float):
+        self.video_id = video_id
+        self.status = "queued"
+        self.duration = float(duration or 0.0)
+        self.stage: Optional[str] = None
+        self.stage_started: Optional[float] = None
+        self.stages: List[Dict[str, Any]] = []
+        self.frames_done = 0
+        self.frames_total = int(math.ceil(self.duration / FRAME_INTERVAL_SEC)) if self.duration > 0 else 0
+        self.frame_rate: Optional[float] = None  # 최근 프레임/초
+        self._last_frames = (0, None)            # (frames_done, t) — 처리 속도 계산용
+        self._last_flush = 0.0
+        self.error: Optional[str] = None
+        self.failed_shards: List[Dict[str, Any]] = []  # 샤딩 경로에서 실패한 샤드 (부분 결과)
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.trace: Optional[Dict[str, Any]] = None
+        self.profile_url: Optional[str] = None
+
+    def eta_sec(self, now: float) -> Optional[float]:
+        if self.status in ("done", "failed"):
+            return 0.0
+        if self.duration <= 0:
+            return None
+        done = {s["name"] for s in self.stages}
+        eta = 0.0
+        if self.stage is not None:
+            elapsed = now - (self.stage_started or now)
+            if self.stage == "frames" and self.frame_rate and self.frames_total:
+                eta += max(self.frames_total - self.frames_done, 0) / self.frame_rate
+            else:
+                eta += max(_stage_rate.get(self.stage, 0.0) * self.duration - elapsed, 0.0)
+            done.add(self.stage)
+        eta += sum(_stage_rate.get(s, 0.0) * self.duration for s in STAGES if s not in done)
+        return eta
+
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, Any]:
+        now = now or time.time()
+        eta = self.eta_sec(now)
+        return {
+            "video_id": self.video_id,
+            "status": self.status,
+            "stage": self.stage,
+            "stage_elapsed_sec": round(now - self.stage_started, 1) if self.stage_started else None,
+            "stages": list(self.stages),
+            "frames_done": self.frames_done,
+            "frames_total": self.frames_total,
+            "frames_per_sec": round(self.frame_rate, 2) if self.frame_rate else None,
+            "video_duration": self.duration,
+            "elapsed_sec": round((self.finished_at or now) - self.started_at, 1) if self.started_at else None,
+            "eta_sec": round(eta, 1) if eta is not None else None,
+            "error": self.error,
+            "failed_shards": list(self.failed_shards),
+            "profile_url": self.profile_url,
+        }
+
+
+def _ts(t: Optional[float]) -> Optional[datetime]:
+    return datetime.fromtimestamp(t) if t else None
+
+
+def _persist(job: _Job) -> None:
+    """JobStatus 1행 upsert (실패해도 분석은 계속)"""
+    db: Session = SessionLocal()
+    try:
+        row = db.query(JobStatus).filter(JobStatus.video_id == job.video_id).first()
+        if row is None:
+            row = JobStatus(video_id=job.video_id)
+            db.add(row)
+        row.status = job.status
+        row.stage = job.stage
+        row.stages = json.dumps(job.stages, ensure_ascii=False)
+        row.frames_done = job.frames_done
+        row.frames_total = job.frames_total
+        row.video_duration = job.duration
+        row.error = job.error
+        row.failed_shards = json.dumps(job.failed_shards, ensure_ascii=False) if job.failed_shards else None
+        row.started_at = _ts(job.started_at)
+        row.finished_at = _ts(job.finished_at)
+        row.updated_at = datetime.now()
+        if job.trace is not None:
+            row.trace = json.dumps(job.trace, ensure_ascii=False)
+        if job.profile_url is not None:
+            row.profile_url = job.profile_url
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.warning("Job status save failed for video_id %s: %s", job.video_id, e)
+    finally:
+        db.close()
+
+
+def _get(video_id: int) -> Optional[_Job]:
+    with _lock:
+        return _jobs.get(video_id)
+
+
+# -----------------------------
+# 기록 API (파이프라인에서 호출)
+# -----------------------------
+def create_job(video_id: int, duration: float) -> None:
+    """업로드 직후: queued 상태 등록"""
+    job = _Job(video_id, duration)
+    with _lock:
+        _jobs[video_id] = job
+    _persist(job)
+
+
+def start_job(video_id: int, duration: Optional[float] = None) -> None:
+    with _lock:
+        job = _jobs.get(video_id)
+        if job is None:
+            job = _jobs[video_id] = _Job(video_id, duration or 0.0)
+        job.status = "running"
+        job.started_at = time.time()
+    metrics.begin_trace(video_id)
+    _persist(job)
+
+
+def set_duration(video_id: int, duration: float) -> None:
+    """영상 길이를 작업 등록 후에 알게 된 경우 (직접 업로드: 원본을 내려받은 뒤 측정)"""
+    job = _get(video_id)
+    if job is None:
+        return
+    with _lock:
+        job.duration = float(duration or 0.0)
+        job.frames_total = int(math.ceil(job.duration / FRAME_INTERVAL_SEC)) if job.duration > 0 else 0
+    _persist(job)
+
+
+@contextmanager
+def stage(video_id: int, name: str) -> Iterator[None]:
+    """단계 구간 기록: 시작 시 현재 단계 갱신, 종료 시 소요 시간/메모리 기록 + 단계 추정치 갱신"""
+    job = _get(video_id)
+    if job is None:
+        yield
+        return
+    started = time.time()
+    with _lock:
+        job.stage, job.stage_started = name, started
+    _persist(job)
+    mem: Dict[str, float] = {}
+    try:
+        with memory.track(mem), metrics.span(f"stage.{name}", video_id=video_id):
+            yield
+    finally:
+        ended = time.time()
+        duration = ended - started
+        if mem:
+            memory.STAGE_PEAK_RSS.observe(mem["rss_peak_mb"], stage=name)
+            metrics.annotate("memory", {"stage": name, **mem}, video_id=video_id)
+        with _lock:
+            job.stages.append({"name": name, "duration": round(duration, 2),
+                               "rss_peak_mb": mem.get("rss_peak_mb"), "rss_delta_mb": mem.get("rss_delta_mb")})
+            job.stage, job.stage_started = None, None
+            if job.duration > 0:
+                prev = _stage_rate.get(name)
+                rate = duration / job.duration
+                _stage_rate[name] = rate if prev is None else (1 - RATE_EMA_ALPHA) * prev + RATE_EMA_ALPHA * rate
+        _persist(job)
+
+
+def frames_progress(video_id: int, done: int, total: Optional[int] = None) -> None:
+    """프레임 처리 수 갱신 (메모리는 매번, DB는 FLUSH_INTERVAL_SEC마다)"""
+    job = _get(video_id)
+    if job is None:
+        return
+    now = time.time()
+    with _lock:
+        if total is not None:
+            job.frames_total = int(total)
+        prev_done, prev_t = job._last_frames
+        if prev_t is not None and now > prev_t and done > prev_done:
+            inst = (done - prev_done) / (now - prev_t)
+            job.frame_rate = inst if job.frame_rate is None else (1 - RATE_EMA_ALPHA) * job.frame_rate + RATE_EMA_ALPHA * inst
+        if done > job.frames_done:
+            metrics.FRAMES_PROCESSED.inc(done - job.frames_done)
+        if prev_t is None or done > prev_done:
+            job._last_frames = (done, now)
+        job.frames_done = int(done)
+        flush = now - job._last_flush >= FLUSH_INTERVAL_SEC
+        if flush:
+            job._last_flush = now
+    if flush:
+        _persist(job)
+
+
+def shard_failed(video_id: int, index: int, start: float, end: float, error: str) -> None:
+    """샤드 실패 기록 → 상태 조회의 failed_shards (작업은 나머지 샤드로 계속, 해당 구간 프레임 없음)"""
+    job = _get(video_id)
+    if job is None:
+        return
+    with _lock:
+        job.failed_shards.append({"index": index, "start": round(start, 1), "end": round(end, 1), "error": error})
+    _persist(job)
+
+
+def set_profile_url(video_id: int, url: str) -> None:
+    """프로파일 결과 위치 (finish_job에서 함께 저장)"""
+    job = _get(video_id)
+    if job is not None:
+        job.profile_url = url
+
+
+def finish_job(video_id: int, error: Optional[str] = None) -> None:
+    job = _get(video_id)
+    if job is None:
+        return
+    with _lock:
+        job.status = "failed" if error else "done"
+        job.error = error
+        job.stage, job.stage_started = None, None
+        job.finished_at = time.time()
+        if not error and job.frames_total:
+            job.frames_done = max(job.frames_done, job.frames_total)
+    job.trace = metrics.end_trace(video_id)
+    metrics.JOBS_FINISHED.inc(status=job.status)
+    _persist(job)
+    with _lock:
+        _jobs.pop(video_id, None)  # 완료 후 조회는 DB 행으로
+
+
+def _jobs_by_status():
+    with _lock:
+        counts: Dict[str, int] = {}
+        for job in _jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+    return [({"status": k}, v) for k, v in sorted(counts.items())]
+
+
+metrics.gauge("jobs", "Analysis jobs tracked in this process, by status (queued = waiting background tasks)",
+              _jobs_by_status)
+
+
+# -----------------------------
+# 조회
+# -----------------------------
+def is_active(video_id: int) -> bool:
+    """이 프로세스에서 대기/진행 중인 작업인지 (재시도 중복 방지)"""
+    return _get(video_id) is not None
+
+
+def get_status(db: Session, video_id: int) -> Optional[Dict[str, Any]]:
+    job = _get(video_id)
+    if job is not None:
+        with _lock:
+            return job.snapshot()
+
+    row = db.query(JobStatus).filter(JobStatus.video_id == video_id).first()
+    if row is None:
+        return None
+    end = row.finished_at or row.updated_at
+    return {
+        "video_id": row.video_id,
+        "status": row.status,
+        "stage": row.stage,
+        "stage_elapsed_sec": None,
+        "stages": json.loads(row.stages) if row.stages else [],
+        "frames_done": row.frames_done,
+        "frames_total": row.frames_total,
+        "frames_per_sec": None,
+        "video_duration": row.video_duration,
+        "elapsed_sec": round((end - row.started_at).total_seconds(), 1) if (row.started_at and end) else None,
+        # 다른 워커 프로세스에서 진행 중이면 처리 속도를 알 수 없으므로 ETA 생략
+        "eta_sec": 0.0 if row.status in ("done", "failed") else None,
+        "error": row.error,
+        "failed_shards": json.loads(row.failed_shards) if row.failed_shards else [],
+        "profile_url": row.profile_url,
+    }
+
+
+def get_trace(db: Session, video_id: int) -> Optional[Dict[str, Any]]:
+    """작업 trace (진행 중이면 현재까지, 완료 후에는 JobStatus.trace)"""
+    trace = metrics.get_trace(video_id)
+    if trace is not None:
+        return trace
+    row = db.query(JobStatus.trace).filter(JobStatus.video_id == video_id).first()
+    if row is None or not row[0]:
+        return None
+    return json.loads(row[0])
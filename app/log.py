@@ -0,0 +1,138 @@
+# 로깅 설정 (app 전체 공용)
+# - get_logger("gaze") → "app.gaze" 로거. 레벨은 LOG_LEVEL, 출력은 LOG_FORMAT(json | text)
+# - 출력은 QueueHandler → 별도 스레드(QueueListener)에서 stdout 기록: 분석 루프가 stdout I/O를 기다리지 않음
+# - 메시지는 %-포맷 인자로 넘겨 비활성 레벨이면 문자열 생성 비용도 없음
+# - 프레임 단위 반복 이벤트는 throttled(): 키별 LOG_RATE_LIMIT_SEC마다 1건만 남기고 생략 건수를 함께 기록
+import json
+import sys
+import time
+import queue
+import atexit
+import logging
+import threading
+import multiprocessing
+import logging.handlers
+from typing import Any, Dict, Optional, Tuple
+
+from app.config import LOG_LEVEL, LOG_FORMAT, LOG_RATE_LIMIT_SEC, LOG_ASYNC
+
+ROOT = "app"
+
+# LogRecord 기본 속성 (JSON 출력 시 extra 필드만 골라내기 위함)
+_RESERVED = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_configured = False
+_config_lock = threading.Lock()
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """1줄 1 JSON: ts, level, logger, msg (+ video_id, extra 필드, exc)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        out: Dict[str, Any] = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for k, v in record.__dict__.items():
+            if k not in _RESERVED and not k.startswith("_"):
+                out[k] = v
+        if record.exc_info:
+            out["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            out["exc"] = record.exc_text
+        return json.dumps(out, ensure_ascii=False, default=str)
+
+
+class _JobContextFilter(logging.Filter):
+    """현재 스레드의 분석 작업(video_id)을 레코드에 추가 (metrics.begin_trace 컨텍스트)"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "video_id", None) is None:
+            from app import metrics
+            vid = metrics.current_job()
+            if vid is not None:
+                record.video_id = vid
+        return True
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 메시지/예외 문자열화는 호출 스레드에서 한 번만 (인자 객체를 큐 너머로 넘기지 않음)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _formatter() -> logging.Formatter:
+    if LOG_FORMAT == "json":
+        return JsonFormatter()
+    return logging.Formatter("%(asctime)s %(levelname)s [%(name)s] %(message)s")
+
+
+def configure() -> None:
+    """app 로거 설정 (최초 1회, get_logger에서 자동 호출)"""
+    global _configured, _listener
+    with _config_lock:
+        if _configured:
+            return
+        root = logging.getLogger(ROOT)
+        root.setLevel(getattr(logging, LOG_LEVEL.upper(), logging.INFO))
+        root.propagate = False
+
+        stream = logging.StreamHandler(sys.stdout)
+        stream.setFormatter(_formatter())
+        # 샤드/청크 워커 프로세스는 종료 시 atexit가 돌지 않으므로 동기 출력
+        if LOG_ASYNC and multiprocessing.current_process().name == "MainProcess":
+            q: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+            handler: logging.Handler = _QueueHandler(q)
+            _listener = logging.handlers.QueueListener(q, stream, respect_handler_level=True)
+            _listener.start()
+            atexit.register(_listener.stop)  # 종료 시 남은 로그 기록
+        else:
+            handler = stream
+        handler.addFilter(_JobContextFilter())
+        root.addHandler(handler)
+        _configured = True
+
+
+def get_logger(name: str) -> logging.Logger:
+    configure()
+    return logging.getLogger(f"{ROOT}.{name}")
+
+
+# -----------------------------
+# 반복 이벤트 제한
+# -----------------------------
+_throttle_lock = threading.Lock()
+_throttle: Dict[Tuple[str, str], Tuple[float, int]] = {}  # (logger, key) → (마지막 기록 시각, 생략 건수)
+
+
+def throttled(logger: logging.Logger, level: int, key: str, msg: str, *args,
+              interval: Optional[float] = None, **kwargs) -> None:
+    """
+    key별로 interval(기본 LOG_RATE_LIMIT_SEC)초에 1건만 기록. 생략된 건수는 다음 기록에 suppressed로 첨부.
+    레벨이 비활성이면 즉시 반환 (프레임 루프에서 비용 없음).
+    """
+    if not logger.isEnabledFor(level):
+        return
+    interval = LOG_RATE_LIMIT_SEC if interval is None else interval
+    now = time.monotonic()
+    k = (logger.name, key)
+    with _throttle_lock:
+        last, suppressed = _throttle.get(k, (0.0, 0))
+        if last and now - last < interval:
+            _throttle[k] = (last, suppressed + 1)
+            return
+        _throttle[k] = (now, 0)
+    if suppressed:
+        extra = dict(kwargs.pop("extra", None) or {})
+        extra["suppressed"] = suppressed
+        kwargs["extra"] = extra
+        msg = f"{msg} (+{suppressed} suppressed)"
+    logger.log(level, msg, *args, **kwargs)
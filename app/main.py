@@ -4,35 +4,43 @@
 import os
 os.environ["PATH"] += os.pathsep + r"C:\ffmpeg\bin"
 
-from fastapi import FastAPI, File, UploadFile, Form, Depends, BackgroundTasks, HTTPException
-from fastapi.responses import HTMLResponse
+from fastapi import FastAPI, File, UploadFile, Form, Depends, BackgroundTasks, HTTPException, Header, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 import shutil, uuid
-from moviepy.editor import VideoFileClip
+from typing import Optional
 
+# 무거운 ML/미디어 모듈(TensorFlow, mediapipe, Whisper, DeepFace, librosa, moviepy, openai, boto3)은
+# 사용하는 단계에서 import → 조회 전용 워커도 빠르게 기동
 from app.db import SessionLocal, engine, Base
-from app import crud, s3_utils, video_processing
+from app import crud, schemas, warmup, feedback_service, job_status, metrics, profiling, db_migrate
 from app.config import JWT_SECRET  # 사용 안 해도 유지
-
-# 추가 import
-from app.speech_pronunciation import run_pronunciation_score  # (audio_id, wav_path, script_path)
-from app.voice_hz import save_pitch_to_db                     # (audio_id, wav_path)
+from app.config import DB_CREATE_ALL, FEEDBACK_ASYNC, FEEDBACK_MODE, ADMIN_TOKEN, JOB_WORK_DIR, CHECKPOINT_ENABLED
 from app.models import (
     Audio, Emotion, Frame, Pose, Pronunciation, Pitch, Score, Feedback, Speed, Video
 )
-from app.feedback_chatbot import process_and_feedback
-
-from app.posture_classifier import BASE_DIR, classify_poses_and_save_to_db
-from app.config import (
-    AWS_BUCKET_NAME,
-    AWS_REGION,
-    AWS_ACCESS_KEY_ID,
-    AWS_SECRET_ACCESS_KEY,
-)
+from app.log import get_logger
 
-Base.metadata.create_all(bind=engine)
 app = FastAPI()
+logger = get_logger("main")
+
+
+@app.on_event("startup")
+def _on_startup():
+    # 테이블 생성은 import 시점이 아니라 기동 시 1회 (DB_CREATE_ALL=0 이면 생략)
+    # 기존 테이블에 없는 새 컬럼은 db_migrate가 추가 (여러 번 실행해도 안전)
+    if DB_CREATE_ALL:
+        Base.metadata.create_all(bind=engine)
+        db_migrate.add_missing_columns(engine, Base.metadata)
+    warmup.start_background_warmup()
+
+
+@app.on_event("startup")
+async def _start_feedback_service():
+    # 피드백 스트리밍은 서버 이벤트 루프에서 실행 (백그라운드 분석 스레드에서 submit)
+    feedback_service.start()
 
 
 # --- 공용 유틸 ---
@@ -65,141 +73,196 @@ def get_db_session():
 
 
 # --- Background 처리 ---
-def process_video_background(video_path: str, script_path: str, out_dir: str, video_id: int, temp_file_name: str):
+def process_video_background(video_path: Optional[str], script_path: str, out_dir: str, video_id: int,
+                             temp_file_name: str, plan=None):
     """
     Background task용 비디오 처리 함수 - 전체 분석
-    analyze_presentation_video가 (results, wav_path)를 반환해야 함.
-    run_pronunciation_score(audio_id, wav_path, script_path)로 wav 로컬 경로 직접 전달.
+    analyze_presentation_video가 (results, audio_buf)를 반환해야 함.
+    audio_buf(16kHz mono 공용 버퍼)를 발음/피치 분석에 그대로 전달 (재디코딩 없음).
+    체크포인트(plan)에 완료된 단계는 건너뜀 → 재시도 시 첫 미완료 단계부터 (video_path는 원본이 필요 없으면 None)
     """
+    from app import checkpoint, s3_utils, video_processing
+    from app.speech_pronunciation import run_pronunciation_score  # (audio_id, audio_buf, script_path)
+    from app.voice_hz import save_pitch_to_db                     # (audio_id, audio_buf)
+    from app.feedback_chatbot import process_and_feedback
+    from app.feedback_digest import build_feedback_digest
+    from app.posture_classifier import BASE_DIR, classify_poses_and_save_to_db
+
     db = get_db_session()
-    wav_path = None
+    audio_buf = None
+    job_error = None
+    job_status.start_job(video_id)
+    profiling.job_started(video_id)  # 요청된 작업만 프로파일러 시작
     try:
-        print(f"[INFO] Background processing started for video_id: {video_id}")
+        logger.info("Background processing started for video_id: %s", video_id)
+        if plan is None:
+            plan = checkpoint.plan(video_id)
+        checkpoint.save_script(video_id, script_path)  # 재시도 입력
 
-        # 1) 시각/표정 분석 + 오디오 추출(wav_path)
-        results, wav_path = video_processing.analyze_presentation_video(
+        # 1) 시각/표정 분석 + 오디오 디코딩(audio_buf)
+        results, audio_buf = video_processing.analyze_presentation_video(
             video_path=video_path,
             out_dir=out_dir,
             db=db,
             video_id=video_id,
-            s3_utils=s3_utils
+            s3_utils=s3_utils,
+            plan=plan,
         )
         if results is None:
             results = {}
+        # 샤딩 경로는 전체 STT 텍스트를 함께 반환 (발음 분석 재전사 생략용, 피드백 입력에서는 제외)
+        transcript = results.pop("transcript", None)
 
         # 2) audio_id 확보
         audio_obj = db.query(Audio).filter(Audio.video_id == video_id).first()
         if audio_obj:
             audio_id = audio_obj.id
 
-            # posture 분류 (S3 poses/{video_id}/pose_*.jpg 기반)
-            try:
-                pose_res = classify_poses_and_save_to_db(
-                    db=db,
-                    video_id=video_id,
-                    bucket=AWS_BUCKET_NAME,
-                    region=AWS_REGION,
-                    aws_access_key_id=AWS_ACCESS_KEY_ID,
-                    aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-                    model_path=os.path.join(BASE_DIR, "my_pose_classifier2.keras"),
-                    threshold=0.65,
-                )
-                results["posture"] = pose_res
-            except Exception as e:
-                print(f"[WARN] Posture classification failed: {e}")
+            # posture 분류 (저장소 poses/{video_id}/pose_*.jpg 기반, 샤딩 경로에서는 이미 완료)
+            if plan.done("posture"):
+                results.setdefault("posture", plan.output("posture"))
+            else:
+                with job_status.stage(video_id, "posture"):
+                    try:
+                        crud.clear_stage_results(db, video_id, "posture")
+                        pose_res = classify_poses_and_save_to_db(
+                            db=db,
+                            video_id=video_id,
+                            model_path=os.path.join(BASE_DIR, "my_pose_classifier2.keras"),
+                            threshold=0.65,
+                        )
+                        results["posture"] = pose_res
+                        plan.complete("posture", pose_res)
+                    except Exception as e:
+                        logger.warning("Posture classification failed: %s", e)
+
+            # 로컬 오디오 버퍼 필수 (남은 단계가 오디오를 쓰는 경우)
+            if plan.needs_audio() and (audio_buf is None or not os.path.exists(audio_buf.path)):
+                raise FileNotFoundError(f"Local audio buffer not found: {audio_buf}")
+
+            # 3) 피치 분석 (DB 저장은 voice_hz.py 내부에서 crud 사용, 샤딩 경로에서는 이미 저장됨)
+            if not plan.done("pitch"):
+                with job_status.stage(video_id, "pitch"):
+                    try:
+                        crud.clear_stage_results(db, video_id, "pitch")
+                        save_pitch_to_db(audio_id, audio_buf)
+                        plan.complete("pitch", {})  # f0 구간값은 Pitch 행
+                    except Exception as e:
+                        logger.warning("Pitch analysis failed: %s", e)
+
+            # 4) 발음 분석 (대본 교체 시 여기부터 재실행, 전사는 속도 분석 결과 재사용)
+            if not plan.done("pronunciation"):
+                with job_status.stage(video_id, "pronunciation"):
+                    try:
+                        run_pronunciation_score(audio_id, audio_buf, script_path, stt_text=transcript)
+                        plan.complete("pronunciation", {})
+                    except Exception as e:
+                        logger.warning("Pronunciation scoring failed: %s", e)
+
+            # 5) voice 결과 병합 (speed는 video_processing에서 넣음, DB 병합만 하므로 재개 시에도 항상 실행)
+            with job_status.stage(video_id, "scores"):
+                pron_obj = db.query(Pronunciation).filter_by(audio_id=audio_id).first()
+                pitch_obj = db.query(Pitch).filter_by(audio_id=audio_id).first()
+                score_obj = db.query(Score).filter_by(video_id=video_id).first()
+
+                voice_block = results.get("voice", {})  # ✅ 기존 speed 유지
+                voice_block["pronunciation"] = {
+                    "matching_rate": getattr(pron_obj, "matching_rate", None),   # Pronunciation에서
+                    "score": getattr(score_obj, "pronunciation_score", None),    # ✅ Score에서
+                }
+                voice_block["pitch"] = {
+                    "hz_std": getattr(pitch_obj, "hz_std", None),
+                    "score": getattr(pitch_obj, "pitch_score", None)
+                }
+                results["voice"] = voice_block
+
+                # 6) Score(emotion/speed/pitch) 최종 반영
+                score_obj = db.query(Score).filter(Score.video_id == video_id).first()
+                if not score_obj:
+                    score_obj = Score(video_id=video_id)
+                    db.add(score_obj)
+
+                # Emotion 점수
+                emo_score = (results.get("emotion") or {}).get("score")
+                if emo_score is not None:
+                    try:
+                        score_obj.emotion_score = float(emo_score)
+                    except Exception:
+                        pass
+
+                # Speed 점수 (knn_score 우선)
+                speed_block = (results.get("voice") or {}).get("speed") or {}
+                sp_score = speed_block.get("final_score", speed_block.get("knn_score", speed_block.get("score")))
+                if sp_score is not None:
+                    try:
+                        score_obj.speed_score = float(sp_score)
+                    except Exception:
+                        pass
+
+                # Pitch 점수 (Pitch 테이블의 score는 구간마다 동일값이므로 하나만 읽어도 됨)
+                if pitch_obj and getattr(pitch_obj, "pitch_score", None) is not None:
+                    try:
+                        score_obj.pitch_score = float(pitch_obj.pitch_score)
+                    except Exception:
+                        pass
+
+                db.commit()
+                plan.complete("scores", {})
 
-            # 로컬 wav_path 필수
-            if not wav_path or not os.path.exists(wav_path):
-                raise FileNotFoundError(f"Local wav file not found: {wav_path}")
+        else:
+            logger.warning("Audio object not found in DB. Skipping voice analyses merge.")
 
-            # 3) 발음 분석
-            try:
-                run_pronunciation_score(audio_id, wav_path, script_path)
-            except Exception as e:
-                print(f"[WARN] Pronunciation scoring failed: {e}")
+        logger.info("Video analysis completed for video_id: %s", video_id)
+        logger.debug("Analysis results: %s", results)  # 전체 dict는 DEBUG에서만 문자열화
 
-            # 4) 피치 분석 (DB 저장은 voice_hz.py 내부에서 crud 사용)
+        # 7) 피드백 생성 + 저장 (키 안전화)
+        #    FEEDBACK_ASYNC: 요약만 넘겨 서버 이벤트 루프에서 스트리밍 생성 (이 작업은 여기서 종료)
+        if plan.done("feedback"):
+            logger.info("Feedback already generated for video_id: %s", video_id)
+            return
+        with job_status.stage(video_id, "feedback"):
             try:
-                save_pitch_to_db(audio_id, wav_path)
-            except Exception as e:
-                print(f"[WARN] Pitch analysis failed: {e}")
-
-            # 5) voice 결과 병합 (speed는 video_processing에서 넣음)
-            pron_obj = db.query(Pronunciation).filter_by(audio_id=audio_id).first()
-            pitch_obj = db.query(Pitch).filter_by(audio_id=audio_id).first()
-            score_obj = db.query(Score).filter_by(video_id=video_id).first()
-
-            voice_block = results.get("voice", {})  # ✅ 기존 speed 유지
-            voice_block["pronunciation"] = {
-                "matching_rate": getattr(pron_obj, "matching_rate", None),   # Pronunciation에서
-                "score": getattr(score_obj, "pronunciation_score", None),    # ✅ Score에서
-            }
-            voice_block["pitch"] = {
-                "hz_std": getattr(pitch_obj, "hz_std", None),
-                "score": getattr(pitch_obj, "pitch_score", None)
-            }
-            results["voice"] = voice_block
-
-            # 6) Score(emotion/speed/pitch) 최종 반영
-            score_obj = db.query(Score).filter(Score.video_id == video_id).first()
-            if not score_obj:
-                score_obj = Score(video_id=video_id)
-                db.add(score_obj)
-
-            # Emotion 점수
-            emo_score = (results.get("emotion") or {}).get("score")
-            if emo_score is not None:
-                try:
-                    score_obj.emotion_score = float(emo_score)
-                except Exception:
-                    pass
-
-            # Speed 점수 (knn_score 우선)
-            speed_block = (results.get("voice") or {}).get("speed") or {}
-            sp_score = speed_block.get("final_score", speed_block.get("knn_score", speed_block.get("score")))
-            if sp_score is not None:
-                try:
-                    score_obj.speed_score = float(sp_score)
-                except Exception:
-                    pass
-
-            # Pitch 점수 (Pitch 테이블의 score는 구간마다 동일값이므로 하나만 읽어도 됨)
-            if pitch_obj and getattr(pitch_obj, "pitch_score", None) is not None:
-                try:
-                    score_obj.pitch_score = float(pitch_obj.pitch_score)
-                except Exception:
-                    pass
-
-            db.commit()
-
-        else:
-            print("[WARN] Audio object not found in DB. Skipping voice analyses merge.]")
+                crud.clear_stage_results(db, video_id, "feedback")
+                # 시선 구간 요약용 프레임 시각 {frame_id: frame_timestamp}
+                frame_times = dict(
+                    db.query(Frame.id, Frame.frame_timestamp).filter(Frame.video_id == video_id).all()
+                )
+                use_async = FEEDBACK_ASYNC and FEEDBACK_MODE != "rules"
+                # 비동기 생성은 저장 성공 시 feedback_service가 plan에 완료 표시
+                if use_async and feedback_service.submit(video_id, build_feedback_digest(results, frame_times), plan=plan):
+                    logger.info("Feedback generation queued for video_id: %s", video_id)
+                    return
 
-        print(f"[INFO] Video analysis completed for video_id: {video_id}")
-        print(f"[INFO] Analysis results: {results}")
+                fb = process_and_feedback(results, frame_times=frame_times)
+                logger.debug("Generated Feedback: %s", fb)
 
-        # 7) 피드백 생성 + 저장 (키 안전화)
-        try:
-            fb = process_and_feedback(results)
-            print("[INFO] Generated Feedback:", fb)
-
-            detail_text = fb.get("detailed_feedback", fb.get("detail_feedback", "")) or ""
-            saved_fb = crud.create_feedback_record(
-                db=db,
-                video_id=video_id,
-                short_feedback=fb.get("short_feedback", "") or "",
-                detail_feedback=detail_text
-            )
-            print(f"[INFO] Feedback saved! ID={saved_fb.id}")
+                detail_text = fb.get("detailed_feedback", fb.get("detail_feedback", "")) or ""
+                saved_fb = crud.create_feedback_record(
+                    db=db,
+                    video_id=video_id,
+                    short_feedback=fb.get("short_feedback", "") or "",
+                    detail_feedback=detail_text
+                )
+                logger.info("Feedback saved! ID=%s", saved_fb.id)
+                plan.complete("feedback", {})
+                # 동기 경로도 SSE 구독자에게 종료 이벤트 전달
+                feedback_service.complete(video_id, {"short_feedback": fb.get("short_feedback", "") or "",
+                                                     "detailed_feedback": detail_text})
 
-        except Exception as e:
-            print(f"[ERROR] Failed to generate chatbot feedback: {e}")
+            except Exception as e:
+                logger.error("Failed to generate chatbot feedback: %s", e)
+                feedback_service.fail(video_id, "feedback generation failed")
 
     except Exception as e:
-        print(f"[ERROR] Background processing failed for video_id {video_id}: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Background processing failed for video_id %s: %s", video_id, e)
+        job_error = f"{type(e).__name__}: {e}"
+        feedback_service.fail(video_id, "analysis failed")
     finally:
+        profile_url = profiling.job_finished(video_id, out_dir, s3_utils)
+        if profile_url:
+            job_status.set_profile_url(video_id, profile_url)
+        job_status.finish_job(video_id, job_error)
+
         # 세션 종료
         try:
             db.close()
@@ -208,7 +271,7 @@ def process_video_background(video_path: str, script_path: str, out_dir: str, vi
 
         # 임시 파일/폴더 정리
         try:
-            for path in [video_path, script_path, wav_path]:
+            for path in [video_path, script_path, audio_buf.path if audio_buf else None]:
                 try:
                     if path and os.path.exists(path):
                         os.remove(path)
@@ -230,9 +293,39 @@ def process_video_background(video_path: str, script_path: str, out_dir: str, vi
                 except Exception:
                     pass
 
-            print(f"[INFO] Temporary files cleaned up for video_id: {video_id}")
+            logger.info("Temporary files cleaned up for video_id: %s", video_id)
         except Exception as e:
-            print(f"[WARNING] Failed to clean up temporary files: {e}")
+            logger.warning("Failed to clean up temporary files: %s", e)
+
+
+# --- 헬스체크 ---
+@app.get("/health")
+def health():
+    """liveness + 모델 로드 상태 (항상 200)"""
+    from app.model_registry import registry
+    return {
+        "status": "ok",
+        "ready": warmup.is_ready(),
+        "warmup": warmup.get_state(),
+        "models": registry.stats(),
+        "models_resident_mb": round(registry.resident_mb(), 1),
+    }
+
+
+@app.get("/health/ready")
+def health_ready():
+    """readiness: 워밍업 활성 시 완료 전까지 503"""
+    state = warmup.get_state()
+    if not warmup.is_ready():
+        return JSONResponse(status_code=503, content={"ready": False, "warmup": state})
+    return {"ready": True, "warmup": state}
+
+
+# --- 메트릭 (Prometheus 텍스트 형식) ---
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """span 히스토그램(decode/detect/storage/db/stt/pyin/align/llm/stage), 프레임 처리 수, 큐 길이, 모델 로드/캐시"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
 
 # --- 샘플 페이지 ---
@@ -256,14 +349,34 @@ async def main_sample_page():
 
 
 # --- 업로드 엔드포인트 ---
+def _probe_duration(video_path: str) -> float:
+    from moviepy.editor import VideoFileClip
+
+    try:
+        clip = VideoFileClip(video_path)
+        video_totaltime = clip.duration or 0
+        clip.reader.close()
+        if clip.audio:
+            clip.audio.reader.close_proc()
+        return video_totaltime
+    except Exception as e:
+        logger.error("Failed to extract video duration: %s", e)
+        return 0
+
 @app.post("/videos/upload")
 async def upload_video(
     background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     script: UploadFile = File(...),
     title: str = Form(...),
+    profile: Optional[str] = Form(None),  # sample | cprofile (작업별 CPU 프로파일링)
     db: Session = Depends(get_db)
 ):
+    from app import s3_utils
+
+    if profile and profile not in profiling.MODES:
+        raise HTTPException(status_code=400, detail=f"profile must be one of {', '.join(profiling.MODES)}")
+
     user_id = 1
 
     os.makedirs("temp", exist_ok=True)
@@ -281,15 +394,7 @@ async def upload_video(
         shutil.copyfileobj(script.file, buffer)
 
     # 3) 영상 길이 계산
-    try:
-        clip = VideoFileClip(temp_file_path)
-        video_totaltime = clip.duration or 0
-        clip.reader.close()
-        if clip.audio:
-            clip.audio.reader.close_proc()
-    except Exception as e:
-        print(f"[ERROR] Failed to extract video duration: {e}")
-        video_totaltime = 0
+    video_totaltime = _probe_duration(temp_file_path)
 
     # 4) 비디오 원본 S3 업로드
     s3_key = f"videos/{uuid.uuid4()}/{file.filename}"
@@ -304,8 +409,12 @@ async def upload_video(
         video_url=s3_video_url
     )
 
+    job_status.create_job(db_video.id, video_totaltime)
+    if profile:
+        profiling.request(db_video.id, profile)
+
     # 6) 작업 디렉토리 준비
-    out_dir = os.path.join("temp", str(db_video.id))
+    out_dir = os.path.join(JOB_WORK_DIR, str(db_video.id))  # 작업 임시 파일(오디오 버퍼 등), tmpfs 지정 가능
     os.makedirs(out_dir, exist_ok=True)
 
     # 7) Background Task 실행 (로컬 경로 전달)
@@ -326,6 +435,400 @@ async def upload_video(
     }
 
 
+# --- 저장소 직접 업로드 (presigned URL) ---
+@app.post("/videos/uploads")
+def create_direct_upload(req: schemas.DirectUploadCreate):
+    """업로드 세션 생성 → 영상/대본 presigned PUT URL (대용량 영상은 multipart part별 URL)"""
+    from app import direct_upload
+
+    if req.profile and req.profile not in profiling.MODES:
+        raise HTTPException(status_code=400, detail=f"profile must be one of {', '.join(profiling.MODES)}")
+    try:
+        return direct_upload.create_session(
+            req.title, req.filename, req.script_filename, req.size, req.content_type, req.profile
+        )
+    except NotImplementedError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def process_direct_upload_background(session: dict, out_dir: str, video_id: int):
+    """저장소에서 원본/대본을 내려받고 영상 길이 측정 → 기존 분석 파이프라인"""
+    from app import direct_upload
+
+    try:
+        video_path, script_path = direct_upload.fetch_sources(session, "temp")
+        video_totaltime = _probe_duration(video_path)
+        db = get_db_session()
+        try:
+            crud.update_video_totaltime(db, video_id, video_totaltime)
+        finally:
+            db.close()
+        job_status.set_duration(video_id, video_totaltime)
+    except Exception as e:
+        logger.exception("Direct upload fetch failed for video_id %s: %s", video_id, e)
+        job_status.finish_job(video_id, f"{type(e).__name__}: {e}")
+        return
+    process_video_background(
+        video_path=video_path,
+        script_path=script_path,
+        out_dir=out_dir,
+        video_id=video_id,
+        temp_file_name=os.path.basename(video_path),
+    )
+
+
+@app.post("/videos/uploads/{upload_id}/complete")
+def complete_direct_upload(
+    upload_id: str,
+    req: schemas.DirectUploadComplete,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+):
+    """업로드 완료 확인(multipart 조립) → Video 등록 + 분석 작업 시작 (재호출 시 같은 video_id)"""
+    from app import direct_upload, storage
+
+    try:
+        session = direct_upload.complete_session(upload_id, [(p.part_number, p.etag) for p in req.parts])
+    except direct_upload.UploadNotFound:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    except NotImplementedError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    video_url = storage.get_storage().url(session["video_key"])
+    if session.get("video_id"):
+        return {"message": "Already registered", "video_id": session["video_id"], "s3_url": video_url}
+
+    user_id = 1
+    db_video = crud.create_video(
+        db,
+        user_id=user_id,
+        title=session["title"],
+        video_totaltime=0,  # 분석 작업이 원본을 내려받은 뒤 갱신
+        video_url=video_url
+    )
+    job_status.create_job(db_video.id, 0)
+    if session.get("profile"):
+        profiling.request(db_video.id, session["profile"])
+    direct_upload.mark_registered(session, db_video.id)
+
+    out_dir = os.path.join(JOB_WORK_DIR, str(db_video.id))
+    os.makedirs(out_dir, exist_ok=True)
+    background_tasks.add_task(process_direct_upload_background, session=session, out_dir=out_dir, video_id=db_video.id)
+
+    return {
+        "message": "Upload complete, processing started",
+        "video_id": db_video.id,
+        "s3_url": video_url,
+    }
+
+
+# --- 이어받기 분할 업로드 (tus 방식 offset) ---
+def _resumable_headers(st: dict) -> dict:
+    return {"Upload-Offset": str(st["offset"]), "Upload-Length": str(st["length"]), "Cache-Control": "no-store"}
+
+
+@app.post("/videos/resumable", status_code=201)
+def create_resumable_upload(
+    title: str = Form(...),
+    filename: str = Form(...),
+    length: int = Form(...),  # 영상 전체 바이트 수
+    script: UploadFile = File(...),
+    profile: Optional[str] = Form(None),
+):
+    """업로드 생성 → upload_id (이후 PATCH /videos/resumable/{upload_id} 로 영상 바이트를 순서대로 전송)"""
+    from app import resumable_upload
+
+    if profile and profile not in profiling.MODES:
+        raise HTTPException(status_code=400, detail=f"profile must be one of {', '.join(profiling.MODES)}")
+    try:
+        st = resumable_upload.create(title, filename, length, script.file, script.filename, profile)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = _resumable_headers(st)
+    headers["Location"] = f"/videos/resumable/{st['upload_id']}"
+    return JSONResponse(status_code=201, content=st, headers=headers)
+
+
+@app.head("/videos/resumable/{upload_id}")
+def head_resumable_upload(upload_id: str):
+    """서버가 받은 바이트 수 (Upload-Offset) → 끊긴 뒤 이 위치부터 PATCH"""
+    from app import resumable_upload
+
+    try:
+        st = resumable_upload.status(upload_id)
+    except resumable_upload.UploadNotFound:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    headers = _resumable_headers(st)
+    if st["video_id"]:
+        headers["Video-Id"] = str(st["video_id"])
+    return Response(status_code=200, headers=headers)
+
+
+def process_resumable_background(upload_id: str, video_key: str, out_dir: str, video_id: int, duration: Optional[float]):
+    """업로드 파일을 작업 입력으로 이동(조기 디코딩 오디오 포함) → 원본 저장소 업로드 → 기존 분석 파이프라인"""
+    from app import resumable_upload, s3_utils
+
+    try:
+        video_path, script_path = resumable_upload.take_sources(upload_id, "temp", out_dir)
+        if duration is None:
+            duration = _probe_duration(video_path)
+            db = get_db_session()
+            try:
+                crud.update_video_totaltime(db, video_id, duration)
+            finally:
+                db.close()
+            job_status.set_duration(video_id, duration)
+        s3_utils.upload_file_to_s3(video_path, video_key)  # 원본 보관 (프레임 렌더링 소스)
+    except Exception as e:
+        logger.exception("Resumable upload handoff failed for video_id %s: %s", video_id, e)
+        job_status.finish_job(video_id, f"{type(e).__name__}: {e}")
+        return
+    process_video_background(
+        video_path=video_path,
+        script_path=script_path,
+        out_dir=out_dir,
+        video_id=video_id,
+        temp_file_name=os.path.basename(video_path),
+    )
+
+
+def _register_resumable(upload_id: str, background_tasks: BackgroundTasks) -> int:
+    """완료된 업로드 → Video 등록 + 분석 작업 (한 번만)"""
+    from app import resumable_upload, storage
+
+    def register(info: dict) -> int:
+        video_key = f"videos/{info['upload_id']}/{info['filename']}"
+        db = get_db_session()
+        try:
+            db_video = crud.create_video(
+                db,
+                user_id=1,
+                title=info["title"],
+                video_totaltime=info.get("duration") or 0,
+                video_url=storage.get_storage().url(video_key),
+            )
+        finally:
+            db.close()
+        job_status.create_job(db_video.id, info.get("duration") or 0)
+        if info.get("profile"):
+            profiling.request(db_video.id, info["profile"])
+        out_dir = os.path.join(JOB_WORK_DIR, str(db_video.id))
+        background_tasks.add_task(process_resumable_background, upload_id=upload_id, video_key=video_key,
+                                  out_dir=out_dir, video_id=db_video.id, duration=info.get("duration"))
+        return db_video.id
+
+    video_id, _ = resumable_upload.register_once(upload_id, register)
+    return video_id
+
+
+@app.patch("/videos/resumable/{upload_id}")
+async def patch_resumable_upload(
+    upload_id: str,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    upload_offset: int = Header(..., alias="Upload-Offset"),
+):
+    """
+    Upload-Offset 위치부터 본문을 이어 붙임 (본문은 스트리밍으로 바로 파일에 기록).
+    연결이 끊겨도 받은 부분은 유지 → HEAD로 offset 확인 후 나머지만 재전송.
+    전체가 도착하면 Video 등록 + 분석 시작 (응답 video_id)
+    """
+    from app import resumable_upload
+
+    offset = upload_offset
+    try:
+        async for chunk in request.stream():
+            if chunk:
+                offset = await run_in_threadpool(resumable_upload.append, upload_id, offset, chunk)
+        st = await run_in_threadpool(resumable_upload.after_patch, upload_id)
+        if st["offset"] >= st["length"]:
+            st["video_id"] = await run_in_threadpool(_register_resumable, upload_id, background_tasks)
+    except resumable_upload.UploadNotFound:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    except resumable_upload.OffsetMismatch as e:
+        return JSONResponse(status_code=409, content={"detail": str(e), "offset": e.offset},
+                            headers={"Upload-Offset": str(e.offset)})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return JSONResponse(content=st, headers=_resumable_headers(st))
+
+
+@app.delete("/videos/resumable/{upload_id}", status_code=204)
+def delete_resumable_upload(upload_id: str):
+    from app import resumable_upload
+
+    try:
+        st = resumable_upload.status(upload_id)
+    except resumable_upload.UploadNotFound:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    if st["video_id"]:
+        raise HTTPException(status_code=409, detail="Upload already completed")
+    resumable_upload.abort(upload_id)
+    return Response(status_code=204)
+
+
+# --- 재시도 (체크포인트에서 재개) ---
+def resume_video_background(video_id: int, video_url: str, out_dir: str):
+    """저장된 대본(+ 필요하면 원본)을 내려받아 첫 미완료 단계부터 다시 분석"""
+    from app import checkpoint, storage
+
+    plan = checkpoint.plan(video_id)
+    os.makedirs("temp", exist_ok=True)
+    prefix = uuid.uuid4().hex
+    try:
+        script_path = checkpoint.load_script(video_id, os.path.join("temp", f"{prefix}_script.txt"))
+        if script_path is None:
+            raise FileNotFoundError(f"No stored script for video_id {video_id}")
+        video_path = None
+        if plan.needs_source():
+            key = storage.get_storage().key_from_url(video_url or "")
+            if not key:
+                raise FileNotFoundError(f"No stored source video for video_id {video_id}")
+            video_path = storage.get_storage().download(key, os.path.join("temp", f"{prefix}_{os.path.basename(key)}"))
+    except Exception as e:
+        logger.exception("Retry setup failed for video_id %s: %s", video_id, e)
+        job_status.finish_job(video_id, f"{type(e).__name__}: {e}")
+        return
+    process_video_background(
+        video_path=video_path,
+        script_path=script_path,
+        out_dir=out_dir,
+        video_id=video_id,
+        temp_file_name=os.path.basename(video_path or ""),
+        plan=plan,
+    )
+
+
+def _queue_retry(video_id: int, background_tasks: BackgroundTasks, db: Session) -> dict:
+    from app import checkpoint
+
+    if not CHECKPOINT_ENABLED:
+        raise HTTPException(status_code=409, detail="Checkpoints are disabled (CHECKPOINT_ENABLED=0)")
+    video = db.query(Video).filter(Video.id == video_id).first()
+    if not video:
+        raise HTTPException(status_code=404, detail="Video not found")
+    if job_status.is_active(video_id):
+        raise HTTPException(status_code=409, detail="Analysis already in progress")
+    plan = checkpoint.plan(video_id)
+    job_status.create_job(video_id, video.video_totaltime or 0)
+    out_dir = os.path.join(JOB_WORK_DIR, str(video_id))
+    background_tasks.add_task(resume_video_background, video_id=video_id, video_url=video.video_url, out_dir=out_dir)
+    return {"message": "Retry queued", "video_id": video_id, "resume_from": plan.resume_from}
+
+
+@app.post("/videos/{video_id}/retry")
+def retry_video_analysis(video_id: int, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+    """실패/중단된 분석을 체크포인트의 첫 미완료 단계부터 재개 (resume_from=None이면 모두 완료, 점수만 재병합)"""
+    return _queue_retry(video_id, background_tasks, db)
+
+
+@app.put("/videos/{video_id}/script")
+def replace_video_script(
+    video_id: int,
+    background_tasks: BackgroundTasks,
+    script: UploadFile = File(...),
+    db: Session = Depends(get_db),
+):
+    """대본 교체 → 발음 분석부터 재실행 (영상/음성 모델 결과는 체크포인트 재사용)"""
+    from app import checkpoint
+
+    if not CHECKPOINT_ENABLED:
+        raise HTTPException(status_code=409, detail="Checkpoints are disabled (CHECKPOINT_ENABLED=0)")
+    if job_status.is_active(video_id):
+        raise HTTPException(status_code=409, detail="Analysis already in progress")
+    if not db.query(Video.id).filter(Video.id == video_id).first():
+        raise HTTPException(status_code=404, detail="Video not found")
+    checkpoint.store_script(video_id, script.file.read())
+    checkpoint.invalidate(video_id, checkpoint.SCRIPT_STAGES)
+    return _queue_retry(video_id, background_tasks, db)
+
+
+# --- 분석 진행 상태 ---
+@app.get("/videos/{video_id}/status")
+def get_video_status(video_id: int, db: Session = Depends(get_db)):
+    """
+    분석 작업 상태: status(queued/running/done/failed), 현재 단계, 단계별 소요 시간(stages),
+    프레임 진행률(frames_done/frames_total), 예상 잔여 시간(eta_sec)
+    """
+    status = job_status.get_status(db, video_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    status["profiling"] = profiling.status(video_id)
+    return status
+
+
+@app.get("/videos/{video_id}/frames/{ms}")
+def get_video_frame(video_id: int, ms: int, w: Optional[int] = None, db: Session = Depends(get_db)):
+    """ms 시각 프레임 이미지 (추출 시 저장한 프레임, 없으면 원본 영상에서 렌더링 — 가로 w 픽셀로 축소, 결과 캐시)"""
+    from app import frame_render
+
+    video = db.query(Video).filter(Video.id == video_id).first()
+    if not video:
+        raise HTTPException(status_code=404, detail="Video not found")
+    if ms < 0 or (video.video_totaltime and ms > video.video_totaltime * 1000):
+        raise HTTPException(status_code=404, detail="Timestamp out of range")
+    try:
+        data, content_type = frame_render.render(video_id, video.video_url, ms, w)
+    except (frame_render.SourceNotFound, ValueError) as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return Response(content=data, media_type=content_type, headers={"Cache-Control": "public, max-age=86400"})
+
+
+@app.get("/videos/{video_id}/trace")
+def get_video_trace(video_id: int, db: Session = Depends(get_db)):
+    """작업 trace: spans(시작 오프셋/소요 초, 최대 METRICS_TRACE_MAX_SPANS개) + span별 요약(count/total/max)"""
+    trace = job_status.get_trace(db, video_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="Trace not found")
+    return trace
+
+
+# --- 관리자: 작업 프로파일링 ---
+@app.post("/admin/videos/{video_id}/profile")
+def profile_video_job(video_id: int, mode: str = "sample", x_admin_token: Optional[str] = Header(None)):
+    """
+    실행 중인 작업에는 sample 프로파일러를 즉시 붙이고, 시작 전 작업에는 요청으로 등록.
+    결과(collapsed stacks / pstats)는 작업 종료 시 S3 profiles/{video_id}/ 에 저장 → status의 profile_url
+    """
+    if not ADMIN_TOKEN or x_admin_token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Forbidden")
+    try:
+        result = profiling.attach(video_id, mode)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"video_id": video_id, "mode": mode, "result": result}
+
+
+# --- 피드백 스트리밍 (SSE) ---
+@app.get("/videos/{video_id}/feedback/stream")
+async def stream_feedback(video_id: int, db: Session = Depends(get_db)):
+    """
+    text/event-stream: draft(규칙 기반 즉시 피드백) → token(모델 출력 조각) → done(최종 short/detailed 피드백) 또는 error.
+    이미 생성된 피드백이면 done 1건만 보냄. 없는 영상이면 404.
+    """
+    exists = await run_in_threadpool(lambda: db.query(Video.id).filter(Video.id == video_id).first())
+    if exists is None:
+        raise HTTPException(status_code=404, detail="Video not found")
+    return StreamingResponse(
+        feedback_service.sse_events(video_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _frame_image_url(video_id: int, f) -> Optional[str]:
+    """Frame.image_url 응답값 — 과거 packed 형식("{pack URL}#bytes=...")은 브라우저가 범위를 보내지 않으므로 렌더링 URL로"""
+    from app import frame_render, storage
+    url = _safe_str(f.image_url)
+    if url and storage.RANGE_SEP in url:
+        return frame_render.render_url(video_id, f.frame_timestamp or 0.0)
+    return url
+
+
 # --- 비디오 분석 결과 조회 엔드포인트 ---
 from fastapi import HTTPException
 
@@ -340,14 +843,13 @@ def get_video_analysis(video_id: int, db: Session = Depends(get_db)):
     if not score_obj:
         raise HTTPException(status_code=404, detail="Score not found for video")
 
+    # 피드백은 별도 단계 — 생성 전이어도 점수는 바로 반환 (feedback=None, feedback_status로 진행 상태)
     feedback_obj = (
         db.query(Feedback)
           .filter(Feedback.video_id == video_id)
           .order_by(Feedback.created_at.desc())
           .first()
     )
-    if not feedback_obj:
-        raise HTTPException(status_code=404, detail="Feedback not found for video")
 
     # === 감정 평균 (버전/0건 안전) ===
     em_row = (
@@ -378,7 +880,7 @@ def get_video_analysis(video_id: int, db: Session = Depends(get_db)):
         {
             "id": f.id,
             "frame_timestamp": _safe_float(f.frame_timestamp),
-            "image_url": _safe_str(f.image_url),
+            "image_url": _frame_image_url(video_id, f),
         }
         for f in frames
     ]
@@ -486,7 +988,8 @@ def get_video_analysis(video_id: int, db: Session = Depends(get_db)):
             "short_feedback": feedback_obj.short_feedback or "",
             "detail_feedback": feedback_obj.detail_feedback or "",
             "created_at": feedback_obj.created_at.isoformat() if feedback_obj.created_at else None,
-        },
+        } if feedback_obj else None,
+        "feedback_status": "done" if feedback_obj else (feedback_service.status(video_id) or "pending"),
         
         "audios": audio_data,
         "poses": pose_data,
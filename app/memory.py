@@ -0,0 +1,198 @@
+# 단계별 메모리 계측 + 작업 메모리 예산
+# - track(): 구간 시작/끝/최대 RSS 기록. 최대치는 백그라운드 스레드가 MEMORY_SAMPLE_INTERVAL_SEC마다 RSS를 측정해 갱신
+#   MEMORY_TRACEMALLOC=1이면 Python 힙 최대치(tracemalloc)도 기록 (numpy/torch/TF 네이티브 할당은 RSS로만 보임)
+# - 예산(MEMORY_BUDGET_MB): 작업 중 프로세스 RSS 상한. 단계 예상 사용량(길이/해상도 기반 추정)이
+#   남은 예산(headroom)을 넘으면 호출 측이 청크/스트리밍 변형을 선택 (pyin 블록 처리, 워커 수 축소, 샤딩 대신 순차 처리)
+# - RSS는 프로세스 단위: 같은 프로세스에서 동시에 도는 작업이 있으면 서로의 사용량이 섞임
+import os
+import math
+import time
+import itertools
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from app import metrics
+from app.config import MEMORY_BUDGET_MB, MEMORY_SAMPLE_INTERVAL_SEC, MEMORY_TRACEMALLOC
+from app.log import get_logger
+
+logger = get_logger("memory")
+
+try:
+    import psutil  # 선택 의존성 (없으면 /proc 사용)
+except ImportError:
+    psutil = None
+
+_MB = 1024 * 1024
+
+# 추정 계수 (실측 기반 대략치)
+PYIN_MB_PER_SEC = 2.0      # librosa.pyin 20ms hop: 오디오 1초당 작업 메모리 (yin 프레임 + 확률 행렬)
+PITCH_MIN_BLOCK_SEC = 30.0  # 블록 pyin 최소 길이 (너무 짧으면 블록 경계 보정 비용이 커짐)
+BUDGET_SAFETY = 0.8         # 추정 오차 여유: 남은 예산의 이 비율까지만 사용
+
+STAGE_PEAK_RSS = metrics.histogram(
+    "stage_peak_rss_mb", "Peak process RSS (MB) during each pipeline stage",
+    buckets=(256, 512, 1024, 2048, 3072, 4096, 6144, 8192, 12288, 16384),
+)
+BUDGET_FALLBACKS = metrics.counter("memory_budget_fallbacks_total",
+                                   "Stages switched to a chunked/streaming variant by the memory budget")
+
+
+def rss_mb() -> float:
+    """현재 프로세스 RSS(MB). psutil → /proc/self/statm → 0"""
+    if psutil is not None:
+        try:
+            return psutil.Process().memory_info().rss / _MB
+        except Exception:
+            pass
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / _MB
+    except Exception:
+        return 0.0
+
+
+def available_mb() -> Optional[float]:
+    """시스템 가용 물리 메모리(MB). psutil → /proc/meminfo MemAvailable → None"""
+    if psutil is not None:
+        try:
+            return psutil.virtual_memory().available / _MB
+        except Exception:
+            pass
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    except Exception:
+        pass
+    return None
+
+
+metrics.gauge("process_rss_mb", "Resident memory of this process (MB)", rss_mb)
+
+
+# -----------------------------
+# 최대 RSS 샘플러
+# -----------------------------
+_lock = threading.Lock()
+_watches: Dict[int, float] = {}  # token → 구간 최대 RSS
+_tokens = itertools.count(1)
+_wake = threading.Event()
+_sampler: Optional[threading.Thread] = None
+
+
+def _sample_loop() -> None:
+    while True:
+        _wake.wait()
+        time.sleep(MEMORY_SAMPLE_INTERVAL_SEC)
+        rss = rss_mb()
+        with _lock:
+            if not _watches:
+                _wake.clear()  # 계측 중인 구간이 없으면 대기
+                continue
+            for token, peak in _watches.items():
+                if rss > peak:
+                    _watches[token] = rss
+
+
+def _watch(start: float) -> int:
+    global _sampler
+    with _lock:
+        token = next(_tokens)
+        _watches[token] = start
+        if _sampler is None:
+            _sampler = threading.Thread(target=_sample_loop, name="memory-sampler", daemon=True)
+            _sampler.start()
+    _wake.set()
+    return token
+
+
+def _unwatch(token: int) -> float:
+    with _lock:
+        return _watches.pop(token, 0.0)
+
+
+@contextmanager
+def track(stats: Dict[str, float]) -> Iterator[Dict[str, float]]:
+    """
+    구간 메모리 계측 → stats에 rss_start_mb / rss_end_mb / rss_peak_mb / rss_delta_mb (+ py_peak_mb) 기록.
+    샘플 간격보다 짧은 순간 최대치는 놓칠 수 있음. tracemalloc 최대치는 구간 시작 시 초기화(중첩 구간은 안쪽 기준)
+    """
+    start = rss_mb()
+    token = _watch(start)
+    py_trace = MEMORY_TRACEMALLOC
+    if py_trace:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+    try:
+        yield stats
+    finally:
+        end = rss_mb()
+        peak = max(_unwatch(token), start, end)
+        stats["rss_start_mb"] = round(start, 1)
+        stats["rss_end_mb"] = round(end, 1)
+        stats["rss_peak_mb"] = round(peak, 1)
+        stats["rss_delta_mb"] = round(end - start, 1)
+        if py_trace and tracemalloc.is_tracing():
+            stats["py_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / _MB, 1)
+
+
+# -----------------------------
+# 예산
+# -----------------------------
+def headroom_mb() -> Optional[float]:
+    """예산 대비 남은 메모리(MB, 안전 여유 적용). 예산 미설정이면 None"""
+    if MEMORY_BUDGET_MB <= 0:
+        return None
+    return max(MEMORY_BUDGET_MB - rss_mb(), 0.0) * BUDGET_SAFETY
+
+
+def fallback(stage: str, estimate_mb: float, headroom: float, variant: str, **detail) -> None:
+    """예산 초과로 변형 실행을 선택했음을 로그 + 작업 trace(notes.memory_budget)에 기록"""
+    BUDGET_FALLBACKS.inc(stage=stage)
+    logger.info("Memory budget: %s needs ~%.0fMB (headroom %.0fMB) → %s", stage, estimate_mb, headroom, variant)
+    metrics.annotate("memory_budget", {
+        "stage": stage,
+        "estimate_mb": round(estimate_mb, 1),
+        "headroom_mb": round(headroom, 1),
+        "variant": variant,
+        **detail,
+    })
+
+
+def estimate_pyin_mb(audio_sec: float) -> float:
+    return max(audio_sec, 0.0) * PYIN_MB_PER_SEC
+
+
+def estimate_frames_mb(n_frames: int, width: int, height: int) -> float:
+    """RGB uint8 프레임 n장 (샤드 공유 메모리 버퍼 크기)"""
+    return max(n_frames, 0) * width * height * 3 / _MB
+
+
+def pitch_block_sec(audio_sec: float) -> Optional[float]:
+    """전체 pyin이 예산 안이면 None, 아니면 블록 pyin 블록 길이(초)"""
+    headroom = headroom_mb()
+    estimate = estimate_pyin_mb(audio_sec)
+    if headroom is None or estimate <= headroom:
+        return None
+    block = max(PITCH_MIN_BLOCK_SEC, headroom / PYIN_MB_PER_SEC)
+    if block >= audio_sec:
+        return None
+    fallback("pitch", estimate, headroom, "blockwise_pyin", block_sec=round(block, 1))
+    return block
+
+
+def max_workers(stage: str, per_worker_mb: float, requested: int) -> int:
+    """워커 1개당 예상 사용량으로 예산 안에서 띄울 수 있는 워커 수 (최소 1, 최대 requested)"""
+    headroom = headroom_mb()
+    if headroom is None or per_worker_mb <= 0 or requested <= 1:
+        return requested
+    allowed = max(1, min(requested, int(math.floor(headroom / per_worker_mb))))
+    if allowed < requested:
+        fallback(stage, per_worker_mb * requested, headroom, "fewer_workers",
+                 requested=requested, workers=allowed, per_worker_mb=round(per_worker_mb, 1))
+    return allowed
@@ -0,0 +1,320 @@
+# 메트릭/트레이싱 (GET /metrics, 작업별 trace)
+# - span(name): 구간 소요 시간 → sesac_span_seconds{span=...} 히스토그램 + 현재 작업 trace에 기록
+#   (decode.*, encode.*, detect.*, storage.put/get, db.flush, stt.transcribe, pitch.pyin, pron.align, llm.completion, stage.*)
+# - 카운터/게이지(프레임 처리 수, 큐 길이, 모델 로드 시간, 캐시 hit/miss)를 Prometheus 텍스트 형식으로 노출
+# - annotate(key, value): 구간 외 정보(단계별 메모리, 메모리 예산에 따른 실행 변형)를 trace notes에 기록
+# - 외부 의존성 없음. 프로세스별 값이므로 uvicorn 워커가 여러 개면 워커별로 수집됨
+#   (샤드/청크 전사 자식 프로세스 내부 구간은 부모의 stage/stt 구간으로만 잡힘)
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from app.config import METRICS_ENABLED, METRICS_TRACE_MAX_SPANS
+from app.log import get_logger
+
+logger = get_logger("metrics")
+
+PREFIX = "sesac_"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+_lock = threading.Lock()
+_metrics: Dict[str, "_Metric"] = {}
+
+
+def _key(labels: Optional[Dict[str, Any]]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in (labels or {}).items()))
+
+
+def _escape(v: str) -> str:
+    return v.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _fmt_labels(key: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = key + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _fmt_num(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if not float(v).is_integer() else str(int(v))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str):
+        self.name = PREFIX + name
+        self.help = help_text
+
+    def lines(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"] + self.samples()
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str):
+        super().__init__(name, help_text)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        if not METRICS_ENABLED:
+            return
+        k = _key(labels)
+        with _lock:
+            self._values[k] = self._values.get(k, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        with _lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_fmt_labels(k)} {_fmt_num(v)}" for k, v in items]
+
+
+class Gauge(_Metric):
+    """값 직접 설정(set) 또는 조회 시점 콜백(fn → float | [(labels, value), ...])"""
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, fn: Optional[Callable[[], Any]] = None):
+        super().__init__(name, help_text)
+        self._values: Dict[LabelKey, float] = {}
+        self._fn = fn
+
+    def set(self, value: float, **labels) -> None:
+        with _lock:
+            self._values[_key(labels)] = float(value)
+
+    def samples(self) -> List[str]:
+        if self._fn is not None:
+            try:
+                out = self._fn()
+            except Exception as e:
+                logger.warning("Gauge callback failed for %s: %s", self.name, e)
+                return []
+            items = [((), float(out))] if isinstance(out, (int, float)) else [(_key(l), float(v)) for l, v in out]
+        else:
+            with _lock:
+                items = list(self._values.items())
+        return [f"{self.name}{_fmt_labels(k)} {_fmt_num(v)}" for k, v in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[LabelKey, List[float]] = {}  # [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels) -> None:
+        if not METRICS_ENABLED:
+            return
+        k = _key(labels)
+        with _lock:
+            row = self._values.get(k)
+            if row is None:
+                row = self._values[k] = [0.0] * (len(self.buckets) + 2)
+            for i, b in enumerate(self.buckets):
+                if value <= b:
+                    row[i] += 1
+            row[-2] += value
+            row[-1] += 1
+
+    def samples(self) -> List[str]:
+        with _lock:
+            items = [(k, list(v)) for k, v in self._values.items()]
+        out: List[str] = []
+        for k, row in items:
+            for i, b in enumerate(self.buckets):
+                out.append(f"{self.name}_bucket{_fmt_labels(k, (('le', _fmt_num(b)),))} {_fmt_num(row[i])}")
+            out.append(f"{self.name}_bucket{_fmt_labels(k, (('le', '+Inf'),))} {_fmt_num(row[-1])}")
+            out.append(f"{self.name}_sum{_fmt_labels(k)} {_fmt_num(row[-2])}")
+            out.append(f"{self.name}_count{_fmt_labels(k)} {_fmt_num(row[-1])}")
+        return out
+
+
+def _register(metric: _Metric) -> Any:
+    with _lock:
+        existing = _metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        _metrics[metric.name] = metric
+    return metric
+
+
+def counter(name: str, help_text: str) -> Counter:
+    return _register(Counter(name, help_text))
+
+
+def gauge(name: str, help_text: str, fn: Optional[Callable[[], Any]] = None) -> Gauge:
+    return _register(Gauge(name, help_text, fn))
+
+
+def histogram(name: str, help_text: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+    return _register(Histogram(name, help_text, buckets))
+
+
+def render() -> str:
+    """Prometheus 텍스트 노출 형식 (text/plain; version=0.0.4)"""
+    with _lock:
+        metrics = list(_metrics.values())
+    lines: List[str] = []
+    for m in metrics:
+        lines.extend(m.lines())
+    return "\n".join(lines) + "\n"
+
+
+# -----------------------------
+# 공용 메트릭
+# -----------------------------
+SPAN_SECONDS = histogram("span_seconds", "Duration of instrumented pipeline spans")
+SPAN_ERRORS = counter("span_errors_total", "Spans that raised an exception")
+FRAMES_PROCESSED = counter("frames_processed_total", "Sampled video frames processed (rate = frames/sec)")
+JOBS_FINISHED = counter("jobs_finished_total", "Analysis jobs finished, by status")
+MODEL_LOAD_SECONDS = histogram("model_load_seconds", "Model load time", buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120))
+MODEL_CACHE = counter("model_cache_total", "Model registry lookups, by result (hit|miss)")
+
+
+# -----------------------------
+# 작업별 trace
+# -----------------------------
+class _Trace:
+    def __init__(self, video_id: int):
+        self.video_id = video_id
+        self.t0 = time.time()
+        self.spans: List[Dict[str, Any]] = []
+        self.dropped = 0
+        self.summary: Dict[str, Dict[str, float]] = {}
+        self.notes: Dict[str, List[Any]] = {}
+
+    def add(self, name: str, start: float, sec: float, labels: Dict[str, Any]) -> None:
+        s = self.summary.get(name)
+        if s is None:
+            s = self.summary[name] = {"count": 0, "total_sec": 0.0, "max_sec": 0.0}
+        s["count"] += 1
+        s["total_sec"] += sec
+        s["max_sec"] = max(s["max_sec"], sec)
+        if len(self.spans) >= METRICS_TRACE_MAX_SPANS:
+            self.dropped += 1
+            return
+        span = {"name": name, "start": round(start - self.t0, 3), "sec": round(sec, 4)}
+        if labels:
+            span["labels"] = {k: str(v) for k, v in labels.items()}
+        self.spans.append(span)
+
+    def note(self, key: str, value: Any) -> None:
+        self.notes.setdefault(key, []).append(value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        out = {
+            "spans": list(self.spans),
+            "dropped": self.dropped,
+            "summary": {
+                k: {"count": int(v["count"]), "total_sec": round(v["total_sec"], 3), "max_sec": round(v["max_sec"], 3)}
+                for k, v in sorted(self.summary.items(), key=lambda kv: -kv[1]["total_sec"])
+            },
+        }
+        if self.notes:
+            out["notes"] = {k: list(v) for k, v in self.notes.items()}
+        return out
+
+
+_traces: Dict[int, _Trace] = {}
+_current_job: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar("metrics_current_job", default=None)
+
+
+def current_job() -> Optional[int]:
+    """현재 컨텍스트에서 trace 중인 작업 video_id (로그 필드용)"""
+    return _current_job.get()
+
+
+def begin_trace(video_id: int) -> None:
+    """현재 스레드(컨텍스트)의 span을 video_id 작업 trace로 수집 시작"""
+    with _lock:
+        _traces[video_id] = _Trace(video_id)
+    _current_job.set(video_id)
+
+
+def end_trace(video_id: int) -> Optional[Dict[str, Any]]:
+    """수집 종료 → trace dict (없으면 None)"""
+    with _lock:
+        trace = _traces.pop(video_id, None)
+        snapshot = trace.to_dict() if trace is not None else None
+    if _current_job.get() == video_id:
+        _current_job.set(None)
+    return snapshot
+
+
+def get_trace(video_id: int) -> Optional[Dict[str, Any]]:
+    with _lock:
+        trace = _traces.get(video_id)
+        return trace.to_dict() if trace is not None else None
+
+
+def _record(name: str, start: float, sec: float, video_id: Optional[int], labels: Dict[str, Any]) -> None:
+    SPAN_SECONDS.observe(sec, span=name)
+    vid = video_id if video_id is not None else _current_job.get()
+    if vid is None:
+        return
+    with _lock:
+        trace = _traces.get(vid)
+        if trace is not None:
+            trace.add(name, start, sec, labels)
+
+
+@contextmanager
+def span(name: str, video_id: Optional[int] = None, **labels) -> Iterator[None]:
+    """
+    구간 계측. video_id를 생략하면 현재 컨텍스트의 작업(begin_trace)에 기록.
+    labels는 trace에만 남김 (히스토그램 라벨은 span 이름 하나로 카디널리티 고정)
+    """
+    if not METRICS_ENABLED:
+        yield
+        return
+    start = time.time()
+    t0 = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        SPAN_ERRORS.inc(span=name)
+        raise
+    finally:
+        _record(name, start, time.perf_counter() - t0, video_id, labels)
+
+
+def record_span(name: str, sec: float, video_id: Optional[int] = None, **labels) -> None:
+    """다른 프로세스에서 측정한 구간 기록 (끝난 시각 = 지금)"""
+    if METRICS_ENABLED:
+        _record(name, time.time() - sec, sec, video_id, labels)
+
+
+def annotate(key: str, value: Any, video_id: Optional[int] = None) -> None:
+    """작업 trace에 구간 외 정보 기록 (notes[key]에 누적, 예: 메모리 예산에 따른 실행 변형 선택)"""
+    vid = video_id if video_id is not None else _current_job.get()
+    if vid is None:
+        return
+    with _lock:
+        trace = _traces.get(vid)
+        if trace is not None:
+            trace.note(key, value)
+
+
+def timed(name: str) -> Callable:
+    """함수 전체를 span(name)으로 감싸는 데코레이터"""
+    def deco(fn: Callable) -> Callable:
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
@@ -0,0 +1,252 @@
+# 모델 레지스트리: 분석 모듈들이 쓰는 모델을 한 곳에서 관리
+# - 최초 사용 시 로드(lazy), 로드 시간/상주 메모리(RSS 증가분) 기록
+# - 메모리 예산(MODEL_MEMORY_BUDGET_MB) 초과 시 가장 오래 안 쓴 모델부터 해제(LRU)
+#   close()가 필요한 모델(mediapipe 그래프)은 lease()로 사용 → 사용 중에는 해제하지 않음
+#   DeepFace 감정 모델은 DeepFace 내부 캐시가 소유 → 상주량만 집계하고 해제 대상에서 제외
+# - Whisper는 이름("whisper:base")당 한 인스턴스만 두고 속도/발음 분석이 공유
+import gc
+import time
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from app import metrics
+from app.memory import rss_mb
+from app.config import MODEL_MEMORY_BUDGET_MB
+from app.log import get_logger
+
+logger = get_logger("models")
+
+
+class _Entry:
+    def __init__(self, name: str, loader: Callable[[], Any], estimate_mb: float,
+                 unloader: Optional[Callable[[Any], None]], evictable: bool):
+        self.name = name
+        self.loader = loader
+        self.estimate_mb = estimate_mb
+        self.unloader = unloader
+        self.evictable = evictable
+        self.load_lock = threading.Lock()  # 같은 모델의 동시 로드를 1회로 (다른 모델 조회는 막지 않음)
+        self.leases = 0                    # lease() 사용 중인 수 → 0일 때만 해제
+        self.model = None
+        self.rss_mb = 0.0
+        self.load_sec = 0.0
+        self.loads = 0
+        self.hits = 0
+        self.last_used = None
+
+    @property
+    def loaded(self) -> bool:
+        return self.model is not None
+
+
+class ModelRegistry:
+    def __init__(self, budget_mb: float = 0.0):
+        self.budget_mb = budget_mb  # 0 이하면 무제한
+        self._entries: Dict[str, _Entry] = {}
+        self._lru: "OrderedDict[str, None]" = OrderedDict()  # 로드된 모델만, 오래된 순
+        self._lock = threading.RLock()
+
+    def register(self, name: str, loader: Callable[[], Any], estimate_mb: float = 0.0,
+                 unloader: Optional[Callable[[Any], None]] = None, evictable: bool = True) -> None:
+        """모델 로더 등록 (이미 있으면 무시). evictable=False면 예산 초과 시에도 해제하지 않음"""
+        with self._lock:
+            if name not in self._entries:
+                self._entries[name] = _Entry(name, loader, estimate_mb, unloader, evictable)
+
+    def is_registered(self, name: str) -> bool:
+        return name in self._entries
+
+    def is_loaded(self, name: str) -> bool:
+        entry = self._entries.get(name)
+        return bool(entry and entry.loaded)
+
+    def get(self, name: str) -> Any:
+        """모델 반환 (없으면 로드 후 예산 초과분 LRU 해제)"""
+        return self._acquire(name, lease=False)
+
+    @contextmanager
+    def lease(self, name: str) -> Iterator[Any]:
+        """with 블록 동안 모델 사용 → 그동안 해제(unloader: mediapipe close 등) 대상에서 제외"""
+        model = self._acquire(name, lease=True)
+        try:
+            yield model
+        finally:
+            with self._lock:
+                self._entries[name].leases -= 1
+
+    def _acquire(self, name: str, lease: bool) -> Any:
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                raise KeyError(f"Model not registered: {name}")
+            if entry.loaded:
+                entry.hits += 1
+                metrics.MODEL_CACHE.inc(result="hit")
+                return self._use(entry, lease)
+
+        # 로드는 레지스트리 잠금 밖에서 (다른 모델 조회/해제가 로드 시간 동안 막히지 않도록)
+        with entry.load_lock:
+            with self._lock:
+                if entry.loaded:  # 기다리는 동안 다른 스레드가 로드함
+                    entry.hits += 1
+                    metrics.MODEL_CACHE.inc(result="hit")
+                    return self._use(entry, lease)
+            metrics.MODEL_CACHE.inc(result="miss")
+            before = rss_mb()
+            t0 = time.perf_counter()
+            model = entry.loader()
+            load_sec = time.perf_counter() - t0
+            delta = rss_mb() - before  # 다른 모델이 동시에 로드되면 함께 잡힐 수 있음 (근사치)
+            with self._lock:
+                entry.model = model
+                entry.load_sec = load_sec
+                entry.rss_mb = delta if delta > 0 else entry.estimate_mb
+                entry.loads += 1
+                model = self._use(entry, lease)
+        metrics.MODEL_LOAD_SECONDS.observe(load_sec, model=name)
+        logger.info("Model loaded: %s (%.2fs, ~%.0fMB)", name, load_sec, entry.rss_mb)
+        return model
+
+    def _use(self, entry: _Entry, lease: bool) -> Any:
+        """(잠금 보유 상태) 사용 기록 + LRU 갱신 + 예산 초과분 해제"""
+        entry.last_used = time.time()
+        if lease:
+            entry.leases += 1
+        self._lru[entry.name] = None
+        self._lru.move_to_end(entry.name)
+        self._evict_over_budget(keep=entry.name)
+        return entry.model
+
+    def unload(self, name: str) -> bool:
+        """모델 해제 (사용 중(lease)이거나 해제 불가 모델이면 False)"""
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None or not entry.loaded or entry.leases > 0 or not entry.evictable:
+                return False
+            model, entry.model = entry.model, None
+            self._lru.pop(name, None)
+            if entry.unloader is not None:
+                try:
+                    entry.unloader(model)
+                except Exception as e:
+                    logger.warning("Model unloader failed for %s: %s", name, e)
+            del model
+            gc.collect()
+            logger.info("Model unloaded: %s (~%.0fMB)", name, entry.rss_mb)
+            return True
+
+    def resident_mb(self) -> float:
+        with self._lock:
+            return sum(e.rss_mb for e in self._entries.values() if e.loaded)
+
+    def _evict_over_budget(self, keep: str) -> None:
+        if self.budget_mb <= 0:
+            return
+        for name in list(self._lru):
+            if self.resident_mb() <= self.budget_mb:
+                break
+            if name != keep:
+                self.unload(name)  # 사용 중/해제 불가 모델은 건너뜀
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """모델별 상태 (health/metrics 노출용)"""
+        with self._lock:
+            return [
+                {
+                    "name": e.name,
+                    "loaded": e.loaded,
+                    "rss_mb": round(e.rss_mb, 1) if e.loaded else 0.0,
+                    "load_sec": round(e.load_sec, 3),
+                    "loads": e.loads,
+                    "hits": e.hits,
+                    "leases": e.leases,
+                    "evictable": e.evictable,
+                    "last_used": e.last_used,
+                }
+                for e in self._entries.values()
+            ]
+
+
+registry = ModelRegistry(budget_mb=MODEL_MEMORY_BUDGET_MB)
+
+metrics.gauge("models_resident_mb", "Estimated resident memory of loaded models (MB)", registry.resident_mb)
+metrics.gauge(
+    "models_loaded", "Loaded models in the registry",
+    lambda: sum(1 for s in registry.stats() if s["loaded"]),
+)
+
+
+# -----------------------------
+# 기본 모델 로더 (무거운 import는 로더 안에서)
+# -----------------------------
+def _load_whisper(model_size: str):
+    import whisper
+    return whisper.load_model(model_size)
+
+
+def _load_mp_face_detection():
+    import mediapipe as mp
+    return mp.solutions.face_detection.FaceDetection(model_selection=1)
+
+
+def _load_mp_pose():
+    import mediapipe as mp
+    # static_image_mode=True: 프레임마다 독립적으로 감지(동영상에서도 OK, 속도보다 안정성 우선)
+    return mp.solutions.pose.Pose(
+        static_image_mode=True,
+        model_complexity=1,
+        enable_segmentation=False,
+        min_detection_confidence=0.5
+    )
+
+
+def _load_mp_face_mesh():
+    import mediapipe as mp
+    return mp.solutions.face_mesh.FaceMesh(
+        static_image_mode=True,
+        max_num_faces=1,
+        refine_landmarks=True,
+        min_detection_confidence=0.3,
+        min_tracking_confidence=0.3
+    )
+
+
+def _close_mp(graph) -> None:
+    graph.close()
+
+
+def _load_deepface_emotion():
+    # DeepFace.analyze는 내부 캐시의 모델을 쓰므로, 같은 캐시를 미리 채워 둠 (해제는 DeepFace 캐시가 관리)
+    from deepface import DeepFace
+    try:
+        return DeepFace.build_model(task="facial_attribute", model_name="Emotion")
+    except TypeError:
+        return DeepFace.build_model("Emotion")
+
+
+def _load_pose_classifier(model_path: str):
+    from app.posture_classifier import _load_keras_pose_model
+    return _load_keras_pose_model(model_path)
+
+
+def get_whisper(model_size: str = "base"):
+    """Whisper 공유 인스턴스 (크기별 1개)"""
+    name = f"whisper:{model_size}"
+    registry.register(name, lambda: _load_whisper(model_size), estimate_mb=300.0)
+    return registry.get(name)
+
+
+def get_pose_classifier(model_path: str):
+    """Keras 자세 분류 모델 (경로별 1개)"""
+    from app.posture_classifier import DEFAULT_MODEL_PATH
+    name = "pose_classifier" if model_path == DEFAULT_MODEL_PATH else f"pose_classifier:{model_path}"
+    registry.register(name, lambda: _load_pose_classifier(model_path), estimate_mb=50.0)
+    return registry.get(name)
+
+
+registry.register("mp_face_detection", _load_mp_face_detection, estimate_mb=20.0, unloader=_close_mp)
+registry.register("mp_pose", _load_mp_pose, estimate_mb=40.0, unloader=_close_mp)
+registry.register("mp_face_mesh", _load_mp_face_mesh, estimate_mb=30.0, unloader=_close_mp)
+registry.register("deepface_emotion", _load_deepface_emotion, estimate_mb=60.0, evictable=False)
@@ -111,3 +111,21 @@ class Feedback(Base):
     short_feedback = Column(String(200), nullable=False)
     detail_feedback = Column(Text, nullable=False)
     created_at = Column(TIMESTAMP, server_default=text("CURRENT_TIMESTAMP"))
+
+class JobStatus(Base):
+    __tablename__ = "job_status"
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    video_id = Column(BigInteger, ForeignKey("video.id", ondelete="CASCADE"), nullable=False, unique=True)
+    status = Column(String(20), nullable=False)     # queued | running | done | failed
+    stage = Column(String(50), nullable=True)       # 현재 단계
+    stages = Column(Text, nullable=True)            # 완료 단계 JSON [{"name", "duration"}]
+    frames_done = Column(Integer, nullable=False, default=0)
+    frames_total = Column(Integer, nullable=False, default=0)
+    video_duration = Column(Float, nullable=True)
+    error = Column(Text, nullable=True)
+    failed_shards = Column(Text, nullable=True)     # 실패한 샤드 JSON [{"index", "start", "end", "error"}] (샤딩 경로)
+    started_at = Column(TIMESTAMP, nullable=True)
+    updated_at = Column(TIMESTAMP, nullable=True)
+    finished_at = Column(TIMESTAMP, nullable=True)
+    trace = Column(Text, nullable=True)             # 작업 trace JSON (metrics.end_trace: spans/summary)
+    profile_url = Column(Text, nullable=True)       # 프로파일 결과 S3 URL (profiling.py, 요청한 작업만)
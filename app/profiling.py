@@ -0,0 +1,191 @@
+# 작업별 CPU 프로파일링 (요청한 작업만)
+# - 업로드 폼 profile=sample|cprofile 또는 관리자 엔드포인트(POST /admin/videos/{video_id}/profile)로 요청
+# - sample: 별도 스레드가 분석 스레드의 스택을 PROFILE_SAMPLE_INTERVAL_SEC마다 수집 → collapsed stacks
+#           (flamegraph.pl / speedscope 입력 형식). 실행 중인 작업에도 붙일 수 있음
+# - cprofile: 결정적 프로파일러(cProfile) → pstats 파일 (작업 시작 전에 요청해야 함)
+# - 결과는 S3 profiles/{video_id}/ 에 저장하고 URL을 JobStatus.profile_url에 기록
+# - 분석 스레드만 대상: 샤드/청크 워커 프로세스 내부는 부모 스레드의 대기 구간으로 보임
+import io
+import os
+import sys
+import time
+import pstats
+import cProfile
+import threading
+from collections import Counter
+from typing import Dict, Optional
+
+from app.config import PROFILE_SAMPLE_INTERVAL_SEC
+from app.log import get_logger
+
+logger = get_logger("profiling")
+
+MODES = ("sample", "cprofile")
+TOP_N = 15  # 로그에 남길 상위 항목 수
+
+_lock = threading.Lock()
+_requested: Dict[int, str] = {}      # 시작 전 요청 (video_id → mode)
+_threads: Dict[int, int] = {}        # 실행 중 작업의 분석 스레드 ident
+_active: Dict[int, "_Profiler"] = {}
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+class _Profiler:
+    mode = ""
+
+    def stop(self) -> None:
+        raise NotImplementedError
+
+    def write(self, path_prefix: str) -> str:
+        """결과 파일 저장 → 경로"""
+        raise NotImplementedError
+
+    def top(self) -> str:
+        raise NotImplementedError
+
+
+class SamplingProfiler(_Profiler):
+    """대상 스레드 스택을 주기적으로 수집 (대상 스레드에는 계측 코드가 들어가지 않음)"""
+    mode = "sample"
+
+    def __init__(self, thread_id: int, interval: float = PROFILE_SAMPLE_INTERVAL_SEC):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"profiler-{thread_id}", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                names.append(_frame_name(frame))
+                frame = frame.f_back
+            self.stacks[";".join(reversed(names))] += 1
+            self.samples += 1
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join(timeout=5)
+
+    def write(self, path_prefix: str) -> str:
+        path = path_prefix + ".collapsed.txt"
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, n in self.stacks.most_common():
+                f.write(f"{stack} {n}\n")
+        return path
+
+    def top(self) -> str:
+        # 스택 맨 아래(leaf) 기준 self 시간 비율
+        leaf: Counter = Counter()
+        for stack, n in self.stacks.items():
+            leaf[stack.rsplit(";", 1)[-1]] += n
+        total = max(self.samples, 1)
+        return ", ".join(f"{name} {n * 100.0 / total:.1f}%" for name, n in leaf.most_common(TOP_N))
+
+
+class DeterministicProfiler(_Profiler):
+    """cProfile: 호출한 스레드에서 enable (작업 시작 시점에만 가능)"""
+    mode = "cprofile"
+
+    def __init__(self):
+        self.prof = cProfile.Profile()
+        self.prof.enable()
+
+    def stop(self) -> None:
+        self.prof.disable()
+
+    def write(self, path_prefix: str) -> str:
+        path = path_prefix + ".pstats"
+        self.prof.dump_stats(path)
+        return path
+
+    def top(self) -> str:
+        out = io.StringIO()
+        pstats.Stats(self.prof, stream=out).sort_stats("cumulative").print_stats(TOP_N)
+        return out.getvalue()
+
+
+# -----------------------------
+# 요청 / 작업 수명주기
+# -----------------------------
+def request(video_id: int, mode: str) -> None:
+    """작업 시작 전 프로파일 요청 (업로드 폼/관리자)"""
+    if mode not in MODES:
+        raise ValueError(f"Unknown profile mode: {mode} (available: {', '.join(MODES)})")
+    with _lock:
+        _requested[video_id] = mode
+
+
+def attach(video_id: int, mode: str = "sample") -> str:
+    """
+    관리자 요청 처리: 실행 중이면 sample 프로파일러를 즉시 붙이고, 아직 시작 전이면 요청으로 등록.
+    반환: "attached" | "requested" | "already_profiling"
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown profile mode: {mode} (available: {', '.join(MODES)})")
+    with _lock:
+        if video_id in _active:
+            return "already_profiling"
+        tid = _threads.get(video_id)
+        if tid is not None:
+            if mode != "sample":
+                raise ValueError("cprofile can only be requested before the job starts")
+            _active[video_id] = SamplingProfiler(tid)
+    if tid is not None:
+        logger.info("Sampling profiler attached to running job", extra={"video_id": video_id})
+        return "attached"
+    request(video_id, mode)
+    return "requested"
+
+
+def job_started(video_id: int) -> None:
+    """분석 스레드에서 호출: 스레드 등록 + 요청된 프로파일러 시작"""
+    with _lock:
+        _threads[video_id] = threading.get_ident()
+        mode = _requested.pop(video_id, None)
+        if mode is None:
+            return
+        _active[video_id] = SamplingProfiler(_threads[video_id]) if mode == "sample" else DeterministicProfiler()
+    logger.info("Profiling job with %s profiler", mode, extra={"video_id": video_id})
+
+
+def job_finished(video_id: int, out_dir: str, s3_utils=None) -> Optional[str]:
+    """분석 스레드에서 호출: 프로파일러 정지 → 파일 저장 → S3 업로드. 반환: 결과 URL (없으면 None)"""
+    with _lock:
+        _threads.pop(video_id, None)
+        prof = _active.pop(video_id, None)
+    if prof is None:
+        return None
+
+    prof.stop()
+    try:
+        os.makedirs(out_dir, exist_ok=True)
+        path = prof.write(os.path.join(out_dir, f"profile_{prof.mode}_{int(time.time())}"))
+        logger.info("Profile top (%s): %s", prof.mode, prof.top(), extra={"video_id": video_id})
+        if s3_utils is None:
+            return path
+        url = s3_utils.upload_file_to_s3(path, f"profiles/{video_id}/{os.path.basename(path)}")
+        logger.info("Profile saved: %s", url, extra={"video_id": video_id})
+        return url
+    except Exception as e:
+        logger.error("Failed to save profile: %s", e, extra={"video_id": video_id})
+        return None
+
+
+def status(video_id: int) -> Optional[str]:
+    with _lock:
+        if video_id in _active:
+            return f"running:{_active[video_id].mode}"
+        if video_id in _requested:
+            return f"requested:{_requested[video_id]}"
+    return None
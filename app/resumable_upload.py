@@ -0,0 +1,270 @@
+# 이어받기 분할 업로드 (tus 방식 offset 프로토콜, /videos/resumable)
+# - POST   /videos/resumable            : 업로드 생성 (제목/파일명/전체 크기 + 대본 파일) → upload_id
+# - HEAD   /videos/resumable/{upload_id} : 서버가 받은 바이트 수 (Upload-Offset) → 끊긴 뒤 이어서 보낼 위치
+# - PATCH  /videos/resumable/{upload_id} : Upload-Offset 헤더 = 현재 offset 일 때만 본문을 이어 붙임 (다르면 409)
+#   연결이 중간에 끊겨도 받은 만큼은 유지 → 클라이언트는 HEAD로 offset을 확인하고 나머지만 전송
+# - DELETE /videos/resumable/{upload_id} : 업로드 취소
+# - 서버 조립: RESUMABLE_UPLOAD_DIR/{upload_id}.part 에 순서대로 append (요청 본문을 통째로 버퍼링하지 않음)
+# - 앞부분 RESUMABLE_EARLY_START_MB 도착 시 컨테이너 헤더로 영상 길이 측정 + 오디오 디코딩 시작
+#   (업로드 중인 파일을 ffmpeg stdin으로 흘려 보냄 → 업로드가 끝나면 오디오 버퍼도 거의 완료)
+#   헤더가 뒤에 있는 파일(moov 뒤쪽 mp4)은 측정 실패 → 완료 후 기존 방식으로 측정/디코딩
+# - 상태는 API 노드 로컬 파일 → 같은 upload_id 요청은 같은 노드로 라우팅 (여러 노드 환경은 direct_upload 권장)
+import os
+import json
+import time
+import uuid
+import shutil
+import threading
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from app import audio_buffer
+from app.config import RESUMABLE_UPLOAD_DIR, RESUMABLE_EARLY_START_MB, RESUMABLE_UPLOAD_TTL_HOURS, UPLOAD_MAX_MB
+from app.log import get_logger
+
+logger = get_logger("resumable_upload")
+
+_MB = 1024 * 1024
+FEED_CHUNK = 1 * _MB
+FEED_POLL_SEC = 0.2
+EARLY_AUDIO_IDLE_SEC = 600.0  # 이 시간 동안 새 바이트가 없으면 조기 디코딩 포기 (완료 후 다시 디코딩)
+
+
+class UploadNotFound(Exception):
+    pass
+
+
+class OffsetMismatch(Exception):
+    def __init__(self, offset: int):
+        super().__init__(f"offset mismatch (server offset {offset})")
+        self.offset = offset
+
+
+class _Upload:
+    """진행 중 업로드의 프로세스 내 상태 (append 직렬화, 조기 오디오 디코딩 스레드)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.done = threading.Event()  # 업로드 완료 또는 취소 → 조기 디코딩 스트림 종료
+        self.cancelled = False
+        self.audio_thread: Optional[threading.Thread] = None
+        self.probe_at = 0  # 마지막 길이 측정 시도 offset
+
+
+_uploads: Dict[str, _Upload] = {}
+_uploads_lock = threading.Lock()
+
+
+def _path(upload_id: str, suffix: str) -> str:
+    if not upload_id.isalnum():
+        raise UploadNotFound(upload_id)
+    return os.path.join(RESUMABLE_UPLOAD_DIR, f"{upload_id}{suffix}")
+
+
+def _state(upload_id: str) -> _Upload:
+    with _uploads_lock:
+        return _uploads.setdefault(upload_id, _Upload())
+
+
+def _load(upload_id: str) -> Dict[str, Any]:
+    try:
+        with open(_path(upload_id, ".json"), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        raise UploadNotFound(upload_id) from e
+
+
+def _save(info: Dict[str, Any]) -> None:
+    path = _path(info["upload_id"], ".json")
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(info, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def _remove(upload_id: str, *suffixes: str) -> None:
+    for suffix in suffixes:
+        try:
+            os.remove(_path(upload_id, suffix))
+        except OSError:
+            pass
+
+
+def _sweep() -> None:
+    """RESUMABLE_UPLOAD_TTL_HOURS 동안 진행 없는 미완료 업로드 삭제"""
+    cutoff = time.time() - RESUMABLE_UPLOAD_TTL_HOURS * 3600
+    try:
+        names = os.listdir(RESUMABLE_UPLOAD_DIR)
+    except OSError:
+        return
+    for name in names:
+        if not name.endswith(".json"):
+            continue
+        upload_id = name[:-len(".json")]
+        part = _path(upload_id, ".part")
+        last = os.path.getmtime(part) if os.path.exists(part) else os.path.getmtime(_path(upload_id, ".json"))
+        if last < cutoff:
+            abort(upload_id)
+            logger.info("Stale resumable upload removed: %s", upload_id)
+
+
+def create(title: str, filename: str, length: int, script_file, script_filename: str,
+           profile: Optional[str] = None) -> Dict[str, Any]:
+    """업로드 생성 (대본은 작으므로 생성 요청에 함께 받음) → 상태"""
+    if length <= 0:
+        raise ValueError("length must be positive")
+    if length > UPLOAD_MAX_MB * _MB:
+        raise ValueError(f"file too large (max {UPLOAD_MAX_MB:.0f}MB)")
+    os.makedirs(RESUMABLE_UPLOAD_DIR, exist_ok=True)
+    _sweep()
+
+    upload_id = uuid.uuid4().hex
+    script_path = _path(upload_id, ".script")
+    with open(script_path, "wb") as f:
+        shutil.copyfileobj(script_file, f)
+    open(_path(upload_id, ".part"), "wb").close()
+    info = {
+        "upload_id": upload_id,
+        "title": title,
+        "filename": os.path.basename((filename or "").replace("\\", "/")) or "video.mp4",
+        "script_filename": os.path.basename((script_filename or "").replace("\\", "/")) or "script.txt",
+        "length": int(length),
+        "profile": profile,
+        "duration": None,
+        "video_id": None,
+        "created_at": time.time(),
+    }
+    _save(info)
+    logger.info("Resumable upload created: %s (%.1fMB)", upload_id, length / _MB)
+    return status(upload_id)
+
+
+def status(upload_id: str) -> Dict[str, Any]:
+    """{upload_id, offset, length, duration, video_id}"""
+    info = _load(upload_id)
+    part = _path(upload_id, ".part")
+    offset = os.path.getsize(part) if os.path.exists(part) else info["length"]  # 완료 후 part는 작업으로 이동
+    return {"upload_id": upload_id, "offset": offset, "length": info["length"],
+            "duration": info.get("duration"), "video_id": info.get("video_id")}
+
+
+def append(upload_id: str, offset: int, chunk: bytes) -> int:
+    """offset 위치(= 현재 크기)에 chunk 추가 → 새 offset"""
+    info = _load(upload_id)
+    state = _state(upload_id)
+    part = _path(upload_id, ".part")
+    with state.lock:
+        if not os.path.exists(part):
+            raise OffsetMismatch(info["length"])
+        current = os.path.getsize(part)
+        if offset != current:
+            raise OffsetMismatch(current)
+        if current + len(chunk) > info["length"]:
+            raise ValueError("chunk exceeds upload length")
+        with open(part, "ab") as f:
+            f.write(chunk)
+        return current + len(chunk)
+
+
+def after_patch(upload_id: str) -> Dict[str, Any]:
+    """PATCH 처리 후: 앞부분이 충분하면 길이 측정 + 조기 오디오 디코딩 시작 → 상태 (offset == length면 완료)"""
+    st = status(upload_id)
+    state = _state(upload_id)
+    complete = st["offset"] >= st["length"]
+    early = RESUMABLE_EARLY_START_MB * _MB
+    if st["duration"] is None and (complete or (early > 0 and st["offset"] - state.probe_at >= early)):
+        state.probe_at = st["offset"]
+        duration = audio_buffer.probe_duration(_path(upload_id, ".part"))
+        if duration is not None:
+            info = _load(upload_id)
+            info["duration"] = st["duration"] = duration
+            _save(info)
+            logger.info("Resumable upload %s: duration %.1fs probed at %.1fMB", upload_id, duration, st["offset"] / _MB)
+            if not complete:
+                _start_early_audio(upload_id, state)
+    if complete:
+        state.done.set()
+    return st
+
+
+def _feed(upload_id: str, state: _Upload) -> Iterator[bytes]:
+    """.part 파일을 앞에서부터 읽되, 끝에 도달하면 업로드 완료/취소/정체까지 새 바이트를 기다림"""
+    idle_since = time.time()
+    with open(_path(upload_id, ".part"), "rb") as f:
+        while True:
+            data = f.read(FEED_CHUNK)
+            if data:
+                idle_since = time.time()
+                yield data
+                continue
+            if state.cancelled:
+                raise RuntimeError("upload cancelled")
+            if state.done.is_set():
+                rest = f.read()
+                if rest:
+                    yield rest
+                return
+            if time.time() - idle_since > EARLY_AUDIO_IDLE_SEC:
+                raise TimeoutError("upload stalled")
+            time.sleep(FEED_POLL_SEC)
+
+
+def _start_early_audio(upload_id: str, state: _Upload) -> None:
+    if state.audio_thread is not None:
+        return
+
+    def run():
+        out_path = _path(upload_id, ".audio.f32")
+        try:
+            audio_buffer.decode_audio_stream(_feed(upload_id, state), out_path)
+            logger.info("Resumable upload %s: audio decoded during upload", upload_id)
+        except Exception as e:
+            logger.info("Resumable upload %s: early audio decode skipped (%s)", upload_id, e)
+            _remove(upload_id, ".audio.f32", ".audio.f32.tmp")
+
+    state.audio_thread = threading.Thread(target=run, name=f"early-audio-{upload_id[:8]}", daemon=True)
+    state.audio_thread.start()
+
+
+def register_once(upload_id: str, register: Callable[[Dict[str, Any]], int]) -> Tuple[int, bool]:
+    """완료된 업로드를 한 번만 등록 (register(info) → video_id) → (video_id, 이번 호출에서 등록했는지)"""
+    state = _state(upload_id)
+    with state.lock:
+        info = _load(upload_id)
+        if info.get("video_id"):
+            return info["video_id"], False
+        info["video_id"] = register(info)
+        _save(info)
+        return info["video_id"], True
+
+
+def take_sources(upload_id: str, work_dir: str, out_dir: str) -> Tuple[str, str]:
+    """완료된 업로드 → 분석 작업 입력 (video_path, script_path), 조기 디코딩된 오디오 버퍼는 out_dir로 이동"""
+    info = _load(upload_id)
+    state = _state(upload_id)
+    state.done.set()
+    if state.audio_thread is not None:
+        state.audio_thread.join()  # 남은 꼬리 부분만 디코딩하면 끝
+
+    os.makedirs(work_dir, exist_ok=True)
+    video_path = os.path.join(work_dir, f"{upload_id}_{info['filename']}")
+    script_path = os.path.join(work_dir, f"{upload_id}_{info['script_filename']}")
+    os.replace(_path(upload_id, ".part"), video_path)
+    os.replace(_path(upload_id, ".script"), script_path)
+    audio = _path(upload_id, ".audio.f32")
+    if os.path.exists(audio):
+        os.makedirs(out_dir, exist_ok=True)
+        os.replace(audio, os.path.join(out_dir, audio_buffer.BUFFER_NAME))
+    with _uploads_lock:
+        _uploads.pop(upload_id, None)
+    return video_path, script_path  # 상태 파일(.json)은 완료 후 HEAD 응답용으로 남김 (_sweep이 정리)
+
+
+def abort(upload_id: str) -> None:
+    with _uploads_lock:
+        state = _uploads.pop(upload_id, None)
+    if state is not None:
+        state.cancelled = True
+        state.done.set()
+        if state.audio_thread is not None:
+            state.audio_thread.join(timeout=5)
+    _remove(upload_id, ".part", ".script", ".audio.f32", ".audio.f32.tmp", ".json")
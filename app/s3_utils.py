@@ -1,54 +1,37 @@
+# 기존 호출부(upload_file_to_s3 등, s3_utils 모듈을 인자로 전달하는 코드) 호환용 — 실제 구현은 app.storage
+from app import storage
+from app.log import get_logger
 
-import boto3
-import os
-import cv2
-import numpy as np
-from app.config import AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, AWS_BUCKET_NAME, AWS_REGION
-
-def get_s3_bucket():
-    session = boto3.session.Session(
-        aws_access_key_id=AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-        region_name=AWS_REGION
-    )
-    s3 = session.resource('s3')
-    return s3.Bucket(AWS_BUCKET_NAME), session
+logger = get_logger("s3")
 
 def upload_file_to_s3(file_path, s3_key):
-    bucket, session = get_s3_bucket()
     try:
-        bucket.upload_file(file_path, s3_key)
-        url = f"https://{bucket.name}.s3.{session.region_name}.amazonaws.com/{s3_key}"
-        print(f"S3 업로드 성공: {url}")
+        url = storage.get_storage().put_file(file_path, s3_key)
+        logger.debug("업로드 성공: %s", url)
         return url
     except Exception as e:
-        print(f"S3 업로드 에러: {e}")
+        logger.error("업로드 에러 (%s): %s", s3_key, e)
         raise
 
 def download_file_from_s3(s3_key, local_path):
-    bucket, _ = get_s3_bucket()
     try:
-        bucket.download_file(s3_key, local_path)
-        print(f"S3 다운로드 성공: {local_path}")
+        storage.get_storage().download(s3_key, local_path)
+        logger.debug("다운로드 성공: %s", local_path)
         return local_path
     except Exception as e:
-        print(f"S3 다운로드 에러: {e}")
+        logger.error("다운로드 에러 (%s): %s", s3_key, e)
         raise
 
 def read_image_from_s3(bucket: str, key: str):
-    """S3에서 이미지를 읽어서 OpenCV 형식으로 반환"""
-    s3_client = boto3.client(
-        's3',
-        aws_access_key_id=AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-        region_name=AWS_REGION
-    )
+    """저장소 이미지를 OpenCV 형식으로 반환 (bucket은 호환용, 설정된 저장소 사용)"""
+    return storage.read_image(key)
+
+def upload_bytes_to_s3(data: bytes, s3_key, content_type=None):
+    """메모리 바이트 업로드 (임시 파일 없음)"""
     try:
-        response = s3_client.get_object(Bucket=bucket, Key=key)
-        file_stream = response['Body'].read()
-        np_arr = np.frombuffer(file_stream, np.uint8)
-        img = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
-        return img
+        url = storage.get_storage().put_bytes(s3_key, data, content_type)
+        logger.debug("업로드 성공: %s (%d bytes)", url, len(data))
+        return url
     except Exception as e:
-        print(f"Error reading image from S3: {e}")
-        return None
+        logger.error("업로드 에러 (%s): %s", s3_key, e)
+        raise
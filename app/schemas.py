@@ -1,6 +1,7 @@
 # 
 from pydantic import BaseModel
 from datetime import datetime
+from typing import List, Optional
 
 class VideoCreate(BaseModel):
     title: str
@@ -13,4 +14,20 @@ class VideoOut(BaseModel):
     audio_url: str
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+
+class DirectUploadCreate(BaseModel):
+    title: str
+    filename: str
+    script_filename: str = "script.txt"
+    size: int  # 영상 바이트 수 (multipart 분할 기준)
+    content_type: Optional[str] = None
+    profile: Optional[str] = None  # sample | cprofile
+
+class UploadedPart(BaseModel):
+    part_number: int
+    etag: str
+
+class DirectUploadComplete(BaseModel):
+    parts: List[UploadedPart] = []  # multipart일 때 part별 PUT 응답 ETag
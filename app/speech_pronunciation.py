@@ -3,12 +3,17 @@ import os
 import re
 import sys
 import shutil
+from typing import Optional, Union
 import numpy as np
-import whisper
 from pydub import AudioSegment
 from sqlalchemy.orm import Session
 from app.db import SessionLocal
 from app.models import Audio, Pronunciation, Score
+from app import stt_chunked, metrics
+from app.audio_buffer import AudioBuffer
+from app.log import get_logger
+
+logger = get_logger("pronunciation")
 
 try:
     from imageio_ffmpeg import get_ffmpeg_exe  # pip install imageio-ffmpeg
@@ -76,15 +81,6 @@ def _ensure_ffmpeg_on_path():
         pass
 
 
-# Whisper 모델 전역 캐시
-_WHISPER_MODEL = None
-def _get_whisper_model(model_size: str = "base"):
-    global _WHISPER_MODEL
-    if _WHISPER_MODEL is None:
-        _WHISPER_MODEL = whisper.load_model(model_size)
-    return _WHISPER_MODEL
-
-
 # ------------------ 한글 처리 보조 함수 ------------------
 def hangul_to_syllables(text: str):
     text = re.sub(r"[^가-힣 ]", "", text)
@@ -192,51 +188,63 @@ def get_or_create_script_text_from_file(db: Session, audio_id: int, script_path:
 
 
 # ------------------ 메인 엔트리: 발음 점수 ------------------
-def run_pronunciation_score(audio_id: int, wav_path: str, script_file_path: str, model_size: str = "base"):
+def run_pronunciation_score(audio_id: int, audio: Union[AudioBuffer, str], script_file_path: str,
+                            model_size: Optional[str] = None, stt_text: Optional[str] = None):
     """
-    ffmpeg PATH 보정 -> Whisper -> 정렬/점수 -> Pronunciation/Score 저장
+    ffmpeg PATH 보정 -> STT 백엔드 -> 정렬/점수 -> Pronunciation/Score 저장
+    audio: 공용 오디오 버퍼(AudioBuffer, 재디코딩 없음) 또는 로컬 오디오 파일 경로
+    model_size 미지정 시 STT_MODEL_SIZE (speed_analysis와 같은 인스턴스 공유).
+    stt_text가 주어지면(속도 분석/샤딩 경로에서 이미 전사한 경우) Whisper를 다시 돌리지 않음 (audio 미사용).
     """
     db: Session = SessionLocal()
     try:
-        _ensure_ffmpeg_on_path()
-
         # audio_id -> video_id 역추적
         audio_obj = db.query(Audio).filter(Audio.id == audio_id).first()
         if not audio_obj:
             raise ValueError(f"Audio not found for id={audio_id}")
         video_id = audio_obj.video_id
 
-        # 입력 파일 검증
-        if not wav_path or not os.path.exists(wav_path):
-            raise FileNotFoundError(f"Local wav not found: {wav_path}")
-
-        abs_audio = os.path.abspath(wav_path)
-        print("DEBUG | wav_path:", abs_audio, "exists:", os.path.exists(abs_audio))
-        print("DEBUG | ffmpeg which:", shutil.which("ffmpeg"))
-
         # 스크립트 저장/업데이트 (이 시점에 Pronunciation 레코드 보장)
         script_text, pron_obj = get_or_create_script_text_from_file(db, audio_id, script_file_path)
 
-        # 확장자 보정
-        audio_path = abs_audio
-        ext = os.path.splitext(audio_path)[1].lower()
-        if ext != ".wav":
-            audio = AudioSegment.from_file(audio_path)
-            wav_out = audio_path.rsplit(".", 1)[0] + ".wav"
-            audio.export(wav_out, format="wav")
-            audio_path = wav_out
-            print("DEBUG | converted to wav:", audio_path, "exists:", os.path.exists(audio_path))
-
-        # Whisper STT
-        model = _get_whisper_model(model_size)
-        result = model.transcribe(audio_path, language="ko")
-        stt_text = result["text"].strip()
+        if stt_text is not None:  # 전사 재사용 → 오디오 불필요 (체크포인트 재개 시 None 가능)
+            stt_input = None
+        elif isinstance(audio, AudioBuffer):
+            stt_input = audio
+        else:
+            _ensure_ffmpeg_on_path()
+
+            # 입력 파일 검증
+            if not audio or not os.path.exists(audio):
+                raise FileNotFoundError(f"Local wav not found: {audio}")
+
+            abs_audio = os.path.abspath(audio)
+            logger.debug("wav_path: %s, ffmpeg: %s", abs_audio, shutil.which("ffmpeg"))
+
+            # 확장자 보정
+            audio_path = abs_audio
+            ext = os.path.splitext(audio_path)[1].lower()
+            if ext != ".wav":
+                seg = AudioSegment.from_file(audio_path)
+                wav_out = audio_path.rsplit(".", 1)[0] + ".wav"
+                seg.export(wav_out, format="wav")
+                audio_path = wav_out
+                logger.debug("converted to wav: %s", audio_path)
+            stt_input = audio_path
+
+        # STT (이미 전사된 텍스트가 있으면 재사용)
+        if stt_text is None:
+            # 긴 오디오는 청크 병렬 전사
+            result = stt_chunked.transcribe(stt_input, language="ko", model_size=model_size)
+            stt_text = result["text"]
+        stt_text = stt_text.strip()
 
         # 비교/정렬
         ref_syll = hangul_to_syllables(script_text)
         hyp_syll = hangul_to_syllables(stt_text)
 
-        ops = align_ops(ref_syll, hyp_syll)
+        with metrics.span("pron.align", ref=len(ref_syll), hyp=len(hyp_syll)):
+            ops = align_ops(ref_syll, hyp_syll)
         n_insert = ops.count('I')
         n_delete = ops.count('D')
         n_match = ops.count('M')
@@ -315,9 +323,7 @@ def run_pronunciation_score(audio_id: int, wav_path: str, script_file_path: str,
 
         db.commit()
 
-        print(f"[matching_rate]: {match_score:.1f}")
-        print(f"[pronounciation_score]: {final_score:.1f}")
-        print("[INFO] Pronunciation scoring saved to DB")
+        logger.info("Pronunciation scoring saved to DB (matching_rate=%.1f, score=%.1f)", match_score, final_score)
 
     finally:
         try:
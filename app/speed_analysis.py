@@ -1,14 +1,15 @@
 import os
 import sys
 import shutil
-from typing import Tuple, List, Dict, Any, Optional
+from typing import Tuple, List, Dict, Any, Optional, Union
 
 import numpy as np
-import whisper
 from sqlalchemy.orm import Session
 from sklearn.neighbors import NearestNeighbors
 
 from app import crud
+from app import stt_chunked
+from app.audio_buffer import AudioBuffer
 from app.models import Knn  # mean_wpm 컬럼을 갖는 테이블(벤치마크 WPM 저장)
 
 # -------------------------------
@@ -81,15 +82,6 @@ def _ensure_ffmpeg_on_path() -> None:
         )
 
 
-# Whisper 모델 전역 캐시
-_MODEL = None
-def _get_model():
-    global _MODEL
-    if _MODEL is None:
-        _MODEL = whisper.load_model("base")
-    return _MODEL
-
-
 def build_speed_rows_from_segments(result: dict) -> List[Dict[str, Any]]:
     """
     Whisper result에서 구간별 속도 지표 생성 + 필터링 + wpm_band 라벨링
@@ -106,7 +98,8 @@ def build_speed_rows_from_segments(result: dict) -> List[Dict[str, Any]]:
         end = float(seg.get("end", 0.0))
         text = (seg.get("text") or "").strip()
         num_words = len(seg["words"]) if "words" in seg else len(text.split())
-        duration = max(end - start, 1e-6)
+        # VAD 전사 결과는 세그먼트 내 제거된 무음을 뺀 실제 발화 길이(speech_sec) 사용
+        duration = max(float(seg.get("speech_sec", end - start)), 1e-6)
         wps = num_words / duration
 
         # 필터 조건
@@ -160,6 +153,7 @@ def calculate_overall_wpm_and_knn_score_db(
 ) -> Tuple[float, float]:
     """
     전체 발화 기준 WPM + (선택)KNN 기반 점수 계산
+    - result["speech_sec"](VAD 발화 시간)가 있으면 그 시간 기준
     - knn이 None이면 knn_score=0
     """
     all_words: List[str] = []
@@ -177,6 +171,9 @@ def calculate_overall_wpm_and_knn_score_db(
 
     total_words = len(all_words)
     total_duration = (all_end - all_start) if (all_start is not None and all_end is not None) else 0.0
+    # VAD 전사 결과면 첫~끝 구간 대신 실제 발화 시간 기준 (긴 무음이 WPM을 낮추지 않도록)
+    if result.get("speech_sec") and total_words:
+        total_duration = min(total_duration, float(result["speech_sec"]))
 
     wpm = 0.0
     knn_score = 0.0
@@ -213,30 +210,17 @@ def apply_bad_ratio_penalty(knn_score: float, speed_rows: List[Dict[str, Any]],
     return final_score, bad_ratio, penalty_ratio
 
 
-def analyze_and_save_speed(db: Session, audio_id: int, wav_path: str) -> Dict[str, Any]:
+def save_speed_from_result(db: Session, audio_id: int, result: dict) -> Dict[str, Any]:
     """
-    로컬 WAV 경로를 받아 Whisper로 속도 분석 후:
+    Whisper 형식 result(segments/words/text)로부터:
       1) segment speed rows 생성 및 저장(구간별 wpm_band 포함)
       2) 전체 wpm 및 KNN 점수 계산
       3) good/bad 비율 기반 감점 적용 → final_score 도출
-    반환 dict은 프론트 디버깅/로그용. 실제 점수 저장은 기존 점수 테이블 로직에 연결.
+    샤딩/청크 전사 결과를 병합한 result도 그대로 받을 수 있음.
     """
-    _ensure_ffmpeg_on_path()
-
-    if not wav_path or not os.path.exists(wav_path):
-        raise FileNotFoundError(f"Local wav not found: {wav_path}")
-
     # KNN 벤치마크 구성
     knn, scale = get_knn_model_from_db(db)
 
-    # Whisper
-    model = _get_model()
-    result = model.transcribe(
-        wav_path,
-        word_timestamps=True,
-        language="ko",
-    )
-
     # 세그먼트 속도 계산 + 라벨링
     speed_rows = build_speed_rows_from_segments(result)
     if speed_rows:
@@ -260,3 +244,26 @@ def analyze_and_save_speed(db: Session, audio_id: int, wav_path: str) -> Dict[st
         "penalty_ratio": penalty_ratio,     # = bad_ratio * MAX_PENALTY_RATIO
         "wpm_range": (WPM_GOOD_MIN, WPM_GOOD_MAX),
     }
+
+
+def analyze_and_save_speed(db: Session, audio_id: int, audio: Union[AudioBuffer, str]) -> Dict[str, Any]:
+    """
+    공용 오디오 버퍼(AudioBuffer) 또는 로컬 WAV 경로를 받아 STT 백엔드로 전사한 뒤
+    save_speed_from_result로 점수 계산/저장.
+    반환 dict은 프론트 디버깅/로그용. 실제 점수 저장은 기존 점수 테이블 로직에 연결.
+    """
+    if not isinstance(audio, AudioBuffer):
+        _ensure_ffmpeg_on_path()
+        if not audio or not os.path.exists(audio):
+            raise FileNotFoundError(f"Local wav not found: {audio}")
+
+    # STT (기본 openai-whisper, STT_BACKEND로 교체 가능 / 긴 오디오는 청크 병렬 전사)
+    result = stt_chunked.transcribe(
+        audio,
+        word_timestamps=True,
+        language="ko",
+    )
+
+    speed_res = save_speed_from_result(db, audio_id, result)
+    speed_res["text"] = result.get("text", "")  # 전사 텍스트 (발음 분석 재사용, 체크포인트 저장)
+    return speed_res
@@ -0,0 +1,517 @@
+# 아티팩트 저장소 추상화 (put / get / list / URL)
+# - STORAGE_BACKEND=s3(기본, AWS) | minio(S3 호환 서버: STORAGE_ENDPOINT_URL, path-style URL) | local(STORAGE_LOCAL_DIR)
+# - url(key): DB(Frame.image_url 등)에 저장하고 다시 매칭하는 공개 URL — 키 ↔ URL 변환은 이 모듈에서만
+#   (s3: https://{bucket}.s3.{region}.amazonaws.com/{key}, STORAGE_PUBLIC_URL이 있으면 {base}/{key})
+# - 읽기 캐시: STORAGE_CACHE_MB > 0이면 get 결과를 STORAGE_CACHE_DIR에 디스크 LRU로 보관 (put은 캐시에도 기록)
+#   → 같은 영상 재분석 시 GET 반복 없음. 프로세스별 캐시 (여러 워커 프로세스가 같은 디렉터리를 쓰지 않도록 pid 하위 폴더)
+# - 범위 참조(ref): "{key}#bytes={start}-{end}" (end 포함, HTTP Range와 동일) → pack 파일 안의 개별 이미지 (artifact_pack.py)
+#   read_ref / read_image는 일반 키와 범위 참조를 모두 받음 (범위 참조는 Range GET 1회)
+# - 직접 업로드(direct_upload.py): presigned PUT / multipart는 S3·MinIO만 지원 (local은 NotImplementedError)
+import os
+import shutil
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from app import metrics
+from app.config import (
+    AWS_ACCESS_KEY_ID,
+    AWS_SECRET_ACCESS_KEY,
+    AWS_BUCKET_NAME,
+    AWS_REGION,
+    STORAGE_BACKEND,
+    STORAGE_ENDPOINT_URL,
+    STORAGE_LOCAL_DIR,
+    STORAGE_PUBLIC_URL,
+    STORAGE_CACHE_DIR,
+    STORAGE_CACHE_MB,
+)
+from app.log import get_logger
+
+logger = get_logger("storage")
+
+_MB = 1024 * 1024
+RANGE_SEP = "#bytes="
+
+CACHE_LOOKUPS = metrics.counter("storage_cache_total", "Storage read-cache lookups, by result (hit|miss)")
+
+
+class Storage:
+    """키(예: frames/{video_id}/frame_{ms}.jpg) 기반 객체 저장소"""
+    name = "base"
+
+    def __init__(self, public_url: str = ""):
+        self.public_url = public_url.rstrip("/")
+
+    # --- 백엔드 구현 ---
+    def _put(self, key: str, data: bytes, content_type: Optional[str]) -> None:
+        raise NotImplementedError
+
+    def _put_file(self, path: str, key: str) -> None:
+        with open(path, "rb") as f:
+            self._put(key, f.read(), None)
+
+    def _get(self, key: str) -> bytes:
+        raise NotImplementedError
+
+    def _get_range(self, key: str, start: int, end: int) -> bytes:
+        return self._get(key)[start:end + 1]
+
+    def _download(self, key: str, path: str) -> None:
+        with open(path, "wb") as f:
+            f.write(self._get(key))
+
+    def list(self, prefix: str) -> List[str]:
+        """prefix 아래 키 전체 (페이지 나눔 처리, 정렬)"""
+        raise NotImplementedError
+
+    def _default_url(self, key: str) -> str:
+        raise NotImplementedError
+
+    def size(self, key: str) -> Optional[int]:
+        """객체 크기 (없으면 None)"""
+        raise NotImplementedError
+
+    # --- 직접 업로드 (presigned) ---
+    def presign_put(self, key: str, expires_sec: int, content_type: Optional[str] = None) -> str:
+        raise NotImplementedError(f"{self.name} storage does not support presigned uploads")
+
+    def create_multipart(self, key: str, content_type: Optional[str] = None) -> str:
+        raise NotImplementedError(f"{self.name} storage does not support presigned uploads")
+
+    def presign_part(self, key: str, upload_id: str, part_number: int, expires_sec: int) -> str:
+        raise NotImplementedError(f"{self.name} storage does not support presigned uploads")
+
+    def complete_multipart(self, key: str, upload_id: str, parts: List[Tuple[int, str]]) -> None:
+        raise NotImplementedError(f"{self.name} storage does not support presigned uploads")
+
+    def abort_multipart(self, key: str, upload_id: str) -> None:
+        raise NotImplementedError(f"{self.name} storage does not support presigned uploads")
+
+    # --- 공용 API ---
+    def url(self, key: str) -> str:
+        if self.public_url:
+            return f"{self.public_url}/{key}"
+        return self._default_url(key)
+
+    def key_from_url(self, url: str) -> Optional[str]:
+        """url(key)의 역변환 (이 저장소 URL이 아니면 None)"""
+        base = self.url("")
+        return url[len(base):] if url and url.startswith(base) else None
+
+    def put_bytes(self, key: str, data: bytes, content_type: Optional[str] = None) -> str:
+        """바이트 업로드 → URL"""
+        with metrics.span("storage.put", backend=self.name):
+            self._put(key, data, content_type)
+        return self.url(key)
+
+    def put_file(self, path: str, key: str) -> str:
+        """로컬 파일 업로드 → URL"""
+        with metrics.span("storage.put", backend=self.name):
+            self._put_file(path, key)
+        return self.url(key)
+
+    def get_bytes(self, key: str, byte_range: Optional[Tuple[int, int]] = None, cached: bool = True) -> bytes:
+        """전체 객체 또는 byte_range=(start, end) 구간 (end 포함), cached=False는 읽기 캐시 우회 (갱신되는 상태 파일)"""
+        with metrics.span("storage.get", backend=self.name):
+            if byte_range is not None:
+                return self._get_range(key, *byte_range)
+            return self._get(key)
+
+    def download(self, key: str, path: str) -> str:
+        with metrics.span("storage.get", backend=self.name):
+            self._download(key, path)
+        return path
+
+
+class S3Storage(Storage):
+    """AWS S3 / S3 호환(MinIO 등, endpoint_url 지정) — boto3 클라이언트 1개를 재사용 (스레드 안전)"""
+
+    def __init__(self, bucket: str, region: Optional[str], endpoint_url: str = "", public_url: str = ""):
+        super().__init__(public_url)
+        self.bucket = bucket
+        self.region = region
+        self.endpoint_url = endpoint_url.rstrip("/")
+        self.name = "minio" if endpoint_url else "s3"
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    import boto3
+                    kwargs = {
+                        "aws_access_key_id": AWS_ACCESS_KEY_ID,
+                        "aws_secret_access_key": AWS_SECRET_ACCESS_KEY,
+                        "region_name": self.region,
+                    }
+                    if self.endpoint_url:
+                        kwargs["endpoint_url"] = self.endpoint_url
+                    self._client = boto3.client("s3", **kwargs)
+        return self._client
+
+    def _put(self, key: str, data: bytes, content_type: Optional[str]) -> None:
+        extra = {"ContentType": content_type} if content_type else {}
+        self.client.put_object(Bucket=self.bucket, Key=key, Body=data, **extra)
+
+    def _put_file(self, path: str, key: str) -> None:
+        self.client.upload_file(path, self.bucket, key)  # 큰 파일은 멀티파트
+
+    def _get(self, key: str) -> bytes:
+        return self.client.get_object(Bucket=self.bucket, Key=key)["Body"].read()
+
+    def _get_range(self, key: str, start: int, end: int) -> bytes:
+        return self.client.get_object(Bucket=self.bucket, Key=key, Range=f"bytes={start}-{end}")["Body"].read()
+
+    def _download(self, key: str, path: str) -> None:
+        self.client.download_file(self.bucket, key, path)
+
+    def list(self, prefix: str) -> List[str]:
+        keys: List[str] = []
+        token = None
+        while True:
+            kwargs = {"Bucket": self.bucket, "Prefix": prefix, "MaxKeys": 1000}
+            if token:
+                kwargs["ContinuationToken"] = token
+            resp = self.client.list_objects_v2(**kwargs)
+            keys.extend(o["Key"] for o in resp.get("Contents", []))
+            if not resp.get("IsTruncated"):
+                break
+            token = resp.get("NextContinuationToken")
+        return sorted(keys)
+
+    def _default_url(self, key: str) -> str:
+        if self.endpoint_url:
+            return f"{self.endpoint_url}/{self.bucket}/{key}"  # path-style
+        return f"https://{self.bucket}.s3.{self.region}.amazonaws.com/{key}"
+
+    def size(self, key: str) -> Optional[int]:
+        try:
+            return int(self.client.head_object(Bucket=self.bucket, Key=key)["ContentLength"])
+        except Exception:
+            return None
+
+    def presign_put(self, key: str, expires_sec: int, content_type: Optional[str] = None) -> str:
+        params = {"Bucket": self.bucket, "Key": key}
+        if content_type:
+            params["ContentType"] = content_type
+        return self.client.generate_presigned_url("put_object", Params=params, ExpiresIn=expires_sec)
+
+    def create_multipart(self, key: str, content_type: Optional[str] = None) -> str:
+        extra = {"ContentType": content_type} if content_type else {}
+        return self.client.create_multipart_upload(Bucket=self.bucket, Key=key, **extra)["UploadId"]
+
+    def presign_part(self, key: str, upload_id: str, part_number: int, expires_sec: int) -> str:
+        params = {"Bucket": self.bucket, "Key": key, "UploadId": upload_id, "PartNumber": part_number}
+        return self.client.generate_presigned_url("upload_part", Params=params, ExpiresIn=expires_sec)
+
+    def complete_multipart(self, key: str, upload_id: str, parts: List[Tuple[int, str]]) -> None:
+        self.client.complete_multipart_upload(
+            Bucket=self.bucket, Key=key, UploadId=upload_id,
+            MultipartUpload={"Parts": [{"PartNumber": n, "ETag": etag} for n, etag in sorted(parts)]},
+        )
+
+    def abort_multipart(self, key: str, upload_id: str) -> None:
+        self.client.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+
+
+class LocalStorage(Storage):
+    """로컬 디렉터리 (개발/벤치마크). URL은 STORAGE_PUBLIC_URL 또는 file://"""
+    name = "local"
+
+    def __init__(self, root: str, public_url: str = ""):
+        super().__init__(public_url)
+        self.root = os.path.abspath(root)
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, *key.split("/")))
+        if not path.startswith(self.root + os.sep):
+            raise ValueError(f"Invalid storage key: {key}")
+        return path
+
+    def _put(self, key: str, data: bytes, content_type: Optional[str]) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def _put_file(self, path: str, key: str) -> None:
+        dst = self._path(key)
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        shutil.copyfile(path, dst)
+
+    def _get(self, key: str) -> bytes:
+        with open(self._path(key), "rb") as f:
+            return f.read()
+
+    def _get_range(self, key: str, start: int, end: int) -> bytes:
+        with open(self._path(key), "rb") as f:
+            f.seek(start)
+            return f.read(end - start + 1)
+
+    def _download(self, key: str, path: str) -> None:
+        shutil.copyfile(self._path(key), path)
+
+    def list(self, prefix: str) -> List[str]:
+        keys: List[str] = []
+        # prefix의 디렉터리 부분만 탐색
+        base = os.path.join(self.root, *prefix.split("/")[:-1])
+        for dirpath, _, files in os.walk(base):
+            for name in files:
+                if name.endswith(".tmp"):
+                    continue
+                key = os.path.relpath(os.path.join(dirpath, name), self.root).replace(os.sep, "/")
+                if key.startswith(prefix):
+                    keys.append(key)
+        return sorted(keys)
+
+    def size(self, key: str) -> Optional[int]:
+        path = self._path(key)
+        return os.path.getsize(path) if os.path.isfile(path) else None
+
+    def _default_url(self, key: str) -> str:
+        return "file://" + os.path.join(self.root, *key.split("/")) if key else "file://" + self.root + os.sep
+
+
+# -----------------------------
+# 디스크 LRU 읽기 캐시
+# -----------------------------
+def _write_bytes(path: str, data: bytes) -> None:
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+class DiskLRUCache:
+    """키 → 파일(sha1 이름). 총 크기가 max_bytes를 넘으면 오래 안 쓴 항목부터 삭제"""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.dir = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # 파일명 → 크기 (LRU 순)
+        self._total = 0
+        os.makedirs(directory, exist_ok=True)
+        # 기존 파일은 수정 시각 순으로 복원
+        existing = []
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if os.path.isfile(path) and not name.endswith(".tmp"):
+                st = os.stat(path)
+                existing.append((st.st_mtime, name, st.st_size))
+        for _, name, size in sorted(existing):
+            self._entries[name] = size
+            self._total += size
+        self._evict()
+
+    @staticmethod
+    def _name(key: str) -> str:
+        return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        name = self._name(key)
+        with self._lock:
+            if name not in self._entries:
+                return None
+            self._entries.move_to_end(name)
+        try:
+            with open(os.path.join(self.dir, name), "rb") as f:
+                return f.read()
+        except OSError:
+            with self._lock:
+                self._total -= self._entries.pop(name, 0)
+            return None
+
+    def get_file(self, key: str, dest: str) -> bool:
+        """캐시 항목을 dest로 복사 (메모리에 올리지 않음) → 적중 여부"""
+        name = self._name(key)
+        with self._lock:
+            if name not in self._entries:
+                return False
+            self._entries.move_to_end(name)
+        try:
+            shutil.copyfile(os.path.join(self.dir, name), dest)
+            return True
+        except OSError:
+            with self._lock:
+                self._total -= self._entries.pop(name, 0)
+            return False
+
+    def put(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        self._store(key, len(data), lambda tmp: _write_bytes(tmp, data))
+
+    def put_file(self, key: str, src: str) -> None:
+        """로컬 파일을 캐시에 복사 (max_bytes보다 크면 캐시하지 않음)"""
+        size = os.path.getsize(src)
+        if size > self.max_bytes:
+            return
+        self._store(key, size, lambda tmp: shutil.copyfile(src, tmp))
+
+    def _store(self, key: str, size: int, write) -> None:
+        name = self._name(key)
+        path = os.path.join(self.dir, name)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            write(tmp)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning("Storage cache write failed: %s", e)
+            return
+        with self._lock:
+            self._total += size - self._entries.pop(name, 0)
+            self._entries[name] = size
+            self._evict()
+
+    def _evict(self) -> None:
+        while self._total > self.max_bytes and self._entries:
+            name, size = self._entries.popitem(last=False)
+            self._total -= size
+            try:
+                os.remove(os.path.join(self.dir, name))
+            except OSError:
+                pass
+
+
+class CachedStorage(Storage):
+    """다른 저장소 앞단 읽기 캐시 (get_bytes/download만 캐시, put은 원본 + 캐시에 기록)"""
+
+    def __init__(self, inner: Storage, cache: DiskLRUCache):
+        super().__init__(inner.public_url)
+        self.inner = inner
+        self.cache = cache
+        self.name = inner.name
+
+    def url(self, key: str) -> str:
+        return self.inner.url(key)
+
+    def list(self, prefix: str) -> List[str]:
+        return self.inner.list(prefix)
+
+    def size(self, key: str) -> Optional[int]:
+        return self.inner.size(key)
+
+    def presign_put(self, key: str, expires_sec: int, content_type: Optional[str] = None) -> str:
+        return self.inner.presign_put(key, expires_sec, content_type)
+
+    def create_multipart(self, key: str, content_type: Optional[str] = None) -> str:
+        return self.inner.create_multipart(key, content_type)
+
+    def presign_part(self, key: str, upload_id: str, part_number: int, expires_sec: int) -> str:
+        return self.inner.presign_part(key, upload_id, part_number, expires_sec)
+
+    def complete_multipart(self, key: str, upload_id: str, parts: List[Tuple[int, str]]) -> None:
+        self.inner.complete_multipart(key, upload_id, parts)
+
+    def abort_multipart(self, key: str, upload_id: str) -> None:
+        self.inner.abort_multipart(key, upload_id)
+
+    def put_bytes(self, key: str, data: bytes, content_type: Optional[str] = None) -> str:
+        url = self.inner.put_bytes(key, data, content_type)
+        self.cache.put(key, data)
+        return url
+
+    def put_file(self, path: str, key: str) -> str:
+        url = self.inner.put_file(path, key)
+        self.cache.put_file(key, path)
+        return url
+
+    def get_bytes(self, key: str, byte_range: Optional[Tuple[int, int]] = None, cached: bool = True) -> bytes:
+        if not cached:
+            return self.inner.get_bytes(key, byte_range)
+        cache_key = key if byte_range is None else range_ref(key, byte_range[0], byte_range[1] - byte_range[0] + 1)
+        data = self.cache.get(cache_key)
+        if data is not None:
+            CACHE_LOOKUPS.inc(result="hit")
+            return data
+        CACHE_LOOKUPS.inc(result="miss")
+        data = self.inner.get_bytes(key, byte_range)
+        self.cache.put(cache_key, data)
+        return data
+
+    def download(self, key: str, path: str) -> str:
+        # 파일 단위로 복사 (원본 영상처럼 큰 객체도 메모리에 올리지 않음), 캐시 상한보다 큰 객체는 캐시하지 않음
+        if self.cache.get_file(key, path):
+            CACHE_LOOKUPS.inc(result="hit")
+            return path
+        CACHE_LOOKUPS.inc(result="miss")
+        self.inner.download(key, path)  # 백엔드 스트리밍 다운로드 (S3: download_file)
+        self.cache.put_file(key, path)
+        return path
+
+
+# -----------------------------
+# 진입점
+# -----------------------------
+_storage: Optional[Storage] = None
+_storage_lock = threading.Lock()
+
+
+def _create() -> Storage:
+    backend = STORAGE_BACKEND.lower()
+    if backend == "local":
+        inner: Storage = LocalStorage(STORAGE_LOCAL_DIR, STORAGE_PUBLIC_URL)
+    elif backend in ("s3", "minio"):
+        if backend == "minio" and not STORAGE_ENDPOINT_URL:
+            raise ValueError("STORAGE_BACKEND=minio requires STORAGE_ENDPOINT_URL")
+        inner = S3Storage(AWS_BUCKET_NAME, AWS_REGION, STORAGE_ENDPOINT_URL, STORAGE_PUBLIC_URL)
+    else:
+        raise ValueError(f"Unknown storage backend: {STORAGE_BACKEND} (available: s3, minio, local)")
+    if STORAGE_CACHE_MB > 0:
+        cache_dir = os.path.join(STORAGE_CACHE_DIR, str(os.getpid()))
+        return CachedStorage(inner, DiskLRUCache(cache_dir, int(STORAGE_CACHE_MB * _MB)))
+    return inner
+
+
+def get_storage() -> Storage:
+    """설정(STORAGE_BACKEND) 기준 저장소 (프로세스당 1개)"""
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                _storage = _create()
+                logger.info("Storage backend: %s%s", _storage.name,
+                            " (read cache %.0fMB)" % STORAGE_CACHE_MB if STORAGE_CACHE_MB > 0 else "")
+    return _storage
+
+
+def range_ref(key: str, start: int, length: int) -> str:
+    """key의 [start, start+length) 구간 참조"""
+    return f"{key}{RANGE_SEP}{start}-{start + length - 1}"
+
+
+def parse_ref(ref: str) -> Tuple[str, Optional[Tuple[int, int]]]:
+    """ref → (key, (start, end) 또는 None)"""
+    key, sep, rng = ref.partition(RANGE_SEP)
+    if not sep:
+        return ref, None
+    start, _, end = rng.partition("-")
+    return key, (int(start), int(end))
+
+
+def read_ref(ref: str) -> bytes:
+    """키 또는 범위 참조 → 바이트"""
+    key, byte_range = parse_ref(ref)
+    return get_storage().get_bytes(key, byte_range)
+
+
+def read_image(key: str):
+    """저장소 이미지(키 또는 범위 참조) → OpenCV BGR 배열 (읽기/디코딩 실패 시 None)"""
+    import cv2
+    import numpy as np
+
+    try:
+        data = read_ref(key)
+    except Exception as e:
+        logger.error("Failed to read %s: %s", key, e)
+        return None
+    img = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+    if img is None:
+        logger.error("Failed to decode image: %s", key)
+    return img
@@ -0,0 +1,164 @@
+# STT 백엔드 인터페이스
+# - speed_analysis / speech_pronunciation 은 get_stt_backend().transcribe(...)만 사용
+# - 반환 형식은 openai-whisper transcribe()와 동일:
+#   {"text": str, "language": str,
+#    "segments": [{"id", "start", "end", "text", "words": [{"word", "start", "end", "probability"}]}]}
+# - STT_BACKEND=whisper(기본, openai-whisper fp32) | faster-whisper(CTranslate2, CPU int8 양자화)
+from typing import Any, Dict, List, Optional, Tuple
+
+from app import metrics
+from app.config import STT_BACKEND, STT_MODEL_SIZE, STT_COMPUTE_TYPE, STT_CPU_THREADS
+from app.model_registry import registry, get_whisper
+
+
+class SttBackend:
+    """audio: 파일 경로 또는 16kHz mono float32 numpy 배열"""
+    name = "base"
+
+    def __init__(self, model_size: str):
+        self.model_size = model_size
+
+    def transcribe(self, audio, language: str = "ko", word_timestamps: bool = False) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def load(self) -> None:
+        """모델 로드만 수행 (워밍업용)"""
+        raise NotImplementedError
+
+
+class OpenAIWhisperBackend(SttBackend):
+    name = "whisper"
+
+    def load(self) -> None:
+        get_whisper(self.model_size)
+
+    def transcribe(self, audio, language: str = "ko", word_timestamps: bool = False) -> Dict[str, Any]:
+        model = get_whisper(self.model_size)
+        with metrics.span("stt.transcribe", backend=self.name):
+            return model.transcribe(audio, word_timestamps=word_timestamps, language=language)
+
+
+def _load_faster_whisper(model_size: str, compute_type: str, cpu_threads: int):
+    from faster_whisper import WhisperModel  # pip install faster-whisper
+    return WhisperModel(model_size, device="cpu", compute_type=compute_type, cpu_threads=cpu_threads)
+
+
+class FasterWhisperBackend(SttBackend):
+    """CTranslate2 기반 Whisper (CPU int8). 결과를 openai-whisper 형식으로 변환"""
+    name = "faster-whisper"
+
+    def __init__(self, model_size: str, compute_type: str = STT_COMPUTE_TYPE, cpu_threads: int = STT_CPU_THREADS):
+        super().__init__(model_size)
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self.registry_name = f"faster-whisper:{model_size}:{compute_type}"
+        registry.register(
+            self.registry_name,
+            lambda: _load_faster_whisper(model_size, compute_type, cpu_threads),
+            estimate_mb=150.0,
+        )
+
+    def load(self) -> None:
+        registry.get(self.registry_name)
+
+    def transcribe(self, audio, language: str = "ko", word_timestamps: bool = False) -> Dict[str, Any]:
+        model = registry.get(self.registry_name)
+        with metrics.span("stt.transcribe", backend=self.name):
+            return self._transcribe(model, audio, language, word_timestamps)
+
+    def _transcribe(self, model, audio, language: str, word_timestamps: bool) -> Dict[str, Any]:
+        seg_iter, info = model.transcribe(audio, language=language, word_timestamps=word_timestamps)
+
+        segments = []
+        texts = []
+        for seg in seg_iter:  # generator: 순회 시점에 실제 디코딩
+            item = {
+                "id": len(segments),
+                "start": float(seg.start),
+                "end": float(seg.end),
+                "text": seg.text,
+                "avg_logprob": getattr(seg, "avg_logprob", None),
+                "no_speech_prob": getattr(seg, "no_speech_prob", None),
+            }
+            if word_timestamps:
+                item["words"] = [
+                    {
+                        "word": w.word,
+                        "start": float(w.start),
+                        "end": float(w.end),
+                        "probability": float(w.probability),
+                    }
+                    for w in (seg.words or [])
+                ]
+            segments.append(item)
+            texts.append(seg.text)
+
+        return {
+            "text": "".join(texts),
+            "segments": segments,
+            "language": getattr(info, "language", language),
+        }
+
+
+_BACKENDS = {
+    OpenAIWhisperBackend.name: OpenAIWhisperBackend,
+    FasterWhisperBackend.name: FasterWhisperBackend,
+}
+_instances: Dict[tuple, SttBackend] = {}
+
+
+def get_stt_backend(name: Optional[str] = None, model_size: Optional[str] = None) -> SttBackend:
+    """설정(STT_BACKEND/STT_MODEL_SIZE) 기준 백엔드 (엔진/크기별 1개)"""
+    name = (name or STT_BACKEND).lower()
+    model_size = model_size or STT_MODEL_SIZE
+    if name not in _BACKENDS:
+        raise ValueError(f"Unknown STT backend: {name} (available: {', '.join(_BACKENDS)})")
+    key = (name, model_size)
+    if key not in _instances:
+        _instances[key] = _BACKENDS[name](model_size)
+    return _instances[key]
+
+
+# -----------------------------
+# 결과 시각 이동/병합 (샤드·청크 전사 공용)
+# -----------------------------
+def shift_segments(segments: List[Dict[str, Any]], offset: float) -> List[Dict[str, Any]]:
+    """segments/words 시각을 offset(초)만큼 이동 (원본 타임라인 기준으로 복원)"""
+    shifted = []
+    for seg in segments:
+        seg = dict(seg)
+        seg["start"] = float(seg.get("start", 0.0)) + offset
+        seg["end"] = float(seg.get("end", 0.0)) + offset
+        if "words" in seg:
+            words = []
+            for w in seg["words"]:
+                w = dict(w)
+                if "start" in w:
+                    w["start"] = float(w["start"]) + offset
+                if "end" in w:
+                    w["end"] = float(w["end"]) + offset
+                words.append(w)
+            seg["words"] = words
+        shifted.append(seg)
+    return shifted
+
+
+def merge_results(parts: List[Tuple[float, Dict[str, Any]]], language: str = "ko") -> Dict[str, Any]:
+    """
+    [(offset, result), ...] (시간순) → 단일 result.
+    offset은 각 result 시각의 원본 기준 시작점(이미 이동된 결과면 0.0).
+    """
+    segments: List[Dict[str, Any]] = []
+    texts: List[str] = []
+    speech_secs = [result.get("speech_sec") for _, result in parts]
+    for offset, result in parts:
+        for seg in shift_segments(result.get("segments", []), offset):
+            seg["id"] = len(segments)
+            segments.append(seg)
+        text = (result.get("text") or "").strip()
+        if text:
+            texts.append(text)
+    merged = {"segments": segments, "text": " ".join(texts), "language": language}
+    if parts and all(v is not None for v in speech_secs):
+        merged["speech_sec"] = float(sum(speech_secs))  # VAD 발화 시간 합
+    return merged
@@ -0,0 +1,246 @@
+# 긴 오디오 병렬 청크 전사
+# - 16kHz mono float32 오디오(공용 AudioBuffer 또는 디코딩 결과) → 목표 길이(STT_CHUNK_SEC) 근처의 무음 구간에서 분할
+# - 청크를 공용 프로세스 풀에서 STT 백엔드로 전사 (AudioBuffer면 워커가 구간만 memmap으로 읽음, 배열 pickle 없음) → segments/words 시각을 원본 기준으로 보정해 병합
+# - 풀은 최대 워커 수로 1개만 두고, 작업별 동시 청크 수는 메모리 예산(memory.max_workers)으로 제한
+# - 병합 결과는 Whisper result 형식 그대로 (build_speed_rows_from_segments / 발음 정렬과 호환)
+import os
+import threading
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from app.audio_buffer import SAMPLE_RATE, AudioBuffer, load_audio
+from app.config import (
+    MEMORY_STT_WORKER_MB,
+    STT_CHUNK_MIN_DURATION_SEC,
+    STT_CHUNK_SEC,
+    STT_CHUNK_WORKERS,
+    VAD_ENABLED,
+)
+from app.stt_backend import get_stt_backend, merge_results
+from app import memory, vad
+from app.vad import frame_db as _frame_db
+from app.log import get_logger
+
+logger = get_logger("stt")
+
+FRAME_SEC = vad.FRAME_SEC  # 에너지 계산 프레임 (30ms)
+MIN_SILENCE_SEC = 0.3     # 분할 후보가 되는 최소 무음 길이
+SILENCE_DB_BELOW_PEAK = 30.0  # 상위 5% 에너지 대비 이만큼 낮으면 무음
+
+_EXECUTOR: Optional[ProcessPoolExecutor] = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+# -----------------------------
+# 무음 경계 분할
+# -----------------------------
+def _best_cut(silent: np.ndarray, db: np.ndarray, lo: int, hi: int, target: int, min_run: int) -> int:
+    """[lo, hi] 안에서 가장 긴 무음 구간의 중앙(동률이면 target에 가까운 쪽), 없으면 최저 에너지 프레임"""
+    best = None  # (run_len, -distance, mid)
+    i = lo
+    while i <= hi:
+        if silent[i]:
+            j = i
+            while j + 1 <= hi and silent[j + 1]:
+                j += 1
+            run = j - i + 1
+            if run >= min_run:
+                mid = (i + j) // 2
+                cand = (run, -abs(mid - target), mid)
+                if best is None or cand > best:
+                    best = cand
+            i = j + 1
+        else:
+            i += 1
+    if best is not None:
+        return best[2]
+    return lo + int(np.argmin(db[lo:hi + 1]))
+
+
+def find_silence_cuts(audio: np.ndarray, sr: int = SAMPLE_RATE, chunk_sec: float = STT_CHUNK_SEC,
+                      search_sec: Optional[float] = None) -> List[float]:
+    """목표 길이마다 ±search_sec 안의 무음 구간에서 자를 시각(초) 목록"""
+    total = len(audio) / sr
+    if total <= chunk_sec * 1.5:
+        return []
+    search_sec = search_sec if search_sec is not None else chunk_sec * 0.25
+
+    db = _frame_db(audio, sr)
+    if len(db) == 0:
+        return []
+    silent = db < (np.percentile(db, 95) - SILENCE_DB_BELOW_PEAK)
+    min_run = max(1, int(MIN_SILENCE_SEC / FRAME_SEC))
+
+    cuts: List[float] = []
+    pos = 0.0
+    while total - pos > chunk_sec * 1.5:
+        target = pos + chunk_sec
+        lo = max(int((target - search_sec) / FRAME_SEC), int((pos + 1.0) / FRAME_SEC))
+        hi = min(int((target + search_sec) / FRAME_SEC), len(db) - 1)
+        if hi <= lo:
+            break
+        cut = _best_cut(silent, db, lo, hi, int(target / FRAME_SEC), min_run) * FRAME_SEC
+        cuts.append(cut)
+        pos = cut
+    return cuts
+
+
+def chunk_bounds(audio: np.ndarray, sr: int = SAMPLE_RATE, chunk_sec: float = STT_CHUNK_SEC
+                 ) -> List[Tuple[float, float]]:
+    """[(start_sec, end_sec), ...] (빈 구간 제외)"""
+    bounds = [0.0] + find_silence_cuts(audio, sr, chunk_sec) + [len(audio) / sr]
+    return [(s, e) for s, e in zip(bounds[:-1], bounds[1:]) if int(e * sr) > int(s * sr)]
+
+
+def split_at_silence(audio: np.ndarray, sr: int = SAMPLE_RATE, chunk_sec: float = STT_CHUNK_SEC
+                     ) -> List[Tuple[float, np.ndarray]]:
+    """[(offset_sec, chunk), ...]"""
+    return [(s, audio[int(s * sr): int(e * sr)]) for s, e in chunk_bounds(audio, sr, chunk_sec)]
+
+
+# -----------------------------
+# 프로세스 풀
+# -----------------------------
+def _pool_size() -> int:
+    """공용 풀 크기 (STT_CHUNK_WORKERS, 0이면 코어 수)"""
+    return max(1, STT_CHUNK_WORKERS if STT_CHUNK_WORKERS > 0 else (os.cpu_count() or 1))
+
+
+def _resolve_workers() -> int:
+    """작업 1개의 동시 청크 수 (풀 크기, 메모리 예산으로 제한 — 1개면 백엔드 단일 호출)"""
+    return memory.max_workers("stt", MEMORY_STT_WORKER_MB, _pool_size())
+
+
+def _init_worker(n_threads: int) -> None:
+    # 워커 수 × torch 스레드가 코어 수를 넘지 않도록
+    try:
+        import torch
+        torch.set_num_threads(max(1, n_threads))
+    except Exception:
+        pass
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    """
+    청크 전사용 공용 프로세스 풀 (최대 크기로 1번만 생성, 워커에 모델이 로드된 채로 재사용).
+    spawn 풀은 필요할 때만 워커를 띄우고, 작업별 동시 청크 수는 transcribe_chunked가 제한
+    → 메모리 예산이 바뀌어도 풀을 다시 만들지 않음 (다른 작업이 제출 중인 풀을 닫지 않음)
+    """
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            size = _pool_size()
+            _EXECUTOR = ProcessPoolExecutor(
+                max_workers=size,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(max(1, (os.cpu_count() or 1) // size),),
+            )
+        return _EXECUTOR
+
+
+def _transcribe_chunk(chunk, language: str, word_timestamps: bool,
+                      model_size: Optional[str]) -> Dict[str, Any]:
+    """chunk: float32 배열 또는 (AudioBuffer, start_sec, end_sec)"""
+    if isinstance(chunk, tuple):
+        buf, start, end = chunk
+        chunk = np.array(buf.array(start, end), dtype=np.float32)
+    return get_stt_backend(model_size=model_size).transcribe(
+        chunk, language=language, word_timestamps=word_timestamps
+    )
+
+
+# -----------------------------
+# 엔트리
+# -----------------------------
+def transcribe_chunked(audio: Union[AudioBuffer, np.ndarray], language: str = "ko",
+                       word_timestamps: bool = False, chunk_sec: float = STT_CHUNK_SEC,
+                       model_size: Optional[str] = None, n_workers: Optional[int] = None) -> Dict[str, Any]:
+    """무음 경계 청크 → 병렬 전사 → 원본 시각으로 병합"""
+    buf = audio if isinstance(audio, AudioBuffer) else None
+    samples = buf.array() if buf is not None else audio
+    bounds = chunk_bounds(samples, SAMPLE_RATE, chunk_sec)
+    if len(bounds) <= 1:
+        return get_stt_backend(model_size=model_size).transcribe(
+            np.asarray(samples, dtype=np.float32), language=language, word_timestamps=word_timestamps
+        )
+
+    n_workers = min(n_workers or _resolve_workers(), _pool_size())
+    logger.info("Chunked transcription: %.1fs → %d chunks x %d workers",
+                len(samples) / SAMPLE_RATE, len(bounds), n_workers)
+    executor = _get_executor()
+    # 이 작업의 진행 중 청크를 n_workers개로 제한 (공용 풀을 다른 작업과 나눠 씀)
+    pending: Dict[Any, float] = {}
+    results: Dict[float, Dict[str, Any]] = {}
+    bound_iter = iter(bounds)
+
+    def _submit_next() -> bool:
+        bound = next(bound_iter, None)
+        if bound is None:
+            return False
+        start, end = bound
+        # 버퍼가 있으면 경로+구간만 전달 (워커가 memmap으로 해당 구간만 읽음)
+        chunk = (buf, start, end) if buf is not None else samples[int(start * SAMPLE_RATE): int(end * SAMPLE_RATE)]
+        pending[executor.submit(_transcribe_chunk, chunk, language, word_timestamps, model_size)] = start
+        return True
+
+    for _ in range(n_workers):
+        if not _submit_next():
+            break
+    try:
+        while pending:
+            done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+            for fut in done:
+                start = pending.pop(fut)
+                results[start] = fut.result()
+                _submit_next()
+    finally:
+        for fut in pending:
+            fut.cancel()
+    parts = [(start, results[start]) for start, _ in bounds]
+    return merge_results(parts, language=language)
+
+
+def _transcribe_audio(audio, language: str, word_timestamps: bool,
+                      model_size: Optional[str]) -> Dict[str, Any]:
+    """AudioBuffer 또는 배열 → 길이에 따라 청크 병렬 전사 / 백엔드 단일 호출"""
+    backend = get_stt_backend(model_size=model_size)
+    if isinstance(audio, AudioBuffer):
+        duration = audio.duration
+    else:
+        audio = np.asarray(audio, dtype=np.float32)
+        duration = len(audio) / SAMPLE_RATE
+
+    if STT_CHUNK_MIN_DURATION_SEC > 0 and duration >= STT_CHUNK_MIN_DURATION_SEC:
+        # 예산상 워커가 1개뿐이면 백엔드 단일 호출 (Whisper가 30초 창 단위로 순차 처리, 모델 1벌)
+        n_workers = _resolve_workers()
+        if n_workers >= 2:
+            return transcribe_chunked(audio, language=language, word_timestamps=word_timestamps,
+                                      model_size=model_size, n_workers=n_workers)
+    samples = np.array(audio.array(), dtype=np.float32) if isinstance(audio, AudioBuffer) else audio
+    return backend.transcribe(samples, language=language, word_timestamps=word_timestamps)
+
+
+def transcribe(audio, language: str = "ko", word_timestamps: bool = False,
+               model_size: Optional[str] = None) -> Dict[str, Any]:
+    """
+    STT 진입점.
+    - VAD_ENABLED면 발화 구간만 전사하고 시각을 원본 타임라인으로 복원 (result["speech_sec"] 포함)
+    - STT_CHUNK_MIN_DURATION_SEC 이상 길이면 청크 병렬 전사, 아니면 백엔드 단일 호출
+    audio: 공용 AudioBuffer, 파일 경로 또는 16kHz mono float32 배열
+    """
+    if isinstance(audio, str):
+        audio = load_audio(audio)
+    if not VAD_ENABLED:
+        return _transcribe_audio(audio, language, word_timestamps, model_size)
+
+    if isinstance(audio, AudioBuffer):
+        voiced, smap = vad.voiced_buffer(audio)
+    else:
+        voiced, smap = vad.trim_silence(audio, SAMPLE_RATE)
+    if smap.speech_sec <= 0:
+        return vad.empty_result(language)
+    return smap.remap_result(_transcribe_audio(voiced, language, word_timestamps, model_size))
@@ -0,0 +1,179 @@
+# 음성 구간 검출(VAD) — STT/피치 전처리
+# - 30ms 프레임 에너지(dB) 기반 경량 검출: 상위 5% 에너지 대비 VAD_DB_BELOW_PEAK 이상 낮으면 무음
+# - VAD_MIN_SILENCE_SEC 이상 이어지는 무음만 제거, 발화 구간 앞뒤로 VAD_PAD_SEC 여유
+# - 발화 구간만 이어붙인 오디오(압축 타임라인)로 STT/pyin 실행 → SpeechMap으로 원본 시각 복원
+# - 공용 AudioBuffer는 구간/발화 버퍼를 파일로 캐시 (오디오당 검출 1회, 워커도 memmap으로 공유)
+import os
+import json
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from app.audio_buffer import AudioBuffer
+from app.config import VAD_DB_BELOW_PEAK, VAD_MIN_SILENCE_SEC, VAD_PAD_SEC
+from app.log import get_logger
+
+logger = get_logger("vad")
+
+FRAME_SEC = 0.03          # 에너지 계산 프레임 (30ms)
+MIN_SPEECH_SEC = 0.1      # 이보다 짧은 발화 구간은 잡음으로 간주
+ABS_FLOOR_DB = -60.0      # 전체가 조용한 녹음에서 잡음을 발화로 오인하지 않도록 하한
+
+
+def frame_db(audio: np.ndarray, sr: int, frame_sec: float = FRAME_SEC) -> np.ndarray:
+    """프레임별 RMS 에너지(dB)"""
+    hop = max(1, int(sr * frame_sec))
+    n_frames = len(audio) // hop
+    if n_frames == 0:
+        return np.array([])
+    frames = np.asarray(audio[: n_frames * hop]).reshape(n_frames, hop)
+    rms = np.sqrt(np.mean(frames.astype(np.float64) ** 2, axis=1) + 1e-12)
+    return 20.0 * np.log10(rms)
+
+
+def _runs(mask: np.ndarray) -> List[Tuple[int, int]]:
+    """True 연속 구간 [(start, end_exclusive), ...]"""
+    if len(mask) == 0:
+        return []
+    padded = np.concatenate([[False], mask, [False]]).astype(np.int8)
+    diff = np.diff(padded)
+    starts = np.flatnonzero(diff == 1)
+    ends = np.flatnonzero(diff == -1)
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+def detect_speech(audio: np.ndarray, sr: int, pad_sec: float = VAD_PAD_SEC,
+                  min_silence_sec: float = VAD_MIN_SILENCE_SEC) -> List[Tuple[float, float]]:
+    """발화 구간 [(start_sec, end_sec), ...] (패딩/병합 완료, 시간순)"""
+    total = len(audio) / sr if sr else 0.0
+    db = frame_db(audio, sr)
+    if len(db) == 0:
+        return []
+
+    threshold = max(float(np.percentile(db, 95)) - VAD_DB_BELOW_PEAK, ABS_FLOOR_DB)
+    voiced = db >= threshold
+
+    # 짧은 무음(문장 내 쉼)은 발화로 메움
+    min_gap = max(1, int(round(min_silence_sec / FRAME_SEC)))
+    for s, e in _runs(~voiced):
+        if s > 0 and e < len(voiced) and e - s < min_gap:
+            voiced[s:e] = True
+
+    min_run = max(1, int(round(MIN_SPEECH_SEC / FRAME_SEC)))
+    intervals: List[Tuple[float, float]] = []
+    for s, e in _runs(voiced):
+        if e - s < min_run:
+            continue
+        start = max(0.0, s * FRAME_SEC - pad_sec)
+        end = min(total, e * FRAME_SEC + pad_sec)
+        if intervals and start <= intervals[-1][1]:
+            intervals[-1] = (intervals[-1][0], max(intervals[-1][1], end))
+        else:
+            intervals.append((start, end))
+    return intervals
+
+
+class SpeechMap:
+    """압축 타임라인(발화 구간만 이어붙임) ↔ 원본 타임라인 시각 변환"""
+
+    def __init__(self, intervals: List[Tuple[float, float]], total_sec: float, sr: int):
+        self.intervals = [(float(s), float(e)) for s, e in intervals]
+        self.total_sec = float(total_sec)
+        self.sr = sr
+        # 샘플 경계 기준 (압축 오디오와 정확히 일치)
+        self._src = np.array([int(s * sr) for s, _ in self.intervals], dtype=np.int64)
+        lengths = np.array([int(e * sr) - int(s * sr) for s, e in self.intervals], dtype=np.int64)
+        self._lengths = lengths
+        self._cmp = np.concatenate([[0], np.cumsum(lengths)[:-1]]) if len(lengths) else np.array([], dtype=np.int64)
+
+    @property
+    def speech_sec(self) -> float:
+        return float(self._lengths.sum()) / self.sr if len(self._lengths) else 0.0
+
+    def to_original(self, t, end: bool = False):
+        """
+        압축 시각(초) → 원본 시각(초). 스칼라/배열 모두 지원.
+        end=True면 구간 경계 시각을 앞 구간의 끝으로 대응 (세그먼트 end용).
+        """
+        t_arr = np.asarray(t, dtype=float)
+        if len(self._src) == 0:
+            return t_arr if t_arr.ndim else float(t_arr)
+        samples = t_arr * self.sr
+        idx = np.searchsorted(self._cmp, samples, side="left" if end else "right") - 1
+        idx = np.clip(idx, 0, len(self._src) - 1)
+        out = (self._src[idx] + (samples - self._cmp[idx])) / self.sr
+        return out if t_arr.ndim else float(out)
+
+    def compact(self, audio: np.ndarray) -> np.ndarray:
+        """원본 샘플 → 발화 구간만 이어붙인 샘플"""
+        if len(self._src) == 0:
+            return np.zeros(0, dtype=np.float32)
+        return np.concatenate([audio[s: s + n] for s, n in zip(self._src, self._lengths)]).astype(np.float32)
+
+    def remap_result(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        압축 타임라인 기준 STT result → 원본 시각으로 복원.
+        세그먼트마다 실제 발화 길이(speech_sec), result 전체 발화 길이(speech_sec)를 기록 (WPM 계산용).
+        """
+        segments = []
+        for seg in result.get("segments", []):
+            seg = dict(seg)
+            cs, ce = float(seg.get("start", 0.0)), float(seg.get("end", 0.0))
+            seg["start"] = self.to_original(cs)
+            seg["end"] = self.to_original(ce, end=True)
+            seg["speech_sec"] = max(ce - cs, 0.0)
+            if "words" in seg:
+                words = []
+                for w in seg["words"]:
+                    w = dict(w)
+                    if "start" in w:
+                        w["start"] = self.to_original(float(w["start"]))
+                    if "end" in w:
+                        w["end"] = self.to_original(float(w["end"]), end=True)
+                    words.append(w)
+                seg["words"] = words
+            segments.append(seg)
+        return {**result, "segments": segments, "speech_sec": self.speech_sec}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"intervals": self.intervals, "total_sec": self.total_sec, "sr": self.sr}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SpeechMap":
+        return cls([tuple(x) for x in data["intervals"]], data["total_sec"], data["sr"])
+
+
+def empty_result(language: str = "ko") -> Dict[str, Any]:
+    """발화가 없을 때의 STT result"""
+    return {"text": "", "segments": [], "language": language, "speech_sec": 0.0}
+
+
+def trim_silence(audio: np.ndarray, sr: int) -> Tuple[np.ndarray, SpeechMap]:
+    """배열 → (발화 구간만 이어붙인 배열, SpeechMap)"""
+    audio = np.asarray(audio, dtype=np.float32)
+    smap = SpeechMap(detect_speech(audio, sr), len(audio) / sr, sr)
+    return smap.compact(audio), smap
+
+
+def voiced_buffer(buf: AudioBuffer) -> Tuple[AudioBuffer, SpeechMap]:
+    """
+    공용 버퍼 → (발화 구간 버퍼, SpeechMap). 결과는 버퍼 옆 파일로 캐시되어
+    STT/피치/청크 워커가 검출을 반복하지 않음.
+    """
+    voiced_path = buf.path + ".voiced"
+    map_path = buf.path + ".vad.json"
+    if os.path.exists(voiced_path) and os.path.exists(map_path):
+        with open(map_path, "r", encoding="utf-8") as f:
+            smap = SpeechMap.from_dict(json.load(f))
+        return AudioBuffer(voiced_path, buf.sample_rate), smap
+
+    samples = buf.array()
+    smap = SpeechMap(detect_speech(samples, buf.sample_rate), buf.duration, buf.sample_rate)
+    with open(voiced_path, "wb") as f:
+        for s, n in zip(smap._src, smap._lengths):
+            f.write(np.ascontiguousarray(samples[s: s + n], dtype=np.float32).tobytes())
+    with open(map_path, "w", encoding="utf-8") as f:
+        json.dump(smap.to_dict(), f)
+
+    logger.info("VAD: %.1fs → speech %.1fs (%d intervals)", smap.total_sec, smap.speech_sec, len(smap.intervals))
+    return AudioBuffer(voiced_path, buf.sample_rate), smap
@@ -1,41 +1,33 @@
 
 from moviepy.editor import VideoFileClip
 import os
-from typing import Tuple, Dict, Any
+import math
+from typing import Tuple, Dict, Any, Optional
 
 from PIL import Image
 import numpy as np
 from sqlalchemy.orm import Session
 
 import cv2
-import mediapipe as mp
-
-from app import crud
-from app.config import AWS_BUCKET_NAME, AWS_REGION
-from app.models import Audio
-from app.speed_analysis import analyze_and_save_speed  # ✅ 로컬 wav_path 버전 사용
-
-# ---------- MediaPipe 초기화 ----------
-mp_face = mp.solutions.face_detection
-FACE_DETECTOR = mp_face.FaceDetection(model_selection=1)
-
-mp_pose = mp.solutions.pose
-# static_image_mode=True: 프레임마다 독립적으로 감지(동영상에서도 OK, 속도보다 안정성 우선)
-POSE_DETECTOR = mp_pose.Pose(
-    static_image_mode=True,
-    model_complexity=1,
-    enable_segmentation=False,
-    min_detection_confidence=0.5
-)
+
+from app import crud, audio_buffer, artifact_pack, checkpoint, image_codec, job_status, metrics
+from app.config import AUDIO_UPLOAD_WAV, FRAME_RENDER_LAZY
+from app.models import Audio, Video
+from app.model_registry import registry
+from app.speed_analysis import analyze_and_save_speed  # 공용 오디오 버퍼(또는 로컬 wav) 사용
+from app.log import get_logger
+
+logger = get_logger("video")
 
 # ---------- 포즈(사람) 크롭 ----------
-def _crop_person_rgb_with_mediapipe(frame_rgb: np.ndarray, out_size=(128, 128)) -> Image.Image:
+def _detect_person_box(frame_rgb: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
     """
-    MediaPipe Pose로 전신 랜드마크를 찾고, 그 최소/최대 xy로 bbox를 만들어 128x128 크롭.
-    실패하면 전체 프레임을 128x128로 리사이즈해서 반환.
+    MediaPipe Pose로 전신 랜드마크를 찾고, 그 최소/최대 xy(+10% 마진)로 bbox (x1, y1, x2, y2) 반환.
+    실패 시 None.
     """
     h, w = frame_rgb.shape[:2]
-    result = POSE_DETECTOR.process(frame_rgb)
+    with metrics.span("detect.pose"), registry.lease("mp_pose") as pose:
+        result = pose.process(frame_rgb)
 
     if result.pose_landmarks and result.pose_landmarks.landmark:
         xs, ys = [], []
@@ -61,19 +53,30 @@ def _crop_person_rgb_with_mediapipe(frame_rgb: np.ndarray, out_size=(128, 128))
             y2 = min(h, y2 + margin_y)
 
             if x2 > x1 and y2 > y1:
-                crop = frame_rgb[y1:y2, x1:x2]
-                return Image.fromarray(crop).resize(out_size)
+                return (x1, y1, x2, y2)
+    return None
+
 
-    # 실패 시 전체 리사이즈
+def _crop_person_rgb(frame_rgb: np.ndarray, box, out_size=(128, 128)) -> Image.Image:
+    """bbox가 있으면 크롭 후 리사이즈, 없으면 전체 프레임 리사이즈"""
+    if box is not None:
+        x1, y1, x2, y2 = box
+        return Image.fromarray(frame_rgb[y1:y2, x1:x2]).resize(out_size)
     return Image.fromarray(frame_rgb).resize(out_size)
 
-# ---------- 얼굴(감정) 크롭 ----------
-def extract_face_from_frame(frame: np.ndarray, save_path: str) -> bool:
+
+def _crop_person_rgb_with_mediapipe(frame_rgb: np.ndarray, out_size=(128, 128)) -> Image.Image:
     """
-    MoviePy 프레임(RGB) 기준: 얼굴 검출 → RGB crop → 저장
+    사람 bbox 기준 128x128 크롭.
+    실패하면 전체 프레임을 128x128로 리사이즈해서 반환.
     """
-    rgb_frame = frame  # 이미 RGB
-    results = FACE_DETECTOR.process(rgb_frame)
+    return _crop_person_rgb(frame_rgb, _detect_person_box(frame_rgb), out_size)
+
+# ---------- 얼굴(감정) 크롭 ----------
+def _detect_face_box(rgb_frame: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
+    """MoviePy 프레임(RGB) 기준 첫 번째 유효 얼굴 bbox (x1, y1, x2, y2), 없으면 None"""
+    with metrics.span("detect.face"), registry.lease("mp_face_detection") as detector:
+        results = detector.process(rgb_frame)
     if results.detections:
         for det in results.detections:
             box = det.location_data.relative_bounding_box
@@ -82,85 +85,124 @@ def extract_face_from_frame(frame: np.ndarray, save_path: str) -> bool:
             y1 = max(0, int(box.ymin * h))
             x2 = min(w, x1 + int(box.width * w))
             y2 = min(h, y1 + int(box.height * h))
-            face_rgb = rgb_frame[y1:y2, x1:x2]
-            if face_rgb.shape[0] > 0 and face_rgb.shape[1] > 0:
-                face_bgr = cv2.cvtColor(face_rgb, cv2.COLOR_RGB2BGR)
-                cv2.imwrite(save_path, face_bgr)
-                return True
-    return False
+            if y2 > y1 and x2 > x1:
+                return (x1, y1, x2, y2)
+    return None
+
+
+def _crop_face_rgb(frame: np.ndarray) -> Optional[np.ndarray]:
+    """
+    MoviePy 프레임(RGB) 기준: 얼굴 검출 → RGB crop (없으면 None)
+    """
+    box = _detect_face_box(frame)  # 이미 RGB
+    if box is None:
+        return None
+    x1, y1, x2, y2 = box
+    return frame[y1:y2, x1:x2]
+
+def load_audio_buffer(video_path: str, out_dir: str) -> "audio_buffer.AudioBuffer":
+    """작업 디렉터리의 공용 오디오 버퍼 (업로드 중 미리 디코딩됐으면 그대로, 없으면 원본에서 1회 디코딩)"""
+    os.makedirs(out_dir, exist_ok=True)
+    buf_path = os.path.join(out_dir, audio_buffer.BUFFER_NAME)
+    if os.path.isfile(buf_path) and os.path.getsize(buf_path) > 0:  # resumable_upload 조기 디코딩
+        return audio_buffer.AudioBuffer(buf_path)
+    return audio_buffer.decode_audio(video_path, buf_path)
+
+
+def save_audio_track(video_path: str, out_dir: str, db: Session, video_id: int, duration: float, s3_utils):
+    """
+    오디오를 한 번만 디코딩 → 16kHz mono float32 공용 버퍼(AudioBuffer) → Audio 저장.
+    (out_dir에 버퍼가 이미 있으면 그대로 사용)
+    AUDIO_UPLOAD_WAV이면 버퍼에서 WAV(pcm_s16le)를 만들어 S3(audios/)에 업로드,
+    아니면 Audio.audio_url은 원본 영상 URL(오디오 포함)을 가리킴.
+    반환: (audio_buf, audio_obj)
+    """
+    audio_buf = load_audio_buffer(video_path, out_dir)
+
+    if AUDIO_UPLOAD_WAV:
+        wav_local_path = os.path.join(out_dir, "audio.wav")
+        audio_buffer.write_wav(audio_buf, wav_local_path)
+        s3_audio_key = f"audios/{video_id}/audio.wav"
+        s3_audio_url = s3_utils.upload_file_to_s3(wav_local_path, s3_audio_key)
+        try:
+            os.remove(wav_local_path)
+        except Exception:
+            pass
+        audio_obj = crud.create_audio(db, video_id, s3_audio_url, duration)  # Video.video_url은 원본 영상 유지 (프레임 렌더링 소스)
+    else:
+        video = db.query(Video).filter(Video.id == video_id).first()
+        audio_obj = crud.create_audio(db, video_id, getattr(video, "video_url", "") or "", duration)
+    return audio_buf, audio_obj
+
 
 def extract_frames_and_audio(
-    video_path: str, out_dir: str, db: Session, video_id: int, s3_utils
-) -> str:
+    video_path: str, out_dir: str, db: Session, video_id: int, s3_utils,
+    inline_gaze: Optional[Dict[int, str]] = None,
+) -> "audio_buffer.AudioBuffer":
     """
-    - 1초 간격 프레임 추출 → S3(frames/) 업로드 → Frame 저장
+    - 1초 간격 프레임 추출 → 메모리 인코딩(image_codec) → S3(frames/) 업로드 → Frame 저장 (임시 이미지 파일 없음)
     - 얼굴(감정) 크롭 → S3(faces/) 업로드   [분류는 emotion 모듈에서]
     - 사람(포즈) 크롭(128x128) → S3(poses/) 업로드  [분류는 별도 posture_classifier.py]
-    - 오디오 추출(WAV, pcm_s16le) → S3(audios/) 업로드 → Audio 저장
-    - 반환: 로컬 wav_path (Whisper용)
+    - 오디오 1회 디코딩(16kHz mono float32 버퍼) → (선택) WAV S3(audios/) 업로드 → Audio 저장
+    - 이미지별 객체 또는 영상별 pack(ARTIFACT_PACKED)으로 저장 (artifact_pack)
+    - 업로드한 키/크기/frame_id를 manifest(manifests/{video_id}/artifacts.json)로 저장 → 분석 단계 입력
+    - inline_gaze(dict)를 주면 원본 프레임은 업로드하지 않고(Frame.image_url = 렌더링 URL, frame_render)
+      메모리 프레임으로 시선을 바로 분석해 Gaze 저장 + {frame_id: direction} 기록
+    - 반환: AudioBuffer (STT/피치/발음 분석 공용)
     """
-    print(f"[INFO] Starting video processing for video_id: {video_id}")
+    from app import frame_render, gaze_analysis
+
+    logger.info("Starting video processing for video_id: %s", video_id)
     os.makedirs(out_dir, exist_ok=True)
 
     clip = None
-    wav_local_path = os.path.join(out_dir, "audio.wav")
 
     try:
         clip = VideoFileClip(video_path)
         duration = float(clip.duration or 0.0)
 
-        t = 0.0
-        while t < duration:
-            frame = clip.get_frame(t)  # RGB numpy array
-            ms = int(t * 1000)
-
-            # 1) 원본 프레임 저장 & 업로드
-            frame_path = os.path.join(out_dir, f"frame_{ms}.jpg")
-            Image.fromarray(frame).save(frame_path)
-            s3_frame_key = f"frames/{video_id}/frame_{ms}.jpg"
-            s3_img_url = s3_utils.upload_file_to_s3(frame_path, s3_frame_key)
-            crud.create_frame(db, video_id, t, s3_img_url)
-            print(f"[INFO] Frame saved: {s3_img_url}")
-
-            # 2) 감정용 얼굴 크롭
-            face_save_path = os.path.join(out_dir, f"face_{ms}.jpg")
-            if extract_face_from_frame(frame, face_save_path):
-                s3_face_key = f"faces/{video_id}/face_{ms}.jpg"
-                s3_utils.upload_file_to_s3(face_save_path, s3_face_key)
-                print(f"[INFO_FACE] Face crop saved: s3://{AWS_BUCKET_NAME}/{s3_face_key}")
-
-            # 3) 포즈용 사람 크롭 (128x128)
-            pose_img = _crop_person_rgb_with_mediapipe(frame)
-            pose_path = os.path.join(out_dir, f"pose_{ms}.jpg")
-            pose_img.save(pose_path, quality=95)
-            s3_pose_key = f"poses/{video_id}/pose_{ms}.jpg"
-            s3_utils.upload_file_to_s3(pose_path, s3_pose_key)
-            print(f"[INFO_POSE] Pose crop saved: s3://{AWS_BUCKET_NAME}/{s3_pose_key}")
-
-            # temp 정리(원하면 유지)
-            try:
-                os.remove(frame_path)
-                if os.path.exists(face_save_path):
-                    os.remove(face_save_path)
-                os.remove(pose_path)
-            except Exception:
-                pass
-
-            t += 1.0  # 1초 간격
-
-        # 4) 오디오 추출 (Whisper 친화적)
-        if clip.audio is None:
-            raise RuntimeError("No audio track found in the video.")
-        clip.audio.write_audiofile(wav_local_path, codec="pcm_s16le")
-
-        # 오디오 S3 업로드 + DB 저장/업데이트
-        s3_audio_key = f"audios/{video_id}/audio.wav"
-        s3_audio_url = s3_utils.upload_file_to_s3(wav_local_path, s3_audio_key)
-        crud.create_audio(db, video_id, s3_audio_url, duration)
-        crud.update_video_audio_url(db, video_id, s3_audio_url)
-
-        print(f"[INFO] Video processing completed for video_id: {video_id}")
-        return wav_local_path
+        frames_done = 0
+        writer = artifact_pack.ArtifactWriter(video_id, out_dir, s3_utils)
+        job_status.frames_progress(video_id, 0, total=int(math.ceil(duration)))
+        with job_status.stage(video_id, "frames"):
+            t = 0.0
+            while t < duration:
+                with metrics.span("decode.frame"):
+                    frame = clip.get_frame(t)  # RGB numpy array
+
+                # 1) 원본 프레임 인코딩(메모리) & 업로드 (lazy: 렌더링 URL만 저장 + 시선 분석)
+                if inline_gaze is not None:
+                    frame_obj = crud.create_frame(db, video_id, t, frame_render.render_url(video_id, t))
+                    bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+                    direction = gaze_analysis.detect_gaze_direction_with_mediapipe(bgr)
+                    crud.create_gaze_record(db, frame_obj.id, direction)
+                    inline_gaze[frame_obj.id] = direction
+                else:
+                    s3_img_url = writer.put(t, "frame", image_codec.encode_frame(frame))
+                    frame_obj = crud.create_frame(db, video_id, t, s3_img_url)
+                    logger.debug("Frame saved: %s", s3_img_url)
+                writer.link_frame(t, frame_obj.id)
+
+                # 2) 감정용 얼굴 크롭
+                face_rgb = _crop_face_rgb(frame)
+                if face_rgb is not None:
+                    writer.put(t, "face", image_codec.encode_crop(face_rgb))
+
+                # 3) 포즈용 사람 크롭 (128x128)
+                writer.put(t, "pose", image_codec.encode_crop(np.asarray(_crop_person_rgb_with_mediapipe(frame))))
+
+                t += 1.0  # 1초 간격
+                frames_done += 1
+                job_status.frames_progress(video_id, frames_done)
+
+            writer.close()  # packed면 pack 업로드, manifest 저장
+
+        # 4) 오디오 추출 (1회 디코딩, 분석기 공용 버퍼)
+        with job_status.stage(video_id, "audio"):
+            audio_buf, _ = save_audio_track(video_path, out_dir, db, video_id, duration, s3_utils)
+
+        logger.info("Video processing completed for video_id: %s (%d frames)", video_id, frames_done)
+        return audio_buf
 
     finally:
         # MoviePy 리소스 정리
@@ -173,109 +215,198 @@ def extract_frames_and_audio(
             pass
 
 
+def _default_speed_result() -> Dict[str, Any]:
+    return {
+        "speed_rows": [],
+        "overall_wpm": 0.0,
+        "knn_score": 0.0,
+        "final_score": 0.0,
+        "bad_ratio": 0.0,
+        "penalty_ratio": 0.0,
+        "wpm_range": (100.0, 150.0),
+        "counts": {"good": 0, "bad": 0, "total": 0},
+    }
+
+
+def _package_speed_result(speed_res: Dict[str, Any]) -> Dict[str, Any]:
+    """analyze_and_save_speed / save_speed_from_result 반환값 → 결과 패키징용 dict"""
+    speed_rows = speed_res.get("speed_rows", []) or []
+    total = len(speed_rows)
+    good_cnt = sum(1 for r in speed_rows if r.get("wpm_band") == "good")
+    bad_cnt = total - good_cnt
+
+    return {
+        "speed_rows": speed_rows,  # 각 row에 wpm_band 포함
+        "overall_wpm": speed_res.get("overall_wpm", 0.0),
+        "knn_score": speed_res.get("knn_score", 0.0),
+        "final_score": speed_res.get("final_score", 0.0),
+        "bad_ratio": speed_res.get("bad_ratio", (bad_cnt / total) if total else 0.0),
+        "penalty_ratio": speed_res.get("penalty_ratio", 0.0),
+        "wpm_range": speed_res.get("wpm_range", (100.0, 150.0)),
+        "counts": {"good": good_cnt, "bad": bad_cnt, "total": total},
+    }
+
+
+def _package_emotion(emotion_score_result, all_emotion_avg) -> Dict[str, Any]:
+    return {
+        "avg": (emotion_score_result or {}).get("user"),
+        "ref": (emotion_score_result or {}).get("ref"),
+        "score": (emotion_score_result or {}).get("score"),
+        "all_avg": all_emotion_avg
+    }
+
+
+def _package_speed(voice_speed_result: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "counts": voice_speed_result["counts"],
+        "bad_ratio": voice_speed_result["bad_ratio"],
+        "penalty_ratio": voice_speed_result["penalty_ratio"],
+        "wpm_range": voice_speed_result["wpm_range"],
+
+        # 점수
+        "overall_wpm": voice_speed_result["overall_wpm"],
+        "knn_score": voice_speed_result["knn_score"],
+        "final_score": voice_speed_result["final_score"],
+
+        # 구간 상세(프론트에서 타임라인 표시용)
+        "speed_rows": voice_speed_result["speed_rows"],
+    }
+
+
+def _package_results(
+    gaze_results, emotion_score_result, all_emotion_avg, voice_speed_result
+) -> Dict[str, Any]:
+    """결과 패키징 (posture는 main에서 추가/병합)"""
+    return {
+        "gaze": gaze_results,
+        "emotion": _package_emotion(emotion_score_result, all_emotion_avg),
+        "voice": {"speed": _package_speed(voice_speed_result)},
+    }
+
+
+def _restore_gaze(output: Optional[Dict[str, Any]]) -> Dict[Any, Any]:
+    """체크포인트(JSON)의 시선 결과 → {frame_id(int): direction, "gaze_score": ...}"""
+    return {int(k) if str(k).isdigit() else k: v for k, v in (output or {}).items()}
+
+
+def _complete_sharded_stages(plan: "checkpoint.Plan", results: Dict[str, Any]) -> None:
+    """
+    샤딩 결과 → 성공한 단계만 체크포인트 완료 처리.
+    실패 샤드가 있으면 모든 단계가 일부 구간 없이 계산됐으므로 아무것도 완료 처리하지 않음 (재시도 시 전체 재실행).
+    """
+    if results.get("failed_shards"):
+        return
+    failed = set(results.get("failed_stages") or [])
+    outputs = {
+        "frames": {},
+        "gaze": results.get("gaze"),
+        "emotion": results.get("emotion"),
+        "speed": {"speed": (results.get("voice") or {}).get("speed"), "transcript": results.get("transcript")},
+        "posture": results.get("posture"),
+        "pitch": {},
+    }
+    for stage in checkpoint.SHARDED_STAGES:
+        if stage not in failed:
+            plan.complete(stage, outputs[stage])
+
+
 def analyze_presentation_video(
-    video_path: str, out_dir: str, db: Session, video_id: int, s3_utils
-) -> Tuple[Dict[str, Any], str]:
-    from app import gaze_analysis, emotion_analysis
+    video_path: str, out_dir: str, db: Session, video_id: int, s3_utils,
+    plan: Optional["checkpoint.Plan"] = None,
+) -> Tuple[Dict[str, Any], Optional["audio_buffer.AudioBuffer"]]:
+    """
+    frames → gaze → emotion → speed (plan으로 완료된 단계는 건너뛰고 체크포인트 출력으로 결과 복원).
+    audio_buf는 남은 단계에 오디오가 필요 없으면(plan.needs_audio) None.
+    """
+    from app import gaze_analysis, emotion_analysis, video_sharding
 
-    # 1) 프레임/오디오/크롭 저장
-    wav_path = extract_frames_and_audio(video_path, out_dir, db, video_id, s3_utils)
+    if plan is None:
+        plan = checkpoint.plan(video_id)
 
-    # 2) 시선 분석
-    print(f"[INFO] Starting gaze analysis for video_id: {video_id}")
-    gaze_results = []
-    try:
-        gaze_results = gaze_analysis.analyze_and_save_gaze(
-            bucket=AWS_BUCKET_NAME,
-            prefix=f"frames/{video_id}/",
-            db=db,
-            region=AWS_REGION
+    # 0) 긴 영상은 시간 샤드로 나눠 멀티프로세스 처리 (frames~pitch를 한 번에 → 성공한 단계만 완료 처리)
+    #    프레임 단계가 이미 완료됐으면 남은 단계만 아래 일반 경로로 재개
+    if not plan.done("frames") and video_sharding.should_shard(video_path):
+        crud.clear_stage_results(db, video_id, "frames")
+        results, audio_buf = video_sharding.analyze_presentation_video_sharded(
+            video_path, out_dir, db, video_id, s3_utils
         )
-        print(f"[INFO] Gaze analysis completed with {len(gaze_results)} results")
-    except Exception as e:
-        print(f"[ERROR] Gaze analysis failed: {e}")
+        _complete_sharded_stages(plan, results)
+        return results, audio_buf
+
+    # 1) 프레임/오디오/크롭 저장 (FRAME_RENDER_LAZY: 원본 프레임 업로드 생략, 시선은 추출 중 분석)
+    inline_gaze: Optional[Dict[int, str]] = {} if FRAME_RENDER_LAZY else None
+    if plan.done("frames"):
+        if inline_gaze is not None:
+            inline_gaze = _restore_gaze(plan.output("frames", {}).get("inline_gaze"))
+        audio_buf = load_audio_buffer(video_path, out_dir) if plan.needs_audio() else None
+    else:
+        crud.clear_stage_results(db, video_id, "frames")
+        audio_buf = extract_frames_and_audio(video_path, out_dir, db, video_id, s3_utils, inline_gaze)
+        plan.complete("frames", {"inline_gaze": inline_gaze} if inline_gaze is not None else {})
+
+    # 2) 시선 분석
+    if plan.done("gaze"):
+        gaze_results = _restore_gaze(plan.output("gaze"))
+    else:
+        logger.info("Starting gaze analysis for video_id: %s", video_id)
+        with job_status.stage(video_id, "gaze"):
+            gaze_results = []
+            try:
+                if inline_gaze is not None:  # Gaze 행은 프레임 단계에서 저장됨
+                    gaze_results = dict(inline_gaze)
+                    gaze_results["gaze_score"] = gaze_analysis.save_gaze_score(db, video_id, inline_gaze)
+                else:
+                    crud.clear_stage_results(db, video_id, "gaze")
+                    gaze_results = gaze_analysis.analyze_and_save_gaze(video_id=video_id, db=db)
+                logger.info("Gaze analysis completed with %d results", len(gaze_results))
+                plan.complete("gaze", gaze_results)
+            except Exception as e:
+                logger.error("Gaze analysis failed: %s", e)
 
     # 3) 감정 분석 (faces/ 사용)
-    print(f"[INFO] Starting emotion analysis for video_id: {video_id}")
-    emotion_score_result = {"user": None, "ref": None, "score": None}
-    all_emotion_avg = None
-    try:
-        _ = emotion_analysis.analyze_emotion_and_save_to_db(
-            bucket=AWS_BUCKET_NAME,
-            prefix=f"faces/{video_id}/",
-            db=db,
-            region=AWS_REGION,
-            video_id=video_id,
-        )
-        emotion_score_result = emotion_analysis.evaluate_presentation_emotion_corrected(db, video_id)
-        all_emotion_avg = emotion_analysis.get_all_emotion_averages_corrected(db, video_id)
-        print("유저 감정 평균", all_emotion_avg)
-        print("보정 neutral/happy", emotion_score_result.get("user"))
-        print(f"[INFO] Emotion analysis completed")
-    except Exception as e:
-        print(f"[ERROR] Emotion analysis failed: {e}")
-        import traceback
-        traceback.print_exc()
-
-    # 4) 속도 분석 (이제 로컬 WAV만 사용)
-    print(f"[INFO] Starting speed analysis for video_id: {video_id}")
-    voice_speed_result = {
-    "speed_rows": [],
-    "overall_wpm": 0.0,
-    "knn_score": 0.0,
-    "final_score": 0.0,
-    "bad_ratio": 0.0,
-    "penalty_ratio": 0.0,
-    "wpm_range": (100.0, 150.0),
-    "counts": {"good": 0, "bad": 0, "total": 0},
-    }
-    try:
-        audio_obj = db.query(Audio).filter(Audio.video_id == video_id).first()
-        if audio_obj:
-            speed_res = analyze_and_save_speed(db, audio_obj.id, wav_path)
-
-        speed_rows = speed_res.get("speed_rows", []) or []
-        total = len(speed_rows)
-        good_cnt = sum(1 for r in speed_rows if r.get("wpm_band") == "good")
-        bad_cnt = total - good_cnt
-        
-        voice_speed_result = {
-            "speed_rows": speed_rows,  # 각 row에 wpm_band 포함
-            "overall_wpm": speed_res.get("overall_wpm", 0.0),
-            "knn_score": speed_res.get("knn_score", 0.0),
-            "final_score": speed_res.get("final_score", 0.0),
-            "bad_ratio": speed_res.get("bad_ratio", (bad_cnt / total) if total else 0.0),
-            "penalty_ratio": speed_res.get("penalty_ratio", 0.0),
-            "wpm_range": speed_res.get("wpm_range", (100.0, 150.0)),
-            "counts": {"good": good_cnt, "bad": bad_cnt, "total": total},
-        }
-    except Exception as e:
-        print(f"[WARN] Speed analysis failed: {e}")
+    if plan.done("emotion"):
+        emotion_block = plan.output("emotion")
+    else:
+        logger.info("Starting emotion analysis for video_id: %s", video_id)
+        emotion_score_result = {"user": None, "ref": None, "score": None}
+        all_emotion_avg = None
+        with job_status.stage(video_id, "emotion"):
+            try:
+                crud.clear_stage_results(db, video_id, "emotion")
+                _ = emotion_analysis.analyze_emotion_and_save_to_db(video_id=video_id, db=db)
+                emotion_score_result = emotion_analysis.evaluate_presentation_emotion_corrected(db, video_id)
+                all_emotion_avg = emotion_analysis.get_all_emotion_averages_corrected(db, video_id)
+                logger.debug("유저 감정 평균: %s", all_emotion_avg)
+                logger.info("Emotion analysis completed (보정 neutral/happy: %s)", emotion_score_result.get("user"))
+                plan.complete("emotion", _package_emotion(emotion_score_result, all_emotion_avg))
+            except Exception as e:
+                logger.exception("Emotion analysis failed: %s", e)
+        emotion_block = _package_emotion(emotion_score_result, all_emotion_avg)
+
+    # 4) 속도 분석 (공용 오디오 버퍼 사용, 전사 텍스트는 발음 분석에서 재사용)
+    transcript = None
+    if plan.done("speed"):
+        speed_block = plan.output("speed", {}).get("speed")
+        transcript = plan.output("speed", {}).get("transcript")
+    else:
+        logger.info("Starting speed analysis for video_id: %s", video_id)
+        voice_speed_result = _default_speed_result()
+        with job_status.stage(video_id, "speed"):
+            try:
+                crud.clear_stage_results(db, video_id, "speed")
+                audio_obj = db.query(Audio).filter(Audio.video_id == video_id).first()
+                if audio_obj:
+                    speed_res = analyze_and_save_speed(db, audio_obj.id, audio_buf)
+
+                voice_speed_result = _package_speed_result(speed_res)
+                transcript = speed_res.get("text")
+                plan.complete("speed", {"speed": _package_speed(voice_speed_result), "transcript": transcript})
+            except Exception as e:
+                logger.warning("Speed analysis failed: %s", e)
+        speed_block = _package_speed(voice_speed_result)
 
     # 5) 결과 패키징 (posture는 main에서 추가/병합)
-    results: Dict[str, Any] = {
-        "gaze": gaze_results,
-        "emotion": {
-            "avg": (emotion_score_result or {}).get("user"),
-            "ref": (emotion_score_result or {}).get("ref"),
-            "score": (emotion_score_result or {}).get("score"),
-            "all_avg": all_emotion_avg
-        },
-        "voice": {
-            "speed": {
-                "counts": voice_speed_result["counts"],
-                "bad_ratio": voice_speed_result["bad_ratio"],
-                "penalty_ratio": voice_speed_result["penalty_ratio"],
-                "wpm_range": voice_speed_result["wpm_range"],
-
-                # 점수
-                "overall_wpm": voice_speed_result["overall_wpm"],
-                "knn_score": voice_speed_result["knn_score"],
-                "final_score": voice_speed_result["final_score"],
-
-                # 구간 상세(프론트에서 타임라인 표시용)
-                "speed_rows": voice_speed_result["speed_rows"],
-            }
-        }
-    }
-    return results, wav_path
\ No newline at end of file
+    results = {"gaze": gaze_results, "emotion": emotion_block, "voice": {"speed": speed_block}}
+    if transcript:
+        results["transcript"] = transcript
+    return results, audio_buf
@@ -0,0 +1,552 @@
+# 긴 영상(30분+) 시간 샤딩 처리
+# - 키프레임 정렬 시간 구간(샤드)으로 나눠 워커 프로세스에서 프레임/오디오 분석
+# - 워커는 디코딩한 프레임을 공유 메모리 버퍼에 써두고, 분석 결과(박스/시선/감정/자세/전사/f0)만 반환
+# - 워커 수는 메모리 예산(MEMORY_BUDGET_MB, 미설정이면 가용 물리 메모리)으로도 제한, 2개 미만이면 샤딩하지 않고 순차 처리
+# - 공유 메모리 프레임은 긴 변 SHARD_FRAME_MAX_SIDE로 축소해 보관 (분석/크롭/프레임 업로드 모두 축소본 사용)
+# - 부모 프로세스는 공유 메모리의 프레임으로 S3 업로드 + DB 저장, 샤드 결과를 전역 타임스탬프로 병합
+import os
+import math
+import time
+import logging
+import bisect
+import shutil
+import subprocess
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+from moviepy.editor import VideoFileClip
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+from sqlalchemy.orm import Session
+
+from app import artifact_pack, crud, image_codec, job_status, memory, metrics
+from app.config import (
+    FRAME_RENDER_LAZY,
+    MEMORY_SHARD_WORKER_MB,
+    SHARD_FRAME_MAX_SIDE,
+    SHARD_MIN_DURATION_SEC,
+    SHARD_TARGET_SEC,
+    SHARD_WORKERS,
+    VAD_ENABLED,
+)
+from app.models import Pose
+from app.log import get_logger, throttled
+
+logger = get_logger("sharding")
+
+POSE_THRESHOLD = 0.65
+SAMPLE_INTERVAL_SEC = 1.0  # extract_frames_and_audio와 동일한 1초 간격
+
+
+# -----------------------------
+# 샤드 계획
+# -----------------------------
+def _resolve_workers(n_shards: int) -> int:
+    n = SHARD_WORKERS if SHARD_WORKERS > 0 else (os.cpu_count() or 1)
+    return max(1, min(n, n_shards))
+
+
+def shard_worker_mb(width: int, height: int, target_sec: float = SHARD_TARGET_SEC) -> float:
+    """샤드 워커 1개 예상 사용량: 상주 모델 + 샤드 프레임 공유 메모리 + 샤드 오디오 pyin"""
+    n_frames = math.ceil(target_sec / SAMPLE_INTERVAL_SEC)
+    return (MEMORY_SHARD_WORKER_MB + memory.estimate_frames_mb(n_frames, width, height)
+            + memory.estimate_pyin_mb(target_sec))
+
+
+def _frame_size(width: int, height: int) -> Tuple[int, int]:
+    """공유 메모리 프레임 크기 (w, h): 긴 변이 SHARD_FRAME_MAX_SIDE를 넘으면 비율 유지 축소"""
+    longest = max(width, height)
+    if SHARD_FRAME_MAX_SIDE <= 0 or longest <= SHARD_FRAME_MAX_SIDE:
+        return width, height
+    scale = SHARD_FRAME_MAX_SIDE / longest
+    return max(1, int(round(width * scale))), max(1, int(round(height * scale)))
+
+
+def _budget_workers(n_shards: int, width: int, height: int) -> int:
+    """
+    워커 수 (SHARD_WORKERS/코어 수, 메모리 예산으로 제한).
+    예산(MEMORY_BUDGET_MB)도 워커 수도 지정하지 않았으면 가용 물리 메모리로 제한 — 코어 수만큼 띄우면 수십 GB
+    """
+    per_worker = shard_worker_mb(width, height)
+    n = memory.max_workers("shards", per_worker, _resolve_workers(n_shards))
+    if SHARD_WORKERS <= 0 and memory.headroom_mb() is None:
+        available = memory.available_mb()
+        if available is not None:
+            allowed = max(1, int(available * memory.BUDGET_SAFETY // per_worker))
+            if allowed < n:
+                memory.fallback("shards", per_worker * n, available * memory.BUDGET_SAFETY, "fewer_workers",
+                                requested=n, workers=allowed, per_worker_mb=round(per_worker, 1))
+                n = allowed
+    return n
+
+
+def should_shard(video_path: str) -> bool:
+    """SHARD_MIN_DURATION_SEC 이상이고 (메모리 예산 안에서) 워커가 2개 이상일 때만 샤딩"""
+    if SHARD_MIN_DURATION_SEC <= 0:
+        return False
+    try:
+        infos = ffmpeg_parse_infos(video_path)
+        duration = float(infos.get("duration") or 0.0)
+    except Exception as e:
+        logger.warning("Failed to probe duration for sharding: %s", e)
+        return False
+    if duration < SHARD_MIN_DURATION_SEC:
+        return False
+    n_shards = max(1, math.ceil(duration / SHARD_TARGET_SEC))
+    if _resolve_workers(n_shards) < 2:
+        return False
+    # 예산상 워커 1개만 가능하면 샤딩 대신 순차 처리(프레임 단위 스트리밍, 모델 1벌)
+    w, h = _frame_size(*(infos.get("video_size") or (0, 0)))
+    return _budget_workers(n_shards, w, h) >= 2
+
+
+def probe_keyframes(video_path: str) -> List[float]:
+    """
+    ffprobe 패킷 플래그(K)로 키프레임 시각 목록 조회 (디코딩 없이 빠름).
+    ffprobe가 없거나 실패하면 빈 리스트 → 균등 분할로 대체.
+    """
+    ffprobe = shutil.which("ffprobe")
+    if not ffprobe:
+        return []
+    cmd = [
+        ffprobe, "-v", "error", "-select_streams", "v:0",
+        "-show_entries", "packet=pts_time,flags", "-of", "csv=p=0", video_path,
+    ]
+    try:
+        out = subprocess.run(cmd, capture_output=True, text=True, timeout=300, check=True).stdout
+    except Exception as e:
+        logger.warning("Keyframe probe failed, falling back to uniform shards: %s", e)
+        return []
+
+    keyframes = []
+    for line in out.splitlines():
+        parts = line.strip().split(",")
+        if len(parts) >= 2 and "K" in parts[1]:
+            try:
+                keyframes.append(float(parts[0]))
+            except ValueError:
+                continue
+    return sorted(set(keyframes))
+
+
+def _snap_to_keyframe(target: float, keyframes: List[float], tol: float) -> float:
+    """target에 가장 가까운 키프레임 (tol 이내일 때만), 없으면 target 그대로"""
+    if not keyframes:
+        return target
+    i = bisect.bisect_left(keyframes, target)
+    candidates = [keyframes[j] for j in (i - 1, i) if 0 <= j < len(keyframes)]
+    best = min(candidates, key=lambda k: abs(k - target))
+    return best if abs(best - target) <= tol else target
+
+
+def plan_shards(duration: float, keyframes: List[float], target_sec: float = SHARD_TARGET_SEC
+                ) -> List[Tuple[float, float]]:
+    """
+    [0, duration)을 target_sec 내외의 키프레임 정렬 구간 [(start, end), ...]으로 분할.
+    워커의 첫 seek가 키프레임에 떨어지도록 경계를 가장 가까운 키프레임에 맞춤.
+    """
+    if duration <= 0:
+        return []
+    n = max(1, math.ceil(duration / max(target_sec, 1.0)))
+    bounds = [0.0]
+    for i in range(1, n):
+        b = _snap_to_keyframe(i * duration / n, keyframes, tol=target_sec / 2)
+        # 너무 짧은 샤드/역전 방지
+        if b > bounds[-1] + SAMPLE_INTERVAL_SEC and b < duration - SAMPLE_INTERVAL_SEC:
+            bounds.append(b)
+    bounds.append(duration)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _sample_times(start: float, end: float) -> List[float]:
+    """전역 1초 격자 중 [start, end)에 속하는 샘플 시각 (샤드 간 중복/누락 없음)"""
+    first = math.ceil(start / SAMPLE_INTERVAL_SEC)
+    last = math.ceil(end / SAMPLE_INTERVAL_SEC)
+    return [k * SAMPLE_INTERVAL_SEC for k in range(first, last)]
+
+
+# -----------------------------
+# 워커 (별도 프로세스)
+# -----------------------------
+def _analyze_shard_audio(task: Dict[str, Any]) -> Dict[str, Any]:
+    """샤드 구간 오디오(공용 버퍼 memmap 슬라이스) → STT 전사 + pyin f0 (시각은 전역 타임라인 기준)"""
+    from app import vad, voice_hz
+    from app.stt_backend import get_stt_backend, shift_segments
+
+    # failed_stages: 이 샤드에서 실패한 오디오 단계 ("speed": 전사, "pitch": f0) → 부모가 해당 단계를 미완료로 처리
+    out: Dict[str, Any] = {"segments": [], "text": "", "f0_times": np.array([]), "f0": np.array([]),
+                           "failed_stages": []}
+    audio_buf = task.get("audio_buf")
+    if audio_buf is None:
+        return out
+
+    start = task["start"]
+    samples = np.array(audio_buf.array(start, task["end"]), dtype=np.float32)
+    if len(samples) == 0:
+        return out
+
+    sr = audio_buf.sample_rate
+    # 샤드 구간 VAD: 발화 구간만 전사/pyin, 시각은 샤드 기준으로 복원 후 start만큼 이동
+    voiced, smap = vad.trim_silence(samples, sr) if VAD_ENABLED else (samples, None)
+
+    try:
+        if smap is not None and smap.speech_sec <= 0:
+            result = vad.empty_result("ko")
+        else:
+            result = get_stt_backend().transcribe(voiced, word_timestamps=True, language="ko")
+            if smap is not None:
+                result = smap.remap_result(result)
+        out["segments"] = shift_segments(result.get("segments", []), start)
+        out["text"] = (result.get("text") or "").strip()
+        if "speech_sec" in result:
+            out["speech_sec"] = result["speech_sec"]
+    except Exception as e:
+        logger.warning("Shard %d transcription failed: %s", task["index"], e)
+        out["failed_stages"].append("speed")
+
+    # 샤드 구간 pyin은 워커 예상 사용량(shard_worker_mb)에 포함 → 워커에서는 예산 판단 없이 전체 실행
+    try:
+        if smap is not None:
+            f0_times, f0 = voice_hz.estimate_f0_voiced(voiced, sr, smap, block_sec=0)
+        else:
+            f0_times, f0 = voice_hz.estimate_f0_from_samples(samples, sr, block_sec=0)
+        out["f0_times"] = np.asarray(f0_times, dtype=float) + start
+        out["f0"] = np.asarray(f0, dtype=float)
+    except Exception as e:
+        logger.warning("Shard %d pitch estimation failed: %s", task["index"], e)
+        out["failed_stages"].append("pitch")
+    return out
+
+
+def _analyze_shard(task: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    워커 엔트리: 샤드 구간 프레임을 공유 메모리에 디코딩하고 프레임별 분석값 + 오디오 분석값 반환.
+    DB/S3는 건드리지 않음 (부모 프로세스 담당).
+    """
+    import cv2
+    from app import video_processing, gaze_analysis, emotion_analysis, posture_classifier
+
+    shm = shared_memory.SharedMemory(name=task["shm_name"])
+    frames = None
+    clip = None
+    t0 = time.perf_counter()
+    try:
+        times = task["times"]
+        h, w = task["frame_shape"]
+        frames = np.ndarray((len(times), h, w, 3), dtype=np.uint8, buffer=shm.buf)
+
+        clip = VideoFileClip(task["video_path"], audio=False)  # 오디오는 공용 버퍼에서 읽음
+        try:
+            pose_model = posture_classifier.load_pose_model()
+        except Exception as e:
+            logger.warning("Shard %d pose model unavailable: %s", task["index"], e)
+            pose_model = None
+
+        samples = []
+        for i, t in enumerate(times):
+            frame = clip.get_frame(t)  # RGB numpy array
+            if frame.shape[:2] != (h, w):
+                frame = cv2.resize(frame, (w, h), interpolation=cv2.INTER_AREA)  # 축소 (SHARD_FRAME_MAX_SIDE)
+            frames[i] = frame
+
+            face_box = video_processing._detect_face_box(frame)
+            person_box = video_processing._detect_person_box(frame)
+            sample = {
+                "t": t,
+                "face_box": face_box,
+                "person_box": person_box,
+                "gaze": None,
+                "emotion": None,
+                "pose_prob": None,
+            }
+
+            try:
+                sample["gaze"] = gaze_analysis.detect_gaze_direction_with_mediapipe(
+                    cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+                )
+            except Exception as e:
+                throttled(logger, logging.WARNING, "gaze", "Shard %d gaze failed at t=%s: %s", task["index"], t, e)
+
+            if face_box is not None:
+                x1, y1, x2, y2 = face_box
+                try:
+                    face_bgr = cv2.cvtColor(frame[y1:y2, x1:x2], cv2.COLOR_RGB2BGR)
+                    sample["emotion"] = emotion_analysis.analyze_face_emotion(face_bgr)
+                except Exception as e:
+                    throttled(logger, logging.WARNING, "emotion", "Shard %d emotion failed at t=%s: %s",
+                              task["index"], t, e)
+
+            if pose_model is not None:
+                try:
+                    pose_img = video_processing._crop_person_rgb(frame, person_box)
+                    arr = posture_classifier.pil_to_pose_input(pose_img)
+                    sample["pose_prob"] = posture_classifier.predict_pose_prob(pose_model, arr)
+                except Exception as e:
+                    throttled(logger, logging.WARNING, "pose", "Shard %d pose failed at t=%s: %s",
+                              task["index"], t, e)
+
+            samples.append(sample)
+
+        audio = _analyze_shard_audio(task)
+        return {
+            "index": task["index"], "start": task["start"], "end": task["end"], "samples": samples, **audio,
+            "elapsed_sec": time.perf_counter() - t0,  # 부모에서 shard.analyze span으로 기록
+        }
+    finally:
+        try:
+            if clip is not None:
+                clip.reader.close()
+        except Exception:
+            pass
+        frames = None  # 공유 메모리 view 해제 후 close
+        shm.close()
+
+
+# -----------------------------
+# 부모: 샤드 결과 저장/병합
+# -----------------------------
+def _persist_shard(
+    db: Session,
+    video_id: int,
+    task: Dict[str, Any],
+    res: Dict[str, Any],
+    shm: shared_memory.SharedMemory,
+    writer: "artifact_pack.ArtifactWriter",
+    gaze_results: Dict[int, str],
+    pose_counts: Dict[str, int],
+) -> None:
+    """공유 메모리의 프레임으로 frames/faces/poses 저장(writer, manifest 기록) + Frame/Gaze/Emotion/Pose 저장"""
+    from app import frame_render, video_processing
+
+    h, w = task["frame_shape"]
+    frames = np.ndarray((len(task["times"]), h, w, 3), dtype=np.uint8, buffer=shm.buf)
+    try:
+        for i, sample in enumerate(res["samples"]):
+            t = sample["t"]
+            frame = frames[i]
+
+            # 1) 원본 프레임 인코딩(메모리) & 업로드 (FRAME_RENDER_LAZY: 렌더링 URL만 저장)
+            if FRAME_RENDER_LAZY:
+                s3_img_url = frame_render.render_url(video_id, t)
+            else:
+                s3_img_url = writer.put(t, "frame", image_codec.encode_frame(frame))
+            frame_obj = crud.create_frame(db, video_id, t, s3_img_url)
+            writer.link_frame(t, frame_obj.id)
+
+            # 2) 감정용 얼굴 크롭
+            if sample["face_box"] is not None:
+                x1, y1, x2, y2 = sample["face_box"]
+                writer.put(t, "face", image_codec.encode_crop(frame[y1:y2, x1:x2]))
+
+            # 3) 포즈용 사람 크롭 (128x128)
+            pose_rgb = np.asarray(video_processing._crop_person_rgb(frame, sample["person_box"]))
+            writer.put(t, "pose", image_codec.encode_crop(pose_rgb))
+
+            # 4) 분석값 저장
+            if sample["gaze"] is not None:
+                crud.create_gaze_record(db, frame_obj.id, sample["gaze"])
+                gaze_results[frame_obj.id] = sample["gaze"]
+
+            if sample["emotion"] is not None:
+                crud.create_emotion(db=db, frame_id=frame_obj.id, **sample["emotion"])
+
+            if sample["pose_prob"] is not None:
+                prob = float(sample["pose_prob"])
+                label = "GOOD" if prob >= POSE_THRESHOLD else "BAD"
+                db.add(Pose(frame_id=frame_obj.id, image_type=label, estimate_score=prob))
+                pose_counts["total"] += 1
+                pose_counts["good" if label == "GOOD" else "bad"] += 1
+
+        db.commit()
+        logger.info("Shard %d saved: %d frames (%.1f~%.1fs)",
+                    task["index"], len(res["samples"]), task["start"], task["end"])
+    finally:
+        frames = None
+
+
+def merge_shard_transcripts(shard_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """샤드별 전사(이미 전역 시각) → Whisper 형식 단일 result"""
+    from app.stt_backend import merge_results
+    return merge_results([(0.0, res) for res in shard_results])
+
+
+def merge_shard_f0(shard_results: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+    times = [np.asarray(r.get("f0_times", []), dtype=float) for r in shard_results]
+    f0 = [np.asarray(r.get("f0", []), dtype=float) for r in shard_results]
+    if not times:
+        return np.array([]), np.array([])
+    return np.concatenate(times), np.concatenate(f0)
+
+
+def _release_shm(shm: shared_memory.SharedMemory) -> None:
+    try:
+        shm.close()
+    except BufferError:
+        pass
+    try:
+        shm.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def analyze_presentation_video_sharded(
+    video_path: str, out_dir: str, db: Session, video_id: int, s3_utils
+) -> Tuple[Dict[str, Any], Any]:
+    """
+    analyze_presentation_video의 샤딩 버전. 반환 형식 동일 (results, audio_buf).
+    추가로 results["posture"](자세 점수)와 results["transcript"](전체 STT 텍스트),
+    results["failed_shards"](실패 샤드 [{index, start, end, error}], 해당 구간은 분석에서 빠짐),
+    results["failed_stages"](일부라도 실패한 단계: emotion/speed/pitch — 체크포인트 완료 처리에서 제외)를 채움.
+    """
+    from app import video_processing, gaze_analysis, emotion_analysis, posture_classifier
+    from app import speed_analysis, voice_hz
+
+    os.makedirs(out_dir, exist_ok=True)
+
+    # 0) 해상도/길이 + 샤드 계획
+    clip = VideoFileClip(video_path, audio=False)
+    try:
+        w, h = _frame_size(*clip.size)  # 공유 메모리에 둘 축소 크기
+        duration = float(clip.duration or 0.0)
+    finally:
+        try:
+            clip.reader.close()
+        except Exception:
+            pass
+
+    # 1) 오디오 1회 디코딩(공용 버퍼) + Audio 저장 (Speed/Pitch FK, 발음 분석용)
+    #    워커는 버퍼 파일의 자기 구간만 memmap으로 읽음 (샤드별 재디코딩 없음)
+    with job_status.stage(video_id, "audio"):
+        audio_buf, audio_obj = video_processing.save_audio_track(video_path, out_dir, db, video_id, duration, s3_utils)
+
+    shards = plan_shards(duration, probe_keyframes(video_path))
+    n_workers = _budget_workers(len(shards), w, h)
+    logger.info("Sharded processing for video_id %s: %.1fs → %d shards x %d workers",
+                video_id, duration, len(shards), n_workers)
+
+    tasks = [
+        {
+            "index": idx,
+            "start": start,
+            "end": end,
+            "times": _sample_times(start, end),
+            "frame_shape": (h, w),
+            "video_path": video_path,
+            "audio_buf": audio_buf,
+        }
+        for idx, (start, end) in enumerate(shards)
+    ]
+
+    # 2) 샤드 분석 — 진행 중인 샤드 수를 워커 수로 제한해 공유 메모리 사용량 상한 유지
+    gaze_results: Dict[Any, Any] = {}
+    pose_counts = {"good": 0, "bad": 0, "total": 0}
+    writer = artifact_pack.ArtifactWriter(video_id, out_dir, s3_utils)
+    shard_results: Dict[int, Dict[str, Any]] = {}
+    failed_shards: List[Dict[str, Any]] = []  # 실패 샤드는 건너뛰고 결과/작업 상태에 기록 (해당 구간은 프레임 없음)
+    pending: Dict[Any, Tuple[Dict[str, Any], shared_memory.SharedMemory]] = {}
+    task_iter = iter(tasks)
+    frames_done = 0
+    job_status.frames_progress(video_id, 0, total=sum(len(t["times"]) for t in tasks))
+
+    with job_status.stage(video_id, "frames"):  # 샤드 워커가 시선/감정/자세/전사/f0까지 처리
+        ctx = multiprocessing.get_context("spawn")  # TF/torch 상태를 fork로 물려받지 않도록
+        with ProcessPoolExecutor(max_workers=n_workers, mp_context=ctx) as executor:
+            def _submit_next() -> bool:
+                task = next(task_iter, None)
+                if task is None:
+                    return False
+                size = max(1, len(task["times"]) * h * w * 3)
+                shm = shared_memory.SharedMemory(create=True, size=size)
+                task["shm_name"] = shm.name
+                pending[executor.submit(_analyze_shard, task)] = (task, shm)
+                return True
+
+            for _ in range(n_workers):
+                if not _submit_next():
+                    break
+
+            while pending:
+                done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+                for fut in done:
+                    task, shm = pending.pop(fut)
+                    try:
+                        res = fut.result()
+                        _persist_shard(db, video_id, task, res, shm, writer, gaze_results, pose_counts)
+                        shard_results[task["index"]] = res
+                        metrics.record_span("shard.analyze", res.get("elapsed_sec", 0.0), video_id=video_id,
+                                            shard=task["index"], frames=len(task["times"]))
+                        frames_done += len(task["times"])
+                        job_status.frames_progress(video_id, frames_done)
+                    except Exception as e:
+                        db.rollback()
+                        logger.error("Shard %d (%.1f~%.1fs) failed: %s", task["index"], task["start"], task["end"], e)
+                        failed_shards.append({"index": task["index"], "start": task["start"], "end": task["end"],
+                                              "error": f"{type(e).__name__}: {e}"})
+                        job_status.shard_failed(video_id, task["index"], task["start"], task["end"],
+                                                f"{type(e).__name__}: {e}")
+                    finally:
+                        _release_shm(shm)
+                    _submit_next()
+
+        writer.close()  # packed면 pack 업로드, manifest 저장
+
+    ordered = [shard_results[i] for i in sorted(shard_results)]
+    failed_stages = {stage for res in ordered for stage in res.get("failed_stages", [])}
+
+    # 3) 시선 점수
+    with job_status.stage(video_id, "gaze"):
+        gaze_score = gaze_analysis.save_gaze_score(db, video_id, gaze_results)
+        gaze_results["gaze_score"] = gaze_score
+
+    # 4) 감정 평가 (Emotion 테이블 기반, 기존과 동일)
+    with job_status.stage(video_id, "emotion"):
+        emotion_score_result = {"user": None, "ref": None, "score": None}
+        all_emotion_avg = None
+        try:
+            emotion_score_result = emotion_analysis.evaluate_presentation_emotion_corrected(db, video_id)
+            all_emotion_avg = emotion_analysis.get_all_emotion_averages_corrected(db, video_id)
+        except Exception as e:
+            logger.error("Emotion evaluation failed: %s", e)
+            failed_stages.add("emotion")
+
+    # 5) 자세 점수
+    with job_status.stage(video_id, "posture"):
+        pose_res = posture_classifier.save_pose_score(
+            db, video_id, pose_counts["good"], pose_counts["bad"], pose_counts["total"]
+        )
+
+    # 6) 속도: 샤드 전사 병합 → 기존 점수 로직
+    with job_status.stage(video_id, "speed"):
+        merged = merge_shard_transcripts(ordered)
+        voice_speed_result = video_processing._default_speed_result()
+        try:
+            speed_res = speed_analysis.save_speed_from_result(db, audio_obj.id, merged)
+            voice_speed_result = video_processing._package_speed_result(speed_res)
+        except Exception as e:
+            logger.warning("Speed analysis failed: %s", e)
+            failed_stages.add("speed")
+
+    # 7) 피치: 샤드 f0 병합 → 0.5초 집계/점수/저장
+    with job_status.stage(video_id, "pitch"):
+        try:
+            f0_times, f0 = merge_shard_f0(ordered)
+            voice_hz.save_pitch_from_f0(audio_obj.id, f0_times, f0)
+        except Exception as e:
+            logger.warning("Pitch analysis failed: %s", e)
+            failed_stages.add("pitch")
+
+    results = video_processing._package_results(
+        gaze_results, emotion_score_result, all_emotion_avg, voice_speed_result
+    )
+    results["posture"] = pose_res
+    results["transcript"] = merged["text"]
+    results["failed_shards"] = failed_shards
+    results["failed_stages"] = sorted(failed_stages)
+    if failed_shards:
+        logger.warning("Sharded processing completed for video_id: %s with %d/%d shards failed",
+                       video_id, len(failed_shards), len(tasks))
+    else:
+        logger.info("Sharded processing completed for video_id: %s (%d shards ok)", video_id, len(tasks))
+    return results, audio_buf
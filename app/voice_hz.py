@@ -1,4 +1,6 @@
 # === app/voice_hz.py (전체 교체본) ===
+from typing import Optional, Union
+
 import numpy as np
 import librosa
 from sklearn.neighbors import NearestNeighbors
@@ -6,6 +8,13 @@ from sqlalchemy.orm import Session
 from app.db import SessionLocal
 from app.models import Pitch, Knn
 from app import crud  # ✅ crud 사용
+from app import vad
+from app import memory, metrics
+from app.audio_buffer import AudioBuffer
+from app.config import VAD_ENABLED
+from app.log import get_logger
+
+logger = get_logger("pitch")
 
 def load_knn_model():
     db: Session = SessionLocal()
@@ -20,8 +29,10 @@ def load_knn_model():
     return knn_model, pitch_std_array
 
 
-def _aggregate_f0_to_halfsec(f0, sr, hop_length, agg_sec=0.5):
-    times = librosa.frames_to_time(np.arange(len(f0)), sr=sr, hop_length=hop_length)
+def _aggregate_f0_by_time(times, f0, agg_sec=0.5):
+    """(times, f0) 시계열을 agg_sec 단위 구간 중앙값으로 집계 (times는 초 단위, 오름차순)"""
+    times = np.asarray(times, dtype=float)
+    f0 = np.asarray(f0, dtype=float)
     duration = times[-1] if len(times) else 0.0
     if duration == 0 or len(f0) == 0:
         return np.array([])
@@ -42,20 +53,91 @@ def _aggregate_f0_to_halfsec(f0, sr, hop_length, agg_sec=0.5):
     return np.array(agg_vals)
 
 
-def analyze_pitch(wav_path: str, knn_model, pitch_std_array):
-    y, sr = librosa.load(wav_path, sr=None)
+def _aggregate_f0_to_halfsec(f0, sr, hop_length, agg_sec=0.5):
+    times = librosa.frames_to_time(np.arange(len(f0)), sr=sr, hop_length=hop_length)
+    return _aggregate_f0_by_time(times, f0, agg_sec=agg_sec)
+
+
+def _pyin(y, sr: int, hop: int):
+    try:
+        f0, _, _ = librosa.pyin(y, fmin=50, fmax=500, sr=sr, hop_length=hop)
+    except Exception:
+        f0, _, _ = librosa.pyin(y, fmin=50, fmax=500, sr=sr, hop_length=hop, viterbi=False)
+    return np.asarray(f0, dtype=float)
+
+
+def _pyin_blockwise(y, sr: int, hop: int, block_sec: float):
+    """
+    메모리 예산 초과 시: hop 배수 길이 블록별 pyin 후 이어붙임 (프레임 시각은 전체 실행과 동일한 격자).
+    각 블록의 마지막 프레임은 다음 블록 첫 프레임과 같은 시각이므로 버림
+    """
+    n_blocks = max(1, int(np.ceil(len(y) / (block_sec * sr))))
+    block = int(np.ceil(len(y) / n_blocks / hop)) * hop
+    parts = []
+    for start in range(0, len(y), block):
+        f0 = _pyin(y[start:start + block], sr, hop)
+        if start + block < len(y):
+            f0 = f0[:block // hop]
+        parts.append(f0)
+    return np.concatenate(parts) if parts else np.array([])
+
+
+def estimate_f0_from_samples(y, sr: int, block_sec: Optional[float] = None):
+    """
+    mono 샘플 → pyin f0 (20ms hop)
+    block_sec: None이면 메모리 예산으로 결정(초과 시 블록 pyin), 0이면 전체 한 번, 양수면 해당 길이 블록
+    반환: (times, f0) — times는 샘플 시작 기준 초
+    """
+    y = np.asarray(y, dtype=np.float32)
     base_hop = int(sr * 0.02)  # 20ms
     if base_hop < 1:
         base_hop = 1
 
-    try:
-        f0, _, _ = librosa.pyin(y, fmin=50, fmax=500, sr=sr, hop_length=base_hop)
-    except Exception:
-        f0, _, _ = librosa.pyin(y, fmin=50, fmax=500, sr=sr, hop_length=base_hop, viterbi=False)
+    audio_sec = len(y) / sr
+    if block_sec is None:
+        block_sec = memory.pitch_block_sec(audio_sec)
+    with metrics.span("pitch.pyin", audio_sec=round(audio_sec, 1), block_sec=round(block_sec or 0.0, 1)):
+        if block_sec and block_sec < audio_sec:
+            f0 = _pyin_blockwise(y, sr, base_hop, block_sec)
+        else:
+            f0 = _pyin(y, sr, base_hop)
+
+    times = librosa.frames_to_time(np.arange(len(f0)), sr=sr, hop_length=base_hop)
+    return times, f0
+
+
+def estimate_f0_voiced(y, sr: int, smap: "vad.SpeechMap", block_sec: Optional[float] = None):
+    """
+    발화 구간만 이어붙인 샘플 → pyin f0, 시각은 원본 타임라인으로 복원.
+    무음 구간은 f0 점이 없으므로 집계 시 NaN 구간이 됨 (끝 시각에 NaN 점을 둬 전체 길이 유지)
+    """
+    if smap.speech_sec <= 0:
+        return np.array([0.0, smap.total_sec]), np.array([np.nan, np.nan])
+    times, f0 = estimate_f0_from_samples(y, sr, block_sec=block_sec)
+    times = smap.to_original(times)
+    return np.append(times, smap.total_sec), np.append(f0, np.nan)
+
+
+def estimate_f0(audio: Union[AudioBuffer, str]):
+    """
+    공용 오디오 버퍼(16kHz, 재디코딩 없음) 또는 wav 경로(원본 샘플레이트) → (times, f0)
+    VAD_ENABLED면 발화 구간에만 pyin 실행
+    """
+    if isinstance(audio, AudioBuffer):
+        if VAD_ENABLED:
+            voiced, smap = vad.voiced_buffer(audio)
+            return estimate_f0_voiced(voiced.array(), voiced.sample_rate, smap)
+        y, sr = audio.array(), audio.sample_rate
+    else:
+        y, sr = librosa.load(audio, sr=None)
+        if VAD_ENABLED:
+            voiced, smap = vad.trim_silence(y, sr)
+            return estimate_f0_voiced(voiced, sr, smap)
+    return estimate_f0_from_samples(y, sr)
 
-    f0 = np.asarray(f0, dtype=float)
-    f0_half = _aggregate_f0_to_halfsec(f0, sr, base_hop, agg_sec=0.5)
 
+def score_pitch(f0_half, knn_model, pitch_std_array):
+    """0.5초 집계 f0 → (hz_std, pitch_score)"""
     hz_values = f0_half[~np.isnan(f0_half)]
     hz_std = float(np.nanstd(hz_values)) if len(hz_values) > 0 else 0.0
 
@@ -71,13 +153,17 @@ def analyze_pitch(wav_path: str, knn_model, pitch_std_array):
             mean_dist_pitch = float(np.mean(mean_dist_pitch))
             pitch_score = float(100 * np.exp(-mean_dist_pitch / (scale_pitch + 1e-9)))
 
-    return f0_half, hz_std, pitch_score
+    return hz_std, pitch_score
 
 
-def save_pitch_to_db(audio_id: int, wav_path: str):
-    knn_model, pitch_std_array = load_knn_model()
-    hz_array, hz_std, pitch_score = analyze_pitch(wav_path, knn_model, pitch_std_array)
+def analyze_pitch(audio: Union[AudioBuffer, str], knn_model, pitch_std_array):
+    times, f0 = estimate_f0(audio)
+    f0_half = _aggregate_f0_by_time(times, f0, agg_sec=0.5)
+    hz_std, pitch_score = score_pitch(f0_half, knn_model, pitch_std_array)
+    return f0_half, hz_std, pitch_score
+
 
+def _save_pitch_rows(audio_id: int, hz_array, hz_std: float, pitch_score: float):
     # 벌크로 모아서 crud로 저장
     items = []
     for idx, hz_val in enumerate(hz_array):
@@ -99,7 +185,25 @@ def save_pitch_to_db(audio_id: int, wav_path: str):
         if items:
             crud.bulk_insert_pitch(db, items)  # 커밋은 crud 내부에서 하지 않음
             db.commit()  # 한 번에 커밋
-        print(f"[INFO] Pitch 저장 완료: audio_id={audio_id}, 총 {len(hz_array)}개 구간, "
-              f"hz_std={hz_std:.3f}, score={pitch_score:.1f}")
+        logger.info("Pitch 저장 완료: audio_id=%s, 총 %d개 구간, hz_std=%.3f, score=%.1f",
+                    audio_id, len(hz_array), hz_std, pitch_score)
     finally:
         db.close()
+
+
+def save_pitch_to_db(audio_id: int, audio: Union[AudioBuffer, str]):
+    knn_model, pitch_std_array = load_knn_model()
+    hz_array, hz_std, pitch_score = analyze_pitch(audio, knn_model, pitch_std_array)
+    _save_pitch_rows(audio_id, hz_array, hz_std, pitch_score)
+
+
+def save_pitch_from_f0(audio_id: int, times, f0):
+    """
+    이미 추정된 (times, f0) 시계열(샤드 병합 결과 등)로 점수 계산 후 저장.
+    times는 원본 타임라인 기준 초여야 함.
+    """
+    knn_model, pitch_std_array = load_knn_model()
+    f0_half = _aggregate_f0_by_time(times, f0, agg_sec=0.5)
+    hz_std, pitch_score = score_pitch(f0_half, knn_model, pitch_std_array)
+    _save_pitch_rows(audio_id, f0_half, hz_std, pitch_score)
+    return f0_half, hz_std, pitch_score
@@ -0,0 +1,121 @@
+# 선택적 백그라운드 워밍업: 서버 기동 후 별도 스레드에서 모델을 미리 로드/1회 추론
+# - WARMUP_ON_STARTUP=1 일 때만 동작 (기본은 lazy 로드)
+# - 진행 상태는 /health, /health/ready 에서 노출
+import time
+import threading
+from typing import Any, Callable, Dict, List
+
+from app.config import WARMUP_ON_STARTUP, WARMUP_MODELS
+from app.log import get_logger
+
+logger = get_logger("warmup")
+
+# 워밍업 가능한 모델 이름 (WARMUP_MODELS 미지정 시 전체)
+DEFAULT_WARMUP_MODELS = [
+    "mp_face_detection",
+    "mp_pose",
+    "mp_face_mesh",
+    "deepface_emotion",
+    "pose_classifier",
+    "stt",
+]
+
+_state: Dict[str, Any] = {
+    "enabled": WARMUP_ON_STARTUP,
+    "status": "disabled" if not WARMUP_ON_STARTUP else "pending",
+    "started_at": None,
+    "finished_at": None,
+    "done": [],
+    "errors": {},
+}
+_lock = threading.Lock()
+
+
+def _prime_mediapipe(name: str) -> None:
+    import numpy as np
+    from app.model_registry import registry
+    with registry.lease(name) as graph:
+        graph.process(np.zeros((64, 64, 3), dtype=np.uint8))
+
+
+def _prime_deepface() -> None:
+    import numpy as np
+    from app.emotion_analysis import analyze_face_emotion
+    analyze_face_emotion(np.zeros((48, 48, 3), dtype=np.uint8))
+
+
+def _prime_pose_classifier() -> None:
+    import numpy as np
+    from app.posture_classifier import load_pose_model, predict_pose_prob
+    predict_pose_prob(load_pose_model(), np.zeros((1, 128, 128, 3), dtype="float32"))
+
+
+def _prime_stt() -> None:
+    import numpy as np
+    from app.stt_backend import get_stt_backend
+    # 설정된 STT 백엔드로 1초 무음 전사 → 모델 로드 + 디코더 초기화
+    get_stt_backend().transcribe(np.zeros(16000, dtype=np.float32), language="ko")
+
+
+def _primer(name: str) -> Callable[[], None]:
+    if name.startswith("mp_"):
+        return lambda: _prime_mediapipe(name)
+    if name == "deepface_emotion":
+        return _prime_deepface
+    if name == "pose_classifier":
+        return _prime_pose_classifier
+    if name == "stt":
+        return _prime_stt
+    raise KeyError(f"Unknown warmup model: {name}")
+
+
+def _target_models() -> List[str]:
+    if WARMUP_MODELS:
+        return [m.strip() for m in WARMUP_MODELS.split(",") if m.strip()]
+    return list(DEFAULT_WARMUP_MODELS)
+
+
+def _run() -> None:
+    with _lock:
+        _state["status"] = "warming"
+        _state["started_at"] = time.time()
+    for name in _target_models():
+        try:
+            _primer(name)()
+            with _lock:
+                _state["done"].append(name)
+        except Exception as e:
+            logger.warning("Warmup failed for %s: %s", name, e)
+            with _lock:
+                _state["errors"][name] = str(e)
+    with _lock:
+        _state["finished_at"] = time.time()
+        _state["status"] = "ready" if not _state["errors"] else "degraded"
+    logger.info("Warmup finished: %s (%.1fs)", _state["status"], _state["finished_at"] - _state["started_at"])
+
+
+def start_background_warmup() -> bool:
+    """WARMUP_ON_STARTUP이면 데몬 스레드로 워밍업 시작 (중복 호출 무시)"""
+    if not WARMUP_ON_STARTUP:
+        return False
+    with _lock:
+        if _state["status"] != "pending":
+            return False
+        _state["status"] = "starting"
+    threading.Thread(target=_run, name="model-warmup", daemon=True).start()
+    return True
+
+
+def is_ready() -> bool:
+    """워밍업 비활성(lazy)이면 항상 ready, 활성이면 워밍업 종료 후 ready"""
+    with _lock:
+        return _state["status"] in ("disabled", "ready", "degraded")
+
+
+def get_state() -> Dict[str, Any]:
+    with _lock:
+        return {
+            **_state,
+            "done": list(_state["done"]),
+            "errors": dict(_state["errors"]),
+        }
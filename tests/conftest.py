@@ -0,0 +1,19 @@
+# 테스트 공용 설정: app.config는 import 시 환경 변수를 읽으므로 app 모듈보다 먼저 설정
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("STORAGE_BACKEND", "local")
+os.environ.setdefault("STORAGE_CACHE_MB", "0")
+os.environ.setdefault("LOG_ASYNC", "0")
+
+import pytest
+
+
+@pytest.fixture
+def local_storage(tmp_path, monkeypatch):
+    """tmp_path 아래 local 저장소를 get_storage()로 사용"""
+    from app import storage
+    store = storage.LocalStorage(str(tmp_path / "storage"))
+    monkeypatch.setattr(storage, "_storage", store)
+    return store
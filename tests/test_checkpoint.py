@@ -0,0 +1,107 @@
+import json
+
+import pytest
+
+from app import checkpoint
+
+
+@pytest.fixture(autouse=True)
+def enabled(local_storage, monkeypatch):
+    monkeypatch.setattr(checkpoint, "CHECKPOINT_ENABLED", True)
+
+
+def _state(store, video_id):
+    return json.loads(store.get_bytes(f"checkpoints/{video_id}/state.json", cached=False))
+
+
+def test_fresh_job_starts_from_first_stage():
+    plan = checkpoint.plan(1)
+    assert plan.resume_from == "frames"
+    assert not any(plan.done(s) for s in checkpoint.STAGES)
+
+
+def test_resume_from_first_incomplete_stage():
+    plan = checkpoint.plan(1)
+    plan.complete("frames", {})
+    plan.complete("gaze", {"3": "center", "gaze_score": 80})
+    plan.complete("emotion", {"score": 70})
+
+    resumed = checkpoint.plan(1)
+    assert resumed.resume_from == "speed"
+    assert [s for s in checkpoint.STAGES if resumed.done(s)] == ["frames", "gaze", "emotion"]
+    assert resumed.output("gaze") == {"3": "center", "gaze_score": 80}
+    assert resumed.output("speed", {}) == {}
+
+
+def test_markers_after_gap_are_dropped(local_storage):
+    plan = checkpoint.plan(1)
+    for stage in ("frames", "gaze", "speed", "posture"):  # emotion 미완료
+        plan.complete(stage, {})
+
+    resumed = checkpoint.plan(1)
+    assert resumed.resume_from == "emotion"
+    assert not resumed.done("speed") and not resumed.done("posture")
+    assert set(_state(local_storage, 1)) == {"frames", "gaze"}
+
+
+def test_all_stages_done():
+    plan = checkpoint.plan(1)
+    for stage in checkpoint.STAGES:
+        plan.complete(stage, {})
+    resumed = checkpoint.plan(1)
+    assert resumed.resume_from is None
+    assert all(resumed.done(s) for s in checkpoint.STAGES)
+
+
+def test_invalidate_keeps_earlier_stages():
+    plan = checkpoint.plan(1)
+    for stage in checkpoint.STAGES:
+        plan.complete(stage, {})
+
+    checkpoint.invalidate(1, checkpoint.SCRIPT_STAGES)
+    resumed = checkpoint.plan(1)
+    assert resumed.resume_from == "pronunciation"
+    assert resumed.done("pitch") and not resumed.done("feedback")
+
+
+def test_stage_version_bump_reruns_from_that_stage(monkeypatch):
+    plan = checkpoint.plan(1)
+    for stage in ("frames", "gaze", "emotion", "speed"):
+        plan.complete(stage, {})
+
+    monkeypatch.setitem(checkpoint.STAGE_VERSIONS, "gaze", checkpoint.STAGE_VERSIONS["gaze"] + 1)
+    resumed = checkpoint.plan(1)
+    assert resumed.resume_from == "gaze"
+    assert resumed.done("frames") and not resumed.done("speed")
+
+
+def test_disabled_never_resumes(monkeypatch):
+    checkpoint.plan(1).complete("frames", {})
+    monkeypatch.setattr(checkpoint, "CHECKPOINT_ENABLED", False)
+    assert checkpoint.plan(1).resume_from == "frames"
+
+
+def test_needs_audio_uses_saved_transcript():
+    plan = checkpoint.plan(1)
+    for stage in ("frames", "gaze", "emotion"):
+        plan.complete(stage, {})
+    assert plan.needs_audio()
+
+    plan.complete("speed", {"speed": {}, "transcript": "안녕하세요"})
+    plan.complete("posture", {})
+    plan.complete("pitch", {})
+    assert not plan.needs_audio()  # 발음은 저장된 전사 사용
+    assert not checkpoint.plan(1).needs_source()
+
+
+def test_late_completion_does_not_restore_invalidated_stages():
+    plan = checkpoint.plan(1)
+    for stage in checkpoint.STAGES[:-1]:
+        plan.complete(stage, {})
+
+    checkpoint.invalidate(1, checkpoint.SCRIPT_STAGES)  # 비동기 피드백 생성 중 대본 교체
+    plan.complete("feedback", {})                        # 이전 작업의 plan으로 늦게 완료
+
+    resumed = checkpoint.plan(1)
+    assert resumed.resume_from == "pronunciation"
+    assert not resumed.done("scores") and not resumed.done("feedback")
@@ -0,0 +1,95 @@
+import io
+import os
+
+import pytest
+
+from app import audio_buffer, resumable_upload
+
+
+@pytest.fixture(autouse=True)
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(resumable_upload, "RESUMABLE_UPLOAD_DIR", str(tmp_path / "resumable"))
+    monkeypatch.setattr(resumable_upload, "RESUMABLE_EARLY_START_MB", 0)  # 조기 디코딩 없음 (ffmpeg 불필요)
+    monkeypatch.setattr(audio_buffer, "probe_duration", lambda path: 12.5)
+    return tmp_path / "resumable"
+
+
+def _create(length):
+    return resumable_upload.create("title", "talk.mp4", length, io.BytesIO(b"script"), "script.txt")
+
+
+def test_create_starts_at_zero():
+    st = _create(10)
+    assert st["offset"] == 0 and st["length"] == 10 and st["video_id"] is None
+
+
+def test_patch_appends_at_current_offset():
+    upload_id = _create(10)["upload_id"]
+    assert resumable_upload.append(upload_id, 0, b"abcd") == 4
+    assert resumable_upload.append(upload_id, 4, b"efg") == 7
+    assert resumable_upload.status(upload_id)["offset"] == 7  # HEAD
+
+
+def test_patch_with_stale_offset_is_rejected():
+    upload_id = _create(10)["upload_id"]
+    resumable_upload.append(upload_id, 0, b"abcd")
+
+    with pytest.raises(resumable_upload.OffsetMismatch) as exc:
+        resumable_upload.append(upload_id, 0, b"abcd")  # 끊긴 요청 재전송
+    assert exc.value.offset == 4
+    with pytest.raises(resumable_upload.OffsetMismatch):
+        resumable_upload.append(upload_id, 6, b"gh")
+    assert resumable_upload.status(upload_id)["offset"] == 4
+
+
+def test_patch_past_length_is_rejected():
+    upload_id = _create(5)["upload_id"]
+    with pytest.raises(ValueError):
+        resumable_upload.append(upload_id, 0, b"toolong")
+    assert resumable_upload.status(upload_id)["offset"] == 0
+
+
+def test_complete_upload_probes_duration_and_moves_sources(tmp_path):
+    upload_id = _create(6)["upload_id"]
+    resumable_upload.append(upload_id, 0, b"abc")
+    assert resumable_upload.after_patch(upload_id)["duration"] is None  # 조기 측정 비활성
+    resumable_upload.append(upload_id, 3, b"def")
+    st = resumable_upload.after_patch(upload_id)
+    assert st["offset"] == st["length"] == 6
+    assert st["duration"] == 12.5
+
+    video_path, script_path = resumable_upload.take_sources(upload_id, str(tmp_path / "work"), str(tmp_path / "out"))
+    with open(video_path, "rb") as f:
+        assert f.read() == b"abcdef"
+    assert os.path.basename(script_path).endswith("script.txt")
+    # 완료 후 HEAD는 전체 길이, 추가 PATCH는 offset 불일치
+    assert resumable_upload.status(upload_id)["offset"] == 6
+    with pytest.raises(resumable_upload.OffsetMismatch) as exc:
+        resumable_upload.append(upload_id, 6, b"x")
+    assert exc.value.offset == 6
+
+
+def test_register_once():
+    upload_id = _create(1)["upload_id"]
+    calls = []
+
+    def register(info):
+        calls.append(info["upload_id"])
+        return 42
+
+    assert resumable_upload.register_once(upload_id, register) == (42, True)
+    assert resumable_upload.register_once(upload_id, register) == (42, False)
+    assert calls == [upload_id]
+    assert resumable_upload.status(upload_id)["video_id"] == 42
+
+
+def test_unknown_or_aborted_upload():
+    with pytest.raises(resumable_upload.UploadNotFound):
+        resumable_upload.status("0" * 32)
+    with pytest.raises(resumable_upload.UploadNotFound):
+        resumable_upload.status("../etc")
+
+    upload_id = _create(4)["upload_id"]
+    resumable_upload.abort(upload_id)
+    with pytest.raises(resumable_upload.UploadNotFound):
+        resumable_upload.append(upload_id, 0, b"ab")
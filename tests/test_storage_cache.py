@@ -0,0 +1,28 @@
+from app import storage
+
+
+def _cached(tmp_path, max_bytes):
+    inner = storage.LocalStorage(str(tmp_path / "inner"))
+    return inner, storage.CachedStorage(inner, storage.DiskLRUCache(str(tmp_path / "cache"), max_bytes))
+
+
+def test_download_streams_and_caches_small_objects(tmp_path, monkeypatch):
+    inner, store = _cached(tmp_path, max_bytes=1024)
+    inner.put_bytes("a/small.bin", b"x" * 100)
+    monkeypatch.setattr(store, "get_bytes", None)  # download는 객체를 bytes로 읽지 않음
+
+    store.download("a/small.bin", str(tmp_path / "d1"))
+    assert (tmp_path / "d1").read_bytes() == b"x" * 100
+
+    inner.put_bytes("a/small.bin", b"changed")  # 캐시 적중이면 원본을 다시 읽지 않음
+    store.download("a/small.bin", str(tmp_path / "d2"))
+    assert (tmp_path / "d2").read_bytes() == b"x" * 100
+
+
+def test_download_skips_cache_for_large_objects(tmp_path):
+    inner, store = _cached(tmp_path, max_bytes=64)
+    inner.put_bytes("videos/big.mp4", b"v" * 1000)
+
+    store.download("videos/big.mp4", str(tmp_path / "d1"))
+    assert (tmp_path / "d1").read_bytes() == b"v" * 1000
+    assert store.cache.get("videos/big.mp4") is None
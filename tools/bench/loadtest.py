@@ -0,0 +1,311 @@
+# HTTP 부하 테스트 (업로드 버스트 + 분석 결과 폴링)
+# - serve: app.main:app 을 로컬 SQLite(또는 --db-url) + LocalS3 + fake chat API 위에서 기동 (모델은 기본 stand-in)
+#     python -m tools.bench.loadtest serve --port 8000
+#   presigned URL은 LocalS3 HTTP 엔드포인트(--s3-port)로 발급 → run --upload-mode direct 로 직접 업로드 경로 측정
+# - run: 가상 사용자(폐쇄 루프)가 트래픽 비율(--mix)대로 요청 + 주기적 업로드 버스트, 사용자 수 단계별(--users) 측정
+#     python -m tools.bench.loadtest run --url http://127.0.0.1:8000 --users 4 16 64 --duration 60
+#   결과: 단계·요청 종류별 처리량(req/s), p50/p95/p99/max 지연, 오류율 + 5초 구간별 p95 → {out}/loadtest_{timestamp}.json
+# - 분석이 끝나기 전 /videos/{id}/analysis 의 404(Score 없음)는 정상 응답(not_ready)으로 집계, 5xx/연결 실패/그 외 4xx는 오류
+import os
+import sys
+import json
+import math
+import time
+import random
+import asyncio
+import argparse
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from tools.bench import stubs, synth
+
+WINDOW_SEC = 5.0
+DEFAULT_MIX = "analysis=8,status=4,upload=1,health=1"
+
+
+# -----------------------------
+# 서버
+# -----------------------------
+def serve(args: argparse.Namespace) -> None:
+    import uvicorn
+
+    os.environ.setdefault("FEEDBACK_ASYNC", "1")  # 서버에서는 실제 운영처럼 이벤트 루프에서 피드백 생성
+    stubs.configure_env(args.workdir, stub_models=args.models == "stub", db_url=args.db_url)
+    stubs.start_fake_chat_api(args.chat_port)
+    if (args.db_url or os.environ["DB_URL"]).startswith("sqlite"):
+        stubs.sqlite_compat()
+    s3 = stubs.install_s3_stub(os.path.join(args.workdir, "s3"))
+    stubs.start_s3_http(s3, args.s3_port)
+    if args.models == "stub":
+        stubs.install_model_stubs(synth.make_script(60.0), latency_sec=args.stub_latency)
+    from app.main import app
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+# -----------------------------
+# 클라이언트
+# -----------------------------
+def _percentile(sorted_vals: List[float], q: float) -> Optional[float]:
+    if not sorted_vals:
+        return None
+    k = math.ceil(q / 100.0 * len(sorted_vals)) - 1  # nearest-rank
+    return sorted_vals[max(0, min(len(sorted_vals) - 1, k))]
+
+
+def _parse_mix(text: str) -> List[Tuple[str, float]]:
+    mix = []
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        mix.append((name.strip(), float(weight or 1)))
+    return mix
+
+
+class Recorder:
+    def __init__(self):
+        self.samples: List[Tuple[float, str, float, str]] = []  # (종료 시각, op, 지연초, 결과)
+
+    def add(self, op: str, t_end: float, latency: float, outcome: str) -> None:
+        self.samples.append((t_end, op, latency, outcome))
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        by_op: Dict[str, List[Tuple[float, str]]] = defaultdict(list)
+        for _, op, lat, outcome in self.samples:
+            by_op[op].append((lat, outcome))
+            by_op["all"].append((lat, outcome))
+        out: Dict[str, Any] = {}
+        for op, items in sorted(by_op.items()):
+            lats = sorted(l for l, _ in items)
+            outcomes: Dict[str, int] = defaultdict(int)
+            for _, o in items:
+                outcomes[o] += 1
+            errors = sum(n for o, n in outcomes.items() if o == "error" or o.startswith("http_"))
+            out[op] = {
+                "count": len(items),
+                "throughput_rps": round(len(items) / elapsed, 2) if elapsed > 0 else None,
+                "p50_ms": _ms(_percentile(lats, 50)),
+                "p95_ms": _ms(_percentile(lats, 95)),
+                "p99_ms": _ms(_percentile(lats, 99)),
+                "max_ms": _ms(lats[-1] if lats else None),
+                "error_rate": round(errors / len(items), 4) if items else 0.0,
+                "outcomes": dict(outcomes),
+            }
+        return out
+
+    def windows(self, t0: float) -> List[Dict[str, Any]]:
+        buckets: Dict[int, List[float]] = defaultdict(list)
+        errs: Dict[int, int] = defaultdict(int)
+        for t_end, _, lat, outcome in self.samples:
+            i = int((t_end - t0) // WINDOW_SEC)
+            buckets[i].append(lat)
+            if outcome == "error" or outcome.startswith("http_"):
+                errs[i] += 1
+        return [
+            {"t": round(i * WINDOW_SEC, 1), "rps": round(len(v) / WINDOW_SEC, 2),
+             "p95_ms": _ms(_percentile(sorted(v), 95)), "errors": errs[i]}
+            for i, v in sorted(buckets.items())
+        ]
+
+
+def _ms(v: Optional[float]) -> Optional[float]:
+    return None if v is None else round(v * 1000, 1)
+
+
+class LoadTest:
+    def __init__(self, args: argparse.Namespace, video_bytes: bytes, script_bytes: bytes):
+        self.args = args
+        self.video_bytes = video_bytes
+        self.script_bytes = script_bytes
+        self.mix = _parse_mix(args.mix)
+        self.video_ids: List[int] = list(args.video_ids)
+        self.rng = random.Random(args.seed)
+
+    async def _request(self, client, rec: Recorder, op: str, method: str, url: str, **kwargs) -> Optional[Any]:
+        t0 = time.perf_counter()
+        try:
+            resp = await client.request(method, url, **kwargs)
+            latency = time.perf_counter() - t0
+            if resp.status_code < 400:
+                outcome = "ok"
+            elif op == "analysis" and resp.status_code == 404:
+                outcome = "not_ready"
+            else:
+                outcome = f"http_{resp.status_code}"
+            rec.add(op, time.perf_counter(), latency, outcome)
+            return resp if outcome == "ok" else None
+        except Exception:
+            rec.add(op, time.perf_counter(), time.perf_counter() - t0, "error")
+            return None
+
+    async def upload(self, client, rec: Recorder) -> None:
+        if self.args.upload_mode == "direct":
+            await self.upload_direct(client, rec)
+            return
+        files = {
+            "file": ("bench.mp4", self.video_bytes, "video/mp4"),
+            "script": ("bench.txt", self.script_bytes, "text/plain"),
+        }
+        resp = await self._request(client, rec, "upload", "POST", "/videos/upload", files=files,
+                                   data={"title": "loadtest"})
+        if resp is not None:
+            try:
+                self.video_ids.append(int(resp.json()["video_id"]))
+            except Exception:
+                pass
+
+    async def upload_direct(self, client, rec: Recorder) -> None:
+        """세션 생성 → 저장소로 직접 PUT(multipart면 part별) → complete (API 요청 지연만 upload로 집계)"""
+        body = {"title": "loadtest", "filename": "bench.mp4", "script_filename": "bench.txt",
+                "size": len(self.video_bytes), "content_type": "video/mp4"}
+        resp = await self._request(client, rec, "upload", "POST", "/videos/uploads", json=body)
+        if resp is None:
+            return
+        session = resp.json()
+        video = session["video"]
+        try:
+            parts = []
+            if "parts" in video:
+                size = video["part_size"]
+                for p in video["parts"]:
+                    start = (p["part_number"] - 1) * size
+                    r = await client.put(p["url"], content=self.video_bytes[start:start + size])
+                    r.raise_for_status()
+                    parts.append({"part_number": p["part_number"], "etag": r.headers["ETag"]})
+            else:
+                (await client.put(video["url"], content=self.video_bytes)).raise_for_status()
+            (await client.put(session["script"]["url"], content=self.script_bytes)).raise_for_status()
+        except Exception:
+            rec.add("upload", time.perf_counter(), 0.0, "error")
+            return
+        resp = await self._request(client, rec, "upload", "POST", f"/videos/uploads/{session['upload_id']}/complete",
+                                   json={"parts": parts})
+        if resp is not None:
+            try:
+                self.video_ids.append(int(resp.json()["video_id"]))
+            except Exception:
+                pass
+
+    async def one(self, client, rec: Recorder, op: str) -> None:
+        if op == "upload":
+            await self.upload(client, rec)
+            return
+        if op == "health":
+            await self._request(client, rec, op, "GET", "/health")
+            return
+        if not self.video_ids:
+            await self._request(client, rec, "health", "GET", "/health")
+            return
+        vid = self.rng.choice(self.video_ids[-self.args.poll_window:])
+        path = f"/videos/{vid}/analysis" if op == "analysis" else f"/videos/{vid}/status"
+        await self._request(client, rec, op, "GET", path)
+
+    async def user(self, client, rec: Recorder, deadline: float) -> None:
+        names = [n for n, _ in self.mix]
+        weights = [w for _, w in self.mix]
+        while time.perf_counter() < deadline:
+            await self.one(client, rec, self.rng.choices(names, weights)[0])
+            if self.args.think_ms > 0:
+                await asyncio.sleep(self.rng.expovariate(1000.0 / self.args.think_ms))
+
+    async def bursts(self, client, rec: Recorder, deadline: float) -> None:
+        if self.args.burst_size <= 0:
+            return
+        while time.perf_counter() + self.args.burst_interval < deadline:
+            await asyncio.sleep(self.args.burst_interval)
+            await asyncio.gather(*(self.upload(client, rec) for _ in range(self.args.burst_size)))
+
+    async def stage(self, n_users: int) -> Dict[str, Any]:
+        import httpx
+
+        rec = Recorder()
+        limits = httpx.Limits(max_connections=n_users + self.args.burst_size + 4)
+        async with httpx.AsyncClient(base_url=self.args.url, timeout=self.args.timeout, limits=limits) as client:
+            t0 = time.perf_counter()
+            deadline = t0 + self.args.duration
+            await asyncio.gather(self.bursts(client, rec, deadline),
+                                 *(self.user(client, rec, deadline) for _ in range(n_users)))
+            elapsed = time.perf_counter() - t0
+        return {"users": n_users, "elapsed_sec": round(elapsed, 1), "ops": rec.summary(elapsed),
+                "windows": rec.windows(t0)}
+
+
+def _print_stage(stage: Dict[str, Any]) -> None:
+    print(f"\n== users={stage['users']} ({stage['elapsed_sec']}s)")
+    print(f"{'op':10s} {'count':>7s} {'rps':>8s} {'p50':>8s} {'p95':>8s} {'p99':>8s} {'max':>8s} {'err%':>6s}")
+    for op, s in stage["ops"].items():
+        cells = [s["p50_ms"], s["p95_ms"], s["p99_ms"], s["max_ms"]]
+        print(f"{op:10s} {s['count']:7d} {s['throughput_rps'] or 0:8.1f} "
+              + " ".join(f"{(c if c is not None else 0):8.1f}" for c in cells)
+              + f" {s['error_rate'] * 100:6.2f}")
+
+
+def run(args: argparse.Namespace) -> None:
+    w, h = (int(v) for v in args.size.lower().split("x"))
+    video_path, script_path = synth.make_media(args.media, args.upload_minutes, w, h, args.fps)
+    with open(video_path, "rb") as f:
+        video_bytes = f.read()
+    with open(script_path, "rb") as f:
+        script_bytes = f.read()
+
+    lt = LoadTest(args, video_bytes, script_bytes)
+    stages = []
+    for n in args.users:
+        stage = asyncio.run(lt.stage(n))
+        _print_stage(stage)
+        stages.append(stage)
+
+    os.makedirs(args.out, exist_ok=True)
+    path = os.path.join(args.out, f"loadtest_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"args": vars(args), "upload_bytes": len(video_bytes), "stages": stages}, f,
+                  ensure_ascii=False, indent=2)
+    print(f"\nsaved: {path}")
+    if args.max_error_rate is not None:
+        worst = max(s["ops"].get("all", {}).get("error_rate", 0.0) for s in stages)
+        if worst > args.max_error_rate:
+            sys.exit(1)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="HTTP 부하 테스트 (업로드 + 분석 폴링)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    sp = sub.add_parser("serve", help="stand-in 환경으로 앱 기동")
+    sp.add_argument("--host", default="127.0.0.1")
+    sp.add_argument("--port", type=int, default=8000)
+    sp.add_argument("--models", choices=("stub", "real"), default="stub")
+    sp.add_argument("--stub-latency", type=float, default=0.0)
+    sp.add_argument("--db-url", default=None, help="기본: {workdir}/bench.db (SQLite)")
+    sp.add_argument("--workdir", default="bench_work")
+    sp.add_argument("--chat-port", type=int, default=8765)
+    sp.add_argument("--s3-port", type=int, default=8766, help="presigned URL용 LocalS3 HTTP 포트")
+
+    rp = sub.add_parser("run", help="부하 실행")
+    rp.add_argument("--url", default="http://127.0.0.1:8000")
+    rp.add_argument("--users", type=int, nargs="+", default=[4, 16, 64], help="단계별 가상 사용자 수")
+    rp.add_argument("--duration", type=float, default=60.0, help="단계별 실행 시간(초)")
+    rp.add_argument("--mix", default=DEFAULT_MIX, help="요청 종류=가중치 (analysis,status,upload,health)")
+    rp.add_argument("--think-ms", type=float, default=200.0, help="사용자별 요청 간 평균 대기(지수 분포)")
+    rp.add_argument("--burst-size", type=int, default=5, help="버스트당 동시 업로드 수 (0이면 없음)")
+    rp.add_argument("--burst-interval", type=float, default=20.0)
+    rp.add_argument("--video-ids", type=int, nargs="*", default=[], help="폴링 대상 기존 video_id")
+    rp.add_argument("--poll-window", type=int, default=20, help="최근 업로드 중 폴링 대상 수")
+    rp.add_argument("--upload-mode", choices=("proxy", "direct"), default="proxy",
+                    help="proxy: POST /videos/upload, direct: presigned URL로 저장소 직접 업로드")
+    rp.add_argument("--upload-minutes", type=float, default=0.25, help="업로드할 합성 영상 길이(분)")
+    rp.add_argument("--size", default="640x360")
+    rp.add_argument("--fps", type=int, default=10)
+    rp.add_argument("--timeout", type=float, default=120.0)
+    rp.add_argument("--seed", type=int, default=0)
+    rp.add_argument("--max-error-rate", type=float, default=None, help="초과 시 종료 코드 1")
+    rp.add_argument("--media", default="bench_media")
+    rp.add_argument("--out", default="bench_results")
+
+    args = ap.parse_args()
+    if args.cmd == "serve":
+        serve(args)
+    else:
+        run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+# 순수 Python 커널 마이크로 벤치마크 + 기준선 비교
+# - align_ops(음절 Levenshtein 정렬), _aggregate_f0_to_halfsec(f0 0.5초 집계), corrected_ratios(감정 dominant 보정 비율)
+# - 커널마다 repeat회 측정한 중앙값을 보정 루프(calibration) 시간으로 나눈 상대값으로 비교 → 기계 속도 차이 완화
+# - 기준선: tools/bench/baselines/micro.json (--save-baseline로 갱신, 기준 기계에서 생성해 커밋)
+# - --check: 기준선 대비 상대값이 --threshold(기본 25%) 이상 느려진 커널이 있으면 종료 코드 1
+#   기준선 파일이 없어도 종료 코드 1 (CI 회귀 게이트가 비교 없이 통과하지 않도록)
+# - 실행: python -m tools.bench.micro [--check] [--save-baseline]
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import statistics
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Tuple
+
+from tools.bench import stubs, synth
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "micro.json")
+
+
+def _calibration() -> None:
+    # 고정 분량의 인터프리터 작업 (정수 연산 + 리스트/딕셔너리)
+    acc: Dict[int, int] = {}
+    for i in range(200_000):
+        acc[i & 1023] = acc.get(i & 1023, 0) + i * i
+
+
+def _measure(fn: Callable[[], Any], repeat: int, warmup: int = 1) -> Dict[str, float]:
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return {"median_sec": statistics.median(times), "min_sec": min(times)}
+
+
+# -----------------------------
+# 커널 입력
+# -----------------------------
+def _align_case(n_syllables: int, seed: int = 0) -> Tuple[List[str], List[str]]:
+    """대본 음절 vs 5% 치환/3% 누락/2% 삽입된 인식 음절"""
+    from app.speech_pronunciation import hangul_to_syllables
+    rng = random.Random(seed)
+    ref = hangul_to_syllables(synth.make_script(n_syllables / synth.SYLLABLES_PER_SEC * 1.3, seed))[:n_syllables]
+    hyp: List[str] = []
+    for s in ref:
+        r = rng.random()
+        if r < 0.03:
+            continue
+        if r < 0.08:
+            hyp.append(rng.choice(ref))
+        else:
+            hyp.append(s)
+        if rng.random() < 0.02:
+            hyp.append(rng.choice(ref))
+    return ref, hyp
+
+
+def _f0_case(minutes: float, seed: int = 0):
+    import numpy as np
+    rng = np.random.RandomState(seed)
+    n = int(minutes * 60 / 0.02)  # 20ms hop
+    f0 = 150 + 30 * np.sin(np.arange(n) / 50.0) + rng.randn(n) * 5
+    f0[rng.rand(n) < 0.35] = np.nan  # 무성 구간
+    return f0
+
+
+def _emotion_rows(n: int, seed: int = 0) -> List[SimpleNamespace]:
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(n):
+        scores = [rng.random() for _ in range(6)]
+        total = sum(scores)
+        vals = [100.0 * s / total for s in scores]
+        rows.append(SimpleNamespace(**dict(zip(("angry", "fear", "surprise", "happy", "sad", "neutral"), vals))))
+    return rows
+
+
+def build_kernels() -> Dict[str, Tuple[Callable[[], Any], int]]:
+    """이름 → (호출, repeat)"""
+    from app.speech_pronunciation import align_ops
+    from app.voice_hz import _aggregate_f0_to_halfsec
+    from app.emotion_analysis import corrected_ratios
+
+    ref300, hyp300 = _align_case(300)
+    ref1200, hyp1200 = _align_case(1200, seed=1)
+    f0_10min = _f0_case(10)
+    rows_1h = _emotion_rows(3600)
+    return {
+        "align_ops[300]": (lambda: align_ops(ref300, hyp300), 5),
+        "align_ops[1200]": (lambda: align_ops(ref1200, hyp1200), 2),
+        "aggregate_f0_halfsec[10min]": (lambda: _aggregate_f0_to_halfsec(f0_10min, 16000, 320), 5),
+        "emotion_corrected_ratios[3600]": (lambda: corrected_ratios(rows_1h), 10),
+    }
+
+
+def run(only: List[str]) -> Dict[str, Any]:
+    calib = _measure(_calibration, repeat=7)["median_sec"]
+    kernels = {}
+    for name, (fn, repeat) in build_kernels().items():
+        if only and not any(o in name for o in only):
+            continue
+        m = _measure(fn, repeat)
+        m["relative"] = m["median_sec"] / calib
+        kernels[name] = m
+    return {"python": sys.version.split()[0], "calibration_sec": calib, "kernels": kernels}
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> Tuple[str, List[str]]:
+    lines, regressions = [], []
+    base_k = baseline.get("kernels", {})
+    header = f"{'kernel':34s} {'median_ms':>10s} {'relative':>9s} {'baseline':>9s} {'change':>8s}"
+    lines.append(header)
+    lines.append("-" * len(header))
+    for name, m in current["kernels"].items():
+        b = base_k.get(name)
+        if b is None:
+            lines.append(f"{name:34s} {m['median_sec'] * 1000:10.2f} {m['relative']:9.2f} {'-':>9s} {'new':>8s}")
+            continue
+        change = m["relative"] / b["relative"] - 1.0
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        lines.append(f"{name:34s} {m['median_sec'] * 1000:10.2f} {m['relative']:9.2f} {b['relative']:9.2f} "
+                     f"{change * 100:+7.1f}%{flag}")
+    return "\n".join(lines), regressions
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="순수 Python 커널 마이크로 벤치마크")
+    ap.add_argument("--only", nargs="*", default=[], help="이름에 포함된 커널만 실행")
+    ap.add_argument("--baseline", default=BASELINE_PATH)
+    ap.add_argument("--save-baseline", action="store_true", help="결과를 기준선으로 저장")
+    ap.add_argument("--check", action="store_true", help="회귀가 있으면 종료 코드 1")
+    ap.add_argument("--threshold", type=float, default=0.25, help="회귀 판정 기준 (상대값 증가율)")
+    ap.add_argument("--workdir", default="bench_work")
+    args = ap.parse_args()
+
+    stubs.configure_env(args.workdir)  # app.db 임포트용 (DB 접속은 하지 않음)
+    current = run(args.only)
+
+    baseline: Dict[str, Any] = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    table, regressions = compare(current, baseline, args.threshold)
+    print(f"calibration: {current['calibration_sec'] * 1000:.2f}ms (python {current['python']})")
+    print(table)
+
+    if args.save_baseline:
+        if baseline and args.only:
+            baseline.setdefault("kernels", {}).update(current["kernels"])  # 일부 커널만 갱신
+            current = {**current, "kernels": baseline["kernels"]}
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(current, f, ensure_ascii=False, indent=2)
+        print(f"baseline saved: {args.baseline}")
+    if regressions:
+        print(f"regressions (> {args.threshold * 100:.0f}%): {', '.join(regressions)}")
+        if args.check:
+            sys.exit(1)
+    if args.check and not baseline and not args.save_baseline:
+        print(f"no baseline at {args.baseline} — run with --save-baseline on the reference machine and commit it")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
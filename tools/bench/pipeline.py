@@ -0,0 +1,165 @@
+# 종단 간 파이프라인 벤치마크 (analyze_presentation_video / process_video_background)
+# - 합성 영상(tools.bench.synth)을 길이별(기본 1/5/30분)로 만들어 로컬 SQLite + LocalS3 + fake chat API 위에서 실행
+# - 단계별 소요 시간/최대 RSS(job_status stages), 상위 span 합계(작업 trace), 전체 소요/실시간 배율, S3 요청 수를 기록
+# - 결과: {out}/pipeline_{timestamp}.json + 표 출력
+# - 실행 예:
+#   python -m tools.bench.pipeline --minutes 1 5 30                 # 모델 stand-in (파이프라인 오버헤드)
+#   python -m tools.bench.pipeline --minutes 1 --models real        # 실제 모델 (모델 파일/라이브러리 필요)
+#   python -m tools.bench.pipeline --minutes 5 --target analyze     # 발음/피치/피드백 제외
+import os
+import json
+import time
+import shutil
+import argparse
+from typing import Any, Dict, List
+
+from tools.bench import stubs, synth
+
+
+def _fmt_table(rows: List[List[Any]], header: List[str]) -> str:
+    cells = [header] + [[("" if v is None else str(v)) for v in r] for r in rows]
+    widths = [max(len(r[i]) for r in cells) for i in range(len(header))]
+    lines = ["  ".join(c.ljust(w) for c, w in zip(r, widths)) for r in cells]
+    lines.insert(1, "  ".join("-" * w for w in widths))
+    return "\n".join(lines)
+
+
+def run_once(minutes: float, args: argparse.Namespace, s3: "stubs.LocalS3") -> Dict[str, Any]:
+    from app import crud, job_status, memory, video_processing, s3_utils
+    from app.db import SessionLocal
+
+    w, h = (int(v) for v in args.size.lower().split("x"))
+    video_src, script_src = synth.make_media(args.media, minutes, w, h, args.fps, args.seed)
+    with open(script_src, encoding="utf-8") as f:
+        script_text = f.read()
+    if args.models == "stub":
+        stubs.install_model_stubs(script_text, latency_sec=args.stub_latency)
+
+    # 작업이 입력 파일을 지우므로 복사본으로 실행
+    temp_dir = os.path.join(args.workdir, "temp")
+    os.makedirs(temp_dir, exist_ok=True)
+    stamp = int(time.time() * 1000)
+    video_path = os.path.join(temp_dir, f"{stamp}_{os.path.basename(video_src)}")
+    script_path = os.path.join(temp_dir, f"{stamp}_{os.path.basename(script_src)}")
+    shutil.copyfile(video_src, video_path)
+    shutil.copyfile(script_src, script_path)
+
+    duration = minutes * 60.0
+    db = SessionLocal()
+    try:
+        video = crud.create_video(db, user_id=1, title=f"bench {minutes:g}min", video_totaltime=duration,
+                                  video_url=f"bench://{os.path.basename(video_src)}")
+        video_id = video.id
+    finally:
+        db.close()
+    out_dir = os.path.join(temp_dir, str(video_id))
+    os.makedirs(out_dir, exist_ok=True)
+    job_status.create_job(video_id, duration)
+    s3_before = dict(s3.stats)
+
+    mem: Dict[str, float] = {}
+    t0 = time.perf_counter()
+    with memory.track(mem):
+        if args.target == "background":
+            from app.main import process_video_background
+            process_video_background(video_path, script_path, out_dir, video_id, os.path.basename(video_path))
+        else:
+            db = SessionLocal()
+            error = None
+            job_status.start_job(video_id)
+            try:
+                video_processing.analyze_presentation_video(video_path, out_dir, db, video_id, s3_utils)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                raise
+            finally:
+                job_status.finish_job(video_id, error)
+                db.close()
+                shutil.rmtree(out_dir, ignore_errors=True)
+                for p in (video_path, script_path):
+                    if os.path.exists(p):
+                        os.remove(p)
+    wall = time.perf_counter() - t0
+
+    db = SessionLocal()
+    try:
+        status = job_status.get_status(db, video_id) or {}
+        trace = job_status.get_trace(db, video_id) or {}
+    finally:
+        db.close()
+
+    return {
+        "minutes": minutes,
+        "video_id": video_id,
+        "status": status.get("status"),
+        "error": status.get("error"),
+        "wall_sec": round(wall, 2),
+        "realtime_factor": round(duration / wall, 2) if wall > 0 else None,
+        "frames": status.get("frames_total"),
+        "memory": mem,
+        "stages": status.get("stages", []),
+        "spans": dict(list((trace.get("summary") or {}).items())[:args.top_spans]),
+        "budget": (trace.get("notes") or {}).get("memory_budget", []),
+        "s3_requests": {k: s3.stats[k] - s3_before.get(k, 0) for k in s3.stats},
+    }
+
+
+def report(results: List[Dict[str, Any]]) -> str:
+    out = []
+    rows = [[f"{r['minutes']:g}", r["status"], r["wall_sec"], r["realtime_factor"], r["frames"],
+             r["memory"].get("rss_peak_mb"), r["s3_requests"].get("put"), r["s3_requests"].get("get")]
+            for r in results]
+    out.append(_fmt_table(rows, ["min", "status", "wall_s", "x_realtime", "frames", "peak_rss_mb", "s3_put", "s3_get"]))
+    for r in results:
+        out.append(f"\n[{r['minutes']:g}min] stages")
+        srows = [[s["name"], s["duration"], round(s["duration"] / max(r["minutes"], 1e-9), 2),
+                  s.get("rss_peak_mb"), s.get("rss_delta_mb")] for s in r["stages"]]
+        out.append(_fmt_table(srows, ["stage", "sec", "sec/min", "rss_peak_mb", "rss_delta_mb"]))
+        if r["spans"]:
+            out.append(f"[{r['minutes']:g}min] top spans")
+            prow = [[k, v["count"], v["total_sec"], v["max_sec"]] for k, v in r["spans"].items()]
+            out.append(_fmt_table(prow, ["span", "count", "total_s", "max_s"]))
+        if r["error"]:
+            out.append(f"error: {r['error']}")
+    return "\n".join(out)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="종단 간 분석 파이프라인 벤치마크")
+    ap.add_argument("--minutes", type=float, nargs="+", default=[1.0, 5.0, 30.0])
+    ap.add_argument("--target", choices=("background", "analyze"), default="background",
+                    help="background: process_video_background 전체, analyze: analyze_presentation_video만")
+    ap.add_argument("--models", choices=("stub", "real"), default="stub")
+    ap.add_argument("--stub-latency", type=float, default=0.0, help="stub 모델 호출당 추가 지연(초)")
+    ap.add_argument("--size", default="640x360", help="합성 영상 해상도 WxH")
+    ap.add_argument("--fps", type=int, default=10)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--media", default="bench_media", help="합성 영상 캐시 디렉터리")
+    ap.add_argument("--workdir", default="bench_work", help="SQLite DB / LocalS3 / 임시 파일")
+    ap.add_argument("--out", default="bench_results")
+    ap.add_argument("--top-spans", type=int, default=12)
+    ap.add_argument("--chat-port", type=int, default=8765)
+    args = ap.parse_args()
+
+    # app 임포트 전에 환경 구성
+    stubs.configure_env(args.workdir, stub_models=args.models == "stub")
+    stubs.start_fake_chat_api(args.chat_port)
+    stubs.sqlite_compat()
+    s3 = stubs.install_s3_stub(os.path.join(args.workdir, "s3"))
+    stubs.create_tables()
+
+    results = []
+    for m in args.minutes:
+        print(f"== {m:g}min ({args.target}, models={args.models})", flush=True)
+        results.append(run_once(m, args, s3))
+
+    os.makedirs(args.out, exist_ok=True)
+    path = os.path.join(args.out, f"pipeline_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"args": vars(args), "results": results}, f, ensure_ascii=False, indent=2)
+    print(report(results))
+    print(f"\nsaved: {path}")
+
+
+if __name__ == "__main__":
+    main()
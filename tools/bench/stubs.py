@@ -0,0 +1,409 @@
+# 벤치마크/부하 테스트용 외부 의존성 stand-in
+# - configure_env(): app 임포트 전에 호출. 로컬 SQLite DB, 더미 AWS 설정, 로그 레벨 등 환경 변수 기본값
+# - LocalS3 / install_s3_stub(): boto3.client / boto3.session.Session 을 디렉터리 기반 객체 저장소로 교체
+#   (app 모듈들이 쓰는 list_objects_v2 / get_object / put_object / upload_file / download_file / multipart 만 구현)
+# - start_s3_http(): presigned URL용 HTTP 엔드포인트 (PUT 객체/part, GET 객체) → 직접 업로드(direct_upload) 부하 측정
+# - start_fake_chat_api(): tools.fake_chat_api 를 백그라운드 스레드에서 띄우고 OPENAI_BASE_URL 지정
+# - install_model_stubs(): 얼굴/사람 검출, 시선, 감정, 자세 분류, STT를 결정적 가짜 구현으로 교체
+#   (같은 span 이름으로 계측하므로 파이프라인 자체 오버헤드를 stage/span 단위로 비교 가능)
+#   샤딩 워커(spawn)에는 적용되지 않으므로 stub 모드에서는 샤딩을 끔 (configure_env)
+import io
+import os
+import time
+import uuid
+import shutil
+import threading
+from typing import Any, Dict, List, Optional
+
+BENCH_BUCKET = "bench-bucket"
+BENCH_REGION = "local"
+
+
+def configure_env(workdir: str, stub_models: bool = True, db_url: Optional[str] = None) -> None:
+    """app.config 임포트 전에 호출 (이미 설정된 환경 변수는 유지)"""
+    os.makedirs(workdir, exist_ok=True)
+    defaults = {
+        "DB_URL": db_url or f"sqlite:///{os.path.abspath(os.path.join(workdir, 'bench.db'))}",
+        "AWS_ACCESS_KEY_ID": "bench",
+        "AWS_SECRET_ACCESS_KEY": "bench",
+        "AWS_BUCKET_NAME": BENCH_BUCKET,
+        "AWS_REGION": BENCH_REGION,
+        "LOG_LEVEL": "WARNING",
+        "FEEDBACK_ASYNC": "0",  # 서버 이벤트 루프 없이 작업 안에서 피드백까지 완료
+        "CHECKPOINT_ENABLED": "0",  # 벤치 DB를 새로 만들면 video_id가 재사용됨 → 이전 체크포인트로 단계를 건너뛰지 않도록
+    }
+    if stub_models:
+        defaults["STT_BACKEND"] = "bench-stub"
+        defaults["SHARD_MIN_DURATION_SEC"] = "0"
+    for k, v in defaults.items():
+        os.environ.setdefault(k, v)
+
+
+def sqlite_compat() -> None:
+    """SQLite에서 BigInteger PK 자동 증가가 되도록 INTEGER로 컴파일"""
+    from sqlalchemy import BigInteger
+    from sqlalchemy.ext.compiler import compiles
+
+    @compiles(BigInteger, "sqlite")
+    def _bigint_sqlite(type_, compiler, **kw):
+        return "INTEGER"
+
+
+def create_tables() -> None:
+    from app.db import engine
+    from app import models
+    models.Base.metadata.create_all(bind=engine)  # models import 시 테이블이 Base에 등록됨
+
+
+# -----------------------------
+# S3 stand-in
+# -----------------------------
+class _Body:
+    def __init__(self, data: bytes):
+        self._buf = io.BytesIO(data)
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+        return self._buf.read() if amt is None else self._buf.read(amt)
+
+    def close(self) -> None:
+        pass
+
+
+class _NoSuchKey(Exception):
+    pass
+
+
+class LocalS3:
+    """root/{bucket}/{key} 파일로 저장하는 S3 클라이언트 최소 구현 (스레드 안전, 다중 버킷)"""
+
+    class exceptions:
+        NoSuchKey = _NoSuchKey
+
+    def __init__(self, root: str, region: str = BENCH_REGION):
+        self.root = root
+        self.region_name = region
+        self.stats: Dict[str, int] = {"put": 0, "get": 0, "list": 0}
+        self.http_base: Optional[str] = None  # start_s3_http() 이후 presigned URL 기준 주소
+        self._lock = threading.Lock()
+
+    def _path(self, bucket: str, key: str) -> str:
+        return os.path.join(self.root, bucket, *key.split("/"))
+
+    def _count(self, op: str) -> None:
+        with self._lock:
+            self.stats[op] += 1
+
+    # --- client API ---
+    def put_object(self, Bucket: str, Key: str, Body: Any = b"", **kwargs) -> Dict[str, Any]:
+        path = self._path(Bucket, Key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = Body.read() if hasattr(Body, "read") else (Body.encode() if isinstance(Body, str) else Body)
+        with open(path, "wb") as f:
+            f.write(data)
+        self._count("put")
+        return {"ETag": f'"{len(data)}"'}
+
+    def get_object(self, Bucket: str, Key: str, **kwargs) -> Dict[str, Any]:
+        path = self._path(Bucket, Key)
+        if not os.path.isfile(path):
+            raise _NoSuchKey(f"s3://{Bucket}/{Key}")
+        with open(path, "rb") as f:
+            data = f.read()
+        rng = kwargs.get("Range")
+        if rng and rng.startswith("bytes="):
+            start, _, end = rng[len("bytes="):].partition("-")
+            data = data[int(start): (int(end) + 1) if end else None]
+        self._count("get")
+        return {"Body": _Body(data), "ContentLength": len(data)}
+
+    def head_object(self, Bucket: str, Key: str, **kwargs) -> Dict[str, Any]:
+        path = self._path(Bucket, Key)
+        if not os.path.isfile(path):
+            raise _NoSuchKey(f"s3://{Bucket}/{Key}")
+        return {"ContentLength": os.path.getsize(path)}
+
+    def list_objects_v2(self, Bucket: str, Prefix: str = "", MaxKeys: int = 1000,
+                        ContinuationToken: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        base = os.path.join(self.root, Bucket)
+        keys: List[str] = []
+        for dirpath, _, files in os.walk(base):
+            for name in files:
+                key = os.path.relpath(os.path.join(dirpath, name), base).replace(os.sep, "/")
+                if key.startswith(Prefix):
+                    keys.append(key)
+        keys.sort()
+        start = int(ContinuationToken or 0)
+        page = keys[start:start + MaxKeys]
+        self._count("list")
+        resp: Dict[str, Any] = {"KeyCount": len(page), "IsTruncated": start + MaxKeys < len(keys)}
+        if page:
+            resp["Contents"] = [{"Key": k, "Size": os.path.getsize(self._path(Bucket, k))} for k in page]
+        if resp["IsTruncated"]:
+            resp["NextContinuationToken"] = str(start + MaxKeys)
+        return resp
+
+    def upload_file(self, Filename: str, Bucket: str, Key: str, **kwargs) -> None:
+        path = self._path(Bucket, Key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        shutil.copyfile(Filename, path)
+        self._count("put")
+
+    def download_file(self, Bucket: str, Key: str, Filename: str, **kwargs) -> None:
+        path = self._path(Bucket, Key)
+        if not os.path.isfile(path):
+            raise _NoSuchKey(f"s3://{Bucket}/{Key}")
+        shutil.copyfile(path, Filename)
+        self._count("get")
+
+    def _part_path(self, upload_id: str, part_number: int) -> str:
+        return os.path.join(self.root, ".multipart", upload_id, f"{int(part_number):05d}")
+
+    def create_multipart_upload(self, Bucket: str, Key: str, **kwargs) -> Dict[str, Any]:
+        upload_id = uuid.uuid4().hex
+        os.makedirs(os.path.dirname(self._part_path(upload_id, 1)), exist_ok=True)
+        return {"Bucket": Bucket, "Key": Key, "UploadId": upload_id}
+
+    def upload_part(self, Bucket: str, Key: str, UploadId: str, PartNumber: int, Body: Any = b"",
+                    **kwargs) -> Dict[str, Any]:
+        part_dir = os.path.dirname(self._part_path(UploadId, PartNumber))
+        if not os.path.isdir(part_dir):
+            raise _NoSuchKey(f"upload {UploadId}")
+        data = Body.read() if hasattr(Body, "read") else Body
+        with open(self._part_path(UploadId, PartNumber), "wb") as f:
+            f.write(data)
+        self._count("put")
+        return {"ETag": f'"{len(data)}"'}
+
+    def complete_multipart_upload(self, Bucket: str, Key: str, UploadId: str, MultipartUpload: Dict[str, Any],
+                                  **kwargs) -> Dict[str, Any]:
+        path = self._path(Bucket, Key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as out:
+            for part in sorted(MultipartUpload["Parts"], key=lambda p: p["PartNumber"]):
+                with open(self._part_path(UploadId, part["PartNumber"]), "rb") as f:
+                    shutil.copyfileobj(f, out)
+        self.abort_multipart_upload(Bucket, Key, UploadId)
+        return {"Bucket": Bucket, "Key": Key}
+
+    def abort_multipart_upload(self, Bucket: str, Key: str, UploadId: str, **kwargs) -> None:
+        shutil.rmtree(os.path.dirname(self._part_path(UploadId, 1)), ignore_errors=True)
+
+    def generate_presigned_url(self, ClientMethod: str, Params: Dict[str, Any], ExpiresIn: int = 3600,
+                               **kwargs) -> str:
+        if self.http_base is None:
+            return f"file://{self._path(Params['Bucket'], Params['Key'])}"
+        url = f"{self.http_base}/{Params['Bucket']}/{Params['Key']}"
+        if ClientMethod == "upload_part":
+            url += f"?uploadId={Params['UploadId']}&partNumber={Params['PartNumber']}"
+        return url
+
+    # --- resource API (s3_utils: session.resource('s3').Bucket(name)) ---
+    def Bucket(self, name: str) -> "_LocalBucket":
+        return _LocalBucket(self, name)
+
+
+class _LocalBucket:
+    def __init__(self, s3: LocalS3, name: str):
+        self._s3 = s3
+        self.name = name
+
+    def upload_file(self, Filename: str, Key: str, **kwargs) -> None:
+        self._s3.upload_file(Filename, self.name, Key)
+
+    def download_file(self, Key: str, Filename: str, **kwargs) -> None:
+        self._s3.download_file(self.name, Key, Filename)
+
+    def put_object(self, Key: str, Body: Any = b"", **kwargs) -> Dict[str, Any]:
+        return self._s3.put_object(self.name, Key, Body)
+
+
+class _LocalSession:
+    def __init__(self, s3: LocalS3):
+        self._s3 = s3
+        self.region_name = s3.region_name
+
+    def resource(self, service: str, *args, **kwargs) -> LocalS3:
+        return self._s3
+
+    def client(self, service: str, *args, **kwargs) -> LocalS3:
+        return self._s3
+
+
+def install_s3_stub(root: str) -> LocalS3:
+    """boto3 S3 진입점을 LocalS3로 교체 → 인스턴스 (stats로 요청 수 확인)"""
+    import boto3
+    import boto3.session
+
+    s3 = LocalS3(root)
+    boto3.client = lambda service, *args, **kwargs: s3
+    boto3.resource = lambda service, *args, **kwargs: s3
+    boto3.session.Session = lambda *args, **kwargs: _LocalSession(s3)
+    return s3
+
+
+def start_s3_http(s3: LocalS3, port: int = 8766) -> str:
+    """presigned URL 요청(PUT 객체/part, GET 객체)을 LocalS3로 처리하는 HTTP 서버 (데몬 스레드) → base URL"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qs, unquote, urlsplit
+
+    class Handler(BaseHTTPRequestHandler):
+        def _target(self):
+            parts = urlsplit(self.path)
+            bucket, _, key = unquote(parts.path).lstrip("/").partition("/")
+            return bucket, key, {k: v[0] for k, v in parse_qs(parts.query).items()}
+
+        def do_PUT(self):
+            bucket, key, query = self._target()
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            try:
+                if "uploadId" in query:
+                    resp = s3.upload_part(bucket, key, query["uploadId"], int(query["partNumber"]), body)
+                else:
+                    resp = s3.put_object(bucket, key, body)
+            except _NoSuchKey:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("ETag", resp["ETag"])
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def do_GET(self):
+            bucket, key, _ = self._target()
+            try:
+                data = s3.get_object(bucket, key)["Body"].read()
+            except _NoSuchKey:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    threading.Thread(target=server.serve_forever, name="s3-http", daemon=True).start()
+    s3.http_base = f"http://127.0.0.1:{port}"
+    return s3.http_base
+
+
+# -----------------------------
+# chat API stand-in
+# -----------------------------
+def start_fake_chat_api(port: int = 8765) -> str:
+    """tools.fake_chat_api를 데몬 스레드로 기동 → base URL (OPENAI_BASE_URL로도 설정)"""
+    import uvicorn
+    from tools.fake_chat_api import app as chat_app
+
+    server = uvicorn.Server(uvicorn.Config(chat_app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, name="fake-chat-api", daemon=True).start()
+    deadline = time.time() + 10
+    while not server.started and time.time() < deadline:
+        time.sleep(0.05)
+    base_url = f"http://127.0.0.1:{port}/v1"
+    os.environ["OPENAI_BASE_URL"] = base_url
+    return base_url
+
+
+# -----------------------------
+# 모델 stand-in
+# -----------------------------
+class _FakePoseModel:
+    def predict(self, arr, verbose=0):
+        import numpy as np
+        # 밝기 기반 결정적 확률 (프레임마다 조금씩 달라짐)
+        return np.array([[0.5 + 0.4 * float(arr.mean() - 0.5)]], dtype=np.float32)
+
+
+def _script_words(script_text: str) -> List[str]:
+    words = [w.strip(".,!?") for w in script_text.split()]
+    return [w for w in words if w] or ["발표"]
+
+
+def _segment(idx: int, words: List[Dict[str, Any]], word_timestamps: bool) -> Dict[str, Any]:
+    return {
+        "id": idx, "start": words[0]["start"], "end": words[-1]["end"],
+        "text": "".join(w["word"] for w in words),
+        "words": words if word_timestamps else [],
+    }
+
+
+def install_model_stubs(script_text: str = "", words_per_sec: float = 2.0, latency_sec: float = 0.0) -> None:
+    """
+    무거운 모델 추론을 결정적 가짜 구현으로 교체 (라이브러리 임포트는 그대로 필요).
+    latency_sec: 호출마다 추가할 지연 (모델 비용 흉내, 0이면 파이프라인 오버헤드만 측정)
+    """
+    import numpy as np
+    from app import metrics, video_processing, gaze_analysis, emotion_analysis, posture_classifier, stt_backend
+
+    def _wait():
+        if latency_sec > 0:
+            time.sleep(latency_sec)
+
+    def face_box(rgb_frame):
+        with metrics.span("detect.face"):
+            _wait()
+            h, w = rgb_frame.shape[:2]
+            return (int(w * 0.42), int(h * 0.18), int(w * 0.58), int(h * 0.52))
+
+    def person_box(frame_rgb):
+        with metrics.span("detect.pose"):
+            _wait()
+            h, w = frame_rgb.shape[:2]
+            return (int(w * 0.25), int(h * 0.15), int(w * 0.75), h)
+
+    directions = ("center", "center", "left", "center", "right", "center")
+
+    def gaze(image):
+        with metrics.span("detect.face_mesh"):
+            _wait()
+            return directions[int(image.mean()) % len(directions)]
+
+    def emotion(face_bgr):
+        with metrics.span("detect.emotion"):
+            _wait()
+            m = float(face_bgr.mean()) if face_bgr.size else 0.0
+            happy = 10.0 + (m % 30.0)
+            return {"angry": 2.0, "fear": 1.0, "surprise": 3.0, "happy": happy, "sad": 4.0,
+                    "neutral": 100.0 - happy - 10.0}
+
+    words = _script_words(script_text)
+
+    class ScriptStubBackend(stt_backend.SttBackend):
+        """대본 단어를 words_per_sec 속도로 오디오 길이만큼 내보내는 STT (2% 단어는 누락)"""
+        name = "bench-stub"
+
+        def load(self) -> None:
+            pass
+
+        def transcribe(self, audio, language: str = "ko", word_timestamps: bool = False) -> Dict[str, Any]:
+            with metrics.span("stt.transcribe", backend=self.name):
+                _wait()
+                duration = len(np.asarray(audio)) / 16000.0 if not isinstance(audio, str) else 0.0
+                n = int(duration * words_per_sec)
+                step = 1.0 / words_per_sec
+                segments, seg_words = [], []
+                for i in range(n):
+                    if i % 50 == 49:
+                        continue
+                    start = i * step
+                    seg_words.append({"word": " " + words[i % len(words)], "start": start,
+                                      "end": start + step * 0.8, "probability": 0.9})
+                    if len(seg_words) == 10:
+                        segments.append(_segment(len(segments), seg_words, word_timestamps))
+                        seg_words = []
+                if seg_words:
+                    segments.append(_segment(len(segments), seg_words, word_timestamps))
+                return {"text": "".join(s["text"] for s in segments).strip(), "language": language,
+                        "segments": segments}
+
+    video_processing._detect_face_box = face_box
+    video_processing._detect_person_box = person_box
+    gaze_analysis.detect_gaze_direction_with_mediapipe = gaze
+    emotion_analysis.analyze_face_emotion = emotion
+    posture_classifier.load_pose_model = lambda model_path=None: _FakePoseModel()
+    stt_backend._BACKENDS[ScriptStubBackend.name] = ScriptStubBackend
+    for key in [k for k in stt_backend._instances if k[0] == ScriptStubBackend.name]:
+        del stt_backend._instances[key]  # 대본이 바뀌면 새 인스턴스
@@ -0,0 +1,214 @@
+# 벤치마크용 합성 발표 영상/대본 생성
+# - 영상: 단색 배경 + 상반신(몸통/어깨) + 얼굴(눈 깜빡임, 입 움직임, 좌우 흔들림)을 numpy로 렌더링
+# - 오디오: 음절 단위 유성음(기본 주파수가 문장 안에서 오르내리는 배음 톤, 초당 SYLLABLES_PER_SEC) + 문장 사이 무음
+#   → VAD/무음 분할/pyin/속도 분석이 실제 발화와 비슷한 양의 일을 하도록
+# - 대본: 같은 음절 속도 기준 길이의 한국어 문장 (발음 정렬 입력)
+# - 실행: python -m tools.bench.synth --minutes 5 --out /tmp/bench_media
+import os
+import math
+import wave
+import random
+import argparse
+from typing import List, Tuple
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+SYLLABLES_PER_SEC = 4.5
+SENTENCE_SYLLABLES = (12, 28)   # 문장당 음절 수 범위
+PAUSE_SEC = (0.4, 1.2)          # 문장 사이 무음 범위
+F0_RANGE = (110.0, 230.0)       # 기본 주파수 범위(Hz)
+
+_WORDS = [
+    "오늘", "발표할", "주제는", "데이터", "분석", "결과입니다", "먼저", "배경을", "설명드리면",
+    "저희", "팀은", "사용자", "경험을", "개선하기", "위해", "여러", "실험을", "진행했고",
+    "그", "과정에서", "중요한", "점을", "발견했습니다", "다음으로", "구체적인", "사례를",
+    "살펴보겠습니다", "마지막으로", "향후", "계획과", "기대", "효과를", "말씀드리겠습니다",
+]
+
+
+# -----------------------------
+# 대본 / 발화 타임라인
+# -----------------------------
+def make_script(duration_sec: float, seed: int = 0) -> str:
+    """duration_sec 분량(SYLLABLES_PER_SEC 기준) 한국어 대본"""
+    rng = random.Random(seed)
+    target = int(duration_sec * SYLLABLES_PER_SEC * 0.8)  # 무음 구간 고려
+    sentences, n = [], 0
+    while n < target:
+        words, sent_n = [], 0
+        goal = rng.randint(*SENTENCE_SYLLABLES)
+        while sent_n < goal:
+            w = rng.choice(_WORDS)
+            words.append(w)
+            sent_n += len(w)
+        sentences.append(" ".join(words) + ".")
+        n += sent_n
+    return "\n".join(sentences)
+
+
+def plan_utterances(duration_sec: float, seed: int = 0) -> List[Tuple[float, float]]:
+    """[(start, end), ...] 문장 발화 구간 (사이는 무음)"""
+    rng = random.Random(seed)
+    out, t = [], rng.uniform(*PAUSE_SEC)
+    while t < duration_sec:
+        length = rng.randint(*SENTENCE_SYLLABLES) / SYLLABLES_PER_SEC
+        end = min(t + length, duration_sec)
+        out.append((t, end))
+        t = end + rng.uniform(*PAUSE_SEC)
+    return out
+
+
+# -----------------------------
+# 오디오
+# -----------------------------
+def _render_speech(t: np.ndarray, start: float, end: float, rng: np.random.RandomState) -> np.ndarray:
+    """한 문장: 음절마다 진폭 포락선 + 문장 억양(상승 후 하강) f0의 배음 톤"""
+    rel = t - start
+    span = max(end - start, 1e-3)
+    lo, hi = F0_RANGE
+    base = rng.uniform(lo, (lo + hi) / 2)
+    # f0(rel) = base + (hi - base)/2 · sin(π·rel/span) + 8 · sin(2π·3·rel) 의 적분 (블록 경계에서도 위상 연속)
+    phase = 2 * np.pi * (
+        base * rel
+        + (hi - base) * 0.5 * span / np.pi * (1 - np.cos(np.pi * rel / span))
+        + 8.0 * (1 - np.cos(2 * np.pi * 3.0 * rel)) / (2 * np.pi * 3.0)
+    )
+    tone = sum(np.sin(k * phase) / k for k in (1, 2, 3, 4))
+    syl = (rel * SYLLABLES_PER_SEC) % 1.0
+    envelope = np.clip(np.sin(np.pi * syl), 0, None) ** 0.7
+    return (0.25 * tone * envelope).astype(np.float32)
+
+
+def write_audio(path: str, duration_sec: float, seed: int = 0, block_sec: float = 10.0) -> None:
+    """16kHz mono 16bit WAV (블록 단위로 기록해 긴 길이도 메모리 일정)"""
+    utterances = plan_utterances(duration_sec, seed)
+    rng = np.random.RandomState(seed)
+    total = int(duration_sec * SAMPLE_RATE)
+    block = int(block_sec * SAMPLE_RATE)
+    with wave.open(path, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(SAMPLE_RATE)
+        ui = 0
+        for b0 in range(0, total, block):
+            n = min(block, total - b0)
+            t = (b0 + np.arange(n)) / SAMPLE_RATE
+            y = (0.002 * rng.randn(n)).astype(np.float32)  # 배경 잡음
+            t0, t1 = t[0], t[-1]
+            while ui < len(utterances) and utterances[ui][1] < t0:
+                ui += 1
+            j = ui
+            while j < len(utterances) and utterances[j][0] <= t1:
+                s, e = utterances[j]
+                mask = (t >= s) & (t < e)
+                if mask.any():
+                    y[mask] += _render_speech(t[mask], s, e, np.random.RandomState(seed * 100003 + j))
+                j += 1
+            wf.writeframes((np.clip(y, -1, 1) * 32767).astype("<i2").tobytes())
+
+
+# -----------------------------
+# 영상
+# -----------------------------
+def _ellipse_mask(h: int, w: int, cy: float, cx: float, ry: float, rx: float) -> np.ndarray:
+    yy, xx = np.ogrid[:h, :w]
+    return ((yy - cy) / ry) ** 2 + ((xx - cx) / rx) ** 2 <= 1.0
+
+
+def make_frame_renderer(width: int, height: int, utterances: List[Tuple[float, float]]):
+    """t → RGB uint8 프레임"""
+    bg = np.empty((height, width, 3), dtype=np.uint8)
+    bg[:] = (200, 205, 210)
+    yy, xx = np.ogrid[:height, :width]
+    starts = np.array([s for s, _ in utterances]) if utterances else np.array([0.0])
+
+    def speaking(t: float) -> bool:
+        i = int(np.searchsorted(starts, t, side="right")) - 1
+        return 0 <= i < len(utterances) and utterances[i][0] <= t < utterances[i][1]
+
+    def render(t: float) -> np.ndarray:
+        frame = bg.copy()
+        sway = 0.03 * width * math.sin(2 * math.pi * t / 7.0)
+        cx = width / 2 + sway
+        # 몸통 + 어깨
+        torso = (yy > height * 0.55) & (np.abs(xx - cx) < width * 0.18 + (yy - height * 0.55) * 0.35)
+        frame[torso] = (40, 60, 110)
+        # 목 + 얼굴
+        neck = (yy > height * 0.45) & (yy < height * 0.58) & (np.abs(xx - cx) < width * 0.035)
+        frame[neck] = (220, 180, 150)
+        fcy, fry, frx = height * 0.35, height * 0.15, width * 0.075
+        frame[_ellipse_mask(height, width, fcy, cx, fry, frx)] = (230, 190, 160)
+        frame[_ellipse_mask(height, width, fcy - fry * 0.85, cx, fry * 0.4, frx * 1.05) & (yy < fcy - fry * 0.5)] = (40, 30, 25)
+        # 눈 (약 4초마다 깜빡임)
+        blink = (t % 4.0) < 0.15
+        for dx in (-0.4, 0.4):
+            ex, ey = cx + dx * frx, fcy - fry * 0.15
+            eye_ry = fry * (0.02 if blink else 0.09)
+            frame[_ellipse_mask(height, width, ey, ex, eye_ry, frx * 0.16)] = (255, 255, 255)
+            if not blink:
+                frame[_ellipse_mask(height, width, ey, ex, eye_ry * 0.8, frx * 0.08)] = (30, 30, 30)
+        # 입 (발화 중이면 음절 주기로 열림)
+        open_ratio = abs(math.sin(math.pi * t * SYLLABLES_PER_SEC)) if speaking(t) else 0.1
+        frame[_ellipse_mask(height, width, fcy + fry * 0.5, cx, fry * (0.04 + 0.12 * open_ratio), frx * 0.35)] = (150, 60, 60)
+        return frame
+
+    return render
+
+
+def make_video(path: str, duration_sec: float, width: int = 640, height: int = 360, fps: int = 10,
+               seed: int = 0) -> str:
+    """합성 발표 영상(mp4, H.264 + AAC) 생성 → path"""
+    from moviepy.editor import AudioFileClip, VideoClip
+
+    wav_path = os.path.splitext(path)[0] + ".wav"
+    write_audio(wav_path, duration_sec, seed)
+    audio = AudioFileClip(wav_path)
+    clip = VideoClip(make_frame_renderer(width, height, plan_utterances(duration_sec, seed)), duration=duration_sec)
+    clip = clip.set_audio(audio)
+    try:
+        clip.write_videofile(path, fps=fps, codec="libx264", audio_codec="aac", preset="ultrafast",
+                             threads=os.cpu_count() or 1, logger=None)
+    finally:
+        audio.close()
+        clip.close()
+        try:
+            os.remove(wav_path)
+        except OSError:
+            pass
+    return path
+
+
+def make_media(out_dir: str, minutes: float, width: int = 640, height: int = 360, fps: int = 10,
+               seed: int = 0) -> Tuple[str, str]:
+    """(영상 경로, 대본 경로). 같은 인자로 이미 생성한 파일이 있으면 재사용"""
+    os.makedirs(out_dir, exist_ok=True)
+    stem = f"synth_{minutes:g}min_{width}x{height}_{fps}fps_s{seed}"
+    video_path = os.path.join(out_dir, stem + ".mp4")
+    script_path = os.path.join(out_dir, stem + ".txt")
+    duration = minutes * 60.0
+    if not os.path.exists(video_path):
+        make_video(video_path + ".part.mp4", duration, width, height, fps, seed)
+        os.replace(video_path + ".part.mp4", video_path)
+    if not os.path.exists(script_path):
+        with open(script_path, "w", encoding="utf-8") as f:
+            f.write(make_script(duration, seed))
+    return video_path, script_path
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="합성 발표 영상/대본 생성")
+    ap.add_argument("--minutes", type=float, nargs="+", default=[1.0])
+    ap.add_argument("--out", default="bench_media")
+    ap.add_argument("--size", default="640x360", help="WxH")
+    ap.add_argument("--fps", type=int, default=10)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+    w, h = (int(v) for v in args.size.lower().split("x"))
+    for m in args.minutes:
+        video, script = make_media(args.out, m, w, h, args.fps, args.seed)
+        print(f"{m:g}min: {video} / {script}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# 로컬 chat API stand-in (OpenAI /v1/chat/completions 호환 최소 구현)
+# - 피드백 단계(feedback_service / feedback_chatbot)를 실제 LLM 없이 확인하기 위한 개발용 서버
+# - 실행: uvicorn tools.fake_chat_api:app --port 8001
+#   서버 측: OPENAI_BASE_URL=http://localhost:8001/v1 (OPENAI_API_KEY 불필요)
+# - FAKE_CHAT_TOKEN_DELAY_SEC: 토큰 간 지연(스트리밍 확인), FAKE_CHAT_FAIL_RATE: 500 응답 비율(재시도 확인),
+#   FAKE_CHAT_STALL_SEC: 첫 토큰 전 지연(타임아웃 확인)
+import os
+import json
+import time
+import random
+import asyncio
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+TOKEN_DELAY_SEC = float(os.getenv("FAKE_CHAT_TOKEN_DELAY_SEC", "0.02"))
+FAIL_RATE = float(os.getenv("FAKE_CHAT_FAIL_RATE", "0"))
+STALL_SEC = float(os.getenv("FAKE_CHAT_STALL_SEC", "0"))
+
+CANNED = {
+    "short_feedback": "시선은 안정적이고 **속도**도 무난해. **억양 변화**와 **표정**만 조금 더 살려 보자.",
+    "detailed_feedback": "- **[시선]** 0~10초: 카메라를 잘 보고 있어. (로컬 stand-in 응답)\n"
+                         "- **[속도]** 전체: 목표 범위 안에서 말하고 있어. (로컬 stand-in 응답)",
+}
+
+app = FastAPI()
+
+
+def _chunks(text: str, size: int = 8):
+    for i in range(0, len(text), size):
+        yield text[i:i + size]
+
+
+def _chunk_payload(cid: str, model: str, content=None, finish=None) -> str:
+    delta = {"content": content} if content is not None else {}
+    body = {
+        "id": cid,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+    }
+    return f"data: {json.dumps(body, ensure_ascii=False)}\n\n"
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    model = body.get("model", "fake")
+    if random.random() < FAIL_RATE:
+        return JSONResponse(status_code=500, content={"error": {"message": "fake failure", "type": "server_error"}})
+
+    content = json.dumps(CANNED, ensure_ascii=False)
+    cid = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+
+    if not body.get("stream"):
+        await asyncio.sleep(STALL_SEC)
+        return {
+            "id": cid,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
+
+    async def _events():
+        await asyncio.sleep(STALL_SEC)
+        for piece in _chunks(content):
+            yield _chunk_payload(cid, model, piece)
+            await asyncio.sleep(TOKEN_DELAY_SEC)
+        yield _chunk_payload(cid, model, finish="stop")
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(_events(), media_type="text/event-stream")